@@ -0,0 +1,300 @@
+"""Adjacency index for Gstudio
+
+An optional index local to the process, holding the relations and
+the attributes of every node as compact edge tuples, so the relation
+helpers of the nodes are served without any query.
+
+The index is built once with bulk queries, then kept up to date by
+the signals of the relations and attributes. Each change is shared
+with the other processes through the cache framework, under the
+version it brings, so they replay the changes they missed instead of
+rebuilding their own, unless too many were missed or expired."""
+from __future__ import with_statement
+from threading import RLock
+from time import time
+
+from django.core.cache import cache
+
+from gstudio.models import NID
+from gstudio.models import Relation
+from gstudio.models import Attribute
+from gstudio.models import Relationtype
+from gstudio.models import Attributetype
+from gstudio.neighbourhood import Neighbour
+
+INDEX_VERSION_KEY = 'gstudio:adjacency_version'
+INDEX_CHANGES_KEY = 'gstudio:adjacency_changes:%s'
+INDEX_CHANGES_TIMEOUT = 3600
+MAX_REPLAYED_CHANGES = 100
+
+
+def neighbour_of(node):
+    """Return the Neighbour of a node instance"""
+    return Neighbour(node.pk, node.title, node.get_absolute_url())
+
+
+class AdjacencyIndex(object):
+    """Edges of the nodes, indexed by node id.
+
+    outgoing and incoming map a node id to a list of
+    (relation id, relationtype id, other node id, scope) tuples,
+    attributes map a node id to a list of
+    (attribute id, attributetype id, attributetype scope,
+    value scope, value) tuples."""
+
+    def __init__(self):
+        self.lock = RLock()
+        self.version = None
+        self.clear()
+
+    def clear(self):
+        self.outgoing = {}
+        self.incoming = {}
+        self.attributes = {}
+        self.relations = {}
+        self.subjects = {}
+        self.relationtypes = {}
+        self.attributetypes = {}
+        self.nodes = {}
+
+    def get_version(self):
+        version = cache.get(INDEX_VERSION_KEY)
+        if version is None:
+            version = int(time() * 1000)
+            cache.set(INDEX_VERSION_KEY, version)
+        return version
+
+    def publish_changes(self, changes):
+        """Share changes with the other processes, and keep
+        this index current if no other change happened since"""
+        previous = self.version
+        try:
+            version = cache.incr(INDEX_VERSION_KEY)
+        except ValueError:
+            version = int(time() * 1000)
+            cache.set(INDEX_VERSION_KEY, version)
+        cache.set(INDEX_CHANGES_KEY % version, changes,
+                  INDEX_CHANGES_TIMEOUT)
+        if previous is not None and version == previous + 1:
+            self.version = version
+
+    def replay_changes(self, version):
+        """Apply the changes made by the other processes up to a version,
+        and return False if some of them are missing"""
+        if self.version is None or \
+               not 0 < version - self.version <= MAX_REPLAYED_CHANGES:
+            return False
+        keys = [INDEX_CHANGES_KEY % missed
+                for missed in range(self.version + 1, version + 1)]
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            return False
+        for key in keys:
+            self.apply_changes(changes[key])
+        self.version = version
+        return True
+
+    def is_built(self):
+        return self.version is not None
+
+    def ensure_built(self):
+        """Build the index if missing, or if changed by
+        another process and its changes cannot be replayed"""
+        version = self.get_version()
+        if self.version != version:
+            with self.lock:
+                if self.version != version and \
+                       not self.replay_changes(version):
+                    self.build()
+                    self.version = version
+
+    def build(self):
+        """Load all the edges with a few bulk queries"""
+        self.clear()
+        self.relationtypes = dict(
+            (pk, (title, inverse)) for pk, title, inverse in
+            Relationtype.objects.values_list('pk', 'title', 'inverse'))
+        self.attributetypes = dict(
+            Attributetype.objects.values_list('pk', 'title'))
+        for values in Relation.objects.values_list(
+            'pk', 'left_subject', 'relationtype',
+            'right_subject', 'relationtype_scope'):
+            self.add_relation(*values)
+        for values in Attribute.objects.values_list(
+            'pk', 'subject', 'attributetype', 'attributetype_scope',
+            'value_scope', 'svalue'):
+            self.add_attribute(*values)
+        self.load_nodes(self.nodes.keys())
+
+    def load_nodes(self, ids):
+        """Load the Neighbours of the nodes in bulk"""
+        for pk, node in NID.objects.refs(ids).items():
+            self.nodes[pk] = neighbour_of(node)
+
+    def add_relation(self, pk, left, relationtype, right, scope):
+        self.remove_relation(pk)
+        self.relations[pk] = (left, relationtype, right, scope)
+        self.outgoing.setdefault(left, []).append(
+            (pk, relationtype, right, scope))
+        self.incoming.setdefault(right, []).append(
+            (pk, relationtype, left, scope))
+        for node_id in (pk, left, right):
+            self.nodes.setdefault(node_id, None)
+
+    def remove_relation(self, pk):
+        if not pk in self.relations:
+            return
+        left, relationtype, right, scope = self.relations.pop(pk)
+        self.outgoing[left] = [edge for edge in self.outgoing[left]
+                               if edge[0] != pk]
+        self.incoming[right] = [edge for edge in self.incoming[right]
+                                if edge[0] != pk]
+
+    def add_attribute(self, pk, subject, attributetype,
+                      attributetype_scope, value_scope, value):
+        self.remove_attribute(pk)
+        self.subjects[pk] = subject
+        self.attributes.setdefault(subject, []).append(
+            (pk, attributetype, attributetype_scope, value_scope, value))
+
+    def remove_attribute(self, pk):
+        if not pk in self.subjects:
+            return
+        subject = self.subjects.pop(pk)
+        self.attributes[subject] = [attribute for attribute
+                                    in self.attributes[subject]
+                                    if attribute[0] != pk]
+
+    def get_node(self, pk):
+        return self.nodes.get(pk)
+
+    def get_relations(self, pk):
+        """Relations of a node as {name: other node},
+        like Nodetype.get_relations"""
+        relations = {}
+        for edges, index in ((self.outgoing, 0), (self.incoming, 1)):
+            for relation, relationtype, other, scope in edges.get(pk, []):
+                if self.get_node(other) is not None:
+                    relations[self.relationtypes[relationtype][index]] = \
+                        self.get_node(other)
+        return relations
+
+    def get_relation_sets(self, pk):
+        """Relations of a node as {name: [relations]},
+        like Gbobject.get_relations"""
+        relations = {}
+        for edges, index in ((self.outgoing, 0), (self.incoming, 1)):
+            for relation, relationtype, other, scope in edges.get(pk, []):
+                if self.get_node(relation) is not None:
+                    name = str(self.relationtypes[relationtype][index])
+                    relations.setdefault(name, []).append(
+                        self.get_node(relation))
+        return relations
+
+    def get_relations_by_side(self, pk):
+        """Relations of a node as {'lrelations': {name: [nodes]},
+        'rrelations': {name: [nodes]}}, like Gbobject.get_relations1"""
+        relations = {}
+        for edges, index, side in ((self.outgoing, 0, 'lrelations'),
+                                   (self.incoming, 1, 'rrelations')):
+            for relation, relationtype, other, scope in edges.get(pk, []):
+                if self.get_node(other) is not None:
+                    relations.setdefault(side, {}).setdefault(
+                        self.relationtypes[relationtype][index], []).append(
+                        self.get_node(other))
+        return relations
+
+    def get_attributes(self, pk):
+        """Attributes of a node as {name: value},
+        like Gbobject.get_attributes"""
+        attributes = {}
+        for attribute, attributetype, attributetype_scope, value_scope, \
+                value in self.attributes.get(pk, []):
+            attributes[(attributetype_scope or '') +
+                       self.attributetypes[attributetype]] = \
+                (value_scope or '') + value
+        return attributes
+
+    def get_changes(self, instance, deleted=False, created=False):
+        """Return the changes of the index made by the change
+        of an instance, as (kind, id, values) tuples, values
+        being None for a deletion"""
+        changes = []
+        if isinstance(instance, Relation):
+            values = (instance.left_subject_id, instance.relationtype_id,
+                      instance.right_subject_id, instance.relationtype_scope)
+            changes.append(('relation', instance.pk, not deleted and values
+                            or None))
+        elif isinstance(instance, Attribute):
+            values = (instance.subject_id, instance.attributetype_id,
+                      instance.attributetype_scope, instance.value_scope,
+                      instance.svalue)
+            changes.append(('attribute', instance.pk, not deleted and values
+                            or None))
+        if isinstance(instance, Relationtype):
+            values = (instance.title, instance.inverse)
+            changes.append(('relationtype', instance.pk, not deleted and
+                            values or None))
+        elif isinstance(instance, Attributetype):
+            values = (instance.title,)
+            changes.append(('attributetype', instance.pk, not deleted and
+                            values or None))
+
+        # A new node is not in any index yet, and the nodes
+        # of a built index are the same in every process.
+        if isinstance(instance, NID) and (changes or not created and (
+            not self.is_built() or instance.pk in self.nodes)):
+            values = (instance.title, instance.get_absolute_url())
+            changes.append(('node', instance.pk, not deleted and values
+                            or None))
+        return changes
+
+    def apply_changes(self, changes):
+        """Apply changes to the index"""
+        for kind, pk, values in changes:
+            if kind == 'relation':
+                if values is None:
+                    self.remove_relation(pk)
+                else:
+                    self.add_relation(pk, *values)
+                    self.load_nodes([node_id for node_id in (
+                        values[0], values[2])
+                                     if self.nodes.get(node_id) is None])
+            elif kind == 'attribute':
+                if values is None:
+                    self.remove_attribute(pk)
+                else:
+                    self.add_attribute(pk, *values)
+            elif kind == 'relationtype':
+                if values is None:
+                    self.relationtypes.pop(pk, None)
+                else:
+                    self.relationtypes[pk] = values
+            elif kind == 'attributetype':
+                if values is None:
+                    self.attributetypes.pop(pk, None)
+                else:
+                    self.attributetypes[pk] = values[0]
+            elif kind == 'node' and pk in self.nodes:
+                self.nodes[pk] = values and Neighbour(pk, *values) or None
+
+    def update(self, instance, deleted=False, created=False):
+        """Apply the change of an instance to the index,
+        and share it with the other processes"""
+        changes = self.get_changes(instance, deleted, created)
+        if not changes:
+            return
+
+        with self.lock:
+            if self.is_built():
+                self.apply_changes(changes)
+            self.publish_changes(changes)
+
+
+ADJACENCY_INDEX = AdjacencyIndex()
+
+
+def get_adjacency_index():
+    """Return the adjacency index of the process, built"""
+    ADJACENCY_INDEX.ensure_built()
+    return ADJACENCY_INDEX
@@ -10,21 +10,21 @@ from django.conf.urls.defaults import url
 from django.conf.urls.defaults import patterns
 from django.conf import settings as project_settings
 from django.utils.translation import ugettext_lazy as _
-from django.core.urlresolvers import reverse, NoReverseMatch
-
-from tagging.models import Tag
+from django.core.urlresolvers import reverse
 
 import reversion
 from gstudio import settings
 from gstudio.managers import HIDDEN
 from gstudio.managers import PUBLISHED
 from gstudio.ping import DirectoryPinger
+from gstudio.publication import update_publications
 from gstudio.admin.forms import AttributetypeAdminForm
+from gstudio.admin.changelist import NodetypeChangeListMixin
 
 
 
 
-class AttributetypeAdmin(reversion.VersionAdmin):
+class AttributetypeAdmin(NodetypeChangeListMixin, reversion.VersionAdmin):
     """Admin for Attributetype model"""
     form = AttributetypeAdminForm
     date_hierarchy = 'creation_date'
@@ -74,63 +74,6 @@ types','dataType','verbose_name','null','blank','help_text','max_digits','decima
         super(AttributetypeAdmin, self).__init__(model, admin_site)
 
     # Custom Display
-    def get_title(self, attributetype):
-        """Return the title with word count and number of comments"""
-        title = _('%(title)s (%(word_count)i words)') % \
-                {'title': attributetype.title, 'word_count': attributetype.word_count}
-        comments = attributetype.comments.count()
-        if comments:
-            return _('%(title)s (%(comments)i comments)') % \
-                   {'title': title, 'comments': comments}
-        return title
-    get_title.short_description = _('title')
-
-    def get_authors(self, attributetype):
-        """Return the authors in HTML"""
-        try:
-            authors = ['<a href="%s" target="blank">%s</a>' %
-                       (reverse('gstudio_author_detail',
-                                args=[author.username]),
-                        author.username) for author in attributetype.authors.all()]
-        except NoReverseMatch:
-            authors = [author.username for author in attributetype.authors.all()]
-        return ', '.join(authors)
-    get_authors.allow_tags = True
-    get_authors.short_description = _('author(s)')
-
-    def get_metatypes(self, attributetype):
-        """Return the metatypes linked in HTML"""
-        try:
-            metatypes = ['<a href="%s" target="blank">%s</a>' %
-                          (metatype.get_absolute_url(), metatype.title)
-                          for metatype in attributetype.metatypes.all()]
-        except NoReverseMatch:
-            metatypes = [metatype.title for metatype in
-                          attributetype.metatypes.all()]
-        return ', '.join(metatypes)
-    get_metatypes.allow_tags = True
-    get_metatypes.short_description = _('metatype(s)')
-
-    def get_tags(self, attributetype):
-        """Return the tags linked in HTML"""
-        try:
-            return ', '.join(['<a href="%s" target="blank">%s</a>' %
-                              (reverse('gstudio_tag_detail',
-                                       args=[tag.name]), tag.name)
-                              for tag in Tag.attributes.get_for_attribute(attributetype)])
-        except NoReverseMatch:
-            return attributetype.tags
-    get_tags.allow_tags = True
-    get_tags.short_description = _('tag(s)')
-
-    def get_sites(self, attributetype):
-        """Return the sites linked in HTML"""
-        return ', '.join(
-            ['<a href="http://%(domain)s" target="blank">%(name)s</a>' %
-             site.__dict__ for site in attributetype.sites.all()])
-    get_sites.allow_tags = True
-    get_sites.short_description = _('site(s)')
-
     def get_comments_are_open(self, attributetype):
         """Admin wrapper for attributetype.comments_are_open"""
         return attributetype.comments_are_open
@@ -225,6 +168,7 @@ types','dataType','verbose_name','null','blank','help_text','max_digits','decima
     def make_published(self, request, queryset):
         """Set attributetypes selected as published"""
         queryset.update(status=PUBLISHED)
+        update_publications(queryset)
         self.ping_directories(request, queryset, messages=False)
         self.message_user(
             request, _('The selected attributetypes are now marked as published.'))
@@ -233,6 +177,7 @@ types','dataType','verbose_name','null','blank','help_text','max_digits','decima
     def make_hidden(self, request, queryset):
         """Set attributetypes selected as hidden"""
         queryset.update(status=HIDDEN)
+        update_publications(queryset)
         self.message_user(
             request, _('The selected attributetypes are now marked as hidden.'))
     make_hidden.short_description = _('Set attributetypes selected as hidden')
@@ -0,0 +1,151 @@
+"""Changelist of the nodetype admins for Gstudio
+
+The columns of the changelist of the nodetypes read their authors,
+metatypes, sites, tags and number of comments loaded in bulk for the
+rows of the page, so a page is displayed with the same number of
+queries whatever its number of rows."""
+from django.db.models import Q
+from django.db.models import Count
+from django.contrib import comments
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.comments.models import CommentFlag
+from django.contrib.contenttypes.models import ContentType
+from django.utils.translation import ugettext_lazy as _
+from django.core.urlresolvers import reverse, NoReverseMatch
+
+from tagging.models import TaggedItem
+
+from gstudio.feeds import prefetch_relation
+
+
+def prefetch_tags(model, nodetypes):
+    """Return the tags of the nodetypes by nodetype id, in one query"""
+    content_type = ContentType.objects.get_for_model(model)
+    tags = dict([(nodetype.pk, []) for nodetype in nodetypes])
+    if tags:
+        for item in TaggedItem.objects.filter(
+            content_type=content_type, object_id__in=tags.keys()
+            ).select_related('tag').order_by('tag__name'):
+            tags[item.object_id].append(item.tag)
+    return tags
+
+
+def count_comments(model, nodetypes):
+    """Return the number of published comments
+    of the nodetypes by nodetype id, in one query"""
+    content_type = ContentType.objects.get_for_model(model)
+    counts = dict([(nodetype.pk, 0) for nodetype in nodetypes])
+    if counts:
+        object_pks = dict([(unicode(pk), pk) for pk in counts])
+        for row in comments.get_model().objects.filter(
+            content_type=content_type, object_pk__in=object_pks.keys(),
+            is_public=True).filter(
+            Q(flags=None) | Q(flags__flag=CommentFlag.MODERATOR_APPROVAL)
+            ).order_by().values('object_pk').annotate(
+            count=Count('pk', distinct=True)):
+            counts[object_pks[row['object_pk']]] = row['count']
+    return counts
+
+
+class NodetypeChangeList(ChangeList):
+    """ChangeList loading in bulk the columns of its rows"""
+
+    def get_results(self, request):
+        super(NodetypeChangeList, self).get_results(request)
+        self.result_list = self.model_admin.prefetch_rows(self.result_list)
+
+
+class NodetypeChangeListMixin(object):
+    """Mixin of the admins of the nodetypes displaying
+    the columns of the changelist from rows loaded in bulk"""
+
+    def get_changelist(self, request, **kwargs):
+        """Return the changelist loading its rows in bulk"""
+        return NodetypeChangeList
+
+    def prefetch_rows(self, nodetypes):
+        """Return the nodetypes of a page with their authors,
+        metatypes, sites, tags and number of comments"""
+        nodetypes = list(nodetypes)
+        authors = prefetch_relation(nodetypes, 'authors')
+        metatypes = prefetch_relation(nodetypes, 'metatypes')
+        sites = prefetch_relation(nodetypes, 'sites')
+        tags = prefetch_tags(self.model, nodetypes)
+        comment_counts = count_comments(self.model, nodetypes)
+        for nodetype in nodetypes:
+            nodetype.admin_authors = authors[nodetype.pk]
+            nodetype.admin_metatypes = metatypes[nodetype.pk]
+            nodetype.admin_sites = sites[nodetype.pk]
+            nodetype.admin_tags = tags[nodetype.pk]
+            nodetype.admin_comments = comment_counts[nodetype.pk]
+        return nodetypes
+
+    def get_title(self, nodetype):
+        """Return the title with word count and number of comments"""
+        title = _('%(title)s (%(word_count)i words)') % \
+                {'title': nodetype.title, 'word_count': nodetype.word_count}
+        comments = getattr(nodetype, 'admin_comments', None)
+        if comments is None:
+            comments = nodetype.comments.count()
+        if comments:
+            return _('%(title)s (%(comments)i comments)') % \
+                   {'title': title, 'comments': comments}
+        return title
+    get_title.short_description = _('title')
+
+    def get_authors(self, nodetype):
+        """Return the authors in HTML"""
+        authors = getattr(nodetype, 'admin_authors', None)
+        if authors is None:
+            authors = nodetype.authors.all()
+        try:
+            authors = ['<a href="%s" target="blank">%s</a>' %
+                       (reverse('gstudio_author_detail',
+                                args=[author.username]),
+                        author.username) for author in authors]
+        except NoReverseMatch:
+            authors = [author.username for author in authors]
+        return ', '.join(authors)
+    get_authors.allow_tags = True
+    get_authors.short_description = _('author(s)')
+
+    def get_metatypes(self, nodetype):
+        """Return the metatypes linked in HTML"""
+        metatypes = getattr(nodetype, 'admin_metatypes', None)
+        if metatypes is None:
+            metatypes = nodetype.metatypes.all()
+        try:
+            metatypes = ['<a href="%s" target="blank">%s</a>' %
+                         (metatype.get_absolute_url(), metatype.title)
+                         for metatype in metatypes]
+        except NoReverseMatch:
+            metatypes = [metatype.title for metatype in metatypes]
+        return ', '.join(metatypes)
+    get_metatypes.allow_tags = True
+    get_metatypes.short_description = _('metatype(s)')
+
+    def get_tags(self, nodetype):
+        """Return the tags linked in HTML"""
+        tags = getattr(nodetype, 'admin_tags', None)
+        if tags is None:
+            tags = prefetch_tags(self.model, [nodetype])[nodetype.pk]
+        try:
+            return ', '.join(['<a href="%s" target="blank">%s</a>' %
+                              (reverse('gstudio_tag_detail',
+                                       args=[tag.name]), tag.name)
+                              for tag in tags])
+        except NoReverseMatch:
+            return nodetype.tags
+    get_tags.allow_tags = True
+    get_tags.short_description = _('tag(s)')
+
+    def get_sites(self, nodetype):
+        """Return the sites linked in HTML"""
+        sites = getattr(nodetype, 'admin_sites', None)
+        if sites is None:
+            sites = nodetype.sites.all()
+        return ', '.join(
+            ['<a href="http://%(domain)s" target="blank">%(name)s</a>' %
+             site.__dict__ for site in sites])
+    get_sites.allow_tags = True
+    get_sites.short_description = _('site(s)')
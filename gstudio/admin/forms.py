@@ -2,7 +2,6 @@
 from django import forms
 from django.db.models import ManyToOneRel
 from django.db.models import ManyToManyRel
-from django.contrib.sites.models import Site
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.admin.widgets import RelatedFieldWidgetWrapper
 
@@ -50,16 +49,42 @@ from gstudio.models import Processtype
 
 
 from gstudio.admin.widgets import TreeNodeChoiceField
-from gstudio.admin.widgets import MPTTFilteredSelectMultiple
+from gstudio.admin.widgets import TreeNodePicker
 from gstudio.admin.widgets import MPTTModelMultipleChoiceField
 from reversion.models import Version
+from gstudio.current_site import get_current_site
         
+class TreePickerFormMixin(object):
+    """Mixin of the admin forms of the nodetypes, picking the nodes
+    of the tree fields generated from the model with tree pickers,
+    instead of listing all the nodes"""
+    tree_picker_fields = ('parent', 'metatypes',
+                          'prior_nodes', 'posterior_nodes')
+
+    def __init__(self, *args, **kwargs):
+        super(TreePickerFormMixin, self).__init__(*args, **kwargs)
+        for name in self.tree_picker_fields:
+            field = self.fields.get(name)
+            if field is None or isinstance(
+                getattr(field.widget, 'widget', field.widget),
+                TreeNodePicker):
+                continue
+            picker = TreeNodePicker(multiple=isinstance(
+                field, forms.ModelMultipleChoiceField))
+            picker.choices = field.choices
+            if isinstance(field.widget, RelatedFieldWidgetWrapper):
+                field.widget.widget = picker
+            else:
+                field.widget = picker
+
+
 class MetatypeAdminForm(forms.ModelForm):
     """Form for Metatype's Admin"""
     parent = TreeNodeChoiceField(
         label=_('parent metatype').capitalize(),
         required=False, empty_label=_('No parent metatype'),
-        queryset=Metatype.tree.all())
+        queryset=Metatype.tree.all(),
+        widget=TreeNodePicker())
 
     def __init__(self, *args, **kwargs):
         super(MetatypeAdminForm, self).__init__(*args, **kwargs)
@@ -80,30 +105,28 @@ class MetatypeAdminForm(forms.ModelForm):
         model = Metatype
 
 
-class ObjecttypeAdminForm(forms.ModelForm):
+class ObjecttypeAdminForm(TreePickerFormMixin, forms.ModelForm):
     """Form for Objecttype's Admin"""
 
     parent = TreeNodeChoiceField(
         label=_('parent nodetype').capitalize(),
         required=False, empty_label=_('No parent nodetype'),
-        queryset=Nodetype.tree.all())
+        queryset=Nodetype.tree.all(),
+        widget=TreeNodePicker())
 
     metatypes = MPTTModelMultipleChoiceField(
         label=_('Metatypes'), required=False,
         queryset=Metatype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('metatypes'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
     priornodes = MPTTModelMultipleChoiceField(
         label=_('priornodes'), required=False,
         queryset=Nodetype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('nodetypes'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
 
     posteriornodes = MPTTModelMultipleChoiceField(
         label=_('posteriornodes'), required=False,
         queryset=Nodetype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('nodetypes'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
 
 
 
@@ -122,7 +145,7 @@ class ObjecttypeAdminForm(forms.ModelForm):
 
 
 
-        self.fields['sites'].initial = [Site.objects.get_current()]
+        self.fields['sites'].initial = [get_current_site()]
 
     def clean_parent(self):
         """Check if an object does not become a parent of itself"""
@@ -137,18 +160,16 @@ class ObjecttypeAdminForm(forms.ModelForm):
         model = Objecttype
 
 
-class RelationtypeAdminForm(forms.ModelForm):
+class RelationtypeAdminForm(TreePickerFormMixin, forms.ModelForm):
     
     priornodes = MPTTModelMultipleChoiceField(
         label=_('Priornodes'), required=False,
         queryset=Nodetype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('priornodes'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
     posteriornodes = MPTTModelMultipleChoiceField(
         label=_('Prosterior Nodes'), required=False,
         queryset=Nodetype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('prosteriornode'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
 
     def __init__(self, *args, **kwargs):
         super(RelationtypeAdminForm, self).__init__(*args, **kwargs)
@@ -226,28 +247,24 @@ class RelationAdminForm(forms.ModelForm):
         model = Relation
 
 
-class ProcesstypeAdminForm(forms.ModelForm):
+class ProcesstypeAdminForm(TreePickerFormMixin, forms.ModelForm):
 
     priornodes = MPTTModelMultipleChoiceField(
         label=_('Priornodes'), required=False,
         queryset=Nodetype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('priornodes'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
     posteriornodes = MPTTModelMultipleChoiceField(
         label=_('Prosterior Nodes'), required=False,
         queryset=Nodetype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('prosteriornode'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
     attributetype_set = MPTTModelMultipleChoiceField(
         label=_('Attributetype Sets'), required=False,
         queryset=Attributetype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('Attributetype Set'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
     relationtype_set = MPTTModelMultipleChoiceField(
         label=_('Relationtype Set'), required=False,
         queryset=Relationtype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('Relationtype Set'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
 
 
     def __init__(self, *args, **kwargs):
@@ -274,17 +291,15 @@ class ProcesstypeAdminForm(forms.ModelForm):
         """SystemAdminForm's Meta"""
         model = Processtype
 
-class AttributetypeAdminForm(forms.ModelForm):
+class AttributetypeAdminForm(TreePickerFormMixin, forms.ModelForm):
     priornodes = MPTTModelMultipleChoiceField(
         label=_('Priornodes'), required=False,
         queryset=Nodetype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('priornodes'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
     posteriornodes = MPTTModelMultipleChoiceField(
         label=_('Posterior Nodes'), required=False,
         queryset=Nodetype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('posteriornodes'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
     def __init__(self, *args, **kwargs):
         super(AttributetypeAdminForm, self).__init__(*args, **kwargs)
         prior = ManyToManyRel(Nodetype, 'id')
@@ -324,44 +339,37 @@ class AttributeAdminForm(forms.ModelForm):
 
 
 
-class SystemtypeAdminForm(forms.ModelForm):
+class SystemtypeAdminForm(TreePickerFormMixin, forms.ModelForm):
     nodetype_set = MPTTModelMultipleChoiceField(
         label=_('Nodetypeset'), required=False,
         queryset=Nodetype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('Nodetypesets'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
     relationtype_set = MPTTModelMultipleChoiceField(
         label=_('Relationtypeset'), required=False,
         queryset=Relationtype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('Relationtypesets'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
     attributetype_set = MPTTModelMultipleChoiceField(
         label=_('Attributetypeset'), required=False,
         queryset=Attributetype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('Attributetypesets'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
     metatype_set = MPTTModelMultipleChoiceField(
         label=_('Metatypeset'), required=False,
         queryset=Metatype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('metatypesets'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
     processtype_set = MPTTModelMultipleChoiceField(
         label=_('Processtypeset'), required=False,
         queryset=Processtype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('Processtypesets'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
 
     priornodes = MPTTModelMultipleChoiceField(
         label=_('priornodes'), required=False,
         queryset=Nodetype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('nodetypes'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
 
     posteriornodes = MPTTModelMultipleChoiceField(
         label=_('posteriornodes'), required=False,
         queryset=Nodetype.objects.all(),
-        widget=MPTTFilteredSelectMultiple(_('nodetypes'), False,
-                                          attrs={'rows': '10'}))
+        widget=TreeNodePicker(multiple=True))
     def __init__(self, *args, **kwargs):
         super(SystemtypeAdminForm, self).__init__(*args, **kwargs)
         ot = ManyToManyRel(Nodetype,'id')
@@ -10,21 +10,21 @@ from django.conf.urls.defaults import url
 from django.conf.urls.defaults import patterns
 from django.conf import settings as project_settings
 from django.utils.translation import ugettext_lazy as _
-from django.core.urlresolvers import reverse, NoReverseMatch
-
-from tagging.models import Tag
+from django.core.urlresolvers import reverse
 
 import reversion
 from gstudio import settings
 from gstudio.managers import HIDDEN
 from gstudio.managers import PUBLISHED
 from gstudio.ping import DirectoryPinger
+from gstudio.publication import update_publications
 from gstudio.admin.forms import ProcesstypeAdminForm
+from gstudio.admin.changelist import NodetypeChangeListMixin
 
 
 
 
-class ProcesstypeAdmin(reversion.VersionAdmin):
+class ProcesstypeAdmin(NodetypeChangeListMixin, reversion.VersionAdmin):
     """Admin for Processtype model"""
     form = ProcesstypeAdminForm
     date_hierarchy = 'creation_date'
@@ -71,63 +71,6 @@ class ProcesstypeAdmin(reversion.VersionAdmin):
         super(ProcesstypeAdmin, self).__init__(model, admin_site)
 
     # Custom Display
-    def get_title(self, processtype):
-        """Return the title with word count and number of comments"""
-        title = _('%(title)s (%(word_count)i words)') % \
-                {'title': processtype.title, 'word_count': processtype.word_count}
-        comments = processtype.comments.count()
-        if comments:
-            return _('%(title)s (%(comments)i comments)') % \
-                   {'title': title, 'comments': comments}
-        return title
-    get_title.short_description = _('title')
-
-    def get_authors(self, processtype):
-        """Return the authors in HTML"""
-        try:
-            authors = ['<a href="%s" target="blank">%s</a>' %
-                       (reverse('gstudio_author_detail',
-                                args=[author.username]),
-                        author.username) for author in processtype.authors.all()]
-        except NoReverseMatch:
-            authors = [author.username for author in processtype.authors.all()]
-        return ', '.join(authors)
-    get_authors.allow_tags = True
-    get_authors.short_description = _('author(s)')
-
-    def get_metatypes(self, processtype):
-        """Return the metatypes linked in HTML"""
-        try:
-            metatypes = ['<a href="%s" target="blank">%s</a>' %
-                          (metatype.get_absolute_url(), metatype.title)
-                          for metatype in processtype.metatypes.all()]
-        except NoReverseMatch:
-            metatypes = [metatype.title for metatype in
-                          processtype.metatypes.all()]
-        return ', '.join(metatypes)
-    get_metatypes.allow_tags = True
-    get_metatypes.short_description = _('metatype(s)')
-
-    def get_tags(self, processtype):
-        """Return the tags linked in HTML"""
-        try:
-            return ', '.join(['<a href="%s" target="blank">%s</a>' %
-                              (reverse('gstudio_tag_detail',
-                                       args=[tag.name]), tag.name)
-                              for tag in Tag.processs.get_for_process(processtype)])
-        except NoReverseMatch:
-            return processtype.tags
-    get_tags.allow_tags = True
-    get_tags.short_description = _('tag(s)')
-
-    def get_sites(self, processtype):
-        """Return the sites linked in HTML"""
-        return ', '.join(
-            ['<a href="http://%(domain)s" target="blank">%(name)s</a>' %
-             site.__dict__ for site in processtype.sites.all()])
-    get_sites.allow_tags = True
-    get_sites.short_description = _('site(s)')
-
     def get_comments_are_open(self, processtype):
         """Admin wrapper for processtype.comments_are_open"""
         return processtype.comments_are_open
@@ -222,6 +165,7 @@ class ProcesstypeAdmin(reversion.VersionAdmin):
     def make_published(self, request, queryset):
         """Set processtypes selected as published"""
         queryset.update(status=PUBLISHED)
+        update_publications(queryset)
         self.ping_directories(request, queryset, messages=False)
         self.message_user(
             request, _('The selected processtypes are now marked as published.'))
@@ -230,6 +174,7 @@ class ProcesstypeAdmin(reversion.VersionAdmin):
     def make_hidden(self, request, queryset):
         """Set processtypes selected as hidden"""
         queryset.update(status=HIDDEN)
+        update_publications(queryset)
         self.message_user(
             request, _('The selected processtypes are now marked as hidden.'))
     make_hidden.short_description = _('Set processtypes selected as hidden')
@@ -9,21 +9,21 @@ from django.conf.urls.defaults import url
 from django.conf.urls.defaults import patterns
 from django.conf import settings as project_settings
 from django.utils.translation import ugettext_lazy as _
-from django.core.urlresolvers import reverse, NoReverseMatch
-
-from tagging.models import Tag
+from django.core.urlresolvers import reverse
 
 import reversion
 from gstudio import settings
 from gstudio.managers import HIDDEN
 from gstudio.managers import PUBLISHED
 from gstudio.ping import DirectoryPinger
+from gstudio.publication import update_publications
 from gstudio.admin.forms import RelationtypeAdminForm
+from gstudio.admin.changelist import NodetypeChangeListMixin
 
 
 
 
-class RelationtypeAdmin(reversion.VersionAdmin):
+class RelationtypeAdmin(NodetypeChangeListMixin, reversion.VersionAdmin):
     """Admin for Relationtype model"""
     form = RelationtypeAdminForm
     date_hierarchy = 'creation_date'
@@ -84,63 +84,6 @@ class RelationtypeAdmin(reversion.VersionAdmin):
                      super(RelationtypeAdmin, self).__init__(model, admin_site)
                  
                  # Custom Display
-    def get_title(self, relationtype):
-        """Return the title with word count and number of comments"""
-        title = _('%(title)s (%(word_count)i words)') % \
-            {'title': relationtype.title, 'word_count': relationtype.word_count}
-        comments = relationtype.comments.count()
-        if comments:
-            return _('%(title)s (%(comments)i comments)') % \
-                {'title': title, 'comments': comments}
-        return title
-    get_title.short_description = _('title')
-    
-    def get_authors(self, relationtype):
-        """Return the authors in HTML"""
-        try:
-            authors = ['<a href="%s" target="blank">%s</a>' %
-                       (reverse('gstudio_author_detail',
-                                args=[author.username]),
-                        author.username) for author in relationtype.authors.all()]
-        except NoReverseMatch:
-            authors = [author.username for author in relationtype.authors.all()]
-        return ', '.join(authors)
-    get_authors.allow_tags = True
-    get_authors.short_description = _('author(s)')
-        
-    def get_metatypes(self, relationtype):
-        """Return the metatypes linked in HTML"""
-        try:
-            metatypes = ['<a href="%s" target="blank">%s</a>' %
-                          (metatype.get_absolute_url(), metatype.title)
-                          for metatype in relationtype.metatypes.all()]
-        except NoReverseMatch:
-            metatypes = [metatype.title for metatype in
-                          relationtype.metatypes.all()]
-        return ', '.join(metatypes)
-    get_metatypes.allow_tags = True
-    get_metatypes.short_description = _('metatype(s)')
-
-    def get_tags(self, relationtype):
-        """Return the tags linked in HTML"""
-        try:
-            return ', '.join(['<a href="%s" target="blank">%s</a>' %
-                              (reverse('gstudio_tag_detail',
-                                       args=[tag.name]), tag.name)
-                              for tag in Tag.relations.get_for_relation(relationtype)])
-        except NoReverseMatch:
-            return relationtype.tags
-    get_tags.allow_tags = True
-    get_tags.short_description = _('tag(s)')
-
-    def get_sites(self, relationtype):
-        """Return the sites linked in HTML"""
-        return ', '.join(
-            ['<a href="http://%(domain)s" target="blank">%(name)s</a>' %
-             site.__dict__ for site in relationtype.sites.all()])
-    get_sites.allow_tags = True
-    get_sites.short_description = _('site(s)')
-
     def get_comments_are_open(self, relationtype):
         """Admin wrapper for relationtype.comments_are_open"""
         return relationtype.comments_are_open
@@ -235,6 +178,7 @@ class RelationtypeAdmin(reversion.VersionAdmin):
     def make_published(self, request, queryset):
         """Set relationtypes selected as published"""
         queryset.update(status=PUBLISHED)
+        update_publications(queryset)
         self.ping_directories(request, queryset, messages=False)
         self.message_user(
             request, _('The selected relationtypes are now marked as published.'))
@@ -243,6 +187,7 @@ class RelationtypeAdmin(reversion.VersionAdmin):
     def make_hidden(self, request, queryset):
         """Set relationtypes selected as hidden"""
         queryset.update(status=HIDDEN)
+        update_publications(queryset)
         self.message_user(
             request, _('The selected relationtypes are now marked as hidden.'))
     make_hidden.short_description = _('Set relationtypes selected as hidden')
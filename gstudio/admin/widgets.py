@@ -4,10 +4,13 @@ from itertools import chain
 from django import forms
 from django.conf import settings
 from django.contrib.admin import widgets
+from django.forms.util import flatatt
 from django.utils.html import escape
+from django.utils.safestring import mark_safe
 from django.utils.html import conditional_escape
 from django.utils.encoding import smart_unicode
 from django.utils.encoding import force_unicode
+from django.core.urlresolvers import reverse, NoReverseMatch
 
 
 class TreeNodeChoiceField(forms.ModelChoiceField):
@@ -105,3 +108,75 @@ class MPTTFilteredSelectMultiple(widgets.FilteredSelectMultiple):
         js = (settings.ADMIN_MEDIA_PREFIX + 'js/core.js',
               settings.STATIC_URL + 'gstudio/js/mptt_m2m_selectbox.js',
               settings.ADMIN_MEDIA_PREFIX + 'js/SelectFilter2.js',)
+
+
+class TreeNodePicker(forms.Widget):
+    """Widget picking the nodes of a tree from pages loaded on
+    demand, rendering only the nodes selected. The choices of the
+    field are not iterated, the ids are validated by the field"""
+    def __init__(self, multiple=False, attrs=None):
+        self.multiple = multiple
+        super(TreeNodePicker, self).__init__(attrs)
+
+    def get_values(self, value):
+        """Return the ids of a value as a list of strings"""
+        if value is None or value == '':
+            return []
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        return [force_unicode(item) for item in value
+                if item is not None and item != '']
+
+    def get_selection(self, values):
+        """Return the ids and labels of the nodes selected"""
+        if not values:
+            return []
+        nodes = self.choices.queryset.filter(pk__in=values)
+        labels = dict([(force_unicode(node.pk), smart_unicode(node))
+                       for node in nodes])
+        return [(value, labels[value]) for value in values
+                if value in labels]
+
+    def render(self, name, value, attrs=None):
+        """Render the ids selected in a hidden input, with the
+        list of the nodes selected and the tree picker"""
+        try:
+            url = reverse('gstudio_tree_nodes')
+        except NoReverseMatch:
+            url = ''
+        values = self.get_values(value)
+        final_attrs = self.build_attrs(attrs, type='hidden', name=name,
+                                       value=','.join(values))
+        output = [u'<div class="tree-picker" data-url="%s" '
+                  'data-model="%s" data-multiple="%s">' % (
+                      escape(url),
+                      self.choices.queryset.model._meta.module_name,
+                      self.multiple and 'true' or 'false'),
+                  u'<input%s />' % flatatt(final_attrs),
+                  u'<ul class="tree-picker-selection">']
+        for value, label in self.get_selection(values):
+            output.append(u'<li data-id="%s">%s</li>' % (
+                escape(value), conditional_escape(label)))
+        output.extend([u'</ul>',
+                       u'<input type="text" class="tree-picker-search" />',
+                       u'<ul class="tree-picker-nodes"></ul>',
+                       u'</div>'])
+        return mark_safe(u'\n'.join(output))
+
+    def value_from_datadict(self, data, files, name):
+        """Return the ids posted"""
+        values = [value for value in data.get(name, '').split(',')
+                  if value]
+        if self.multiple:
+            return values
+        return values and values[0] or None
+
+    def _has_changed(self, initial, data):
+        """Compare the ids selected"""
+        return set(self.get_values(initial)) != set(self.get_values(data))
+
+    class Media:
+        """TreeNodePicker's Media"""
+        css = {'all': (settings.STATIC_URL + 'gstudio/css/tree_picker.css',)}
+        js = (settings.STATIC_URL + 'gstudio/js/jquery.js',
+              settings.STATIC_URL + 'gstudio/js/tree_picker.js',)
@@ -0,0 +1,152 @@
+"""Archive index for Gstudio
+
+The number of published nodetypes created each day is stored by site
+in the ArchiveDay table, computed again from the publication index for
+the days of a nodetype when its publication or its creation date
+changes, so the calendar and the archive widgets read a few rows
+instead of scanning the creation dates of all the nodetypes.
+
+Like the tag usages, each day stores the date when its count changes
+next, and the expired days are computed again before being read."""
+import operator
+from datetime import date
+from datetime import time
+from datetime import datetime
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.utils import IntegrityError
+from django.db.models import Q
+
+from gstudio.models import ArchiveDay
+from gstudio.models import Publication
+from gstudio.current_site import get_current_site_id
+
+
+def compute_archive_days(days=None):
+    """Return the site id, the day, the number of published nodetypes
+    and the date of the next change of the days, or of all the days"""
+    now = datetime.now()
+    publications = Publication.objects.all()
+    if days is not None:
+        conditions = []
+        for day in days:
+            start = datetime.combine(day, time())
+            conditions.append(Q(creation_date__gte=start,
+                                creation_date__lt=start + timedelta(days=1)))
+        publications = publications.filter(reduce(operator.or_, conditions))
+
+    archives = {}
+    for site_id, creation_date, start, end in publications.values_list(
+        'site', 'creation_date', 'start_publication',
+        'end_publication').iterator():
+        key = (site_id, creation_date.date())
+        count, expiration = archives.get(key, (0, None))
+        change = None
+        if start <= now < end:
+            count += 1
+            change = end
+        elif start > now:
+            change = start
+        if change and (expiration is None or change < expiration):
+            expiration = change
+        archives[key] = (count, expiration)
+    return [(site_id, day, count, expiration) for (site_id, day),
+            (count, expiration) in archives.items()]
+
+
+def save_archive_day(site_id, day, **values):
+    """Update the archive day of a site, or create it,
+    updating it if created meanwhile by a concurrent update"""
+    archive_days = ArchiveDay.objects.filter(site=site_id, day=day)
+    if archive_days.update(**values):
+        return
+    sid = transaction.savepoint()
+    try:
+        ArchiveDay.objects.create(site_id=site_id, day=day, **values)
+    except IntegrityError:
+        transaction.savepoint_rollback(sid)
+        archive_days.update(**values)
+    else:
+        transaction.savepoint_commit(sid)
+
+
+def store_archive_days(archives):
+    """Store the days computed which have or will have published
+    nodetypes, and return the site ids and the days stored"""
+    stored = set()
+    for site_id, day, count, expiration in archives:
+        if count or expiration:
+            save_archive_day(site_id, day, count=count,
+                             expiration=expiration)
+            stored.add((site_id, day))
+    return stored
+
+
+def update_archive_days(days):
+    """Compute again the archive days, updating the days
+    in place so concurrent updates do not create them twice"""
+    days = list(set(days))
+    if not days:
+        return
+    stored = store_archive_days(compute_archive_days(days))
+    outdated = []
+    for pk, site_id, day in ArchiveDay.objects.filter(
+        day__in=days).values_list('pk', 'site', 'day'):
+        if not (site_id, day) in stored:
+            outdated.append(pk)
+    if outdated:
+        ArchiveDay.objects.filter(pk__in=outdated).delete()
+
+
+def refresh_archive_days(site_id):
+    """Compute again the days of a site whose count has changed since"""
+    update_archive_days(ArchiveDay.objects.filter(
+        site=site_id, expiration__lte=datetime.now()).values_list(
+        'day', flat=True))
+
+
+@transaction.commit_on_success
+def rebuild_archive_days():
+    """Compute again all the archive days,
+    and return the number of days stored"""
+    ArchiveDay.objects.all().delete()
+    return len(store_archive_days(compute_archive_days()))
+
+
+def get_archive_days(site_id=None):
+    """Return the queryset of the days with published nodetypes
+    on a site, the current site by default"""
+    if site_id is None:
+        site_id = get_current_site_id()
+    refresh_archive_days(site_id)
+    return ArchiveDay.objects.filter(site=site_id, count__gt=0)
+
+
+def get_archive_dates(kind, order='ASC'):
+    """Return the list of the years, months or days
+    with published nodetypes, as datetimes"""
+    return list(get_archive_days().dates('day', kind, order=order))
+
+
+def get_month_days(year, month):
+    """Return the numbers of the days of a month
+    with published nodetypes"""
+    return [day.day for day in get_archive_days().filter(
+        day__year=year, day__month=month).values_list('day', flat=True)]
+
+
+def get_adjacent_months(year, month):
+    """Return the first days of the previous and the next
+    months with published nodetypes, as datetimes"""
+    archive_days = get_archive_days()
+    current_month = date(year, month, 1)
+    next_month = date(year + month / 12, month % 12 + 1, 1)
+
+    months = []
+    for days in (archive_days.filter(day__lt=current_month).order_by('-day'),
+                 archive_days.filter(day__gte=next_month).order_by('day')):
+        days = list(days.values_list('day', flat=True)[:1])
+        months.append(days and datetime(days[0].year, days[0].month, 1)
+                      or None)
+    return months
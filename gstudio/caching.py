@@ -0,0 +1,50 @@
+"""Caching of the widgets for Gstudio
+
+The contexts of the sidebar widgets are cached under a key holding
+a version of the content of the site, bumped when a nodetype or a
+comment changes, so the stale entries are never read again and
+simply expire."""
+from time import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+
+from gstudio.settings import WIDGET_CACHE_TIMEOUT
+
+CONTENT_VERSION_KEY = 'gstudio:content_version'
+WIDGET_CACHE_KEY = 'gstudio:widget:%s:%s:%s'
+
+
+def get_content_version():
+    """Return the version of the content of the site"""
+    version = cache.get(CONTENT_VERSION_KEY)
+    if version is None:
+        version = int(time() * 1000)
+        cache.add(CONTENT_VERSION_KEY, version)
+    return version
+
+
+def bump_content_version():
+    """Change the version of the content of the site"""
+    try:
+        cache.incr(CONTENT_VERSION_KEY)
+    except ValueError:
+        cache.set(CONTENT_VERSION_KEY, int(time() * 1000))
+
+
+def cached_widget(name, arguments, compute, timeout=None):
+    """Return the context of a widget computed for some arguments,
+    from the cache if enabled with GSTUDIO_WIDGET_CACHE_TIMEOUT"""
+    if timeout is None:
+        timeout = WIDGET_CACHE_TIMEOUT
+    if not timeout:
+        return compute()
+
+    key = WIDGET_CACHE_KEY % (get_content_version(), name, md5(repr(
+        (settings.SITE_ID,) + tuple(arguments))).hexdigest())
+    context = cache.get(key)
+    if context is None:
+        context = compute()
+        cache.set(key, context, timeout)
+    return context
@@ -0,0 +1,38 @@
+"""Current site resolver for Gstudio
+
+The current site is fetched once by process for each SITE_ID, kept on
+the request when one is given, and dropped when a site is saved or
+deleted. The managers only need the id of the current site, so
+building their querysets does not query the sites at all."""
+from django.conf import settings
+from django.contrib.sites.models import Site
+
+SITE_CACHE = {}
+REQUEST_ATTRIBUTE = '_gstudio_current_site'
+
+
+def get_current_site_id():
+    """Return the id of the current site"""
+    return settings.SITE_ID
+
+
+def get_current_site(request=None):
+    """Return the current site, cached by process
+    and on the request if given"""
+    site = getattr(request, REQUEST_ATTRIBUTE, None)
+    if site is not None:
+        return site
+
+    site_id = get_current_site_id()
+    site = SITE_CACHE.get(site_id)
+    if site is None:
+        site = Site.objects.get(pk=site_id)
+        SITE_CACHE[site_id] = site
+    if request is not None:
+        setattr(request, REQUEST_ATTRIBUTE, site)
+    return site
+
+
+def clear_site_cache():
+    """Forget the sites resolved by the process"""
+    SITE_CACHE.clear()
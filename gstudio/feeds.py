@@ -1,9 +1,21 @@
-"""Feeds for Gstudio"""
+"""Feeds for Gstudio
+
+The feeds are rendered once for each url and version of the content of
+the site, and answer the conditional requests with an ETag and the last
+update of their items. The authors and the metatypes of the nodetypes
+are fetched in one query for all the items."""
+from time import mktime
+from hashlib import md5
 from urlparse import urljoin
-from BeautifulSoup import BeautifulSoup
 
+from django.http import Http404
+from django.http import HttpResponse
+from django.http import HttpResponseNotModified
+from django.utils.http import http_date
+from django.utils.encoding import smart_str
+from django.utils.http import parse_http_date_safe
+from django.core.cache import cache
 from django.contrib.auth.models import User
-from django.contrib.sites.models import Site
 from django.core.urlresolvers import reverse
 from django.shortcuts import get_object_or_404
 from django.utils.feedgenerator import Atom1Feed
@@ -20,9 +32,70 @@ from gstudio.settings import COPYRIGHT
 from gstudio.settings import PROTOCOL
 from gstudio.settings import FEEDS_FORMAT
 from gstudio.settings import FEEDS_MAX_ITEMS
+from gstudio.settings import FEEDS_CACHE_TIMEOUT
 from gstudio.managers import nodetypes_published
+from gstudio.caching import get_content_version
 from gstudio.views.metatypes import get_metatype_or_404
 from gstudio.templatetags.gstudio_tags import get_gravatar
+from gstudio.current_site import get_current_site
+
+FEED_CACHE_KEY = 'gstudio:feed:%s:%s:%s'
+
+
+def prefetch_relation(nodetypes, field_name):
+    """Return the related objects of a many to many field
+    of the nodetypes by nodetype id, in one query"""
+    field = Nodetype._meta.get_field(field_name)
+    through = getattr(Nodetype, field_name).through
+    related = field.m2m_reverse_field_name()
+    nodetype = field.m2m_field_name()
+
+    related_objects = dict([(item.pk, []) for item in nodetypes])
+    if related_objects:
+        for row in through.objects.filter(**{
+            '%s__in' % nodetype: related_objects.keys()}).select_related(
+            related).order_by('pk'):
+            related_objects[getattr(row, '%s_id' % nodetype)].append(
+                getattr(row, related))
+    return related_objects
+
+
+def prefetch_nodetypes(nodetypes):
+    """Return the nodetypes with their authors and their
+    metatypes fetched in bulk"""
+    nodetypes = list(nodetypes)
+    authors = prefetch_relation(nodetypes, 'authors')
+    metatypes = prefetch_relation(nodetypes, 'metatypes')
+    for nodetype in nodetypes:
+        nodetype.feed_authors = authors[nodetype.pk]
+        nodetype.feed_metatypes = metatypes[nodetype.pk]
+    return nodetypes
+
+
+def conditional_response(request, content, mime_type, etag, last_modified):
+    """Return the response of a feed, or a not modified response
+    if the client has the same version"""
+    etag = '"%s"' % etag
+    timestamp = last_modified and mktime(last_modified.timetuple())
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if_modified_since = parse_http_date_safe(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'))
+
+    if if_none_match:
+        not_modified = etag in [tag.strip()
+                                for tag in if_none_match.split(',')]
+    else:
+        not_modified = bool(timestamp and if_modified_since and
+                            if_modified_since >= timestamp)
+
+    if not_modified:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, mimetype=mime_type)
+    response['ETag'] = etag
+    if timestamp:
+        response['Last-Modified'] = http_date(timestamp)
+    return response
 
 
 class GstudioFeed(Feed):
@@ -30,12 +103,49 @@ class GstudioFeed(Feed):
     feed_copyright = COPYRIGHT
 
     def __init__(self):
-        self.site = Site.objects.get_current()
-        self.site_url = '%s://%s' % (PROTOCOL, self.site.domain)
         if FEEDS_FORMAT == 'atom':
             self.feed_type = Atom1Feed
             self.subtitle = self.description
 
+    @property
+    def site(self):
+        """Current site, resolved when the feed is served
+        rather than when the urls are loaded"""
+        return get_current_site()
+
+    @property
+    def site_url(self):
+        """Url of the current site"""
+        return '%s://%s' % (PROTOCOL, self.site.domain)
+
+    def __call__(self, request, *args, **kwargs):
+        """Serve the feed rendered once by url and version of the
+        content, cached GSTUDIO_FEEDS_CACHE_TIMEOUT at most"""
+        path = smart_str(request.get_full_path())
+        key = FEED_CACHE_KEY % (get_content_version(),
+                                get_current_site(request).pk,
+                                md5(path).hexdigest())
+        feed = FEEDS_CACHE_TIMEOUT and cache.get(key)
+        if not feed:
+            try:
+                obj = self.get_object(request, *args, **kwargs)
+            except ObjectDoesNotExist:
+                raise Http404('Feed object does not exist.')
+            feedgen = self.get_feed(obj, request)
+            content = feedgen.writeString('utf-8')
+            feed = (content, feedgen.mime_type, md5(content).hexdigest(),
+                    self.last_modified(feedgen))
+            if FEEDS_CACHE_TIMEOUT:
+                cache.set(key, feed, FEEDS_CACHE_TIMEOUT)
+        return conditional_response(request, *feed)
+
+    def last_modified(self, feedgen):
+        """Return the last update of the items of the feed"""
+        dates = [item.get('last_update') or item.get('pubdate')
+                 for item in feedgen.items]
+        dates = [date for date in dates if date]
+        return dates and max(dates) or None
+
 
 class NodetypeFeed(GstudioFeed):
     """Base Nodetype Feed"""
@@ -46,14 +156,28 @@ class NodetypeFeed(GstudioFeed):
         """Publication date of a nodetype"""
         return item.creation_date
 
+    def item_extra_kwargs(self, item):
+        """Last update of a nodetype, for the conditional requests"""
+        return {'last_update': item.last_update}
+
     def item_metatypes(self, item):
         """Nodetype's metatypes"""
-        return [metatype.title for metatype in item.metatypes.all()]
+        metatypes = getattr(item, 'feed_metatypes', None)
+        if metatypes is None:
+            metatypes = item.metatypes.all()
+        return [metatype.title for metatype in metatypes]
+
+    def item_categories(self, item):
+        """Nodetype's metatypes as categories"""
+        return self.item_metatypes(item)
 
     def item_author_name(self, item):
         """Returns the first author of a nodetype"""
-        if item.authors.count():
-            self.item_author = item.authors.all()[0]
+        authors = getattr(item, 'feed_authors', None)
+        if authors is None:
+            authors = item.authors.all()[:1]
+        if authors:
+            self.item_author = authors[0]
             return self.item_author.username
 
     def item_author_email(self, item):
@@ -74,9 +198,8 @@ class NodetypeFeed(GstudioFeed):
         if item.image:
             return item.image.url
 
-        img = BeautifulSoup(item.html_content).find('img')
-        if img:
-            return urljoin(self.site_url, img['src'])
+        if item.content_image:
+            return urljoin(self.site_url, item.content_image)
 
     def item_enclosure_length(self, item):
         """Hardcoded enclosure length"""
@@ -96,7 +219,7 @@ class LatestNodetypes(NodetypeFeed):
 
     def items(self):
         """Items are published nodetypes"""
-        return Nodetype.published.all()[:FEEDS_MAX_ITEMS]
+        return prefetch_nodetypes(Nodetype.published.all()[:FEEDS_MAX_ITEMS])
 
     def title(self):
         """Title of the feed"""
@@ -116,7 +239,7 @@ class MetatypeNodetypes(NodetypeFeed):
 
     def items(self, obj):
         """Items are the published nodetypes of the metatype"""
-        return obj.nodetypes_published()[:FEEDS_MAX_ITEMS]
+        return prefetch_nodetypes(obj.nodetypes_published()[:FEEDS_MAX_ITEMS])
 
     def link(self, obj):
         """URL of the metatype"""
@@ -140,7 +263,8 @@ class AuthorNodetypes(NodetypeFeed):
 
     def items(self, obj):
         """Items are the published nodetypes of the author"""
-        return nodetypes_published(obj.nodetypes)[:FEEDS_MAX_ITEMS]
+        return prefetch_nodetypes(
+            nodetypes_published(obj.nodetypes)[:FEEDS_MAX_ITEMS])
 
     def link(self, obj):
         """URL of the author"""
@@ -164,8 +288,8 @@ class TagNodetypes(NodetypeFeed):
 
     def items(self, obj):
         """Items are the published nodetypes of the tag"""
-        return TaggedItem.objects.get_by_model(
-            Nodetype.published.all(), obj)[:FEEDS_MAX_ITEMS]
+        return prefetch_nodetypes(TaggedItem.objects.get_by_model(
+            Nodetype.published.all(), obj)[:FEEDS_MAX_ITEMS])
 
     def link(self, obj):
         """URL of the tag"""
@@ -192,7 +316,8 @@ class SearchNodetypes(NodetypeFeed):
 
     def items(self, obj):
         """Items are the published nodetypes founds"""
-        return Nodetype.published.search(obj)[:FEEDS_MAX_ITEMS]
+        return prefetch_nodetypes(
+            Nodetype.published.search(obj)[:FEEDS_MAX_ITEMS])
 
     def link(self, obj):
         """URL of the search request"""
@@ -0,0 +1,361 @@
+"""Graph export for Gstudio
+
+Serialize the neighbourhood of a node in the JSON format read by
+the D3 force graph, as a stream of chunks. The serialized graph and
+its validators are kept in the cache for each node, and dropped when
+the node, one of its edges or one of its links is saved, and for the
+nodes of the trees, when one of their parents or siblings is saved.
+
+The ego network of a node is expanded breadth first over its edges,
+one level at a time with a fixed number of queries per level."""
+import json
+from hashlib import md5
+
+from django.db.models import Q
+from django.db.models import Max
+from django.core.cache import cache
+
+from gstudio.models import NID
+from gstudio.models import Metatype
+from gstudio.models import Nodetype
+from gstudio.models import Relation
+from gstudio.models import Attribute
+from gstudio.neighbourhood import m2m_pairs
+from gstudio.settings import GRAPH_CACHE_TIMEOUT
+from gstudio.settings import GRAPH_MAX_NODES
+from gstudio.settings import GRAPH_FAN_OUT
+
+GRAPH_CACHE_KEY = 'gstudio:graph:%s'
+GRAPH_CHUNK_SIZE = 8192
+
+STRING_PREDICATES = ('title', 'altnames', 'plural')
+GRAPH_PREDICATES = ('member_of_metatype', 'subjecttype_of',
+                    'left_subjecttype_of', 'right_subjecttype_of',
+                    'type_of', 'contains_subtypes', 'contains_members',
+                    'prior_nodes', 'posterior_nodes', 'authors')
+EDGE_KINDS = ('relations', 'attributes', 'parent',
+              'prior_nodes', 'posterior_nodes')
+
+
+def get_graph_neighbourhood(node):
+    """Return the neighbourhood of a node to draw,
+    from the batched loader for the nodetypes"""
+    if not isinstance(node, Nodetype):
+        return getattr(node, 'get_nbh', {})
+
+    neighbourhood = node.neighbourhood
+    return {'title': node.title,
+            'altnames': node.altnames,
+            'plural': node.plural,
+            'member_of_metatype': neighbourhood['member_of_metatypes'],
+            'subjecttype_of': neighbourhood['attributetypes'],
+            'left_subjecttype_of': neighbourhood['left_subjecttype_of'],
+            'right_subjecttype_of': neighbourhood['right_subjecttype_of'],
+            'type_of': neighbourhood['type_of'],
+            'contains_subtypes': neighbourhood['contains_subtypes'],
+            'contains_members': neighbourhood['contains_members'],
+            'prior_nodes': neighbourhood['prior_nodes'],
+            'posterior_nodes': neighbourhood['posterior_nodes'],
+            'authors': neighbourhood['authors']}
+
+
+def get_graph_predicates(nbh):
+    """Return the (predicate, neighbours) pairs to draw,
+    ignoring the empty ones"""
+    keys = [key for key in GRAPH_PREDICATES if key in nbh] + \
+           sorted([key for key in nbh if key not in GRAPH_PREDICATES
+                   and key not in STRING_PREDICATES])
+    predicates = []
+    for key in keys:
+        neighbours = nbh[key]
+        if not neighbours or isinstance(neighbours, basestring):
+            continue
+        if hasattr(neighbours, 'get_absolute_url'):
+            neighbours = [neighbours]
+        predicates.append((key, list(neighbours)))
+    return predicates
+
+
+def iter_graph_json(node, nbh):
+    """Yield the pieces of the JSON graph of a node"""
+    this_node = {'_id': str(node.pk), 'title': node.title,
+                 'screen_name': node.title, 'url': node.get_absolute_url()}
+    for key in STRING_PREDICATES:
+        if nbh.get(key):
+            this_node[key] = unicode(nbh[key])
+    predicates = [('a%i' % i, key, neighbours) for i, (key, neighbours)
+                  in enumerate(get_graph_predicates(nbh), 1)]
+
+    yield '{"node_metadata": ['
+    yield json.dumps(this_node)
+    seen = set([this_node['_id']])
+    for predicate_id, key, neighbours in predicates:
+        yield ', ' + json.dumps({'_id': predicate_id, 'screen_name': key})
+        for item in neighbours:
+            if str(item.id) in seen:
+                continue
+            seen.add(str(item.id))
+            yield ', ' + json.dumps({'_id': str(item.id),
+                                     'screen_name': unicode(item.title),
+                                     'title': unicode(item.title),
+                                     'url': item.get_absolute_url()})
+    yield ']'
+
+    for predicate_id, key, neighbours in predicates:
+        yield ', %s: [' % json.dumps(key)
+        yield json.dumps({'from': node.pk, 'to': predicate_id, 'value': 1})
+        for item in neighbours:
+            yield ', ' + json.dumps({'from': predicate_id,
+                                     'to': item.id, 'value': 1})
+        yield ']'
+    yield '}'
+
+
+def chunked(pieces, size=GRAPH_CHUNK_SIZE):
+    """Group small pieces of text in chunks of about size characters"""
+    buffer = []
+    length = 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def get_graph_last_modified(node, nbh):
+    """Return the latest update of the node,
+    its neighbours and its edges"""
+    ids = set([node.pk])
+    for key, neighbours in get_graph_predicates(nbh):
+        if key != 'authors':
+            ids.update([item.id for item in neighbours])
+    edges = Relation.objects.filter(
+        Q(left_subject=node.pk) | Q(right_subject=node.pk)).values('pk')
+    attributes = Attribute.objects.filter(subject=node.pk).values('pk')
+    last_update = NID.objects.filter(
+        Q(pk__in=list(ids)) | Q(pk__in=edges) | Q(pk__in=attributes)
+        ).aggregate(last_update=Max('last_update'))['last_update']
+    return last_update or node.last_update
+
+
+class Graph(object):
+    """Exportable graph of a node, with its validators"""
+
+    def __init__(self, node_id, etag, last_modified,
+                 content=None, node=None, nbh=None):
+        self.node_id = node_id
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content = content
+        self.node = node
+        self.nbh = nbh
+
+    def cache(self):
+        """Store the graph in the cache"""
+        cache.set(GRAPH_CACHE_KEY % self.node_id,
+                  {'etag': self.etag, 'last_modified': self.last_modified,
+                   'content': self.content}, GRAPH_CACHE_TIMEOUT)
+
+    def __iter__(self):
+        """Stream the JSON of the graph, caching it once complete"""
+        if self.content is not None:
+            yield self.content
+            return
+
+        if self.node is None:
+            self.node = NID.objects.get(pk=self.node_id).ref
+            self.nbh = get_graph_neighbourhood(self.node)
+        chunks = []
+        for chunk in chunked(iter_graph_json(self.node, self.nbh)):
+            chunks.append(chunk)
+            yield chunk
+        self.content = ''.join(chunks)
+        # The node may have been saved while streaming, so the
+        # content is kept only if the validators are still the same.
+        entry = cache.get(GRAPH_CACHE_KEY % self.node_id)
+        if entry is not None and entry['etag'] == self.etag:
+            self.cache()
+
+
+def get_graph(node_id):
+    """Return the Graph of a node, from the cache if possible,
+    or None if the node does not exist"""
+    entry = cache.get(GRAPH_CACHE_KEY % node_id)
+    if entry is not None:
+        return Graph(node_id, **entry)
+
+    try:
+        node = NID.objects.get(pk=node_id).ref
+    except NID.DoesNotExist:
+        return None
+    if node is None:
+        return None
+
+    nbh = get_graph_neighbourhood(node)
+    last_modified = get_graph_last_modified(node, nbh)
+    etag = md5('%s:%s:%s' % (node.pk, last_modified.isoformat(), ','.join(
+        [str(item.id) for key, neighbours in get_graph_predicates(nbh)
+         for item in neighbours]))).hexdigest()
+    graph = Graph(node.pk, etag, last_modified, node=node, nbh=nbh)
+    graph.cache()
+    return graph
+
+
+def flush_graph_cache(node_ids):
+    """Drop the cached graphs of the nodes"""
+    cache.delete_many([GRAPH_CACHE_KEY % node_id
+                       for node_id in set(node_ids) if node_id])
+
+
+def get_tree_neighbour_ids(node):
+    """Return the ids of the parent of a metatype or a nodetype,
+    and of its parent before the save, of their children,
+    which are the node and its siblings, and of its children"""
+    model = isinstance(node, Metatype) and Metatype or Nodetype
+    parent_ids = set([node.parent_id, getattr(node, '_old_parent_id', None)])
+    parent_ids.discard(None)
+    lookup = Q(parent=node.pk)
+    if parent_ids:
+        lookup |= Q(parent__in=list(parent_ids))
+    return list(parent_ids) + list(model.objects.filter(lookup).values_list(
+        'pk', flat=True))
+
+
+def get_linked_node_ids(through, instance, reverse=False):
+    """Return the ids of the nodetypes linked to an instance
+    by the intermediary model of a many to many field"""
+    for field in Nodetype._meta.many_to_many:
+        if field.rel.through is through:
+            return [target for source, target in
+                    m2m_pairs(field, [instance.pk], reverse)]
+    return []
+
+
+def breadth_first(start_id, expand, depth,
+                  fan_out=GRAPH_FAN_OUT, max_nodes=GRAPH_MAX_NODES):
+    """Expand the graph around a node level by level.
+
+    expand is called once per level with the ids of the frontier,
+    and returns (source, target, edge) tuples, where source is in
+    the frontier and edge is the (from, to, predicate) to draw.
+    A node keeps at most fan_out edges and the expansion stops
+    when max_nodes nodes are reached.
+    Return the levels of the nodes by id and the edges."""
+    levels = {start_id: 0}
+    edges = []
+    seen_edges = set()
+    frontier = [start_id]
+    for level in range(1, depth + 1):
+        if not frontier or len(levels) >= max_nodes:
+            break
+        degrees = {}
+        next_frontier = []
+        for source, target, edge in expand(frontier):
+            if edge in seen_edges or degrees.get(source, 0) >= fan_out:
+                continue
+            if not target in levels:
+                if len(levels) >= max_nodes:
+                    continue
+                levels[target] = level
+                next_frontier.append(target)
+            degrees[source] = degrees.get(source, 0) + 1
+            seen_edges.add(edge)
+            edges.append(edge)
+        frontier = next_frontier
+    return levels, edges
+
+
+def expand_nodes(ids, kinds=EDGE_KINDS, relationtypes=None):
+    """Return the edges around the nodes as (source, target, edge)
+    tuples, with one query for each kind of edges"""
+    id_set = set(ids)
+    expanded = []
+
+    def add(left, right, predicate):
+        edge = (left, right, predicate)
+        if left in id_set:
+            expanded.append((left, right, edge))
+        if right in id_set:
+            expanded.append((right, left, edge))
+
+    if 'relations' in kinds:
+        relations = Relation.objects.filter(
+            Q(left_subject__in=ids) | Q(right_subject__in=ids))
+        if relationtypes:
+            relations = relations.filter(relationtype__in=relationtypes)
+        for left, right, title in relations.values_list(
+            'left_subject', 'right_subject', 'relationtype__title'):
+            add(left, right, title)
+
+    if 'attributes' in kinds:
+        for pk, subject, title in Attribute.objects.filter(
+            subject__in=ids).values_list('pk', 'subject',
+                                         'attributetype__title'):
+            add(subject, pk, title)
+
+    if 'parent' in kinds:
+        for model in (Nodetype, Metatype):
+            for pk, parent in model.objects.filter(
+                Q(pk__in=ids) | Q(parent__in=ids)).exclude(
+                parent=None).values_list('pk', 'parent'):
+                add(pk, parent, 'type_of')
+
+    for name in ('prior_nodes', 'posterior_nodes'):
+        if name in kinds:
+            field = Nodetype._meta.get_field(name)
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            for left, right in field.rel.through._default_manager.filter(
+                Q(**{'%s__in' % source: ids}) |
+                Q(**{'%s__in' % target: ids})).values_list(source, target):
+                add(left, right, name)
+
+    return expanded
+
+
+def get_ego_network(node_id, depth, fan_out=GRAPH_FAN_OUT,
+                    kinds=EDGE_KINDS, relationtypes=None,
+                    max_nodes=GRAPH_MAX_NODES):
+    """Return the ego network of a node as a dict with the
+    nodes by id and the edges grouped by predicate,
+    or None if the node does not exist"""
+    refs = NID.objects.refs([node_id])
+    if not node_id in refs:
+        return None
+
+    levels, edges = breadth_first(
+        node_id, lambda ids: expand_nodes(ids, kinds, relationtypes),
+        depth, fan_out, max_nodes)
+    missing = [pk for pk in levels if not pk in refs]
+    refs.update(NID.objects.refs(missing))
+
+    predicates = {}
+    for left, right, predicate in edges:
+        if left in refs and right in refs:
+            predicates.setdefault(predicate, []).append((left, right))
+    return {'nodes': [(refs[pk], levels[pk]) for pk in
+                      sorted(levels, key=lambda pk: (levels[pk], pk))
+                      if pk in refs],
+            'predicates': predicates}
+
+
+def iter_ego_network_json(network):
+    """Yield the pieces of the JSON of an ego network"""
+    yield '{"node_metadata": ['
+    for i, (node, level) in enumerate(network['nodes']):
+        yield (i and ', ' or '') + json.dumps(
+            {'_id': str(node.pk), 'screen_name': node.title,
+             'title': node.title, 'url': node.get_absolute_url(),
+             'level': level})
+    yield ']'
+    for predicate in sorted(network['predicates']):
+        yield ', %s: [' % json.dumps(predicate)
+        for i, (left, right) in enumerate(network['predicates'][predicate]):
+            yield (i and ', ' or '') + json.dumps(
+                {'from': left, 'to': right, 'value': 1})
+        yield ']'
+    yield '}'
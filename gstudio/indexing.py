@@ -0,0 +1,73 @@
+"""Incremental indexing for Gstudio's search index
+
+The saves and deletes only queue the ids of the changed nodes in the
+SearchQueue table, which is drained by batches with the
+update_search_index command, so the search index stays fresh without
+slowing down the saves nor rebuilding it."""
+from django.db.models import Q
+
+from gstudio.models import NID
+from gstudio.models import SearchQueue
+from gstudio.managers import get_nodemodel
+from gstudio.settings import SEARCH_INDEXED_MODELS
+from gstudio.settings import SEARCH_INDEX_BATCH_SIZE
+from gstudio.search_backends import get_search_backend
+
+
+def get_indexed_models():
+    """Return the models of the nodes to index"""
+    return [model for model in map(get_nodemodel, SEARCH_INDEXED_MODELS)
+            if model is not None]
+
+
+def is_indexed(node):
+    """Tell if a node belongs to the search index"""
+    return isinstance(node, tuple(get_indexed_models()))
+
+
+def enqueue(node_ids):
+    """Queue the nodes to index"""
+    for node_id in set([node_id for node_id in node_ids if node_id]):
+        SearchQueue.objects.create(node_id=node_id)
+
+
+def index_nodes(node_ids, backend=None):
+    """Index the nodes, and unindex the ones deleted or
+    not indexed anymore. Return the number of nodes indexed"""
+    backend = backend or get_search_backend()
+    refs = NID.objects.refs(node_ids)
+    nodes = [node for node in refs.values() if is_indexed(node)]
+    backend.index(nodes)
+    backend.unindex([node_id for node_id in node_ids
+                     if not node_id in refs or not is_indexed(refs[node_id])])
+    return len(nodes)
+
+
+def process_queue(batch_size=SEARCH_INDEX_BATCH_SIZE, backend=None):
+    """Index the nodes of the next batch of the queue,
+    and return the number of entries processed"""
+    entries = list(SearchQueue.objects.values_list(
+        'pk', 'node_id')[:batch_size])
+    if not entries:
+        return 0
+
+    pks = [pk for pk, node_id in entries]
+    node_ids = list(set([node_id for pk, node_id in entries]))
+    index_nodes(node_ids, backend)
+    # The duplicates queued before this batch are indexed too.
+    SearchQueue.objects.filter(
+        Q(pk__in=pks) | Q(node_id__in=node_ids, pk__lte=max(pks))).delete()
+    return len(entries)
+
+
+def iter_chunks(queryset, chunk_size=SEARCH_INDEX_BATCH_SIZE):
+    """Iterate over a queryset by chunks ordered by primary key,
+    each chunk starting after the last key of the previous one"""
+    last_pk = 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_pk).order_by(
+            'pk')[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1].pk
@@ -0,0 +1,169 @@
+"""Inheritance resolver for Gstudio
+
+Resolve what a node inherits from its ancestors by reading the
+mptt columns (tree_id, lft, rght), with one query for the ancestors
+and one query for what they hold. The results are kept in a cache
+local to the process and keyed by a tree version shared through
+the cache framework, which is bumped when a node or an edge changes.
+The cache holds at most INHERITANCE_CACHE_SIZE results, and hands
+out copies of them, so a caller cannot alter the cached results."""
+from time import time
+
+from django.db.models import Q
+from django.core.cache import cache
+
+from gstudio.models import Metatype
+from gstudio.models import Nodetype
+from gstudio.models import Relation
+from gstudio.models import Attribute
+from gstudio.models import Relationtype
+from gstudio.models import Attributetype
+from gstudio.settings import INHERITANCE_CACHE_SIZE
+
+TREE_VERSION_KEY = 'gstudio:tree_version'
+
+INHERITANCE_CACHE = {'version': None, 'entries': {}}
+
+
+def get_tree_version():
+    """Return the current version of the trees"""
+    version = cache.get(TREE_VERSION_KEY)
+    if version is None:
+        version = int(time() * 1000)
+        cache.set(TREE_VERSION_KEY, version)
+    return version
+
+
+def flush_inheritance_cache():
+    """Bump the version of the trees, making
+    the cached inheritances of every process stale"""
+    try:
+        cache.incr(TREE_VERSION_KEY)
+    except ValueError:
+        cache.set(TREE_VERSION_KEY, int(time() * 1000))
+    INHERITANCE_CACHE['version'] = None
+    INHERITANCE_CACHE['entries'] = {}
+
+
+def copy_inheritance(result):
+    """Return a copy of the lists of an inheritance result"""
+    if isinstance(result, dict):
+        return dict([(key, list(value)) for key, value in result.items()])
+    return list(result)
+
+
+def cached_inheritance(function):
+    """Decorator caching the result of an inheritance
+    resolver by node until the trees change"""
+
+    def wrapper(node):
+        version = get_tree_version()
+        if INHERITANCE_CACHE['version'] != version:
+            INHERITANCE_CACHE['version'] = version
+            INHERITANCE_CACHE['entries'] = {}
+
+        if node.pk is None:
+            return function(node)
+        key = (function.__name__, node._meta.app_label,
+               node._meta.module_name, node.pk)
+        entries = INHERITANCE_CACHE['entries']
+        if not key in entries:
+            if len(entries) >= INHERITANCE_CACHE_SIZE:
+                entries.clear()
+            entries[key] = function(node)
+        return copy_inheritance(entries[key])
+
+    wrapper.__name__ = function.__name__
+    wrapper.__doc__ = function.__doc__
+    return wrapper
+
+
+def tree_lookup(nodes):
+    """Build the lookup matching the ancestors of nodes
+    from their mptt columns"""
+    lookup = None
+    for tree_id, lft, rght in nodes:
+        if lft is None:
+            continue
+        query = Q(tree_id=tree_id, lft__lt=lft, rght__gt=rght)
+        lookup = lookup is None and query or lookup | query
+    return lookup
+
+
+def get_ancestor_ids(node):
+    """Return the set of ids of the ancestors of a metatype or a nodetype.
+    For the other nodes, as the objects, the ancestors are
+    the nodetypes they are member of and their own ancestors."""
+    if isinstance(node, (Metatype, Nodetype)):
+        model = isinstance(node, Metatype) and Metatype or Nodetype
+        nodes = [(node.tree_id, node.lft, node.rght)]
+        ancestor_ids = []
+    else:
+        model = Nodetype
+        nodes = list(Nodetype.objects.filter(member_objects=node).values_list(
+            'pk', 'tree_id', 'lft', 'rght'))
+        ancestor_ids = [values[0] for values in nodes]
+        nodes = [values[1:] for values in nodes]
+
+    lookup = tree_lookup(nodes)
+    if lookup is not None:
+        ancestor_ids.extend(model.objects.filter(lookup).values_list(
+            'pk', flat=True))
+    return set(ancestor_ids)
+
+
+@cached_inheritance
+def get_possible_attributetypes(node):
+    """Return the attribute types inherited by a node"""
+    ancestor_ids = get_ancestor_ids(node)
+    if not ancestor_ids:
+        return []
+    return list(Attributetype.objects.filter(
+        subjecttype__in=list(ancestor_ids)))
+
+
+@cached_inheritance
+def get_possible_reltypes(node):
+    """Return the relation types inherited by a node,
+    splitted by the role played by the ancestors"""
+    reltypes = {'possible_leftroles': [], 'possible_rightroles': []}
+    ancestor_ids = get_ancestor_ids(node)
+    if not ancestor_ids:
+        return reltypes
+
+    for relationtype in Relationtype.objects.filter(
+        Q(left_subjecttype__in=list(ancestor_ids)) |
+        Q(right_subjecttype__in=list(ancestor_ids))):
+        if relationtype.left_subjecttype_id in ancestor_ids:
+            reltypes['possible_rightroles'].append(relationtype)
+        if relationtype.right_subjecttype_id in ancestor_ids:
+            reltypes['possible_leftroles'].append(relationtype)
+    return reltypes
+
+
+@cached_inheritance
+def get_possible_rels(node):
+    """Return the relations inherited by a node,
+    splitted by the role played by the ancestors"""
+    rels = {'possible_leftroles': [], 'possible_rightroles': []}
+    ancestor_ids = get_ancestor_ids(node)
+    if not ancestor_ids:
+        return rels
+
+    for relation in Relation.objects.filter(
+        Q(left_subject__in=list(ancestor_ids)) |
+        Q(right_subject__in=list(ancestor_ids))):
+        if relation.left_subject_id in ancestor_ids:
+            rels['possible_rightroles'].append(relation)
+        if relation.right_subject_id in ancestor_ids:
+            rels['possible_leftroles'].append(relation)
+    return rels
+
+
+@cached_inheritance
+def get_possible_attributes(node):
+    """Return the attributes inherited by a node"""
+    ancestor_ids = get_ancestor_ids(node)
+    if not ancestor_ids:
+        return []
+    return list(Attribute.objects.filter(subject__in=list(ancestor_ids)))
@@ -0,0 +1,91 @@
+"""Ego network benchmark command module for Gstudio"""
+import random
+from time import time
+from optparse import make_option
+
+from django.core.management.base import NoArgsCommand
+
+from gstudio.graphs import breadth_first
+
+
+class Command(NoArgsCommand):
+    """Command object for benchmarking the expansion of the
+    ego networks on a synthetic graph held in memory, counting
+    the round trips the expansion would do on the database"""
+    help = 'Benchmark the ego network expansion on a synthetic graph.'
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--nodes', dest='nodes', type='int', default=100000,
+                    help='Number of nodes of the synthetic graph'),
+        make_option('--degree', dest='degree', type='int', default=8,
+                    help='Average number of edges by node'),
+        make_option('--depth', dest='depth', type='int', default=3,
+                    help='Depth of the ego networks'),
+        make_option('--fan-out', dest='fan_out', type='int', default=50,
+                    help='Maximum number of edges by node'),
+        make_option('--max-nodes', dest='max_nodes', type='int',
+                    default=500, help='Maximum number of nodes returned'),
+        make_option('--runs', dest='runs', type='int', default=100,
+                    help='Number of ego networks to expand'),
+        make_option('--seed', dest='seed', type='int', default=42,
+                    help='Seed of the random generator'),
+        )
+
+    def build_graph(self, nodes, degree):
+        """Build a graph with a few hubs, as a dict of
+        (source, target, edge) tuples by node id"""
+        adjacency = dict((pk, []) for pk in xrange(nodes))
+        hubs = range(0, nodes, 1000)
+        for i in xrange(nodes * degree / 2):
+            left = random.randrange(nodes)
+            if random.random() < 0.1:
+                right = random.choice(hubs)
+            else:
+                right = random.randrange(nodes)
+            if left == right:
+                continue
+            edge = (left, right, 'relation-%i' % (i % 10))
+            adjacency[left].append((left, right, edge))
+            adjacency[right].append((right, left, edge))
+        return adjacency
+
+    def handle_noargs(self, **options):
+        verbosity = int(options.get('verbosity', 1))
+        random.seed(options['seed'])
+
+        start = time()
+        adjacency = self.build_graph(options['nodes'], options['degree'])
+        if verbosity:
+            print 'Graph of %i nodes built in %.2fs.' % (
+                options['nodes'], time() - start)
+
+        round_trips = {'levels': 0, 'nodes': 0}
+
+        def expand(ids):
+            round_trips['levels'] += 1
+            round_trips['nodes'] += len(ids)
+            expanded = []
+            for pk in ids:
+                expanded.extend(adjacency[pk])
+            return expanded
+
+        sizes = []
+        start = time()
+        for i in xrange(options['runs']):
+            levels, edges = breadth_first(
+                random.randrange(options['nodes']), expand,
+                options['depth'], options['fan_out'], options['max_nodes'])
+            sizes.append((len(levels), len(edges)))
+        duration = time() - start
+
+        runs = float(options['runs'])
+        print '%i ego networks of depth %i expanded in %.2fs ' \
+              '(%.2fms each).' % (options['runs'], options['depth'],
+                                  duration, duration * 1000 / runs)
+        print 'Average of %.1f nodes and %.1f edges by network.' % (
+            sum([n for n, e in sizes]) / runs,
+            sum([e for n, e in sizes]) / runs)
+        print 'Average of %.1f expansions by network, each a fixed ' \
+              'number of queries, instead of %.1f when expanding ' \
+              'node by node.' % (
+            round_trips['levels'] / runs, round_trips['nodes'] / runs)
@@ -0,0 +1,84 @@
+"""Publication index benchmark command module for Gstudio"""
+from time import time
+from datetime import datetime
+from optparse import make_option
+
+from django.db import connections
+from django.contrib.sites.models import Site
+from django.core.management.base import NoArgsCommand
+
+from gstudio.models import Nodetype
+from gstudio.managers import PUBLISHED
+from gstudio.settings import FEEDS_MAX_ITEMS
+
+
+def joined_published(queryset):
+    """Return the nodetypes published, filtered by
+    joining their sites, as before the publication index"""
+    now = datetime.now()
+    return queryset.filter(status=PUBLISHED,
+                           start_publication__lte=now,
+                           end_publication__gt=now,
+                           sites=Site.objects.get_current()).distinct()
+
+
+class Command(NoArgsCommand):
+    """Command object for comparing the query plans and the timings
+    of the archive and feed querysets, with the publication index
+    and with the join on the sites of the nodetypes"""
+    help = 'Benchmark the publication index against the join on the sites.'
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--runs', dest='runs', type='int', default=20,
+                    help='Number of evaluations of each queryset'),
+        make_option('--no-plan', action='store_false', dest='plan',
+                    default=True,
+                    help='Do not print the query plans'),
+        )
+
+    def get_querysets(self):
+        """Return the name, the joined and the indexed
+        versions of the querysets compared"""
+        now = datetime.now()
+        nodetypes = Nodetype.objects.all()
+        archive = lambda queryset: queryset.filter(
+            creation_date__year=now.year, creation_date__month=now.month)
+        feed = lambda queryset: queryset[:FEEDS_MAX_ITEMS]
+        return [
+            ('archive', archive(joined_published(nodetypes)),
+             archive(Nodetype.published.all())),
+            ('feed', feed(joined_published(nodetypes)),
+             feed(Nodetype.published.all()))]
+
+    def explain(self, queryset):
+        """Return the lines of the query plan of a queryset"""
+        connection = connections[queryset.db]
+        sql, params = queryset.query.get_compiler(
+            using=queryset.db).as_sql()
+        if connection.vendor == 'sqlite':
+            prefix = 'EXPLAIN QUERY PLAN '
+        else:
+            prefix = 'EXPLAIN '
+        cursor = connection.cursor()
+        cursor.execute(prefix + sql, params)
+        return [' '.join([unicode(value) for value in row])
+                for row in cursor.fetchall()]
+
+    def measure(self, queryset, runs):
+        """Return the mean time in ms to evaluate a queryset"""
+        start = time()
+        for i in xrange(runs):
+            list(queryset.all())
+        return (time() - start) * 1000 / max(runs, 1)
+
+    def handle_noargs(self, **options):
+        runs = options['runs']
+        for name, joined, indexed in self.get_querysets():
+            for label, queryset in (('join', joined), ('index', indexed)):
+                if options['plan']:
+                    print '%s with the %s:' % (name, label)
+                    for line in self.explain(queryset):
+                        print '    %s' % line
+                print '%s with the %s: %i nodetypes in %.2fms.' % (
+                    name, label, len(queryset.all()),
+                    self.measure(queryset, runs))
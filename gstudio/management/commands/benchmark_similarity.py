@@ -0,0 +1,101 @@
+"""Similarity benchmark command module for Gstudio"""
+import random
+from time import time
+from optparse import make_option
+
+from django.core.management.base import NoArgsCommand
+from django.core.management.base import CommandError
+from django.core.exceptions import ImproperlyConfigured
+
+from gstudio.comparison import pearson_score
+
+
+class Command(NoArgsCommand):
+    """Command object for comparing the similarity engine with
+    the Pearson scores of the comparison module, on a synthetic
+    corpus held in memory"""
+    help = 'Benchmark the similarity engine against the comparison module.'
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--nodes', dest='nodes', type='int', default=1000,
+                    help='Number of documents of the synthetic corpus'),
+        make_option('--words', dest='words', type='int', default=1000,
+                    help='Number of distinct words of the corpus'),
+        make_option('--length', dest='length', type='int', default=200,
+                    help='Number of words by document'),
+        make_option('--topics', dest='topics', type='int', default=20,
+                    help='Number of topics sharing their words'),
+        make_option('--queries', dest='queries', type='int', default=20,
+                    help='Number of documents to find similar ones for'),
+        make_option('--top-k', dest='top_k', type='int', default=5,
+                    help='Number of similar documents compared'),
+        make_option('--seed', dest='seed', type='int', default=42,
+                    help='Seed of the random generator'),
+        )
+
+    def build_corpus(self, nodes, words, length, topics):
+        """Build documents drawing half of their words
+        in the words of their topic"""
+        topic_size = max(words / topics, 1)
+        documents = []
+        for i in xrange(nodes):
+            start = random.randrange(topics) * topic_size
+            document = []
+            for j in xrange(length):
+                if random.random() < 0.5:
+                    word = start + random.randrange(topic_size)
+                else:
+                    word = random.randrange(words)
+                document.append('w%i' % word)
+            documents.append(document)
+        return documents
+
+    def handle_noargs(self, **options):
+        try:
+            from gstudio.similarity import VectorStore
+        except ImproperlyConfigured, e:
+            raise CommandError(str(e))
+
+        random.seed(options['seed'])
+        top_k = options['top_k']
+        documents = self.build_corpus(options['nodes'], options['words'],
+                                      options['length'], options['topics'])
+        ids = range(len(documents))
+        queries = random.sample(ids, min(options['queries'], len(ids)))
+
+        start = time()
+        matrix = VectorStore(ids, documents, method='pearson')
+        built = time() - start
+        start = time()
+        engine = dict(matrix.top_k(queries, top_k))
+        scored = time() - start
+        print 'Engine: matrix of %ix%i built in %.2fs, %i queries ' \
+              'scored in %.2fs (%.2fms each).' % (
+            matrix.matrix.shape[0], matrix.matrix.shape[1], built,
+            len(queries), scored, scored * 1000 / len(queries))
+
+        # The dense vectors of the comparison module, as built
+        # by VectorBuilder, with the same words kept.
+        vectors = [[float(value) for value in row]
+                   for row in matrix.matrix.toarray()]
+        start = time()
+        agreement = 0
+        for pk in queries:
+            related = []
+            for other in ids:
+                if other != pk:
+                    score = pearson_score(vectors[pk], vectors[other])
+                    if score:
+                        related.append((score, other))
+            related.sort()
+            expected = set([other for score, other in related[:top_k]
+                            if score < 1.0])
+            found = set([other for other, score, label in engine[pk]])
+            agreement += len(expected & found)
+        compared = time() - start
+        print 'Comparison module: %i queries scored in %.2fs ' \
+              '(%.2fms each), %.1fx slower.' % (
+            len(queries), compared, compared * 1000 / len(queries),
+            compared / (scored or 1e-9))
+        print 'Agreement on the top %i: %.1f%%.' % (
+            top_k, 100.0 * agreement / max(len(queries) * top_k, 1))
@@ -0,0 +1,37 @@
+"""Ping queue draining command module for Gstudio"""
+import time
+from optparse import make_option
+
+from django.core.management.base import NoArgsCommand
+
+from gstudio.ping_queue import next_ping_delay
+from gstudio.ping_queue import process_ping_queue
+
+
+class Command(NoArgsCommand):
+    """Command object for sending the pings of the queue,
+    to run periodically or as a daemon with --loop"""
+    help = 'Send the pings queued to the directories and external urls.'
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--all', action='store_true', dest='all', default=False,
+                    help='Send the pings not due yet too'),
+        make_option('--loop', action='store_true', dest='loop',
+                    default=False,
+                    help='Keep sending the pings when they are due'),
+        make_option('--interval', dest='interval', default=60, type='int',
+                    help='Seconds between the checks of an empty queue'),
+        )
+
+    def handle_noargs(self, **options):
+        verbosity = int(options.get('verbosity', 1))
+        while True:
+            sent, failed = process_ping_queue(force=options.get('all'))
+            if verbosity and (sent or failed or not options.get('loop')):
+                print '%i pings sent, %i pings failed.' % (sent, failed)
+            if not options.get('loop'):
+                break
+            delay = next_ping_delay()
+            if delay is None or delay > options.get('interval'):
+                delay = options.get('interval')
+            time.sleep(delay)
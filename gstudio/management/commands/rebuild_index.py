@@ -0,0 +1,53 @@
+"""Search index rebuild command module for Gstudio"""
+from optparse import make_option
+
+from django.core.management.base import NoArgsCommand
+
+from gstudio.models import SearchQueue
+from gstudio.models import SearchPosting
+from gstudio.models import SearchDocument
+from gstudio.indexing import iter_chunks
+from gstudio.indexing import get_indexed_models
+from gstudio.settings import SEARCH_INDEX_BATCH_SIZE
+from gstudio.search_backends import get_search_backend
+
+
+class Command(NoArgsCommand):
+    """Command object for indexing all the nodes, walking
+    the tables by chunks instead of loading them at once"""
+    help = 'Rebuild the search index of the nodes.'
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--chunk-size', dest='chunk_size', type='int',
+                    default=SEARCH_INDEX_BATCH_SIZE,
+                    help='Number of nodes indexed at once'),
+        make_option('--clear', action='store_true', dest='clear',
+                    default=False,
+                    help='Empty the search index before rebuilding it'),
+        )
+
+    def handle_noargs(self, **options):
+        verbosity = int(options.get('verbosity', 1))
+        backend = get_search_backend()
+
+        last_entries = list(SearchQueue.objects.order_by('-pk').values_list(
+            'pk', flat=True)[:1])
+        last_entry = last_entries and last_entries[0] or 0
+        if options['clear']:
+            SearchPosting.objects.all().delete()
+            SearchDocument.objects.all().delete()
+
+        for model in get_indexed_models():
+            count = 0
+            for chunk in iter_chunks(model._default_manager.all(),
+                                     options['chunk_size']):
+                backend.index(chunk)
+                count += len(chunk)
+            if verbosity:
+                print '%i %s indexed.' % (count,
+                                          model._meta.verbose_name_plural)
+            # The nodes queued until the rebuild started are indexed
+            # now, the deleted ones are left to unindex in the queue.
+            SearchQueue.objects.filter(
+                pk__lte=last_entry,
+                node_id__in=model._default_manager.values('pk')).delete()
@@ -0,0 +1,44 @@
+"""Content rendering command module for Gstudio"""
+from optparse import make_option
+
+from django.conf import settings
+from django.core.management.base import NoArgsCommand
+
+from gstudio.rendering import render_stored_contents
+
+
+class Command(NoArgsCommand):
+    """Command object for rendering again the stored contents,
+    after a change of the markup settings"""
+    help = 'Render again the contents of the nodetypes and gbobjects.'
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--all', action='store_true', dest='all', default=False,
+                    help='Render the contents up to date too'),
+        make_option('--processes', dest='processes', default=None,
+                    type='int',
+                    help='Number of processes, the number of CPUs '
+                    'by default'),
+        )
+
+    def get_models(self):
+        """Return the models with a rendered content
+        and their markup settings"""
+        from gstudio import models
+        rendered_models = [(models.Nodetype, models.MARKUP_LANGUAGE,
+                            models.MARKDOWN_EXTENSIONS)]
+        if 'objectapp' in settings.INSTALLED_APPS:
+            from objectapp import models
+            rendered_models.append((models.Gbobject, models.MARKUP_LANGUAGE,
+                                    models.MARKDOWN_EXTENSIONS))
+        return rendered_models
+
+    def handle_noargs(self, **options):
+        verbosity = int(options.get('verbosity', 1))
+        for model, markup, extensions in self.get_models():
+            count = render_stored_contents(
+                model, markup, extensions, fields=model.rendered_fields,
+                processes=options.get('processes'), force=options.get('all'))
+            if verbosity:
+                print '%i %s rendered.' % (
+                    count, model._meta.verbose_name_plural)
@@ -0,0 +1,76 @@
+"""Sitemaps rendering command module for Gstudio"""
+import os
+from optparse import make_option
+
+from django.utils.importlib import import_module
+from django.core.management.base import NoArgsCommand
+from django.core.management.base import CommandError
+
+from gstudio.current_site import get_current_site
+from gstudio.settings import PROTOCOL
+
+
+class Command(NoArgsCommand):
+    """Command object for rendering the sitemaps in static files,
+    an index and a file for each page of each section"""
+    help = 'Render the XML sitemaps in static files.'
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--output', dest='output', default='.',
+                    help='Directory where the files are written'),
+        make_option('--base-url', dest='base_url', default='/',
+                    help='Url where the files are served'),
+        make_option('--sitemaps', dest='sitemaps',
+                    default='gstudio.sitemaps.SITEMAPS',
+                    help='Dotted path to the dictionary of the sitemaps'),
+        )
+
+    def get_sitemaps(self, path):
+        """Import the dictionary of the sitemaps"""
+        module, attribute = path.rsplit('.', 1)
+        try:
+            return getattr(import_module(module), attribute)
+        except (ImportError, AttributeError):
+            raise CommandError('Cannot import the sitemaps %s' % path)
+
+    def write(self, output, filename, content):
+        """Write a rendered file"""
+        destination = open(os.path.join(output, filename), 'w')
+        try:
+            destination.write(content.encode('utf-8'))
+        finally:
+            destination.close()
+
+    def handle_noargs(self, **options):
+        from gstudio.sitemaps import render_sitemap_index
+        from gstudio.sitemaps import render_sitemap_section
+
+        verbosity = int(options.get('verbosity', 1))
+        output = options['output']
+        if not os.path.isdir(output):
+            raise CommandError('%s is not a directory' % output)
+        sitemaps = self.get_sitemaps(options['sitemaps'])
+        site = get_current_site()
+        base_url = options['base_url']
+        if not '://' in base_url:
+            base_url = '%s://%s/%s' % (PROTOCOL, site.domain,
+                                       base_url.strip('/'))
+        base_url = base_url.rstrip('/')
+
+        filenames = {}
+
+        def location(section, page):
+            filename = 'sitemap-%s.xml' % section
+            if page > 1:
+                filename = 'sitemap-%s-%i.xml' % (section, page)
+            filenames[(section, page)] = filename
+            return '%s/%s' % (base_url, filename)
+
+        self.write(output, 'sitemap.xml',
+                   render_sitemap_index(sitemaps, location))
+        for (section, page), filename in sorted(filenames.items()):
+            self.write(output, filename, render_sitemap_section(
+                sitemaps[section], page, site))
+        if verbosity:
+            print '%i sitemaps rendered in %s.' % (len(filenames) + 1,
+                                                   output)
@@ -0,0 +1,39 @@
+"""Node models update command module for Gstudio"""
+from django.db.models import get_models
+from django.core.management.base import NoArgsCommand
+
+from gstudio.models import NID
+
+CHUNK_SIZE = 500
+
+
+class Command(NoArgsCommand):
+    """Command object for populating the node model
+    of the nodes created before it was recorded"""
+    help = 'Populate the node model of the nodes missing it.'
+
+    def handle_noargs(self, **options):
+        verbosity = int(options.get('verbosity', 1))
+
+        node_models = [model for model in get_models()
+                       if issubclass(model, NID) and not model._meta.proxy]
+        # The deepest models first, so a node is labelled
+        # with its concrete model and not one of its parents.
+        node_models.sort(key=lambda model: len(model.__mro__), reverse=True)
+
+        total = 0
+        for model in node_models:
+            nodemodel = '%s.%s' % (model._meta.app_label,
+                                   model._meta.module_name)
+            pks = list(model._default_manager.filter(
+                nodemodel='').values_list('pk', flat=True))
+            count = 0
+            for i in range(0, len(pks), CHUNK_SIZE):
+                count += NID.objects.filter(
+                    pk__in=pks[i:i + CHUNK_SIZE]).update(nodemodel=nodemodel)
+            total += count
+            if verbosity > 1 and count:
+                print '%i nodes set as %s.' % (count, nodemodel)
+
+        if verbosity:
+            print '%i nodes updated.' % total
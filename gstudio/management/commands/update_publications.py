@@ -0,0 +1,25 @@
+"""Publication index update command module for Gstudio"""
+from django.core.management.base import NoArgsCommand
+
+from gstudio.archives import rebuild_archive_days
+from gstudio.tag_usage import rebuild_tag_usage
+from gstudio.publication import rebuild_publications
+
+
+class Command(NoArgsCommand):
+    """Command object for rebuilding the publication index, the tag
+    usages and the archive days, after loading nodetypes or updating
+    them in bulk"""
+    help = 'Rebuild the publication index, the tag usages and the archives.'
+
+    def handle_noargs(self, **options):
+        verbosity = int(options.get('verbosity', 1))
+        count = rebuild_publications()
+        if verbosity:
+            print '%i publications indexed.' % count
+        count = rebuild_tag_usage()
+        if verbosity:
+            print '%i tag usages computed.' % count
+        count = rebuild_archive_days()
+        if verbosity:
+            print '%i archive days computed.' % count
@@ -0,0 +1,40 @@
+"""Search index update command module for Gstudio"""
+from time import sleep
+from optparse import make_option
+
+from django.core.management.base import NoArgsCommand
+
+from gstudio.indexing import process_queue
+from gstudio.settings import SEARCH_INDEX_BATCH_SIZE
+
+
+class Command(NoArgsCommand):
+    """Command object for indexing the nodes queued
+    in the SearchQueue table, by batches"""
+    help = 'Index the nodes queued since the last update.'
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--batch-size', dest='batch_size', type='int',
+                    default=SEARCH_INDEX_BATCH_SIZE,
+                    help='Number of queued nodes indexed at once'),
+        make_option('--interval', dest='interval', type='float', default=0,
+                    help='Keep polling the queue every interval seconds '
+                    'once drained, instead of exiting'),
+        )
+
+    def handle_noargs(self, **options):
+        verbosity = int(options.get('verbosity', 1))
+        batch_size = options['batch_size']
+        interval = options['interval']
+
+        while True:
+            count = 0
+            processed = process_queue(batch_size)
+            while processed:
+                count += processed
+                processed = process_queue(batch_size)
+            if verbosity and (count or not interval):
+                print '%i queued nodes indexed.' % count
+            if not interval:
+                break
+            sleep(interval)
@@ -0,0 +1,35 @@
+"""Similarities update command module for Gstudio"""
+from optparse import make_option
+
+from django.core.management.base import NoArgsCommand
+from django.core.management.base import CommandError
+from django.core.exceptions import ImproperlyConfigured
+
+from gstudio.settings import SIMILARITY_BLOCK_SIZE
+
+
+class Command(NoArgsCommand):
+    """Command object for scoring the similar nodes
+    of the nodes changed since the last update"""
+    help = 'Update the similar nodes of the changed nodes.'
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--full', action='store_true', dest='full',
+                    default=False,
+                    help='Score all the nodes again'),
+        make_option('--block-size', dest='block_size', type='int',
+                    default=SIMILARITY_BLOCK_SIZE,
+                    help='Number of nodes scored at once'),
+        )
+
+    def handle_noargs(self, **options):
+        verbosity = int(options.get('verbosity', 1))
+        try:
+            from gstudio.similarity import update_similarities
+        except ImproperlyConfigured, e:
+            raise CommandError(str(e))
+
+        count = update_similarities(full=options['full'],
+                                    block_size=options['block_size'])
+        if verbosity:
+            print '%i nodes scored.' % count
@@ -0,0 +1,37 @@
+"""Tree paths update command module for Gstudio"""
+from django.core.management.base import NoArgsCommand
+
+from gstudio.models import Metatype
+from gstudio.models import Nodetype
+from gstudio.treepath import TREE_PATH_LENGTH
+
+
+class Command(NoArgsCommand):
+    """Command object for computing the stored tree paths
+    of the metatypes and nodetypes"""
+    help = 'Compute the tree path of every metatype and nodetype.'
+
+    def handle_noargs(self, **options):
+        verbosity = int(options.get('verbosity', 1))
+
+        for model in (Metatype, Nodetype):
+            # Ordered by level, a parent is always seen before its children.
+            paths = {}
+            count = 0
+            for pk, parent, slug, tree_path in model._default_manager.order_by(
+                'level').values_list('pk', 'parent', 'slug', 'tree_path'):
+                if parent in paths:
+                    path = '%s/%s' % (paths[parent], slug)
+                else:
+                    path = slug
+                paths[pk] = path
+                if len(path) > TREE_PATH_LENGTH:
+                    if verbosity:
+                        print 'Tree path too long, not stored: %s' % path
+                elif path != tree_path:
+                    model._default_manager.filter(pk=pk).update(
+                        tree_path=path)
+                    count += 1
+            if verbosity:
+                print '%i %s updated.' % (
+                    count, model._meta.verbose_name_plural)
@@ -2,21 +2,68 @@
 from datetime import datetime
 
 from django.db import models
-from django.contrib.sites.models import Site
+from django.db.models.loading import get_model
+
+from gstudio.current_site import get_current_site_id
 
 DRAFT = 0
 HIDDEN = 1
 PUBLISHED = 2
 
 
-def tags_published():
-    """Return the published tags"""
-    from tagging.models import Tag
-    from gstudio.models import Nodetype
-    tags_nodetype_published = Tag.objects.usage_for_queryset(
-        Nodetype.published.all())
-    # Need to do that until the issue #44 of django-tagging is fixed
-    return Tag.objects.filter(name__in=[t.name for t in tags_nodetype_published])
+def tags_published(counts=False):
+    """Return the published tags, read in the tag usage table,
+    or the list of these tags with their count if counts"""
+    from gstudio.tag_usage import get_tag_usage
+    from gstudio.tag_usage import get_published_tags
+
+    if counts:
+        return get_tag_usage()
+    return get_published_tags()
+
+
+def get_nodemodel(nodemodel):
+    """Return the model class of a node model label
+    as stored in NID.nodemodel ('app_label.module_name')"""
+    if not nodemodel:
+        return None
+    app_label, module_name = nodemodel.split('.', 1)
+    return get_model(app_label, module_name)
+
+
+class NIDManager(models.Manager):
+    """Manager resolving the NIDs to their concrete nodes"""
+
+    def refs(self, ids):
+        """Return a dict of the concrete nodes of the given ids,
+        fetching the nodes of each model with a single query"""
+        nodemodels = {}
+        for pk, nodemodel in self.get_query_set().filter(
+            pk__in=ids).values_list('pk', 'nodemodel'):
+            nodemodels.setdefault(nodemodel, []).append(pk)
+
+        refs = {}
+        for nodemodel, pks in nodemodels.items():
+            model = get_nodemodel(nodemodel)
+            if model is not None:
+                refs.update(model._default_manager.in_bulk(pks))
+        return refs
+
+
+class SimilarityManager(models.Manager):
+    """Manager retrieving the nodes similar to a node"""
+
+    def similar_to(self, node_id, model, number=None):
+        """Return the published nodes of a model the most similar
+        to a node, as stored by the similarity engine"""
+        nodemodel = '%s.%s' % (model._meta.app_label,
+                               model._meta.module_name)
+        ids = list(self.get_query_set().filter(
+            node=node_id, nodemodel=nodemodel).values_list(
+            'similar', flat=True))
+        manager = getattr(model, 'published', model._default_manager)
+        nodes = manager.in_bulk(ids)
+        return [nodes[pk] for pk in ids if pk in nodes][:number]
 
 
 class AuthorPublishedManager(models.Manager):
@@ -24,23 +71,26 @@ class AuthorPublishedManager(models.Manager):
 
     def get_query_set(self):
         """Return published authors"""
-        now = datetime.now()
+        from gstudio.models import Nodetype
+
+        authorships = Nodetype.authors.through.objects.filter(
+            nodetype__in=Nodetype.published.values('pk'))
         return super(AuthorPublishedManager, self).get_query_set().filter(
-            nodetypes__status=PUBLISHED,
-            nodetypes__start_publication__lte=now,
-            nodetypes__end_publication__gt=now,
-            nodetypes__sites=Site.objects.get_current()
-            ).distinct()
+            pk__in=authorships.values('user'))
 
 
 def nodetypes_published(queryset):
+    """Return only the nodetypes published,
+    found in the publication index of the current site"""
+    from gstudio.models import Publication
 
-    """Return only the nodetypes published"""
     now = datetime.now()
+    publications = Publication.objects.filter(
+        site=get_current_site_id(),
+        start_publication__lte=now,
+        end_publication__gt=now)
     return queryset.filter(status=PUBLISHED,
-                           start_publication__lte=now,
-                           end_publication__gt=now,
-                           sites=Site.objects.get_current())
+                           pk__in=publications.values('nodetype'))
 
 
 class NodetypePublishedManager(models.Manager):
@@ -54,30 +104,20 @@ class NodetypePublishedManager(models.Manager):
     def on_site(self):
         """Return nodetypes published on current site"""
         return super(NodetypePublishedManager, self).get_query_set(
-            ).filter(sites=Site.objects.get_current())
+            ).filter(sites=get_current_site_id())
 
     def search(self, pattern):
-        """Top level search method on nodetypes"""
-        try:
-            return self.advanced_search(pattern)
-        except:
-            return self.basic_search(pattern)
+        """Top level search method on nodetypes,
+        done by the selected search backend"""
+        from gstudio.search_backends import get_search_backend
+        return get_search_backend().search(self.get_query_set(), pattern)
 
     def advanced_search(self, pattern):
         """Advanced search on nodetypes"""
         from gstudio.search import advanced_search
-        return advanced_search(pattern)
+        return advanced_search(pattern, self.get_query_set())
 
     def basic_search(self, pattern):
         """Basic search on nodetypes"""
-        lookup = None
-        for pattern in pattern.split():
-            query_part = models.Q(content__icontains=pattern) | \
-                         models.Q(excerpt__icontains=pattern) | \
-                         models.Q(title__icontains=pattern)
-            if lookup is None:
-                lookup = query_part
-            else:
-                lookup |= query_part
-
-        return self.get_query_set().filter(lookup)
+        from gstudio.search import basic_search
+        return basic_search(pattern, self.get_query_set())
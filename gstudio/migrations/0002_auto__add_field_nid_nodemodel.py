@@ -0,0 +1,337 @@
+# encoding: utf-8
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        
+        # Adding field 'NID.nodemodel'
+        db.add_column('gstudio_nid', 'nodemodel', self.gf('django.db.models.fields.CharField')(default='', max_length=255, db_index=True, blank=True), keep_default=False)
+
+
+    def backwards(self, orm):
+        
+        # Deleting field 'NID.nodemodel'
+        db.delete_column('gstudio_nid', 'nodemodel')
+
+
+    models = {
+        'auth.group': {
+            'Meta': {'object_name': 'Group'},
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '80'}),
+            'permissions': ('django.db.models.fields.related.ManyToManyField', [], {'to': "orm['auth.Permission']", 'symmetrical': 'False', 'blank': 'True'})
+        },
+        'auth.permission': {
+            'Meta': {'ordering': "('content_type__app_label', 'content_type__model', 'codename')", 'unique_together': "(('content_type', 'codename'),)", 'object_name': 'Permission'},
+            'codename': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '50'})
+        },
+        'auth.user': {
+            'Meta': {'object_name': 'User'},
+            'date_joined': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'email': ('django.db.models.fields.EmailField', [], {'max_length': '75', 'blank': 'True'}),
+            'first_name': ('django.db.models.fields.CharField', [], {'max_length': '30', 'blank': 'True'}),
+            'groups': ('django.db.models.fields.related.ManyToManyField', [], {'to': "orm['auth.Group']", 'symmetrical': 'False', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'is_active': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'is_staff': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'is_superuser': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'last_login': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'last_name': ('django.db.models.fields.CharField', [], {'max_length': '30', 'blank': 'True'}),
+            'password': ('django.db.models.fields.CharField', [], {'max_length': '128'}),
+            'user_permissions': ('django.db.models.fields.related.ManyToManyField', [], {'to': "orm['auth.Permission']", 'symmetrical': 'False', 'blank': 'True'}),
+            'username': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '30'})
+        },
+        'contenttypes.contenttype': {
+            'Meta': {'ordering': "('name',)", 'unique_together': "(('app_label', 'model'),)", 'object_name': 'ContentType', 'db_table': "'django_content_type'"},
+            'app_label': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'model': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '100'})
+        },
+        'gstudio.attribute': {
+            'Meta': {'unique_together': "(('subject_scope', 'subject', 'attributetype_scope', 'attributetype', 'value_scope', 'svalue'),)", 'object_name': 'Attribute', '_ormbases': ['gstudio.Edge']},
+            'attributetype': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['gstudio.Attributetype']"}),
+            'attributetype_scope': ('django.db.models.fields.CharField', [], {'max_length': '50', 'null': 'True', 'blank': 'True'}),
+            'edge_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Edge']", 'unique': 'True', 'primary_key': 'True'}),
+            'subject': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'subject_of'", 'to': "orm['gstudio.NID']"}),
+            'subject_scope': ('django.db.models.fields.CharField', [], {'max_length': '50', 'null': 'True', 'blank': 'True'}),
+            'svalue': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'value_scope': ('django.db.models.fields.CharField', [], {'max_length': '50', 'null': 'True', 'blank': 'True'})
+        },
+        'gstudio.attributebigintegerfield': {
+            'Meta': {'object_name': 'AttributeBigIntegerField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.BigIntegerField', [], {'max_length': '100'})
+        },
+        'gstudio.attributebooleanfield': {
+            'Meta': {'object_name': 'AttributeBooleanField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.BooleanField', [], {'default': 'False'})
+        },
+        'gstudio.attributecharfield': {
+            'Meta': {'object_name': 'AttributeCharField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.CharField', [], {'max_length': '100'})
+        },
+        'gstudio.attributecommaseparatedintegerfield': {
+            'Meta': {'object_name': 'AttributeCommaSeparatedIntegerField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.CommaSeparatedIntegerField', [], {'max_length': '100'})
+        },
+        'gstudio.attributedatefield': {
+            'Meta': {'object_name': 'AttributeDateField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.DateField', [], {'max_length': '100'})
+        },
+        'gstudio.attributedatetimefield': {
+            'Meta': {'object_name': 'AttributeDateTimeField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.DateTimeField', [], {'max_length': '100'})
+        },
+        'gstudio.attributedecimalfield': {
+            'Meta': {'object_name': 'AttributeDecimalField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.DecimalField', [], {'max_digits': '3', 'decimal_places': '2'})
+        },
+        'gstudio.attributeemailfield': {
+            'Meta': {'object_name': 'AttributeEmailField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.CharField', [], {'max_length': '100'})
+        },
+        'gstudio.attributefilefield': {
+            'Meta': {'object_name': 'AttributeFileField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.files.FileField', [], {'max_length': '100'})
+        },
+        'gstudio.attributefilepathfield': {
+            'Meta': {'object_name': 'AttributeFilePathField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.FilePathField', [], {'max_length': '100'})
+        },
+        'gstudio.attributefloatfield': {
+            'Meta': {'object_name': 'AttributeFloatField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.FloatField', [], {'max_length': '100'})
+        },
+        'gstudio.attributeimagefield': {
+            'Meta': {'object_name': 'AttributeImageField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.files.ImageField', [], {'max_length': '100'})
+        },
+        'gstudio.attributeintegerfield': {
+            'Meta': {'object_name': 'AttributeIntegerField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.IntegerField', [], {'max_length': '100'})
+        },
+        'gstudio.attributeipaddressfield': {
+            'Meta': {'object_name': 'AttributeIPAddressField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.IPAddressField', [], {'max_length': '15'})
+        },
+        'gstudio.attributenullbooleanfield': {
+            'Meta': {'object_name': 'AttributeNullBooleanField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.NullBooleanField', [], {'null': 'True', 'blank': 'True'})
+        },
+        'gstudio.attributepositiveintegerfield': {
+            'Meta': {'object_name': 'AttributePositiveIntegerField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.PositiveIntegerField', [], {'max_length': '100'})
+        },
+        'gstudio.attributespecification': {
+            'Meta': {'object_name': 'AttributeSpecification', '_ormbases': ['gstudio.Node']},
+            'attributetype': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['gstudio.Attributetype']"}),
+            'node_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Node']", 'unique': 'True', 'primary_key': 'True'}),
+            'subjects': ('django.db.models.fields.related.ManyToManyField', [], {'related_name': "'subjects_attrspec_of'", 'symmetrical': 'False', 'to': "orm['gstudio.NID']"})
+        },
+        'gstudio.attributetextfield': {
+            'Meta': {'object_name': 'AttributeTextField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.TextField', [], {})
+        },
+        'gstudio.attributetimefield': {
+            'Meta': {'object_name': 'AttributeTimeField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.TimeField', [], {'max_length': '100'})
+        },
+        'gstudio.attributetype': {
+            'Meta': {'ordering': "['-creation_date']", 'object_name': 'Attributetype', '_ormbases': ['gstudio.Nodetype']},
+            'applicable_nodetypes': ('django.db.models.fields.CharField', [], {'default': "'OT'", 'max_length': '2'}),
+            'auto_now': ('django.db.models.fields.NullBooleanField', [], {'null': 'True', 'blank': 'True'}),
+            'auto_now_add': ('django.db.models.fields.NullBooleanField', [], {'null': 'True', 'blank': 'True'}),
+            'blank': ('django.db.models.fields.NullBooleanField', [], {'null': 'True', 'blank': 'True'}),
+            'dataType': ('django.db.models.fields.CharField', [], {'default': "'01'", 'max_length': '2'}),
+            'decimal_places': ('django.db.models.fields.IntegerField', [], {'max_length': '2', 'null': 'True', 'blank': 'True'}),
+            'default': ('django.db.models.fields.CharField', [], {'max_length': '500', 'null': 'True', 'blank': 'True'}),
+            'editable': ('django.db.models.fields.NullBooleanField', [], {'null': 'True', 'blank': 'True'}),
+            'help_text': ('django.db.models.fields.CharField', [], {'max_length': '500', 'null': 'True', 'blank': 'True'}),
+            'label': ('django.db.models.fields.CharField', [], {'max_length': '500', 'null': 'True', 'blank': 'True'}),
+            'lft': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'max_digits': ('django.db.models.fields.IntegerField', [], {'max_length': '5', 'null': 'True', 'blank': 'True'}),
+            'min_length': ('django.db.models.fields.IntegerField', [], {'max_length': '10', 'null': 'True', 'blank': 'True'}),
+            'nodetype_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Nodetype']", 'unique': 'True', 'primary_key': 'True'}),
+            'null': ('django.db.models.fields.NullBooleanField', [], {'null': 'True', 'blank': 'True'}),
+            'path': ('django.db.models.fields.CharField', [], {'max_length': '500', 'null': 'True', 'blank': 'True'}),
+            'required': ('django.db.models.fields.NullBooleanField', [], {'null': 'True', 'blank': 'True'}),
+            'subjecttype': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'subjecttype_of'", 'to': "orm['gstudio.NID']"}),
+            'unique': ('django.db.models.fields.NullBooleanField', [], {'null': 'True', 'blank': 'True'}),
+            'upload_to': ('django.db.models.fields.CharField', [], {'max_length': '500', 'null': 'True', 'blank': 'True'}),
+            'validators': ('django.db.models.fields.related.ManyToManyField', [], {'blank': 'True', 'related_name': "'validators_rel_+'", 'null': 'True', 'to': "orm['gstudio.Attributetype']"}),
+            'verbose_name': ('django.db.models.fields.CharField', [], {'max_length': '500', 'null': 'True', 'blank': 'True'}),
+            'verify_exists': ('django.db.models.fields.NullBooleanField', [], {'null': 'True', 'blank': 'True'})
+        },
+        'gstudio.attributeurlfield': {
+            'Meta': {'object_name': 'AttributeURLField', '_ormbases': ['gstudio.Attribute']},
+            'attribute_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Attribute']", 'unique': 'True', 'primary_key': 'True'}),
+            'value': ('django.db.models.fields.URLField', [], {'max_length': '100'})
+        },
+        'gstudio.complement': {
+            'Meta': {'object_name': 'Complement', '_ormbases': ['gstudio.Node']},
+            'node_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Node']", 'unique': 'True', 'primary_key': 'True'}),
+            'nodetypes': ('django.db.models.fields.related.ManyToManyField', [], {'related_name': "'complement_of'", 'symmetrical': 'False', 'to': "orm['gstudio.Nodetype']"})
+        },
+        'gstudio.edge': {
+            'Meta': {'object_name': 'Edge', '_ormbases': ['gstudio.NID']},
+            'nid_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.NID']", 'unique': 'True', 'primary_key': 'True'})
+        },
+        'gstudio.intersection': {
+            'Meta': {'object_name': 'Intersection', '_ormbases': ['gstudio.Node']},
+            'node_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Node']", 'unique': 'True', 'primary_key': 'True'}),
+            'nodetypes': ('django.db.models.fields.related.ManyToManyField', [], {'related_name': "'intersection_of'", 'symmetrical': 'False', 'to': "orm['gstudio.Nodetype']"})
+        },
+        'gstudio.metatype': {
+            'Meta': {'ordering': "['title']", 'object_name': 'Metatype', '_ormbases': ['gstudio.Node']},
+            'description': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'level': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'lft': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'node_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Node']", 'unique': 'True', 'primary_key': 'True'}),
+            'parent': ('django.db.models.fields.related.ForeignKey', [], {'blank': 'True', 'related_name': "'children'", 'null': 'True', 'to': "orm['gstudio.Metatype']"}),
+            'rght': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'slug': ('django.db.models.fields.SlugField', [], {'unique': 'True', 'max_length': '255', 'db_index': 'True'}),
+            'tree_id': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'})
+        },
+        'gstudio.nid': {
+            'Meta': {'object_name': 'NID'},
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'nodemodel': ('django.db.models.fields.CharField', [], {'db_index': 'True', 'max_length': '255', 'blank': 'True'}),
+            'title': ('django.db.models.fields.CharField', [], {'max_length': '255'})
+        },
+        'gstudio.node': {
+            'Meta': {'object_name': 'Node', '_ormbases': ['gstudio.NID']},
+            'altnames': ('tagging.fields.TagField', [], {'null': 'True'}),
+            'nid_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.NID']", 'unique': 'True', 'primary_key': 'True'}),
+            'plural': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'rating_score': ('django.db.models.fields.IntegerField', [], {'default': '0', 'blank': 'True'}),
+            'rating_votes': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0', 'blank': 'True'})
+        },
+        'gstudio.nodespecification': {
+            'Meta': {'object_name': 'NodeSpecification', '_ormbases': ['gstudio.Node']},
+            'attributes': ('django.db.models.fields.related.ManyToManyField', [], {'related_name': "'attributes_in_nodespec'", 'symmetrical': 'False', 'to': "orm['gstudio.Attribute']"}),
+            'node_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Node']", 'unique': 'True', 'primary_key': 'True'}),
+            'relations': ('django.db.models.fields.related.ManyToManyField', [], {'related_name': "'relations_in_nodespec'", 'symmetrical': 'False', 'to': "orm['gstudio.Relation']"}),
+            'subject': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'subject_nodespec'", 'to': "orm['gstudio.Node']"})
+        },
+        'gstudio.nodetype': {
+            'Meta': {'ordering': "['-creation_date']", 'object_name': 'Nodetype', '_ormbases': ['gstudio.Node']},
+            'authors': ('django.db.models.fields.related.ManyToManyField', [], {'symmetrical': 'False', 'related_name': "'nodetypes'", 'blank': 'True', 'to': "orm['auth.User']"}),
+            'comment_enabled': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'content': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'creation_date': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'end_publication': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime(2042, 3, 15, 0, 0)'}),
+            'excerpt': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'featured': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'image': ('django.db.models.fields.files.ImageField', [], {'max_length': '100', 'blank': 'True'}),
+            'last_update': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'level': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'lft': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'login_required': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'metatypes': ('django.db.models.fields.related.ManyToManyField', [], {'blank': 'True', 'related_name': "'member_types'", 'null': 'True', 'symmetrical': 'False', 'to': "orm['gstudio.Metatype']"}),
+            'node_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Node']", 'unique': 'True', 'primary_key': 'True'}),
+            'parent': ('django.db.models.fields.related.ForeignKey', [], {'blank': 'True', 'related_name': "'children'", 'null': 'True', 'to': "orm['gstudio.Nodetype']"}),
+            'password': ('django.db.models.fields.CharField', [], {'max_length': '50', 'blank': 'True'}),
+            'pingback_enabled': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'posterior_nodes': ('django.db.models.fields.related.ManyToManyField', [], {'blank': 'True', 'related_name': "'posterior_nodes_rel_+'", 'null': 'True', 'to': "orm['gstudio.Nodetype']"}),
+            'prior_nodes': ('django.db.models.fields.related.ManyToManyField', [], {'blank': 'True', 'related_name': "'prior_nodes_rel_+'", 'null': 'True', 'to': "orm['gstudio.Nodetype']"}),
+            'rght': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'sites': ('django.db.models.fields.related.ManyToManyField', [], {'related_name': "'nodetypes'", 'symmetrical': 'False', 'to': "orm['sites.Site']"}),
+            'slug': ('django.db.models.fields.SlugField', [], {'max_length': '255', 'db_index': 'True'}),
+            'start_publication': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'status': ('django.db.models.fields.IntegerField', [], {'default': '2'}),
+            'tags': ('tagging.fields.TagField', [], {}),
+            'template': ('django.db.models.fields.CharField', [], {'default': "'gstudio/nodetype_detail.html'", 'max_length': '250'}),
+            'tree_id': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'})
+        },
+        'gstudio.objecttype': {
+            'Meta': {'ordering': "['-creation_date']", 'object_name': 'Objecttype', '_ormbases': ['gstudio.Nodetype']},
+            'lft': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'nodetype_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Nodetype']", 'unique': 'True', 'primary_key': 'True'})
+        },
+        'gstudio.processtype': {
+            'Meta': {'ordering': "['-creation_date']", 'object_name': 'Processtype', '_ormbases': ['gstudio.Nodetype']},
+            'changing_attributetype_set': ('django.db.models.fields.related.ManyToManyField', [], {'blank': 'True', 'related_name': "' changing_attributetype_set_of'", 'null': 'True', 'symmetrical': 'False', 'to': "orm['gstudio.Attributetype']"}),
+            'changing_relationtype_set': ('django.db.models.fields.related.ManyToManyField', [], {'blank': 'True', 'related_name': "'changing_relationtype_set_of'", 'null': 'True', 'symmetrical': 'False', 'to': "orm['gstudio.Relationtype']"}),
+            'lft': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'nodetype_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Nodetype']", 'unique': 'True', 'primary_key': 'True'})
+        },
+        'gstudio.relation': {
+            'Meta': {'unique_together': "(('left_subject_scope', 'left_subject', 'relationtype_scope', 'relationtype', 'right_subject_scope', 'right_subject'),)", 'object_name': 'Relation', '_ormbases': ['gstudio.Edge']},
+            'edge_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Edge']", 'unique': 'True', 'primary_key': 'True'}),
+            'left_subject': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'left_subject_of'", 'to': "orm['gstudio.NID']"}),
+            'left_subject_scope': ('django.db.models.fields.CharField', [], {'max_length': '50', 'null': 'True', 'blank': 'True'}),
+            'relationtype': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['gstudio.Relationtype']"}),
+            'relationtype_scope': ('django.db.models.fields.CharField', [], {'max_length': '50', 'null': 'True', 'blank': 'True'}),
+            'right_subject': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'right_subject_of'", 'to': "orm['gstudio.NID']"}),
+            'right_subject_scope': ('django.db.models.fields.CharField', [], {'max_length': '50', 'null': 'True', 'blank': 'True'})
+        },
+        'gstudio.relationspecification': {
+            'Meta': {'object_name': 'RelationSpecification', '_ormbases': ['gstudio.Node']},
+            'node_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Node']", 'unique': 'True', 'primary_key': 'True'}),
+            'relationtype': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['gstudio.Relationtype']"}),
+            'subjects': ('django.db.models.fields.related.ManyToManyField', [], {'related_name': "'subjects_in_relspec'", 'symmetrical': 'False', 'to': "orm['gstudio.NID']"})
+        },
+        'gstudio.relationtype': {
+            'Meta': {'ordering': "['-creation_date']", 'object_name': 'Relationtype', '_ormbases': ['gstudio.Nodetype']},
+            'inverse': ('django.db.models.fields.CharField', [], {'max_length': '255', 'db_index': 'True'}),
+            'is_reflexive': ('django.db.models.fields.NullBooleanField', [], {'null': 'True', 'blank': 'True'}),
+            'is_symmetrical': ('django.db.models.fields.NullBooleanField', [], {'null': 'True', 'blank': 'True'}),
+            'is_transitive': ('django.db.models.fields.NullBooleanField', [], {'null': 'True', 'blank': 'True'}),
+            'left_applicable_nodetypes': ('django.db.models.fields.CharField', [], {'default': "'OT'", 'max_length': '2'}),
+            'left_cardinality': ('django.db.models.fields.IntegerField', [], {'null': 'True', 'blank': 'True'}),
+            'left_subjecttype': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'left_subjecttype_of'", 'to': "orm['gstudio.NID']"}),
+            'lft': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'nodetype_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Nodetype']", 'unique': 'True', 'primary_key': 'True'}),
+            'right_applicable_nodetypes': ('django.db.models.fields.CharField', [], {'default': "'OT'", 'max_length': '2'}),
+            'right_cardinality': ('django.db.models.fields.IntegerField', [], {'null': 'True', 'blank': 'True'}),
+            'right_subjecttype': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'right_subjecttype_of'", 'to': "orm['gstudio.NID']"})
+        },
+        'gstudio.systemtype': {
+            'Meta': {'ordering': "['-creation_date']", 'object_name': 'Systemtype', '_ormbases': ['gstudio.Nodetype']},
+            'attributetype_set': ('django.db.models.fields.related.ManyToManyField', [], {'symmetrical': 'False', 'related_name': "'attributetype_set_of'", 'blank': 'True', 'to': "orm['gstudio.Attributetype']"}),
+            'lft': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'metatype_set': ('django.db.models.fields.related.ManyToManyField', [], {'symmetrical': 'False', 'related_name': "'metatype_set_of'", 'blank': 'True', 'to': "orm['gstudio.Metatype']"}),
+            'nodetype_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Nodetype']", 'unique': 'True', 'primary_key': 'True'}),
+            'nodetype_set': ('django.db.models.fields.related.ManyToManyField', [], {'symmetrical': 'False', 'related_name': "'nodetype_set_of'", 'blank': 'True', 'to': "orm['gstudio.Nodetype']"}),
+            'processtype_set': ('django.db.models.fields.related.ManyToManyField', [], {'symmetrical': 'False', 'related_name': "'processtype_set_of'", 'blank': 'True', 'to': "orm['gstudio.Processtype']"}),
+            'relationtype_set': ('django.db.models.fields.related.ManyToManyField', [], {'symmetrical': 'False', 'related_name': "'relationtype_set_of'", 'blank': 'True', 'to': "orm['gstudio.Relationtype']"})
+        },
+        'gstudio.union': {
+            'Meta': {'object_name': 'Union', '_ormbases': ['gstudio.Node']},
+            'node_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['gstudio.Node']", 'unique': 'True', 'primary_key': 'True'}),
+            'nodetypes': ('django.db.models.fields.related.ManyToManyField', [], {'related_name': "'union_of'", 'symmetrical': 'False', 'to': "orm['gstudio.Nodetype']"})
+        },
+        'sites.site': {
+            'Meta': {'ordering': "('domain',)", 'object_name': 'Site', 'db_table': "'django_site'"},
+            'domain': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '50'})
+        }
+    }
+
+    complete_apps = ['gstudio']
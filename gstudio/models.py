@@ -3,22 +3,22 @@ import warnings
 from datetime import datetime
 from django.db import models
 from django.db.models import Q
-from django.utils.html import strip_tags
-from django.utils.html import linebreaks
 from django.contrib.auth.models import User
 from django.contrib.sites.models import Site
+from django.db.models.signals import pre_save
 from django.db.models.signals import post_save
+from django.db.models.signals import post_delete
+from django.db.models.signals import m2m_changed
 from django.utils.importlib import import_module
 from django.contrib import comments
 from django.contrib.comments.models import CommentFlag
 from django.contrib.comments.moderation import moderator
 from django.utils.translation import ugettext_lazy as _
-from django.contrib.markup.templatetags.markup import markdown
-from django.contrib.markup.templatetags.markup import textile
-from django.contrib.markup.templatetags.markup import restructuredtext
 import mptt
 
 from djangoratings.fields import RatingField
+from tagging.models import Tag
+from tagging.models import TaggedItem
 from tagging.fields import TagField
 from gstudio.settings import UPLOAD_TO
 from gstudio.settings import MARKUP_LANGUAGE
@@ -26,14 +26,37 @@ from gstudio.settings import NODETYPE_TEMPLATES
 from gstudio.settings import NODETYPE_BASE_MODEL
 from gstudio.settings import MARKDOWN_EXTENSIONS
 from gstudio.settings import AUTO_CLOSE_COMMENTS_AFTER
+from gstudio.settings import ADJACENCY_INDEX
 from gstudio.managers import nodetypes_published
 from gstudio.managers import NodetypePublishedManager
 from gstudio.managers import AuthorPublishedManager
+from gstudio.managers import NIDManager
+from gstudio.managers import SimilarityManager
+from gstudio.managers import get_nodemodel
+from gstudio.rendering import render_content
+from gstudio.rendering import RENDERED_FIELDS
+from gstudio.rendering import get_rendering_key
+from gstudio.treepath import build_tree_path
+from gstudio.treepath import check_descendant_tree_paths
+from gstudio.treepath import update_descendant_tree_paths
 from gstudio.managers import DRAFT, HIDDEN, PUBLISHED
 from gstudio.moderator import NodetypeCommentModerator
 from gstudio.url_shortener import get_url_shortener
+from gstudio.signals import get_senders
+from gstudio.signals import connect_senders
+from gstudio.signals import is_indexed_sender
 from gstudio.signals import ping_directories_handler
 from gstudio.signals import ping_external_urls_handler
+from gstudio.signals import flush_inheritance_handler
+from gstudio.signals import store_old_parent_handler
+from gstudio.signals import flush_graph_cache_handler
+from gstudio.signals import update_adjacency_index_handler
+from gstudio.signals import update_search_index_handler
+from gstudio.signals import bump_content_version_handler
+from gstudio.signals import update_publications_handler
+from gstudio.signals import clear_current_site_handler
+from gstudio.signals import update_tag_usage_handler
+from gstudio.signals import update_archives_handler
 import json
 import reversion
 from reversion.models import Version
@@ -139,6 +162,10 @@ class NID(models.Model):
                             unique_for_date='creation_date',
                             max_length=255)
 
+    nodemodel = models.CharField(_('node model'), max_length=255,
+                                 db_index=True, editable=False, blank=True)
+
+    objects = NIDManager()
 
     def get_serialized_dict(self):
         """
@@ -161,19 +188,15 @@ class NID(models.Model):
         """ 
         Returns the object reference the id belongs to.
         """
+        model = get_nodemodel(self.nodemodel)
+        if model is None:
+            return None
+        if self.__class__ is model:
+            return self
         try:
-            """ 
-            ALGO:     get object id, go to version model, return for the given id.
-            """
-
-            # Retrieving only the relevant tupleset for the versioned objects
-            vrs = Version.objects.filter(type=0 , object_id=self.id)
-            # Returned value is a list, so splice it.                                                                                                     
-            vrs =  vrs[0]            
-        except:
+            return model._default_manager.get(pk=self.pk)
+        except model.DoesNotExist:
             return None
-        
-        return vrs.object
 
     @property
     def get_edit_url(self):
@@ -190,6 +213,13 @@ class NID(models.Model):
         version = Version.objects.get(id=self.id)
         return version.serialized_data
 
+    def save(self, *args, **kwargs):
+        """Remember the concrete model of the node"""
+        if not self.nodemodel:
+            self.nodemodel = '%s.%s' % (self._meta.app_label,
+                                        self._meta.module_name)
+        super(NID, self).save(*args, **kwargs)
+
     def __unicode__(self):
         return self.title
 
@@ -239,6 +269,8 @@ class Metatype(Node):
     
     description = models.TextField(_('description'), blank=True, null=True)
     parent = models.ForeignKey('self', null=True, blank=True, verbose_name=_('parent metatype'), related_name='children')
+    tree_path = models.CharField(_('tree path'), max_length=255,
+                                 db_index=True, editable=False, blank=True)
 
 
     def nodetypes_published(self):
@@ -271,87 +303,32 @@ class Metatype(Node):
     @property
     def get_possible_attributetypes(self):
         """
-        Gets the relations possible for this metatype
-        1. Recursively create a set of all the ancestors i.e. parent/subtypes of the MT. 
-        2. Get all the AT's linked to each ancestor 
+        Gets the attribute types possible for this metatype from its
+        ancestors, as resolved with the mptt columns.
         """
-        #Step 1. 
-        ancestor_list = []
-        this_parent = self.parent
-        
-        # recursive thru parent field and append
-        while this_parent:
-            ancestor_list.append(this_parent)
-            this_parent = this_parent.parent
-            
-        #Step 2.
-        attrtypes = [] 
-                
-        for each in ancestor_list:
-            # retrieve all the AT's from each ancestor 
-            attrtypes.extend(Attributetype.objects.filter(subjecttype=each.id))
-                     
-        return attrtypes
+        from gstudio.inheritance import get_possible_attributetypes
+        return get_possible_attributetypes(self)
 
 
     @property
     def get_possible_rels(self):
         """
-        Gets the relations possible for this metatype
-        1. Recursively create a set of all the ancestors i.e. parent/subtypes of the MT. 
-        2. Get all the R's linked to each ancestor 
+        Gets the relations possible for this metatype from its
+        ancestors, as resolved with the mptt columns.
         """
-        #Step 1. 
-        ancestor_list = []
-        this_parent = self.parent
-        
-        # append
-        while this_parent:
-            ancestor_list.append(this_parent)
-            this_parent = this_parent.parent
-            
-        #Step 2.
-        rels = {}
-        rt_set = Relation.objects.all()
-        right_subset = []
-        left_subset = []
-        
-        for each in ancestor_list:
-            # retrieve all the RT's from each ancestor 
-            right_subset.extend(rt_set.filter(subject1=each.id))
-            left_subset.extend(rt_set.filter(subject2=each.id))
-         
-        rels['possible_leftroles'] = left_subset
-        rels['possible_rightroles'] = right_subset
-        
-        return rels
+        from gstudio.inheritance import get_possible_rels
+        return get_possible_rels(self)
 
 
 
     @property
     def get_possible_attributes(self):
         """
-        Gets the relations possible for this metatype
-        1. Recursively create a set of all the ancestors i.e. parent/subtypes of the MT. 
-        2. Get all the RT's linked to each ancestor 
+        Gets the attributes possible for this metatype from its
+        ancestors, as resolved with the mptt columns.
         """
-        #Step 1. 
-        ancestor_list = []
-        this_parent = self.parent
-        
-        # recursive thru parent field and append
-        while this_parent:
-            ancestor_list.append(this_parent)
-            this_parent = this_parent.parent
-            
-        #Step 2.
-        attrs = [] 
-                
-        for each in ancestor_list:
-            # retrieve all the AT's from each ancestor 
-            attrs.extend(Attribute.objects.filter(subject=each.id))
-                     
-        return attrs
+        from gstudio.inheritance import get_possible_attributes
+        return get_possible_attributes(self)
 
     @property
     def get_rendered_nbh(self):
@@ -376,13 +353,21 @@ class Metatype(Node):
 
         return nbh
 
-                  
-    @property
-    def tree_path(self):
-        """Return metatype's tree path, by its ancestors"""
-        if self.parent:
-            return '%s/%s' % (self.parent.tree_path, self.slug)
-        return self.slug
+
+    def clean(self):
+        """Check that the tree paths of the metatype
+        and of its descendants can be stored"""
+        check_descendant_tree_paths(Metatype, self, self.pk and self.tree_path,
+                                    build_tree_path(self))
+
+    def save(self, *args, **kwargs):
+        """Store metatype's tree path and propagate it to its descendants"""
+        old_path = self.pk and self.tree_path
+        tree_path = build_tree_path(self)
+        check_descendant_tree_paths(Metatype, self, old_path, tree_path)
+        self.tree_path = tree_path
+        super(Metatype, self).save(*args, **kwargs)
+        update_descendant_tree_paths(Metatype, self, old_path)
 
     def __unicode__(self):
         return self.title
@@ -426,6 +411,8 @@ class Nodetype(Node):
     parent = models.ForeignKey('self', null=True, blank=True,
                                verbose_name=_('is a kind of'),
                                related_name='children')
+    tree_path = models.CharField(_('tree path'), max_length=255,
+                                 db_index=True, editable=False, blank=True)
 
     prior_nodes = models.ManyToManyField('self', null=True, blank=True,
                                verbose_name=_('its meaning depends on '),
@@ -436,6 +423,16 @@ class Nodetype(Node):
 
     image = models.ImageField(_('image'), upload_to=UPLOAD_TO,
                               blank=True, help_text=_('used for illustration'))
+    content_image = models.CharField(_('content image'), max_length=255,
+                                     blank=True, editable=False)
+    rendered_key = models.CharField(_('rendered key'), max_length=32,
+                                    blank=True, editable=False)
+    rendered_content = models.TextField(_('rendered content'), blank=True,
+                                        editable=False)
+    rendered_word_count = models.PositiveIntegerField(
+        _('rendered word count'), default=0, editable=False)
+    rendered_links = models.TextField(_('rendered links'), blank=True,
+                                      editable=False)
 
     excerpt = models.TextField(_('excerpt'), blank=True,
                                 help_text=_('optional element'))
@@ -489,176 +486,81 @@ class Nodetype(Node):
 
     def get_possible_reltypes(self):
         """
-        Gets the relations possible for this metatype
-        1. Recursively create a set of all the ancestors i.e. parent/subtypes of the MT. 
-        2. Get all the RT's linked to each ancestor 
+        Gets the relation types possible for this nodetype from its
+        ancestors, as resolved with the mptt columns.
         """
-        #Step 1. 
-        ancestor_list = []
-        this_parent = self.parent
-        
-        # append
-        while this_parent:
-            ancestor_list.append(this_parent)
-            this_parent = this_parent.parent
-            
-        #Step 2.
-        reltypes = {}
-        rt_set = Relationtype.objects.all()
-        right_subset = []
-        left_subset = []
-        
-        for each in ancestor_list:
-            # retrieve all the RT's from each ancestor 
-            right_subset.extend(rt_set.filter(subjecttypeLeft=each.id))
-            left_subset.extend(rt_set.filter(subjecttypeRight=each.id))
-         
-        reltypes['possible_leftroles'] = left_subset
-        reltypes['possible_rightroles'] = right_subset
-        
-        return reltypes
+        from gstudio.inheritance import get_possible_reltypes
+        return get_possible_reltypes(self)
 
 
     @property
     def get_possible_attributetypes(self):
         """
-        Gets the relations possible for this metatype
-        1. Recursively create a set of all the ancestors i.e. parent/subtypes of the MT. 
-        2. Get all the AT's linked to each ancestor 
+        Gets the attribute types possible for this nodetype from its
+        ancestors, as resolved with the mptt columns.
         """
-        #Step 1. 
-        ancestor_list = []
-        this_parent = self.parent
-        
-        # recursive thru parent field and append
-        while this_parent:
-            ancestor_list.append(this_parent)
-            this_parent = this_parent.parent
-            
-        #Step 2.
-        attrtypes = [] 
-                
-        for each in ancestor_list:
-            # retrieve all the AT's from each ancestor 
-            attrtypes.extend(Attributetype.objects.filter(subjecttype=each.id))
-                     
-        return attrtypes
+        from gstudio.inheritance import get_possible_attributetypes
+        return get_possible_attributetypes(self)
 
 
     @property
     def get_possible_rels(self):
         """
-        Gets the relations possible for this metatype
-        1. Recursively create a set of all the ancestors i.e. parent/subtypes of the MT. 
-        2. Get all the R's linked to each ancestor 
+        Gets the relations possible for this nodetype from its
+        ancestors, as resolved with the mptt columns.
         """
-        #Step 1. 
-        ancestor_list = []
-        this_parent = self.parent
-        
-        # append
-        while this_parent:
-            ancestor_list.append(this_parent)
-            this_parent = this_parent.parent
-            
-        #Step 2.
-        rels = {}
-        rt_set = Relation.objects.all()
-        right_subset = []
-        left_subset = []
-        
-        for each in ancestor_list:
-            # retrieve all the RT's from each ancestor 
-            right_subset.extend(rt_set.filter(subject1=each.id))
-            left_subset.extend(rt_set.filter(subject2=each.id))
-         
-        rels['possible_leftroles'] = left_subset
-        rels['possible_rightroles'] = right_subset
-        
-        return rels
+        from gstudio.inheritance import get_possible_rels
+        return get_possible_rels(self)
 
 
 
     @property
     def get_possible_attributes(self):
         """
-        Gets the relations possible for this metatype
-        1. Recursively create a set of all the ancestors i.e. parent/subtypes of the MT. 
-        2. Get all the RT's linked to each ancestor 
+        Gets the attributes possible for this nodetype from its
+        ancestors, as resolved with the mptt columns.
         """
-        #Step 1. 
-        ancestor_list = []
-        this_parent = self.parent
-        
-        # recursive thru parent field and append
-        while this_parent:
-            ancestor_list.append(this_parent)
-            this_parent = this_parent.parent
-            
-        #Step 2.
-        attrs = [] 
-                
-        for each in ancestor_list:
-            # retrieve all the AT's from each ancestor 
-            attrs.extend(Attribute.objects.filter(subject=each.id))
-                     
-        return attrs
+        from gstudio.inheritance import get_possible_attributes
+        return get_possible_attributes(self)
 
 
     def get_graph_json(self):
-        
-        
-        # predicate_id={"plural":"a1","altnames":"a2","contains_members":"a3","contains_subtypes":"a4","prior_nodes":""}
-	g_json = {}
-	g_json["node_metadata"]= [] 
-
-	
-	nbh = self.get_nbh
-	predicate_id = {}
-        counter = 1
-        for key in nbh.keys():
-            val = "a" + str(counter)
-            predicate_id[key] = val
-            counter = counter + 1
-
-
-        
-	
-        this_node = {"_id":str(self.id),"title":self.title,"screen_name":self.title, "url":self.get_absolute_url()}
-	for key in predicate_id.keys():
-		if nbh[key]:
-			try:
-				g_json[str(key)]=[]      
-				g_json["node_metadata"].append({"_id":str(predicate_id[key]),"screen_name":key})
-				g_json[str(key)].append({"from":self.id , "to":predicate_id[key],"value":1  })
-				if not isinstance(nbh[key],basestring):
-					for item in nbh[key]:
-				
-						g_json["node_metadata"].append({"_id":str(item.id),"screen_name":item.title, "title":item.title, "url":item.get_absolute_url()})
-						g_json[str(key)].append({"from":predicate_id[key] , "to":item.id ,"value":1  })
-			
-				else:
-					value={nbh["plural"]:"a4",nbh["altnames"]:"a5"}			
-		            		this_node[str(key)]=nbh[key]
-				
-					for item in value.keys():
-						g_json["node_metadata"].append({"_id":str(value[nbh[key]]),"screen_name":nbh[key]})
-						g_json[str(key)].append({"from":predicate_id[key] , "to":value[nbh[key]] ,"value":1  })
-				
-			
-			except:
-		                    pass
-	g_json["node_metadata"].append(this_node)      
-        print g_json
-        return json.dumps(g_json)   
-
-
-    @property
-    def tree_path(self):
-        """Return nodetype's tree path, by its ancestors"""
-        if self.parent:
-            return '%s/%s' % (self.parent.tree_path, self.slug)
-        return self.slug
+        """
+        Returns the neighbourhood of the nodetype as a graph in JSON
+        """
+        from gstudio.graphs import get_graph_neighbourhood
+        from gstudio.graphs import iter_graph_json
+        return ''.join(iter_graph_json(self, get_graph_neighbourhood(self)))
+
+
+    rendered_fields = RENDERED_FIELDS + ('content_image',)
+
+    def render_content(self):
+        """Render the content with its words, links and first image,
+        unless the stored rendering is current"""
+        if self.rendered_key != get_rendering_key(
+            self.content, MARKUP_LANGUAGE, MARKDOWN_EXTENSIONS):
+            rendering = render_content(self.content, MARKUP_LANGUAGE,
+                                       MARKDOWN_EXTENSIONS)
+            for field in self.rendered_fields:
+                setattr(self, field, rendering[field])
+
+    def clean(self):
+        """Check that the tree paths of the nodetype
+        and of its descendants can be stored"""
+        check_descendant_tree_paths(Nodetype, self, self.pk and self.tree_path,
+                                    build_tree_path(self))
+
+    def save(self, *args, **kwargs):
+        """Store nodetype's tree path and propagate it to its descendants,
+        and store the rendering of its content"""
+        old_path = self.pk and self.tree_path
+        tree_path = build_tree_path(self)
+        check_descendant_tree_paths(Nodetype, self, old_path, tree_path)
+        self.tree_path = tree_path
+        self.render_content()
+        super(Nodetype, self).save(*args, **kwargs)
+        update_descendant_tree_paths(Nodetype, self, old_path)
 
     @property
     def tree_path_sentence(self):
@@ -671,20 +573,24 @@ class Nodetype(Node):
     @property
     def html_content(self):
         """Return the content correctly formatted"""
-        if MARKUP_LANGUAGE == 'markdown':
-            return markdown(self.content, MARKDOWN_EXTENSIONS)
-        elif MARKUP_LANGUAGE == 'textile':
-            return textile(self.content)
-        elif MARKUP_LANGUAGE == 'restructuredtext':
-            return restructuredtext(self.content)
-        elif not '</p>' in self.content:
-            return linebreaks(self.content)
-        return self.content
+        self.render_content()
+        return self.rendered_content
+
+    @property
+    def links(self):
+        """Return the urls linked by the content"""
+        self.render_content()
+        return [url for url in self.rendered_links.split('\n') if url]
+
     @property
     def get_relations(self):
         """
         Returns all the relations of the nodetype
         """
+        if ADJACENCY_INDEX:
+            from gstudio.adjacency import get_adjacency_index
+            return get_adjacency_index().get_relations(self.pk)
+
         relations={}
         
         left_relations=Relation.objects.filter(left_subject=self.id)
@@ -702,81 +608,48 @@ class Nodetype(Node):
                 relations[relation]=predicate
         return relations
 
+    @property
+    def neighbourhood(self):
+        """
+        Returns the neighbourhood of the nodetype, loaded once
+        in a fixed number of queries
+        """
+        if getattr(self, '_neighbourhood', None) is None:
+            from gstudio.neighbourhood import load_neighbourhoods
+            self._neighbourhood = load_neighbourhoods([self])[self.pk]
+        return self._neighbourhood
+
     @property
     def get_rendered_nbh(self):
         """          
         Returns the neighbourhood of the nodetype
         """
+        if getattr(self, '_rendered_nbh', None) is not None:
+            return self._rendered_nbh
+
+        neighbourhood = self.neighbourhood
+        links = lambda key: dict([(each.title, each.url)
+                                  for each in neighbourhood[key]])
         nbh = {}
         nbh['title'] = self.title
         nbh['altnames'] = self.altnames
         nbh['plural'] = self.plural        
-        #get all MTs 
-        member_of_dict = {}
-        for each in self.metatypes.all():
-            member_of_dict[each.title]= each.get_absolute_url()
-        nbh['member_of_metatypes']=member_of_dict
-        typeof={}
-        parent=self.parent
-        if parent:
-            typeof[parent] = parent.get_absolute_url()
-        nbh['type_of']=typeof
-        #get all subtypes 
-        subtypes={}
-        for each in Nodetype.objects.filter(parent=self.id):
-            subtypes[each.title] =each.get_absolute_url()
-        nbh['contains_subtypes']=subtypes   
-        # get all the objects inheriting this OT 
-        contains_members_dict = {}
-        for each in self.member_objects.all():
-           contains_members_dict[each.title]= each.get_absolute_url()
-        nbh['contains_members'] = contains_members_dict
-        #get prior nodes
-        priornodes_dict = {}
-        for each in self.prior_nodes.all():
-             priornodes_dict[each.title]= each.get_absolute_url()
-        nbh['priornodes'] = priornodes_dict
-        #get posterior nodes
-        posteriornodes_dict = {}
-        for each in self.posterior_nodes.all():
-             posteriornodes_dict[each.title]= each.get_absolute_url()
-        nbh['posteriornodes'] = posteriornodes_dict
-        #get authors
-        author_dict = {}
-        for each in self.authors.all():
-             author_dict['User'] = each.get_absolute_url()
-        nbh['authors'] = author_dict
-        #get siblings
-        siblings={}
-        for each in self.get_siblings():
-            siblings[each.title]=each.get_absolute_url()
-        nbh['siblings']=siblings
-        #get Relations
-        relns={}
-        relnvalue={}
-        if self.get_relations:
-            NTrelns=self.get_relations
-            for value in NTrelns:
-                relnvalue[NTrelns[value].title]=NTrelns[value].ref.get_absolute_url()
-                relns[value]=relnvalue
-        nbh['relations']=relns
-        #get Attributes
-        attributes = self.subject_of.all()
-        nbh['attributes']=attributes
-        #get ATs
-        attributetypes={}
-        for each in self.subjecttype_of.all():
-            attributetypes[each.title]=each.get_absolute_url()
-        nbh['ats']=attributetypes
-        #get RTs as leftroles and rightroles
-        leftroles = {} 
-        for each in self.left_subjecttype_of.all():
-            leftroles[each.title]=each.get_absolute_url()
-        nbh['leftroles']=leftroles
-        rightroles = {} 
-        for each in self.right_subjecttype_of.all():
-            rightroles[each.title]=each.get_absolute_url()
-        nbh['rightroles']=rightroles
+        nbh['member_of_metatypes'] = links('member_of_metatypes')
+        nbh['type_of'] = links('type_of')
+        nbh['contains_subtypes'] = links('contains_subtypes')
+        nbh['contains_members'] = links('contains_members')
+        nbh['priornodes'] = links('prior_nodes')
+        nbh['posteriornodes'] = links('posterior_nodes')
+        nbh['authors'] = links('authors')
+        nbh['siblings'] = links('siblings')
+        nbh['relations'] = dict([
+            (name, dict([(each.title, each.url) for each in subjects]))
+            for name, subjects in neighbourhood['relations'].items()])
+        nbh['attributes'] = dict(neighbourhood['attributes'])
+        nbh['ats'] = links('attributetypes')
+        nbh['leftroles'] = links('left_subjecttype_of')
+        nbh['rightroles'] = links('right_subjecttype_of')
+        self._rendered_nbh = nbh
         return nbh
        
  
@@ -799,7 +672,8 @@ class Nodetype(Node):
     @property
     def word_count(self):
         """Count the words of a nodetype"""
-        return len(strip_tags(self.html_content).split())
+        self.render_content()
+        return self.rendered_word_count
 
     @property
     def is_actual(self):
@@ -992,29 +866,31 @@ class Objecttype(Nodetype):
         """          
         Returns the neighbourhood of the nodetype
         """
+        neighbourhood = self.neighbourhood
         nbh = {}
         nbh['title'] = self.title
         nbh['altnames'] = self.altnames
         nbh['plural'] = self.plural        
-        nbh['member_of_metatype'] = self.metatypes.all()
+        nbh['member_of_metatype'] = neighbourhood['member_of_metatypes']
         # get all the ATs for the objecttype
-        nbh['subjecttype_of']= self.subjecttype_of.all() 
+        nbh['subjecttype_of'] = neighbourhood['attributetypes']
         # get all the RTs for the objecttype        
-        nbh.update(self.get_relationtypes) 
+        nbh['left_subjecttype_of'] = neighbourhood['left_subjecttype_of']
+        nbh['right_subjecttype_of'] = neighbourhood['right_subjecttype_of']
 
-        nbh['type_of'] = [self.parent]
+        nbh['type_of'] = neighbourhood['type_of']
 
-        nbh['contains_subtypes'] = Nodetype.objects.filter(parent=self.id)
+        nbh['contains_subtypes'] = neighbourhood['contains_subtypes']
         # get all the objects inheriting this OT 
-        nbh['contains_members'] = self.member_objects.all()
+        nbh['contains_members'] = neighbourhood['contains_members']
 
-        nbh['prior_nodes'] = self.prior_nodes.all()             
+        nbh['prior_nodes'] = neighbourhood['prior_nodes']
 
-        nbh['posterior_nodes'] = self.posterior_nodes.all() 
+        nbh['posterior_nodes'] = neighbourhood['posterior_nodes']
 
-	nbh['authors'] = self.authors.all()
+        nbh['authors'] = neighbourhood['authors']
 
-	return nbh
+        return nbh
 
     # def save(self):
     #     nbhood=self.get_nbh
@@ -1667,10 +1543,227 @@ class Intersection(Node):
     Intersection of classes
     """
     nodetypes = models.ManyToManyField(Nodetype, related_name = 'intersection_of', verbose_name='intersection of classes')
-        
+
     def __unicode__(self):
         return self.title
-    
+
+
+class SearchDocument(models.Model):
+    """
+    Node indexed by the search index, with its length in terms
+    """
+    node = models.OneToOneField(NID, primary_key=True,
+                                related_name='search_document',
+                                verbose_name=_('node'))
+    length = models.PositiveIntegerField(_('length'), default=0)
+
+    def __unicode__(self):
+        return u'%s' % self.node_id
+
+    class Meta:
+        """SearchDocument's Meta"""
+        verbose_name = _('search document')
+        verbose_name_plural = _('search documents')
+
+
+class SearchPosting(models.Model):
+    """
+    Occurrences of a term in a document of the search index
+    """
+    term = models.CharField(_('term'), max_length=100, db_index=True)
+    document = models.ForeignKey(SearchDocument, related_name='postings',
+                                 verbose_name=_('document'))
+    frequency = models.PositiveIntegerField(_('frequency'), default=1)
+
+    def __unicode__(self):
+        return u'%s: %s' % (self.term, self.document_id)
+
+    class Meta:
+        """SearchPosting's Meta"""
+        unique_together = (('term', 'document'),)
+        verbose_name = _('search posting')
+        verbose_name_plural = _('search postings')
+
+
+class SearchQueue(models.Model):
+    """
+    Node waiting to be indexed or unindexed by the search index
+    """
+    node_id = models.PositiveIntegerField(_('node id'), db_index=True)
+    creation_date = models.DateTimeField(_('creation date'),
+                                         default=datetime.now)
+
+    def __unicode__(self):
+        return u'%s' % self.node_id
+
+    class Meta:
+        """SearchQueue's Meta"""
+        ordering = ('pk',)
+        verbose_name = _('search queue entry')
+        verbose_name_plural = _('search queue entries')
+
+
+class SimilarityDocument(models.Model):
+    """
+    Node compared by the similarity engine, with the digest
+    of its words to detect when it changes
+    """
+    node = models.OneToOneField(NID, primary_key=True,
+                                related_name='similarity_document',
+                                verbose_name=_('node'))
+    digest = models.CharField(_('digest'), max_length=32)
+
+    def __unicode__(self):
+        return u'%s' % self.node_id
+
+    class Meta:
+        """SimilarityDocument's Meta"""
+        verbose_name = _('similarity document')
+        verbose_name_plural = _('similarity documents')
+
+
+class Similarity(models.Model):
+    """
+    Node similar to another node, ranked by the similarity engine
+    """
+    node = models.ForeignKey(NID, related_name='similarities',
+                             verbose_name=_('node'))
+    similar = models.ForeignKey(NID, related_name='+',
+                                verbose_name=_('similar node'))
+    nodemodel = models.CharField(_('node model'), max_length=255,
+                                 db_index=True)
+    score = models.FloatField(_('score'))
+    rank = models.PositiveIntegerField(_('rank'))
+
+    def __unicode__(self):
+        return u'%s: %s' % (self.node_id, self.similar_id)
+
+    objects = SimilarityManager()
+
+    class Meta:
+        """Similarity's Meta"""
+        ordering = ('node', 'nodemodel', 'rank')
+        unique_together = (('node', 'similar'),)
+        verbose_name = _('similarity')
+        verbose_name_plural = _('similarities')
+
+
+class Publication(models.Model):
+    """
+    Site where a nodetype is published, with its publication window,
+    denormalized to find the published nodetypes with a range scan
+    """
+    site = models.ForeignKey(Site, verbose_name=_('site'))
+    nodetype = models.ForeignKey(Nodetype, related_name='publications',
+                                 verbose_name=_('nodetype'))
+    start_publication = models.DateTimeField(_('start publication'))
+    end_publication = models.DateTimeField(_('end publication'))
+    creation_date = models.DateTimeField(_('creation date'), db_index=True)
+
+    def __unicode__(self):
+        return u'%s: %s' % (self.site_id, self.nodetype_id)
+
+    class Meta:
+        """Publication's Meta"""
+        ordering = ('site', 'start_publication')
+        unique_together = (('site', 'nodetype'),)
+        verbose_name = _('publication')
+        verbose_name_plural = _('publications')
+
+
+class TagUsage(models.Model):
+    """
+    Number of published nodetypes of a tag on a site,
+    with the date when this number changes next
+    """
+    tag = models.ForeignKey(Tag, related_name='usages',
+                            verbose_name=_('tag'))
+    site = models.ForeignKey(Site, verbose_name=_('site'))
+    count = models.PositiveIntegerField(_('count'), default=0)
+    last_used = models.DateTimeField(_('last used'), null=True)
+    expiration = models.DateTimeField(_('expiration'), null=True,
+                                      db_index=True)
+
+    def __unicode__(self):
+        return u'%s: %s' % (self.tag_id, self.count)
+
+    class Meta:
+        """TagUsage's Meta"""
+        unique_together = (('site', 'tag'),)
+        verbose_name = _('tag usage')
+        verbose_name_plural = _('tag usages')
+
+
+class ArchiveDay(models.Model):
+    """
+    Number of published nodetypes of a site created on a day,
+    with the date when this number changes next
+    """
+    site = models.ForeignKey(Site, verbose_name=_('site'))
+    day = models.DateField(_('day'))
+    count = models.PositiveIntegerField(_('count'), default=0)
+    expiration = models.DateTimeField(_('expiration'), null=True,
+                                      db_index=True)
+
+    def __unicode__(self):
+        return u'%s: %s' % (self.day, self.count)
+
+    class Meta:
+        """ArchiveDay's Meta"""
+        ordering = ('site', 'day')
+        unique_together = (('site', 'day'),)
+        verbose_name = _('archive day')
+        verbose_name_plural = _('archive days')
+
+
+class QueuedPing(models.Model):
+    """
+    Ping of a nodetype waiting to be sent to a directory,
+    or to the external urls of the nodetype if no directory
+    """
+    nodetype = models.ForeignKey(Nodetype, related_name='queued_pings',
+                                 verbose_name=_('nodetype'))
+    directory = models.CharField(_('directory'), max_length=255, blank=True)
+    request_date = models.DateTimeField(_('request date'),
+                                        default=datetime.now)
+    next_attempt = models.DateTimeField(_('next attempt'), db_index=True)
+    attempts = models.PositiveIntegerField(_('attempts'), default=0)
+    last_error = models.TextField(_('last error'), blank=True)
+
+    def __unicode__(self):
+        return u'%s: %s' % (self.nodetype_id,
+                            self.directory or 'external urls')
+
+    class Meta:
+        """QueuedPing's Meta"""
+        ordering = ('next_attempt',)
+        unique_together = (('nodetype', 'directory'),)
+        verbose_name = _('queued ping')
+        verbose_name_plural = _('queued pings')
+
+
+class PingbackDiscovery(models.Model):
+    """
+    Outcome of the discovery of the pingback server of an
+    external url, kept until its expiration
+    """
+    url = models.TextField(_('url'))
+    url_hash = models.CharField(_('url hash'), max_length=32, unique=True)
+    server = models.CharField(_('server'), max_length=255, blank=True)
+    error = models.CharField(_('error'), max_length=255, blank=True)
+    discovery_date = models.DateTimeField(_('discovery date'),
+                                          default=datetime.now)
+    expiration = models.DateTimeField(_('expiration'), db_index=True)
+
+    def __unicode__(self):
+        return u'%s: %s' % (self.url, self.server or self.error)
+
+    class Meta:
+        """PingbackDiscovery's Meta"""
+        ordering = ('-discovery_date',)
+        verbose_name = _('pingback discovery')
+        verbose_name_plural = _('pingback discoveries')
+
 
 reversion.register(NID)
 # reversion.register(Node)
@@ -1725,6 +1818,79 @@ post_save.connect(ping_directories_handler, sender=Nodetype,
                   dispatch_uid='gstudio.nodetype.post_save.ping_directories')
 post_save.connect(ping_external_urls_handler, sender=Nodetype,
                   dispatch_uid='gstudio.nodetype.post_save.ping_external_urls')
-
-
-
+for sender in get_senders(Metatype) + get_senders(Nodetype) + \
+        get_senders(Edge):
+    post_save.connect(flush_inheritance_handler, sender=sender,
+                      dispatch_uid='gstudio.post_save.flush_inheritance')
+# The parents of a deleted node are deleted with it,
+# so the root models are enough to see every deletion.
+for sender in (Metatype, Nodetype, Edge):
+    post_delete.connect(flush_inheritance_handler, sender=sender,
+                        dispatch_uid='gstudio.post_delete.flush_inheritance')
+connect_senders(post_save, flush_graph_cache_handler, NID,
+                'gstudio.post_save.flush_graph_cache')
+connect_senders(post_delete, flush_graph_cache_handler, NID,
+                'gstudio.post_delete.flush_graph_cache')
+for sender in get_senders(Metatype) + get_senders(Nodetype):
+    pre_save.connect(store_old_parent_handler, sender=sender,
+                     dispatch_uid='gstudio.pre_save.store_old_parent')
+for field_name in ('metatypes', 'prior_nodes', 'posterior_nodes', 'authors'):
+    m2m_changed.connect(
+        flush_graph_cache_handler,
+        sender=Nodetype._meta.get_field(field_name).rel.through,
+        dispatch_uid='gstudio.nodetype.%s.flush_graph_cache' % field_name)
+# The relations, the attributes and their types are nodes, and the
+# index keeps the titles of the nodes they link, so the nodes are
+# the senders of the changes of the adjacency index.
+connect_senders(post_save, update_adjacency_index_handler, NID,
+                'gstudio.post_save.update_adjacency_index')
+connect_senders(post_delete, update_adjacency_index_handler, NID,
+                'gstudio.post_delete.update_adjacency_index')
+for signal, dispatch_uid in (
+    (post_save, 'gstudio.post_save.update_search_index'),
+    (post_delete, 'gstudio.post_delete.update_search_index')):
+    connect_senders(signal, update_search_index_handler, NID,
+                    dispatch_uid, is_indexed_sender)
+    for model in (Relation, Attribute):
+        connect_senders(signal, update_search_index_handler, model,
+                        dispatch_uid)
+m2m_changed.connect(update_search_index_handler,
+                    sender=Nodetype.metatypes.through,
+                    dispatch_uid='gstudio.nodetype.metatypes.update_search_index')
+m2m_changed.connect(update_search_index_handler,
+                    sender=Nodetype.authors.through,
+                    dispatch_uid='gstudio.nodetype.authors.update_search_index')
+for signal, dispatch_uid in (
+    (post_save, 'gstudio.post_save.bump_content_version'),
+    (post_delete, 'gstudio.post_delete.bump_content_version')):
+    connect_senders(signal, bump_content_version_handler, Nodetype,
+                    dispatch_uid)
+    for sender in (comments.get_model(), CommentFlag):
+        signal.connect(bump_content_version_handler, sender=sender,
+                       dispatch_uid=dispatch_uid)
+m2m_changed.connect(bump_content_version_handler,
+                    sender=Nodetype.sites.through,
+                    dispatch_uid='gstudio.nodetype.sites.bump_content_version')
+m2m_changed.connect(bump_content_version_handler,
+                    sender=Nodetype.authors.through,
+                    dispatch_uid='gstudio.nodetype.authors.bump_content_version')
+m2m_changed.connect(bump_content_version_handler,
+                    sender=Nodetype.metatypes.through,
+                    dispatch_uid='gstudio.nodetype.metatypes.bump_content_version')
+connect_senders(post_save, update_publications_handler, Nodetype,
+                'gstudio.post_save.update_publications')
+m2m_changed.connect(update_publications_handler,
+                    sender=Nodetype.sites.through,
+                    dispatch_uid='gstudio.nodetype.sites.update_publications')
+post_save.connect(clear_current_site_handler, sender=Site,
+                  dispatch_uid='gstudio.site.post_save.clear_current_site')
+post_delete.connect(clear_current_site_handler, sender=Site,
+                    dispatch_uid='gstudio.site.post_delete.clear_current_site')
+post_save.connect(update_tag_usage_handler, sender=TaggedItem,
+                  dispatch_uid='gstudio.taggeditem.post_save.update_tag_usage')
+post_delete.connect(update_tag_usage_handler, sender=TaggedItem,
+                    dispatch_uid='gstudio.taggeditem.post_delete.update_tag_usage')
+post_delete.connect(update_tag_usage_handler, sender=Nodetype,
+                    dispatch_uid='gstudio.nodetype.post_delete.update_tag_usage')
+post_delete.connect(update_archives_handler, sender=Nodetype,
+                    dispatch_uid='gstudio.nodetype.post_delete.update_archives')
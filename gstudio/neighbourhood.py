@@ -0,0 +1,228 @@
+"""Neighbourhood loader for Gstudio nodetypes
+
+Collect the neighbourhood of one or many nodetypes with a fixed
+number of queries, whatever the number of nodetypes or neighbours."""
+from django.db.models import Q
+
+from gstudio.models import NID
+from gstudio.models import Author
+from gstudio.models import Metatype
+from gstudio.models import Nodetype
+from gstudio.models import Relation
+from gstudio.models import Attribute
+from gstudio.models import Relationtype
+from gstudio.models import Attributetype
+from gstudio.settings import NEIGHBOURHOOD_ROOT_SIBLINGS
+
+NODE_FIELDS = ('id', 'title', 'slug', 'creation_date')
+
+
+class Neighbour(object):
+    """Compact reference to a node of a neighbourhood"""
+    __slots__ = ('id', 'title', 'url')
+
+    def __init__(self, id, title, url):
+        self.id = id
+        self.title = title
+        self.url = url
+
+    def get_absolute_url(self):
+        """Return neighbour's URL"""
+        return self.url
+
+    def __unicode__(self):
+        return self.title
+
+
+def m2m_pairs(field, ids, reverse=False):
+    """Return the (source id, target id) pairs of a many to many field
+    from its intermediary table, for the given source ids"""
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
+    if reverse:
+        source, target = target, source
+    return field.rel.through._default_manager.filter(
+        **{'%s__in' % source: ids}).values_list(source, target)
+
+
+def neighbour(model, values):
+    """Build a Neighbour from a values() projection of a model,
+    reversing its URL without any query"""
+    return Neighbour(values['id'], values['title'],
+                     model(**values).get_absolute_url())
+
+
+def neighbours(model, ids):
+    """Return a dict of Neighbours of a model by id"""
+    if not ids:
+        return {}
+    return dict((values['id'], neighbour(model, values))
+                for values in model._default_manager.filter(
+                    pk__in=list(ids)).values(*NODE_FIELDS))
+
+
+def grouped_neighbours(model, field, ids):
+    """Return the Neighbours of a model grouped
+    by the foreign key field pointing to the given ids"""
+    grouped = {}
+    for values in model._default_manager.filter(
+        **{'%s__in' % field: ids}).values(field, *NODE_FIELDS):
+        key = values.pop(field)
+        grouped.setdefault(key, []).append(neighbour(model, values))
+    return grouped
+
+
+def group(pairs, key_index=0):
+    """Group a list of pairs in a dict of lists"""
+    grouped = {}
+    for pair in pairs:
+        grouped.setdefault(pair[key_index], []).append(pair[1 - key_index])
+    return grouped
+
+
+def load_neighbourhoods(nodetypes):
+    """Return the neighbourhoods of a list of nodetypes
+    in a dict indexed by nodetype id"""
+    nodetypes = list(nodetypes)
+    ids = [nodetype.pk for nodetype in nodetypes]
+    if not ids:
+        return {}
+    id_set = set(ids)
+
+    # Nodetypes around: parents, subtypes, siblings, prior and posterior
+    parent_ids = set([nodetype.parent_id for nodetype in nodetypes])
+    children_lookup = Q(parent__in=ids)
+    if [pk for pk in parent_ids if pk]:
+        children_lookup |= Q(parent__in=[pk for pk in parent_ids if pk])
+    children = list(Nodetype.objects.filter(children_lookup).values_list(
+        'id', 'parent'))
+    if None in parent_ids:
+        # All the roots are siblings, only the first ones are loaded
+        children.extend(Nodetype.objects.filter(
+            parent__isnull=True).order_by('tree_id').values_list(
+            'id', 'parent')[:NEIGHBOURHOOD_ROOT_SIBLINGS + len(ids)])
+    subtypes = group([(parent, pk) for pk, parent in children
+                      if parent in id_set])
+    siblings = group([(parent, pk) for pk, parent in children])
+    prior_nodes = group(m2m_pairs(
+        Nodetype._meta.get_field('prior_nodes'), ids))
+    posterior_nodes = group(m2m_pairs(
+        Nodetype._meta.get_field('posterior_nodes'), ids))
+
+    nodetype_ids = set([pk for pk in parent_ids if pk])
+    nodetype_ids.update([pk for pk, parent in children])
+    for grouped in (prior_nodes, posterior_nodes):
+        for pks in grouped.values():
+            nodetype_ids.update(pks)
+    nodetype_neighbours = neighbours(Nodetype, nodetype_ids)
+
+    # Metatypes
+    metatypes = group(m2m_pairs(Nodetype._meta.get_field('metatypes'), ids))
+    metatype_ids = set()
+    for pks in metatypes.values():
+        metatype_ids.update(pks)
+    metatype_neighbours = dict(
+        (metatype.pk, Neighbour(metatype.pk, metatype.title,
+                                metatype.get_absolute_url()))
+        for metatype in Metatype.objects.in_bulk(list(metatype_ids)).values())
+
+    # Member objects, registered by objectapp
+    members = {}
+    member_neighbours = {}
+    member_objects = getattr(Nodetype, 'member_objects', None)
+    if member_objects is not None:
+        related = member_objects.related
+        members = group(m2m_pairs(related.field, ids, reverse=True))
+        member_ids = set()
+        for pks in members.values():
+            member_ids.update(pks)
+        member_neighbours = neighbours(related.model, member_ids)
+
+    # Authors
+    authors = group(m2m_pairs(Nodetype._meta.get_field('authors'), ids))
+    author_ids = set()
+    for pks in authors.values():
+        author_ids.update(pks)
+    author_neighbours = dict(
+        (pk, Neighbour(pk, username,
+                       Author(pk=pk, username=username).get_absolute_url()))
+        for pk, username in Author.objects.filter(
+            pk__in=list(author_ids)).values_list('pk', 'username'))
+
+    # Relations, seen from the left or the right subject
+    relations = list(Relation.objects.filter(
+        Q(left_subject__in=ids) | Q(right_subject__in=ids)).values_list(
+        'left_subject', 'relationtype', 'right_subject'))
+    relationtype_names = dict(
+        (pk, (title, inverse)) for pk, title, inverse in
+        Relationtype.objects.filter(pk__in=list(set(
+            [relationtype for left, relationtype, right in relations]))
+                                    ).values_list('pk', 'title', 'inverse'))
+    subject_ids = set()
+    for left, relationtype, right in relations:
+        subject_ids.update((left, right))
+    subjects = NID.objects.refs(list(subject_ids))
+    relation_neighbours = {}
+    for left, relationtype, right in relations:
+        title, inverse = relationtype_names[relationtype]
+        for pk, name, other in ((left, title, right),
+                                (right, inverse, left)):
+            subject = subjects.get(other)
+            if pk in id_set and subject is not None:
+                relation_neighbours.setdefault(pk, {}).setdefault(
+                    name, []).append(Neighbour(subject.pk, subject.title,
+                                               subject.get_absolute_url()))
+
+    # Attributes, attribute types and roles
+    attributes = group([(subject, (attributetype, svalue))
+                        for subject, attributetype, svalue in
+                        Attribute.objects.filter(subject__in=ids).values_list(
+                            'subject', 'attributetype__title', 'svalue')])
+    attributetypes = grouped_neighbours(Attributetype, 'subjecttype', ids)
+    left_roles = grouped_neighbours(Relationtype, 'left_subjecttype', ids)
+    right_roles = grouped_neighbours(Relationtype, 'right_subjecttype', ids)
+
+    neighbourhoods = {}
+    for nodetype in nodetypes:
+        pk = nodetype.pk
+        sibling_ids = [i for i in siblings.get(nodetype.parent_id, [])
+                       if i != pk]
+        if nodetype.parent_id is None:
+            sibling_ids = sibling_ids[:NEIGHBOURHOOD_ROOT_SIBLINGS]
+        neighbourhoods[pk] = {
+            'type_of': [nodetype_neighbours[nodetype.parent_id]]
+            if nodetype.parent_id in nodetype_neighbours else [],
+            'member_of_metatypes': [metatype_neighbours[i]
+                                    for i in metatypes.get(pk, [])
+                                    if i in metatype_neighbours],
+            'contains_subtypes': [nodetype_neighbours[i]
+                                  for i in subtypes.get(pk, [])],
+            'contains_members': [member_neighbours[i]
+                                 for i in members.get(pk, [])
+                                 if i in member_neighbours],
+            'siblings': [nodetype_neighbours[i] for i in sibling_ids],
+            'prior_nodes': [nodetype_neighbours[i]
+                            for i in prior_nodes.get(pk, [])
+                            if i in nodetype_neighbours],
+            'posterior_nodes': [nodetype_neighbours[i]
+                                for i in posterior_nodes.get(pk, [])
+                                if i in nodetype_neighbours],
+            'authors': [author_neighbours[i] for i in authors.get(pk, [])
+                        if i in author_neighbours],
+            'relations': relation_neighbours.get(pk, {}),
+            'attributes': attributes.get(pk, []),
+            'attributetypes': attributetypes.get(pk, []),
+            'left_subjecttype_of': left_roles.get(pk, []),
+            'right_subjecttype_of': right_roles.get(pk, []),
+            }
+    return neighbourhoods
+
+
+def prefetch_neighbourhoods(nodetypes):
+    """Load the neighbourhoods of a list of nodetypes
+    and attach them to the instances"""
+    nodetypes = list(nodetypes)
+    neighbourhoods = load_neighbourhoods(nodetypes)
+    for nodetype in nodetypes:
+        nodetype._neighbourhood = neighbourhoods[nodetype.pk]
+    return nodetypes
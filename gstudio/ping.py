@@ -1,24 +1,36 @@
 """Pings utilities for Gstudio"""
 import socket
+import httplib
 import xmlrpclib
 import threading
+from Queue import Queue
+from Queue import Empty
+from hashlib import md5
+from datetime import datetime
+from datetime import timedelta
 from urllib2 import urlopen
 from urlparse import urlsplit
 from logging import getLogger
 
 from BeautifulSoup import BeautifulSoup
 
-from django.contrib.sites.models import Site
 from django.core.urlresolvers import reverse
 
+from gstudio.models import PingbackDiscovery
 from gstudio.settings import PROTOCOL
+from gstudio.settings import PING_TIMEOUT
+from gstudio.settings import PING_WORKERS
+from gstudio.settings import PING_DISCOVERY_TTL
+from gstudio.settings import PING_DISCOVERY_ERROR_TTL
+from gstudio.settings import PING_DISCOVERY_MAX_BYTES
+from gstudio.current_site import get_current_site
 
 
 class URLRessources(object):
     """Object defining the ressources of the website"""
 
     def __init__(self):
-        self.current_site = Site.objects.get_current()
+        self.current_site = get_current_site()
         self.site_url = '%s://%s' % (PROTOCOL, self.current_site.domain)
         self.blog_url = '%s%s' % (self.site_url,
                                   reverse('gstudio_nodetype_archive_index'))
@@ -26,16 +38,149 @@ class URLRessources(object):
                                    reverse('gstudio_nodetype_latest_feed'))
 
 
+def get_error_message(error):
+    """Return the message of an error, or its class name if empty"""
+    return str(error) or error.__class__.__name__
+
+
+def run_in_pool(tasks, failure, workers=PING_WORKERS):
+    """Call the function of each task on its argument in a bounded
+    pool of threads, with a dict of transports by thread, and return
+    the results in the order of the tasks, the result of a task
+    raising an exception being failure(task, exception)"""
+    queue = Queue()
+    for index, task in enumerate(tasks):
+        queue.put((index, task))
+    results = [None] * len(tasks)
+
+    def work():
+        transports = {}
+        while True:
+            try:
+                index, task = queue.get_nowait()
+            except Empty:
+                return
+            function, argument = task
+            try:
+                results[index] = function(argument, transports)
+            except Exception, error:
+                results[index] = failure(task, error)
+
+    threads = [threading.Thread(target=work)
+               for i in range(min(workers, len(tasks)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def discovery_failure(task, error):
+    """Return the outcome of the discovery of an url which raised"""
+    return task[1], '', get_error_message(error)
+
+
+def read_head(page, max_bytes=PING_DISCOVERY_MAX_BYTES, chunk_size=4096):
+    """Read a page until the end of its head section,
+    or at most max_bytes"""
+    content = ''
+    while len(content) < max_bytes:
+        chunk = page.read(min(chunk_size, max_bytes - len(content)))
+        if not chunk:
+            break
+        content += chunk
+        if '</head>' in content.lower():
+            break
+    return content
+
+
+def get_url_hash(url):
+    """Return the key of an url in the discoveries"""
+    if isinstance(url, unicode):
+        url = url.encode('utf-8')
+    return md5(url).hexdigest()
+
+
+def get_pingback_discoveries(urls):
+    """Return the pingback servers, or an empty string if none,
+    of the urls discovered and not expired, by url"""
+    hashes = dict([(get_url_hash(url), url) for url in urls])
+    if not hashes:
+        return {}
+    return dict([(hashes[url_hash], server) for url_hash, server in
+                 PingbackDiscovery.objects.filter(
+                     url_hash__in=hashes.keys(),
+                     expiration__gt=datetime.now()).values_list(
+                     'url_hash', 'server')])
+
+
+def store_pingback_discoveries(discoveries):
+    """Record the outcomes of the discoveries of the pingback servers,
+    kept GSTUDIO_PING_DISCOVERY_TTL seconds, or
+    GSTUDIO_PING_DISCOVERY_ERROR_TTL seconds for the errors"""
+    now = datetime.now()
+    for url, server, error in discoveries:
+        url_hash = get_url_hash(url)
+        ttl = error and PING_DISCOVERY_ERROR_TTL or PING_DISCOVERY_TTL
+        PingbackDiscovery.objects.filter(url_hash=url_hash).delete()
+        PingbackDiscovery.objects.create(
+            url=url, url_hash=url_hash, server=server or '',
+            error=error[:255], discovery_date=now,
+            expiration=now + timedelta(seconds=ttl))
+
+
+class TimeoutTransport(xmlrpclib.Transport):
+    """XML-RPC transport with a timeout by request, keeping
+    its connection open between the calls to a host"""
+
+    def __init__(self, timeout=PING_TIMEOUT, use_datetime=0):
+        xmlrpclib.Transport.__init__(self, use_datetime)
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        connection = xmlrpclib.Transport.make_connection(self, host)
+        connection.timeout = self.timeout
+        return connection
+
+
+class SafeTimeoutTransport(xmlrpclib.SafeTransport):
+    """XML-RPC transport over HTTPS with a timeout by request"""
+
+    def __init__(self, timeout=PING_TIMEOUT, use_datetime=0):
+        xmlrpclib.SafeTransport.__init__(self, use_datetime)
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        connection = xmlrpclib.SafeTransport.make_connection(self, host)
+        connection.timeout = self.timeout
+        return connection
+
+
+def get_server(server_name, transports=None, timeout=PING_TIMEOUT):
+    """Return a proxy of an XML-RPC server, sharing the transport
+    of the servers on the same host found in transports"""
+    if transports is None:
+        transports = {}
+    scheme, host = urlsplit(server_name)[:2]
+    transport = transports.get((scheme, host))
+    if transport is None:
+        transport_class = scheme == 'https' and SafeTimeoutTransport \
+                          or TimeoutTransport
+        transport = transports[(scheme, host)] = transport_class(timeout)
+    return xmlrpclib.ServerProxy(server_name, transport=transport)
+
+
 class DirectoryPinger(threading.Thread):
     """Threaded Directory Pinger"""
 
-    def __init__(self, server_name, nodetypes, timeout=10, start_now=True):
+    def __init__(self, server_name, nodetypes, timeout=PING_TIMEOUT,
+                 start_now=True, transports=None, ressources=None):
         self.results = []
         self.timeout = timeout
         self.nodetypes = nodetypes
         self.server_name = server_name
-        self.server = xmlrpclib.ServerProxy(self.server_name)
-        self.ressources = URLRessources()
+        self.server = get_server(self.server_name, transports, timeout)
+        self.ressources = ressources or URLRessources()
 
         threading.Thread.__init__(self)
         if start_now:
@@ -43,20 +188,18 @@ class DirectoryPinger(threading.Thread):
 
     def run(self):
         """Ping nodetypes to a Directory in a Thread"""
-        logger = getLogger('gstudio.ping.directory')
-        socket.setdefaulttimeout(self.timeout)
         for nodetype in self.nodetypes:
-            reply = self.ping_nodetype(nodetype)
-            self.results.append(reply)
-            logger.info('%s : %s' % (self.server_name, reply['message']))
-        socket.setdefaulttimeout(None)
+            self.results.append(self.ping_nodetype(nodetype))
 
     def ping_nodetype(self, nodetype):
         """Ping a nodetype to a Directory"""
         nodetype_url = '%s%s' % (self.ressources.site_url,
                               nodetype.get_absolute_url())
         metatypes = '|'.join([c.title for c in nodetype.metatypes.all()])
+        return self.ping_url(nodetype_url, metatypes)
 
+    def ping_url(self, nodetype_url, metatypes):
+        """Ping the url of a nodetype and its metatypes to a Directory"""
         try:
             reply = self.server.weblogUpdates.extendedPing(
                 self.ressources.current_site.name,
@@ -72,17 +215,22 @@ class DirectoryPinger(threading.Thread):
                 reply = {'message': '%s is an invalid directory.' % \
                          self.server_name,
                          'flerror': True}
+        getLogger('gstudio.ping.directory').info(
+            '%s : %s' % (self.server_name, reply.get('message')))
         return reply
 
 
 class ExternalUrlsPinger(threading.Thread):
     """Threaded ExternalUrls Pinger"""
 
-    def __init__(self, nodetype, timeout=10, start_now=True):
+    def __init__(self, nodetype, timeout=PING_TIMEOUT, start_now=True,
+                 transports=None, ressources=None):
         self.results = []
+        self.failures = []
         self.nodetype = nodetype
         self.timeout = timeout
-        self.ressources = URLRessources()
+        self.transports = transports
+        self.ressources = ressources or URLRessources()
         self.nodetype_url = '%s%s' % (self.ressources.site_url,
                                    self.nodetype.get_absolute_url())
 
@@ -92,18 +240,23 @@ class ExternalUrlsPinger(threading.Thread):
 
     def run(self):
         """Ping external URLS in a Thread"""
-        logger = getLogger('gstudio.ping.external_urls')
-        socket.setdefaulttimeout(self.timeout)
+        self.ping()
 
+    def ping(self):
+        """Ping the external URLS of the nodetype, and return
+        the replies of their pingback servers"""
         external_urls = self.find_external_urls(self.nodetype)
-        external_urls_pingable = self.find_pingback_urls(external_urls)
+        return self.pingback_urls(self.find_pingback_urls(external_urls))
 
+    def pingback_urls(self, external_urls_pingable):
+        """Ping the external URLS with their pingback servers,
+        and return the replies"""
+        logger = getLogger('gstudio.ping.external_urls')
         for url, server_name in external_urls_pingable.items():
             reply = self.pingback_url(server_name, url)
             self.results.append(reply)
             logger.info('%s : %s' % (url, reply))
-
-        socket.setdefaulttimeout(None)
+        return self.results
 
     def is_external_url(self, url, site_url):
         """Check of the url in an external url"""
@@ -114,11 +267,8 @@ class ExternalUrlsPinger(threading.Thread):
 
     def find_external_urls(self, nodetype):
         """Find external urls in a nodetype"""
-        soup = BeautifulSoup(nodetype.html_content)
-        external_urls = [a['href'] for a in soup.findAll('a')
-                         if self.is_external_url(
-                             a['href'], self.ressources.site_url)]
-        return external_urls
+        return [url for url in nodetype.links
+                if self.is_external_url(url, self.ressources.site_url)]
 
     def find_pingback_href(self, content):
         """Try to find Link markup to pingback url"""
@@ -130,38 +280,57 @@ class ExternalUrlsPinger(threading.Thread):
                     return dict_attr.get('href')
 
     def find_pingback_urls(self, urls):
-        """Find the pingback urls of each urls"""
-        pingback_urls = {}
+        """Find the pingback urls of each urls, discovering
+        in parallel the urls not discovered recently"""
+        pingback_urls = get_pingback_discoveries(urls)
+        unknown_urls = [url for url in set(urls)
+                        if not url in pingback_urls]
+        discoveries = run_in_pool([(self.discover_pingback_url, url)
+                                   for url in unknown_urls],
+                                  discovery_failure)
+        store_pingback_discoveries(discoveries)
+
+        pingback_urls.update([(url, server_url) for url, server_url, error
+                              in discoveries])
+        return dict([(url, server_url) for url, server_url
+                     in pingback_urls.items() if server_url])
 
-        for url in urls:
+    def discover_pingback_url(self, url, transports=None):
+        """Discover the pingback url of an url, reading only its
+        headers and its head section, and return the url, the
+        pingback url if found and the error if any"""
+        try:
+            page = urlopen(url, timeout=self.timeout)
             try:
-                page = urlopen(url)
                 headers = page.info()
-
                 if 'text/' not in headers.get('Content-Type', '').lower():
-                    continue
+                    return url, '', ''
 
                 server_url = headers.get('X-Pingback')
                 if not server_url:
-                    server_url = self.find_pingback_href(page.read())
-
-                if server_url:
-                    server_url_splitted = urlsplit(server_url)
-                    if not server_url_splitted.netloc:
-                        url_splitted = urlsplit(url)
-                        server_url = '%s://%s%s' % (url_splitted.scheme,
-                                                    url_splitted.netloc,
-                                                    server_url)
-                    pingback_urls[url] = server_url
-            except IOError:
-                pass
-        return pingback_urls
+                    server_url = self.find_pingback_href(read_head(page))
+            finally:
+                page.close()
+        except (IOError, httplib.HTTPException), error:
+            return url, '', get_error_message(error)
+
+        if server_url:
+            server_url_splitted = urlsplit(server_url)
+            if not server_url_splitted.netloc:
+                url_splitted = urlsplit(url)
+                server_url = '%s://%s%s' % (url_splitted.scheme,
+                                            url_splitted.netloc,
+                                            server_url)
+        return url, server_url or '', ''
 
     def pingback_url(self, server_name, target_url):
         """Do a pingback call for the target url"""
         try:
-            server = xmlrpclib.ServerProxy(server_name)
+            server = get_server(server_name, self.transports, self.timeout)
             reply = server.pingback.ping(self.nodetype_url, target_url)
+        except xmlrpclib.Fault:
+            reply = '%s cannot be pinged.' % target_url
         except (xmlrpclib.Error, socket.error):
             reply = '%s cannot be pinged.' % target_url
+            self.failures.append(target_url)
         return reply
@@ -0,0 +1,245 @@
+"""Queue of the pings for Gstudio
+
+Saving a nodetype only queues its pings in the QueuedPing table, once
+by directory and once for its external urls, so the saves made within
+GSTUDIO_PING_DELAY are sent as a single ping. The queue is drained by
+a daemon thread of the process, or by the process_pings command, which
+sends the pings in a bounded pool of threads reusing one connection by
+host, and retries the failed pings later with an exponential backoff.
+The pingback servers of the external urls of all the nodetypes are
+discovered at once, before sending their pingbacks. A process claims
+the pings it sends by pushing their next attempt, so the pings are not
+sent twice by concurrent processes."""
+import time
+import threading
+from datetime import datetime
+from datetime import timedelta
+from urlparse import urlsplit
+from logging import getLogger
+
+from django.db import connection
+
+from gstudio.models import QueuedPing
+from gstudio.ping import run_in_pool
+from gstudio.ping import URLRessources
+from gstudio.ping import get_error_message
+from gstudio.ping import DirectoryPinger
+from gstudio.ping import ExternalUrlsPinger
+from gstudio.settings import PING_DELAY
+from gstudio.settings import PING_WORKERS
+from gstudio.settings import PING_DISPATCHER
+from gstudio.settings import PING_RETRY_DELAY
+from gstudio.settings import PING_MAX_ATTEMPTS
+
+DISPATCHER_LOCK = threading.Lock()
+DISPATCHER = []
+
+
+def enqueue_ping(nodetype, directory=''):
+    """Queue a ping of a nodetype to a directory, or to its external
+    urls if no directory, merged with the ping already queued"""
+    now = datetime.now()
+    queued_ping, created = QueuedPing.objects.get_or_create(
+        nodetype=nodetype, directory=directory, defaults={
+            'request_date': now,
+            'next_attempt': now + timedelta(seconds=PING_DELAY)})
+    if not created:
+        QueuedPing.objects.filter(pk=queued_ping.pk).update(request_date=now)
+    elif PING_DISPATCHER:
+        get_dispatcher().wake()
+    return queued_ping
+
+
+def ping_directory(task, transports):
+    """Send the pings queued for a directory, and return
+    the queued pings with their error if any"""
+    directory, pings, ressources = task
+    pinger = DirectoryPinger(directory, [], start_now=False,
+                             transports=transports, ressources=ressources)
+    results = []
+    for queued_ping, nodetype_url, metatypes in pings:
+        reply = pinger.ping_url(nodetype_url, metatypes)
+        error = reply.get('flerror', True) and reply.get('message') or ''
+        results.append((queued_ping, error))
+    return results
+
+
+def ping_external_urls(task, transports):
+    """Send the pingbacks queued for the external urls of a
+    nodetype, and return the queued ping with its error if any"""
+    queued_ping, pinger, external_urls_pingable = task
+    pinger.transports = transports
+    pinger.pingback_urls(external_urls_pingable)
+    error = pinger.failures and '%s cannot be pinged.' % ', '.join(
+        pinger.failures) or ''
+    return [(queued_ping, error)]
+
+
+def ping_host(task, transports):
+    """Send the pings queued for the directories of a host"""
+    results = []
+    for directory_task in task:
+        results.extend(ping_directory(directory_task, transports))
+    return results
+
+
+def ping_failure(task, error):
+    """Return the queued pings of a task which raised,
+    with the error as their error"""
+    function, argument = task
+    if function is ping_external_urls:
+        queued_pings = [argument[0]]
+    else:
+        queued_pings = [queued_ping for directory, pings, ressources
+                        in argument for queued_ping, nodetype_url,
+                        metatypes in pings]
+    message = get_error_message(error)
+    return [(queued_ping, message) for queued_ping in queued_pings]
+
+
+def claim_pings(queued_pings, now):
+    """Push the next attempt of the queued pings after the retry
+    delay, so a crashed process does not keep them forever, and
+    return the pings claimed, which no other process has claimed"""
+    next_attempt = now + timedelta(seconds=PING_RETRY_DELAY)
+    return [queued_ping for queued_ping in queued_pings
+            if QueuedPing.objects.filter(
+                pk=queued_ping.pk,
+                next_attempt=queued_ping.next_attempt).update(
+                next_attempt=next_attempt)]
+
+
+def record_ping(queued_ping, error, now):
+    """Remove a ping sent from the queue, or delay it if requested
+    again meanwhile, or schedule it again with a backoff if failed"""
+    logger = getLogger('gstudio.ping.queue')
+    pings = QueuedPing.objects.filter(pk=queued_ping.pk)
+    if not error:
+        pings.filter(request_date=queued_ping.request_date).delete()
+        pings.update(next_attempt=now + timedelta(seconds=PING_DELAY))
+        return True
+
+    attempts = queued_ping.attempts + 1
+    if attempts >= PING_MAX_ATTEMPTS:
+        logger.warning('%s : abandoned after %i attempts, %s' % (
+            queued_ping, attempts, error))
+        pings.delete()
+    else:
+        pings.update(attempts=attempts, last_error=error,
+                     next_attempt=now + timedelta(
+                         seconds=PING_RETRY_DELAY * 2 ** (attempts - 1)))
+    return False
+
+
+def process_ping_queue(force=False):
+    """Send the pings of the queue which are due, or all of them if
+    forced, and return the numbers of pings sent and failed"""
+    now = datetime.now()
+    queued_pings = QueuedPing.objects.select_related('nodetype')
+    if not force:
+        queued_pings = queued_pings.filter(next_attempt__lte=now)
+    queued_pings = claim_pings(queued_pings, now)
+    if not queued_pings:
+        return 0, 0
+
+    ressources = URLRessources()
+    metatypes = {}
+    directories = {}
+    external_pings = []
+    for queued_ping in queued_pings:
+        nodetype = queued_ping.nodetype
+        if not queued_ping.directory:
+            pinger = ExternalUrlsPinger(nodetype, start_now=False,
+                                        ressources=ressources)
+            external_pings.append((queued_ping, pinger,
+                                   pinger.find_external_urls(nodetype)))
+            continue
+        if not nodetype.pk in metatypes:
+            metatypes[nodetype.pk] = '|'.join(
+                nodetype.metatypes.values_list('title', flat=True))
+        nodetype_url = '%s%s' % (ressources.site_url,
+                                 nodetype.get_absolute_url())
+        directories.setdefault(queued_ping.directory, []).append(
+            (queued_ping, nodetype_url, metatypes[nodetype.pk]))
+
+    tasks = []
+    if external_pings:
+        pingback_urls = external_pings[0][1].find_pingback_urls(
+            sum([urls for queued_ping, pinger, urls in external_pings], []))
+        for queued_ping, pinger, urls in external_pings:
+            tasks.append((ping_external_urls, (queued_ping, pinger, dict(
+                [(url, pingback_urls[url]) for url in urls
+                 if url in pingback_urls]))))
+
+    hosts = {}
+    for directory, pings in directories.items():
+        hosts.setdefault(urlsplit(directory)[:2], []).append(
+            (directory, pings, ressources))
+    for host_tasks in hosts.values():
+        tasks.append((ping_host, host_tasks))
+
+    sent = failed = 0
+    for results in run_in_pool(tasks, ping_failure):
+        for queued_ping, error in results:
+            if record_ping(queued_ping, error, now):
+                sent += 1
+            else:
+                failed += 1
+    return sent, failed
+
+
+def next_ping_delay():
+    """Return the number of seconds before the next ping
+    of the queue is due, or None if the queue is empty"""
+    next_attempts = list(QueuedPing.objects.order_by(
+        'next_attempt').values_list('next_attempt', flat=True)[:1])
+    if not next_attempts:
+        return None
+    delay = next_attempts[0] - datetime.now()
+    return max(delay.days * 86400 + delay.seconds + 1, 0)
+
+
+class PingDispatcher(threading.Thread):
+    """Daemon thread draining the queue of the pings,
+    woken up when a ping is queued"""
+
+    def __init__(self):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.event = threading.Event()
+
+    def wake(self):
+        """Signal that a ping has been queued"""
+        self.event.set()
+
+    def run(self):
+        """Wait for the pings queued to be due and send them"""
+        logger = getLogger('gstudio.ping.queue')
+        delay = None
+        while True:
+            self.event.wait(delay)
+            if self.event.isSet():
+                self.event.clear()
+                # Wait for the saves of the delay to be merged
+                time.sleep(PING_DELAY)
+            try:
+                process_ping_queue()
+                delay = next_ping_delay()
+            except Exception, error:
+                logger.error('Ping queue failed: %s' % error)
+                delay = PING_RETRY_DELAY
+            connection.close()
+
+
+def get_dispatcher():
+    """Return the dispatcher of the pings of the process,
+    started at the first call"""
+    DISPATCHER_LOCK.acquire()
+    try:
+        if not DISPATCHER:
+            dispatcher = PingDispatcher()
+            dispatcher.start()
+            DISPATCHER.append(dispatcher)
+        return DISPATCHER[0]
+    finally:
+        DISPATCHER_LOCK.release()
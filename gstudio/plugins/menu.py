@@ -1,4 +1,5 @@
 """Menus for gstudio.plugins"""
+from django.utils.encoding import iri_to_uri
 from django.core.urlresolvers import reverse
 from django.utils.translation import ugettext_lazy as _
 
@@ -11,7 +12,91 @@ from gstudio.models import Nodetype
 from gstudio.models import Author
 from gstudio.models import Metatype
 from gstudio.managers import tags_published
+from gstudio.caching import cached_widget
+from gstudio.archives import get_archive_dates
 from gstudio.plugins.settings import HIDE_NODETYPE_MENU
+from gstudio.plugins.settings import MENU_CACHE_TIMEOUT
+from gstudio.plugins.settings import NODETYPE_MENU_DEPTH
+
+
+YEAR_DEPTH, MONTH_DEPTH, DAY_DEPTH, NODETYPE_DEPTH = range(1, 5)
+URL_MARKERS = {'year': '9876', 'month': '54', 'day': '32',
+               'slug': 'gstudio-menu-slug'}
+
+
+def get_url_pattern(name, arguments):
+    """Return the url named as a format string on its arguments,
+    reversed once with markers, or None if a marker is ambiguous"""
+    markers = dict([(argument, URL_MARKERS[argument])
+                    for argument in arguments])
+    url = reverse(name, kwargs=markers)
+    for marker in markers.values():
+        if url.count(marker) != 1:
+            return None
+    url = url.replace('%', '%%')
+    for argument, marker in markers.items():
+        url = url.replace(marker, '%%(%s)s' % argument)
+    return url
+
+
+def url_builder(name, *arguments):
+    """Return a function building the url named from its
+    arguments, without resolving the url again if possible"""
+    pattern = get_url_pattern(name, arguments)
+    if pattern is None:
+        return lambda **kwargs: reverse(name, kwargs=kwargs)
+    return lambda **kwargs: iri_to_uri(pattern % kwargs)
+
+
+def compute_nodetype_menu(depth=NODETYPE_DEPTH):
+    """Return the title, url, id, parent id and archive flag of the
+    nodes of the nodetype menu, down to the depth given, in one pass
+    on the archive days and one on the values of the nodetypes"""
+    year_url = url_builder('gstudio_nodetype_archive_year', 'year')
+    month_url = url_builder('gstudio_nodetype_archive_month',
+                            'year', 'month')
+    day_url = url_builder('gstudio_nodetype_archive_day',
+                          'year', 'month', 'day')
+    nodetype_url = url_builder('gstudio_nodetype_detail',
+                               'year', 'month', 'day', 'slug')
+
+    nodes = []
+    archives = set()
+    for archive_day in get_archive_dates('day', order='DESC'):
+        year = archive_day.strftime('%Y')
+        month = archive_day.strftime('%m')
+        day = archive_day.strftime('%d')
+
+        key_archive_year = 'year-%s' % year
+        key_archive_month = 'month-%s-%s' % (year, month)
+        key_archive_day = 'day-%s-%s-%s' % (year, month, day)
+
+        if not key_archive_year in archives:
+            nodes.append((year, year_url(year=year),
+                          key_archive_year, None, True))
+            archives.add(key_archive_year)
+
+        if depth >= MONTH_DEPTH and not key_archive_month in archives:
+            nodes.append((archive_day.strftime('%b'),
+                          month_url(year=year, month=month),
+                          key_archive_month, key_archive_year, True))
+            archives.add(key_archive_month)
+
+        if depth >= DAY_DEPTH:
+            nodes.append((day, day_url(year=year, month=month, day=day),
+                          key_archive_day, key_archive_month, True))
+
+    if depth >= NODETYPE_DEPTH:
+        for pk, title, slug, creation_date in Nodetype.published.order_by(
+            ).values_list('pk', 'title', 'slug',
+                          'creation_date').iterator():
+            year = creation_date.strftime('%Y')
+            month = creation_date.strftime('%m')
+            day = creation_date.strftime('%d')
+            nodes.append((title, nodetype_url(year=year, month=month,
+                                              day=day, slug=slug),
+                          pk, 'day-%s-%s-%s' % (year, month, day), False))
+    return nodes
 
 
 class NodetypeMenu(CMSAttachMenu):
@@ -19,44 +104,18 @@ class NodetypeMenu(CMSAttachMenu):
     name = _('Gstudio Nodetype Menu')
 
     def get_nodes(self, request):
-        """Return menu's node for nodetypes"""
+        """Return menu's node for nodetypes, computed once by
+        site and by version of the content"""
+        depth = NODETYPE_MENU_DEPTH or NODETYPE_DEPTH
+        archive_attributes = {'hidden': HIDE_NODETYPE_MENU}
         nodes = []
-        archives = []
-        attributes = {'hidden': HIDE_NODETYPE_MENU}
-        for nodetype in Nodetype.published.all():
-            year = nodetype.creation_date.strftime('%Y')
-            month = nodetype.creation_date.strftime('%m')
-            month_text = nodetype.creation_date.strftime('%b')
-            day = nodetype.creation_date.strftime('%d')
-
-            key_archive_year = 'year-%s' % year
-            key_archive_month = 'month-%s-%s' % (year, month)
-            key_archive_day = 'day-%s-%s-%s' % (year, month, day)
-
-            if not key_archive_year in archives:
-                nodes.append(NavigationNode(
-                    year, reverse('gstudio_nodetype_archive_year', args=[year]),
-                    key_archive_year, attr=attributes))
-                archives.append(key_archive_year)
-
-            if not key_archive_month in archives:
-                nodes.append(NavigationNode(
-                    month_text,
-                    reverse('gstudio_nodetype_archive_month', args=[year, month]),
-                    key_archive_month, key_archive_year,
-                    attr=attributes))
-                archives.append(key_archive_month)
-
-            if not key_archive_day in archives:
-                nodes.append(NavigationNode(
-                    day, reverse('gstudio_nodetype_archive_day',
-                                 args=[year, month, day]),
-                    key_archive_day, key_archive_month,
-                    attr=attributes))
-                archives.append(key_archive_day)
-
-            nodes.append(NavigationNode(nodetype.title, nodetype.get_absolute_url(),
-                                        nodetype.pk, key_archive_day))
+        for title, url, key, parent, archive in cached_widget(
+            'nodetype_menu', (depth,),
+            lambda: compute_nodetype_menu(depth),
+            timeout=MENU_CACHE_TIMEOUT):
+            nodes.append(NavigationNode(
+                title, url, key, parent,
+                attr=archive and archive_attributes or None))
         return nodes
 
 
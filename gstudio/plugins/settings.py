@@ -7,6 +7,10 @@ from django.utils.importlib import import_module
 
 HIDE_NODETYPE_MENU = getattr(settings, 'GSTUDIO_HIDE_NODETYPE_MENU', True)
 
+NODETYPE_MENU_DEPTH = getattr(settings, 'GSTUDIO_NODETYPE_MENU_DEPTH', 4)
+
+MENU_CACHE_TIMEOUT = getattr(settings, 'GSTUDIO_MENU_CACHE_TIMEOUT', 3600)
+
 PLUGINS_TEMPLATES = getattr(settings, 'GSTUDIO_PLUGINS_TEMPLATES', [])
 
 
@@ -0,0 +1,81 @@
+"""Publication index for Gstudio
+
+The sites and the publication window of the published nodetypes are
+copied in the Publication table, whose composite index on the site and
+the window lets the published nodetypes of a site be found with a range
+scan, instead of joining the sites of the nodetypes and removing
+the duplicates."""
+from django.db import transaction
+
+from gstudio.models import Nodetype
+from gstudio.models import TagUsage
+from gstudio.models import ArchiveDay
+from gstudio.models import Publication
+from gstudio.managers import PUBLISHED
+from gstudio.archives import update_archive_days
+from gstudio.tag_usage import update_nodetype_tag_usage
+
+
+def update_publication(nodetype):
+    """Copy the sites, the publication window and the creation date
+    of a nodetype in the publication index, and update the usage of
+    its tags and its archive days"""
+    publications = Publication.objects.filter(nodetype=nodetype.pk)
+    days = set([creation_date.date() for creation_date in
+                publications.values_list('creation_date', flat=True)])
+    days.add(nodetype.creation_date.date())
+    if nodetype.status != PUBLISHED:
+        publications.delete()
+    else:
+        site_ids = set(nodetype.sites.values_list('pk', flat=True))
+        publications.exclude(site__in=site_ids).delete()
+        publications.filter(site__in=site_ids).update(
+            start_publication=nodetype.start_publication,
+            end_publication=nodetype.end_publication,
+            creation_date=nodetype.creation_date)
+        indexed = set(publications.values_list('site', flat=True))
+        for site_id in site_ids - indexed:
+            Publication.objects.create(
+                site_id=site_id, nodetype_id=nodetype.pk,
+                start_publication=nodetype.start_publication,
+                end_publication=nodetype.end_publication,
+                creation_date=nodetype.creation_date)
+    update_nodetype_tag_usage(nodetype.pk)
+    update_archive_days(days)
+
+
+def update_publications(nodetypes):
+    """Update the publication index for several nodetypes"""
+    for nodetype in nodetypes:
+        update_publication(nodetype)
+
+
+def clear_site_publications(site):
+    """Remove the publications, the tag usages
+    and the archive days of a site"""
+    Publication.objects.filter(site=site.pk).delete()
+    TagUsage.objects.filter(site=site.pk).delete()
+    ArchiveDay.objects.filter(site=site.pk).delete()
+
+
+@transaction.commit_on_success
+def rebuild_publications():
+    """Rebuild the publication index from scratch,
+    and return the number of publications indexed"""
+    Publication.objects.all().delete()
+    windows = dict([(values[0], values[1:]) for values in
+                    Nodetype.objects.filter(status=PUBLISHED).values_list(
+                        'pk', 'start_publication', 'end_publication',
+                        'creation_date')])
+    through = Nodetype.sites.through
+    count = 0
+    for nodetype_id, site_id in through.objects.filter(
+        nodetype__status=PUBLISHED).values_list(
+        'nodetype', 'site').iterator():
+        start, end, creation_date = windows[nodetype_id]
+        Publication.objects.create(
+            site_id=site_id, nodetype_id=nodetype_id,
+            start_publication=start, end_publication=end,
+            creation_date=creation_date)
+        count += 1
+    return count
@@ -0,0 +1,92 @@
+"""Rendering of the content for Gstudio
+
+The content of a nodetype is converted to HTML once, when saved, and
+stored next to its source with its number of words, its links and its
+first image, found in the same pass. The rendering key stored with
+them is a hash of the content and of the markup settings, so a
+rendering is done again only when one of them changes. After a change
+of the markup settings, the render_content command renders again all
+the stored contents in a pool of processes."""
+from hashlib import md5
+from multiprocessing import Pool
+
+from django.utils.html import strip_tags
+from django.utils.html import linebreaks
+from django.utils.encoding import smart_str
+from django.contrib.markup.templatetags.markup import markdown
+from django.contrib.markup.templatetags.markup import textile
+from django.contrib.markup.templatetags.markup import restructuredtext
+
+from BeautifulSoup import BeautifulSoup
+
+RENDERED_FIELDS = ('rendered_key', 'rendered_content',
+                   'rendered_word_count', 'rendered_links')
+
+
+def get_rendering_key(content, markup, extensions=''):
+    """Return the hash of a content and of the markup settings"""
+    return md5('%s|%s|%s' % (smart_str(markup), smart_str(extensions),
+                             smart_str(content or ''))).hexdigest()
+
+
+def render_markup(content, markup, extensions=''):
+    """Convert a content to HTML with a markup language"""
+    content = content or ''
+    if markup == 'markdown':
+        return markdown(content, extensions)
+    elif markup == 'textile':
+        return textile(content)
+    elif markup == 'restructuredtext':
+        return restructuredtext(content)
+    elif not '</p>' in content:
+        return linebreaks(content)
+    return content
+
+
+def render_content(content, markup, extensions=''):
+    """Render a content and return the values of the rendered
+    fields, with the source of its first image"""
+    html = render_markup(content, markup, extensions)
+    soup = BeautifulSoup(html)
+    links = [unicode(a['href']) for a in soup.findAll('a', href=True)]
+    image = soup.find('img')
+    return {'rendered_key': get_rendering_key(content, markup, extensions),
+            'rendered_content': unicode(html),
+            'rendered_word_count': len(strip_tags(html).split()),
+            'rendered_links': '\n'.join(links),
+            'content_image': image and unicode(
+                image.get('src', ''))[:255] or ''}
+
+
+def render_row(task):
+    """Render the content of a row, in a process of the pool"""
+    pk, content, markup, extensions = task
+    return pk, render_content(content, markup, extensions)
+
+
+def render_stored_contents(model, markup, extensions='', fields=None,
+                           processes=None, force=False):
+    """Render again in a pool of processes the contents of a model
+    whose rendering is outdated, or all of them if forced,
+    and return the number of contents rendered"""
+    if fields is None:
+        fields = RENDERED_FIELDS
+    rows = model._default_manager.values_list(
+        'pk', 'content', 'rendered_key').iterator()
+    tasks = [(pk, content, markup, extensions)
+             for pk, content, rendered_key in rows
+             if force or rendered_key != get_rendering_key(
+                 content, markup, extensions)]
+    if not tasks:
+        return 0
+
+    pool = Pool(processes)
+    try:
+        for pk, rendering in pool.imap_unordered(render_row, tasks,
+                                                 chunksize=16):
+            model._default_manager.filter(pk=pk).update(
+                **dict([(field, rendering[field]) for field in fields]))
+    finally:
+        pool.close()
+        pool.join()
+    return len(tasks)
@@ -20,8 +20,9 @@ from gstudio.models import Nodetype
 from gstudio.settings import STOP_WORDS
 
 
-def createQ(token):
-    """Creates the Q() object"""
+def parse_term(token):
+    """Return the meta, the searched string and
+    the position of the wildcards of a term"""
     meta = getattr(token, 'meta', None)
     query = getattr(token, 'query', '')
     wildcards = None
@@ -41,10 +42,21 @@ def createQ(token):
             else:
                 wildcards = 'END'
                 search = query[0]
+    return meta, search, wildcards
+
+
+def is_ignored(search):
+    """Ignore connective words (of, a, an...) and STOP_WORDS"""
+    return (len(search) < 3 and not search.isdigit()) or \
+           search in STOP_WORDS
+
+
+def createQ(token):
+    """Creates the Q() object"""
+    meta, search, wildcards = parse_term(token)
 
     # Ignore connective words (of, a, an...) and STOP_WORDS
-    if (len(search) < 3 and not search.isdigit()) or \
-           search in STOP_WORDS:
+    if is_ignored(search):
         return Q()
 
     if not meta:
@@ -111,23 +123,51 @@ OPER_AND = CaselessLiteral('and')
 OPER_OR = CaselessLiteral('or')
 OPER_NOT = '-'
 
-TERM = Combine(Optional(Word(alphas).setResultsName('meta') + ':') +
-               (QUOTED.setResultsName('query') |
-                WILDCARDS.setResultsName('query')))
-TERM.setParseAction(createQ)
 
-EXPRESSION = operatorPrecedence(TERM, [
-    (OPER_NOT, 1, opAssoc.RIGHT),
-    (OPER_OR, 2, opAssoc.LEFT),
-    (Optional(OPER_AND, default='and'), 2, opAssoc.LEFT)])
-EXPRESSION.setParseAction(unionQ)
+def build_grammar(term_action, union_action):
+    """Build the grammar of the search patterns, with the
+    actions compiling the terms and their unions"""
+    term = Combine(Optional(Word(alphas).setResultsName('meta') + ':') +
+                   (QUOTED.setResultsName('query') |
+                    WILDCARDS.setResultsName('query')))
+    term.setParseAction(term_action)
+
+    expression = operatorPrecedence(term, [
+        (OPER_NOT, 1, opAssoc.RIGHT),
+        (OPER_OR, 2, opAssoc.LEFT),
+        (Optional(OPER_AND, default='and'), 2, opAssoc.LEFT)])
+    expression.setParseAction(union_action)
+
+    query = OneOrMore(expression) + StringEnd()
+    query.setParseAction(union_action)
+    return query
 
-QUERY = OneOrMore(EXPRESSION) + StringEnd()
-QUERY.setParseAction(unionQ)
 
+QUERY = build_grammar(createQ, unionQ)
 
-def advanced_search(pattern):
+
+def advanced_search(pattern, queryset=None):
     """Parse the grammar of a pattern
     and build a queryset with it"""
+    if queryset is None:
+        queryset = Nodetype.published.all()
     query_parsed = QUERY.parseString(pattern)
-    return Nodetype.published.filter(query_parsed[0]).distinct()
+    return queryset.filter(query_parsed[0]).distinct()
+
+
+def basic_search(pattern, queryset=None):
+    """Search the words of a pattern in the
+    content, excerpt or title of the nodetypes"""
+    if queryset is None:
+        queryset = Nodetype.published.all()
+    lookup = None
+    for pattern in pattern.split():
+        query_part = Q(content__icontains=pattern) | \
+                     Q(excerpt__icontains=pattern) | \
+                     Q(title__icontains=pattern)
+        if lookup is None:
+            lookup = query_part
+        else:
+            lookup |= query_part
+
+    return queryset.filter(lookup)
@@ -0,0 +1,24 @@
+"""Search backends for Gstudio"""
+import warnings
+
+from django.utils.importlib import import_module
+from django.core.exceptions import ImproperlyConfigured
+
+from gstudio.settings import SEARCH_BACKEND
+from gstudio.search_backends.default import backend as default_backend
+
+
+def get_search_backend():
+    """Return the selected search backend"""
+    try:
+        backend_module = import_module(SEARCH_BACKEND)
+        backend = getattr(backend_module, 'backend')
+    except (ImportError, AttributeError):
+        warnings.warn('%s backend cannot be imported' % SEARCH_BACKEND,
+                      RuntimeWarning)
+        backend = default_backend
+    except ImproperlyConfigured, e:
+        warnings.warn(str(e), RuntimeWarning)
+        backend = default_backend
+
+    return backend
@@ -0,0 +1,25 @@
+"""Default search backend for Gstudio, with lookups on the columns"""
+
+
+class DefaultSearchBackend(object):
+    """Search the nodetypes with the lookups built
+    by the grammar, without any index to maintain"""
+    indexed = False
+
+    def search(self, queryset, pattern):
+        """Search the nodetypes of a queryset matching a pattern"""
+        from gstudio.search import basic_search
+        from gstudio.search import advanced_search
+        try:
+            return advanced_search(pattern, queryset)
+        except:
+            return basic_search(pattern, queryset)
+
+    def index(self, nodes):
+        """Nothing to index"""
+
+    def unindex(self, node_ids):
+        """Nothing to unindex"""
+
+
+backend = DefaultSearchBackend()
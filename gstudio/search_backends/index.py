@@ -0,0 +1,329 @@
+"""Inverted index search backend for Gstudio
+
+The nodes are split in terms stored in the SearchPosting table with
+their frequencies, and the search patterns parsed by the grammar are
+compiled to lookups on the terms, instead of scanning the columns.
+The results are ranked with BM25."""
+import re
+from math import log
+
+from django.db import connection
+from django.db import transaction
+from django.db.models import Q
+from django.db.models import Avg
+from django.db.models import Count
+from django.utils.html import strip_tags
+
+from pyparsing import ParseResults
+from pyparsing import ParseException
+from tagging.utils import parse_tag_input
+
+from gstudio.models import Attribute
+from gstudio.models import SearchPosting
+from gstudio.models import SearchDocument
+from gstudio.search import is_ignored
+from gstudio.search import parse_term
+from gstudio.search import build_grammar
+from gstudio.settings import SEARCH_MAX_RESULTS
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TERM_MAX_LENGTH = 100
+TITLE_WEIGHT = 2
+IDS_CHUNK_SIZE = 500
+
+WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """Return the terms of a text, lowercased,
+    without the connective words and the STOP_WORDS"""
+    return [word for word in WORD.findall((text or '').lower())
+            if not is_ignored(word)]
+
+
+def get_meta_terms(node):
+    """Return the terms used by the author:, metatype:
+    and tag: lookups of the grammar for a node"""
+    terms = []
+    if hasattr(node, 'authors'):
+        terms.extend(['author:%s' % username.lower() for username in
+                      node.authors.values_list('username', flat=True)])
+    if hasattr(node, 'metatypes'):
+        for title, slug in node.metatypes.values_list('title', 'slug'):
+            terms.extend(['metatype:%s' % title.lower(),
+                          'metatype:%s' % slug.lower()])
+    if getattr(node, 'tags', None):
+        terms.extend(['tag:%s' % tag.lower()
+                      for tag in parse_tag_input(node.tags)])
+    return terms
+
+
+def get_document_terms(node, attribute_values=()):
+    """Return the frequencies of the terms of a node
+    and of the values of its attributes, and its length"""
+    frequencies = {}
+    length = 0
+    texts = [(TITLE_WEIGHT, node.title),
+             (1, getattr(node, 'excerpt', '')),
+             (1, strip_tags(getattr(node, 'content', '') or '')),
+             (1, getattr(node, 'tags', ''))]
+    texts.extend([(1, value) for value in attribute_values])
+    for weight, text in texts:
+        for term in tokenize(text):
+            term = term[:TERM_MAX_LENGTH]
+            frequencies[term] = frequencies.get(term, 0) + weight
+            length += weight
+    for term in get_meta_terms(node):
+        frequencies[term[:TERM_MAX_LENGTH]] = 1
+    return frequencies, length
+
+
+class Match(object):
+    """Documents matched by a part of a pattern, as a set of ids
+    or as its complement, with the postings of the terms to rank.
+    A neutral Match, for the ignored terms, matches like Q()."""
+
+    def __init__(self, ids=(), complement=False,
+                 postings=None, neutral=False):
+        self.ids = set(ids)
+        self.complement = complement
+        self.postings = postings or {}
+        self.neutral = neutral
+
+    def merge_postings(self, other):
+        postings = dict(self.postings)
+        for term, documents in other.postings.items():
+            postings.setdefault(term, {}).update(documents)
+        return postings
+
+    def __and__(self, other):
+        if self.neutral or other.neutral:
+            return self.neutral and other or self
+        postings = self.merge_postings(other)
+        if not self.complement and not other.complement:
+            return Match(self.ids & other.ids, False, postings)
+        if not self.complement:
+            return Match(self.ids - other.ids, False, postings)
+        if not other.complement:
+            return Match(other.ids - self.ids, False, postings)
+        return Match(self.ids | other.ids, True, postings)
+
+    def __or__(self, other):
+        if self.neutral or other.neutral:
+            return self.neutral and other or self
+        postings = self.merge_postings(other)
+        if not self.complement and not other.complement:
+            return Match(self.ids | other.ids, False, postings)
+        if not self.complement:
+            return Match(other.ids - self.ids, True, postings)
+        if not other.complement:
+            return Match(self.ids - other.ids, True, postings)
+        return Match(self.ids & other.ids, True, postings)
+
+    def __invert__(self):
+        if self.neutral:
+            return self
+        return Match(self.ids, not self.complement)
+
+
+def term_lookup(prefix, search, wildcards):
+    """Build the lookup on the terms of the index for a term
+    of the grammar, the wildcards being resolved on the terms"""
+    search = search.lower()
+    if wildcards == 'END':
+        return Q(term__startswith=prefix + search)
+    if wildcards in ('START', 'BOTH'):
+        lookup = wildcards == 'START' and Q(term__endswith=search) or \
+                 Q(term__contains=search)
+        if prefix:
+            return lookup & Q(term__startswith=prefix)
+        # The meta terms are not matched by the words
+        return lookup & ~Q(term__contains=':')
+    return Q(term=prefix + search)
+
+
+class InvertedIndexBackend(object):
+    """Search the nodes within an inverted index"""
+    indexed = True
+
+    def get_postings(self, lookup):
+        """Return the postings of the terms matching
+        a lookup, as {term: {document id: frequency}}"""
+        postings = {}
+        for term, document, frequency in SearchPosting.objects.filter(
+            lookup).values_list('term', 'document', 'frequency'):
+            postings.setdefault(term, {})[document] = frequency
+        return postings
+
+    def match(self, lookup, rank=True):
+        """Return the Match of a lookup on the terms"""
+        postings = self.get_postings(lookup)
+        ids = set()
+        for documents in postings.values():
+            ids.update(documents)
+        return Match(ids, False, rank and postings or None)
+
+    def match_term(self, queryset, token):
+        """Compile a term of the grammar to a Match"""
+        meta, search, wildcards = parse_term(token)
+        if is_ignored(search):
+            return Match(neutral=True)
+
+        if meta:
+            if not meta in ('author', 'metatype', 'tag'):
+                raise ParseException('Unknown lookup %s' % meta)
+            return self.match(term_lookup('%s:' % meta, search, wildcards),
+                              rank=False)
+
+        words = tokenize(search)
+        if len(words) < 2:
+            return self.match(term_lookup('', search, wildcards))
+
+        # A quoted sentence matches the documents with all its
+        # words, where the whole sentence is then looked up.
+        match = None
+        for word in words:
+            word_match = self.match(term_lookup('', word, None))
+            match = match is None and word_match or match & word_match
+        if match.ids:
+            match.ids = set(queryset.filter(
+                Q(pk__in=list(match.ids)) &
+                (Q(content__icontains=search) |
+                 Q(excerpt__icontains=search) |
+                 Q(title__icontains=search))).values_list('pk', flat=True))
+        return match
+
+    def union_matches(self, token):
+        """Combine the Matches like unionQ combines the Q()"""
+        match = Match(neutral=True)
+        operation = 'and'
+        negation = False
+
+        for t in token:
+            if type(t) is ParseResults:
+                match &= self.union_matches(t)
+            elif t in ('or', 'and'):
+                operation = t
+            elif t == '-':
+                negation = True
+            else:
+                if negation:
+                    t = ~t
+                if operation == 'or':
+                    match |= t
+                else:
+                    match &= t
+        return match
+
+    def filter_ids(self, queryset, ids):
+        """Return the ids which are in a queryset"""
+        ids = list(ids)
+        kept = set()
+        for i in range(0, len(ids), IDS_CHUNK_SIZE):
+            kept.update(queryset.filter(
+                pk__in=ids[i:i + IDS_CHUNK_SIZE]).values_list(
+                'pk', flat=True))
+        return kept
+
+    def rank(self, match):
+        """Return the ids of a Match sorted by their BM25 score"""
+        stats = SearchDocument.objects.aggregate(
+            count=Count('pk'), average=Avg('length'))
+        count = stats['count'] or 1
+        average = stats['average'] or 1.0
+        lengths = dict(SearchDocument.objects.filter(
+            pk__in=list(match.ids)).values_list('pk', 'length'))
+
+        scores = dict((pk, 0.0) for pk in match.ids)
+        for term, documents in match.postings.items():
+            frequency = len(documents)
+            idf = log(1.0 + (count - frequency + 0.5) / (frequency + 0.5))
+            for pk, tf in documents.items():
+                if pk in scores:
+                    norm = 1.0 - BM25_B + BM25_B * lengths.get(
+                        pk, average) / average
+                    scores[pk] += idf * tf * (BM25_K1 + 1) / (
+                        tf + BM25_K1 * norm)
+        return sorted(scores, key=lambda pk: (-scores[pk], pk))
+
+    def order_by_rank(self, queryset, ids):
+        """Filter a queryset on ids and keep their order"""
+        if not ids:
+            return queryset.none()
+        qn = connection.ops.quote_name
+        column = '%s.%s' % (qn(queryset.model._meta.db_table),
+                            qn(queryset.model._meta.pk.column))
+        rank = 'CASE %s %s END' % (column, ' '.join(
+            ['WHEN %i THEN %i' % (pk, i) for i, pk in enumerate(ids)]))
+        return queryset.filter(pk__in=ids).extra(
+            select={'search_rank': rank}, order_by=['search_rank'])
+
+    def search(self, queryset, pattern):
+        """Search the nodes of a queryset matching a pattern,
+        the best ranked first"""
+        grammar = build_grammar(
+            lambda token: self.match_term(queryset, token),
+            self.union_matches)
+        try:
+            match = grammar.parseString(pattern)[0]
+        except ParseException:
+            match = None
+            for word in tokenize(pattern):
+                word_match = self.match(term_lookup('', word, None))
+                match = match is None and word_match or match | word_match
+
+        if match is None:
+            return queryset.none()
+        if match.neutral:
+            return queryset
+        if match.complement:
+            return queryset.exclude(pk__in=list(match.ids))
+        # The matches out of the queryset, as the unpublished
+        # nodes, must not take the place of the ones in it.
+        match.ids = self.filter_ids(queryset, match.ids)
+        return self.order_by_rank(
+            queryset, self.rank(match)[:SEARCH_MAX_RESULTS])
+
+    @transaction.commit_on_success
+    def index(self, nodes):
+        """Update the postings of the nodes, writing only
+        the terms which have changed"""
+        attribute_values = {}
+        for subject, value in Attribute.objects.filter(
+            subject__in=[node.pk for node in nodes]).values_list(
+            'subject', 'svalue'):
+            attribute_values.setdefault(subject, []).append(value)
+
+        for node in nodes:
+            frequencies, length = get_document_terms(
+                node, attribute_values.get(node.pk, ()))
+            document, created = SearchDocument.objects.get_or_create(
+                node_id=node.pk, defaults={'length': length})
+            if not created and document.length != length:
+                SearchDocument.objects.filter(pk=node.pk).update(
+                    length=length)
+
+            postings = dict(SearchPosting.objects.filter(
+                document=document).values_list('term', 'frequency'))
+            removed = [term for term in postings if not term in frequencies]
+            if removed:
+                SearchPosting.objects.filter(
+                    document=document, term__in=removed).delete()
+            for term, frequency in frequencies.items():
+                if not term in postings:
+                    SearchPosting.objects.create(
+                        term=term, document=document, frequency=frequency)
+                elif postings[term] != frequency:
+                    SearchPosting.objects.filter(
+                        document=document, term=term).update(
+                        frequency=frequency)
+
+    @transaction.commit_on_success
+    def unindex(self, node_ids):
+        """Remove the nodes from the index"""
+        SearchPosting.objects.filter(document__in=node_ids).delete()
+        SearchDocument.objects.filter(pk__in=node_ids).delete()
+
+
+backend = InvertedIndexBackend()
@@ -7,6 +7,18 @@ SAVE_PING_DIRECTORIES = getattr(settings, 'GSTUDIO_SAVE_PING_DIRECTORIES',
                                 bool(PING_DIRECTORIES))
 SAVE_PING_EXTERNAL_URLS = getattr(settings, 'GSTUDIO_PING_EXTERNAL_URLS', True)
 
+PING_TIMEOUT = getattr(settings, 'GSTUDIO_PING_TIMEOUT', 10)
+PING_WORKERS = getattr(settings, 'GSTUDIO_PING_WORKERS', 4)
+PING_DELAY = getattr(settings, 'GSTUDIO_PING_DELAY', 60)
+PING_RETRY_DELAY = getattr(settings, 'GSTUDIO_PING_RETRY_DELAY', 300)
+PING_MAX_ATTEMPTS = getattr(settings, 'GSTUDIO_PING_MAX_ATTEMPTS', 5)
+PING_DISPATCHER = getattr(settings, 'GSTUDIO_PING_DISPATCHER', True)
+PING_DISCOVERY_TTL = getattr(settings, 'GSTUDIO_PING_DISCOVERY_TTL', 604800)
+PING_DISCOVERY_ERROR_TTL = getattr(settings,
+                                   'GSTUDIO_PING_DISCOVERY_ERROR_TTL', 3600)
+PING_DISCOVERY_MAX_BYTES = getattr(settings,
+                                   'GSTUDIO_PING_DISCOVERY_MAX_BYTES', 65536)
+
 COPYRIGHT = getattr(settings, 'GSTUDIO_COPYRIGHT', 'Gstudio')
 
 PAGINATION = getattr(settings, 'GSTUDIO_PAGINATION', 10)
@@ -29,6 +41,8 @@ WYSIWYG_MARKUP_MAPPING = {
 WYSIWYG = getattr(settings, 'GSTUDIO_WYSIWYG',
                   WYSIWYG_MARKUP_MAPPING.get(MARKUP_LANGUAGE))
 
+TREE_PICKER_PAGE_SIZE = getattr(settings, 'GSTUDIO_TREE_PICKER_PAGE_SIZE', 50)
+
 AUTO_CLOSE_COMMENTS_AFTER = getattr(
     settings, 'GSTUDIO_AUTO_CLOSE_COMMENTS_AFTER', None)
 
@@ -47,18 +61,60 @@ UPLOAD_TO = getattr(settings, 'GSTUDIO_UPLOAD_TO', 'uploads')
 
 PROTOCOL = getattr(settings, 'GSTUDIO_PROTOCOL', 'http')
 
+WIDGET_CACHE_TIMEOUT = getattr(settings, 'GSTUDIO_WIDGET_CACHE_TIMEOUT', 0)
+
+SITEMAP_LIMIT = getattr(settings, 'GSTUDIO_SITEMAP_LIMIT', 50000)
+SITEMAP_CACHE_TIMEOUT = getattr(settings, 'GSTUDIO_SITEMAP_CACHE_TIMEOUT',
+                                3600)
+
 FEEDS_FORMAT = getattr(settings, 'GSTUDIO_FEEDS_FORMAT', 'rss')
 FEEDS_MAX_ITEMS = getattr(settings, 'GSTUDIO_FEEDS_MAX_ITEMS', 15)
+FEEDS_CACHE_TIMEOUT = getattr(settings, 'GSTUDIO_FEEDS_CACHE_TIMEOUT', 3600)
 
 PINGBACK_CONTENT_LENGTH = getattr(settings,
                                   'GSTUDIO_PINGBACK_CONTENT_LENGTH', 300)
+PINGBACK_TIMEOUT = getattr(settings, 'GSTUDIO_PINGBACK_TIMEOUT', 10)
+PINGBACK_MAX_BYTES = getattr(settings, 'GSTUDIO_PINGBACK_MAX_BYTES', 1048576)
+PINGBACK_RATE_LIMIT = getattr(settings, 'GSTUDIO_PINGBACK_RATE_LIMIT', 30)
+PINGBACK_CACHE_TIMEOUT = getattr(settings, 'GSTUDIO_PINGBACK_CACHE_TIMEOUT',
+                                 3600)
+PINGBACK_ERROR_CACHE_TIMEOUT = getattr(
+    settings, 'GSTUDIO_PINGBACK_ERROR_CACHE_TIMEOUT', 60)
+PINGBACK_DEFERRED = getattr(settings, 'GSTUDIO_PINGBACK_DEFERRED', False)
+
+INHERITANCE_CACHE_SIZE = getattr(settings, 'GSTUDIO_INHERITANCE_CACHE_SIZE',
+                                 1000)
+
+GRAPH_CACHE_TIMEOUT = getattr(settings, 'GSTUDIO_GRAPH_CACHE_TIMEOUT', 3600)
+GRAPH_MAX_DEPTH = getattr(settings, 'GSTUDIO_GRAPH_MAX_DEPTH', 3)
+GRAPH_FAN_OUT = getattr(settings, 'GSTUDIO_GRAPH_FAN_OUT', 50)
+GRAPH_MAX_NODES = getattr(settings, 'GSTUDIO_GRAPH_MAX_NODES', 500)
+
+NEIGHBOURHOOD_ROOT_SIBLINGS = getattr(
+    settings, 'GSTUDIO_NEIGHBOURHOOD_ROOT_SIBLINGS', 50)
+
+ADJACENCY_INDEX = getattr(settings, 'GSTUDIO_ADJACENCY_INDEX', False)
 
 F_MIN = getattr(settings, 'GSTUDIO_F_MIN', 0.1)
 F_MAX = getattr(settings, 'GSTUDIO_F_MAX', 1.0)
 
+SIMILARITY_MODELS = getattr(settings, 'GSTUDIO_SIMILARITY_MODELS',
+                            ('gstudio.nodetype', 'objectapp.gbobject'))
+SIMILARITY_METHOD = getattr(settings, 'GSTUDIO_SIMILARITY_METHOD', 'cosine')
+SIMILARITY_TOP_K = getattr(settings, 'GSTUDIO_SIMILARITY_TOP_K', 10)
+SIMILARITY_BLOCK_SIZE = getattr(settings, 'GSTUDIO_SIMILARITY_BLOCK_SIZE', 256)
+
 SPAM_CHECKER_BACKENDS = getattr(settings, 'GSTUDIO_SPAM_CHECKER_BACKENDS',
                                 ())
 
+SEARCH_BACKEND = getattr(settings, 'GSTUDIO_SEARCH_BACKEND',
+                         'gstudio.search_backends.default')
+SEARCH_MAX_RESULTS = getattr(settings, 'GSTUDIO_SEARCH_MAX_RESULTS', 500)
+SEARCH_INDEXED_MODELS = getattr(settings, 'GSTUDIO_SEARCH_INDEXED_MODELS',
+                                ('gstudio.nodetype', 'objectapp.gbobject'))
+SEARCH_INDEX_BATCH_SIZE = getattr(settings, 'GSTUDIO_SEARCH_INDEX_BATCH_SIZE',
+                                  200)
+
 URL_SHORTENER_BACKEND = getattr(settings, 'GSTUDIO_URL_SHORTENER_BACKEND',
                                 'gstudio.url_shortener.backends.default')
 
@@ -3,6 +3,7 @@ import inspect
 from functools import wraps
 
 from django.db.models.signals import post_save
+from django.db.models.signals import class_prepared
 
 from gstudio import settings
 
@@ -24,29 +25,248 @@ def disable_for_loaddata(signal_handler):
 
 @disable_for_loaddata
 def ping_directories_handler(sender, **kwargs):
-    """Ping Directories when a nodetype is saved"""
+    """Queue the pings of the Directories when a nodetype is saved"""
     nodetype = kwargs['instance']
 
     if nodetype.is_visible and settings.SAVE_PING_DIRECTORIES:
-        from gstudio.ping import DirectoryPinger
+        from gstudio.ping_queue import enqueue_ping
 
         for directory in settings.PING_DIRECTORIES:
-            DirectoryPinger(directory, [nodetype])
+            enqueue_ping(nodetype, directory)
 
 
 @disable_for_loaddata
 def ping_external_urls_handler(sender, **kwargs):
-    """Ping Externals URLS when a nodetype is saved"""
+    """Queue the ping of the Externals URLS when a nodetype is saved"""
     nodetype = kwargs['instance']
 
     if nodetype.is_visible and settings.SAVE_PING_EXTERNAL_URLS:
-        from gstudio.ping import ExternalUrlsPinger
+        from gstudio.ping_queue import enqueue_ping
 
-        ExternalUrlsPinger(nodetype)
+        enqueue_ping(nodetype)
+
+
+def get_senders(model):
+    """Return a model and its concrete subclasses, as
+    the signals of an instance are sent by its own class"""
+    senders = not model._meta.abstract and [model] or []
+    for subclass in model.__subclasses__():
+        senders.extend(get_senders(subclass))
+    return senders
+
+
+def connect_senders(signal, handler, model, dispatch_uid, test=None):
+    """Connect a handler to a model and its concrete subclasses,
+    including the subclasses prepared later by other applications,
+    or to the ones passing the test if any"""
+    def connect(sender):
+        if test is None or test(sender):
+            signal.connect(handler, sender=sender, dispatch_uid=dispatch_uid)
+
+    for sender in get_senders(model):
+        connect(sender)
+
+    def connect_prepared(sender, **kwargs):
+        if issubclass(sender, model) and not sender._meta.abstract:
+            connect(sender)
+
+    class_prepared.connect(connect_prepared, weak=False)
+
+
+def is_indexed_sender(sender):
+    """Tell if the nodes of a model, or of one of its
+    parents, belong to the search index"""
+    return bool([model for model in sender.__mro__
+                 if hasattr(model, '_meta') and '%s.%s' % (
+                     model._meta.app_label, model._meta.module_name)
+                 in settings.SEARCH_INDEXED_MODELS])
+
+
+def flush_inheritance_handler(sender, **kwargs):
+    """Flush the cached inheritances when
+    a node of the trees or an edge changes"""
+    from gstudio.models import Edge
+    from gstudio.models import Metatype
+    from gstudio.models import Nodetype
+
+    action = kwargs.get('action')
+    if action is not None and not action.startswith('post_'):
+        return
+
+    if action is not None or issubclass(sender, (Metatype, Nodetype, Edge)):
+        from gstudio.inheritance import flush_inheritance_cache
+
+        flush_inheritance_cache()
+
+
+def store_old_parent_handler(sender, **kwargs):
+    """Remember the parent of a node of a tree before it is saved,
+    so the graphs of its old parent are dropped too"""
+    instance = kwargs['instance']
+    if instance.pk and not kwargs.get('raw'):
+        parent_ids = list(sender._default_manager.filter(
+            pk=instance.pk).values_list('parent', flat=True))
+        instance._old_parent_id = parent_ids and parent_ids[0] or None
+
+
+def flush_graph_cache_handler(sender, **kwargs):
+    """Drop the cached graphs of a saved node and of its neighbours
+    in its tree, of the subjects of a saved edge, or of the nodes
+    whose metatypes, prior nodes, posterior nodes or authors changed"""
+    from gstudio.models import NID
+    from gstudio.models import Relation
+    from gstudio.models import Metatype
+    from gstudio.models import Nodetype
+    from gstudio.models import Attribute
+    from gstudio.graphs import flush_graph_cache
+    from gstudio.graphs import get_linked_node_ids
+    from gstudio.graphs import get_tree_neighbour_ids
+
+    instance = kwargs['instance']
+    action = kwargs.get('action')
+    if action is not None:
+        if not action in ('pre_clear', 'post_add', 'post_remove'):
+            return
+        node_ids = isinstance(instance, NID) and [instance.pk] or []
+        if issubclass(kwargs['model'], NID):
+            if action == 'pre_clear':
+                node_ids.extend(get_linked_node_ids(sender, instance,
+                                                    kwargs['reverse']))
+            else:
+                node_ids.extend(kwargs['pk_set'] or [])
+    elif isinstance(instance, Relation):
+        node_ids = [instance.pk, instance.left_subject_id,
+                    instance.right_subject_id]
+    elif isinstance(instance, Attribute):
+        node_ids = [instance.pk, instance.subject_id]
+    elif isinstance(instance, (Metatype, Nodetype)):
+        node_ids = [instance.pk] + get_tree_neighbour_ids(instance)
+    elif isinstance(instance, NID):
+        node_ids = [instance.pk]
+    else:
+        return
+
+    flush_graph_cache(node_ids)
+
+
+def update_adjacency_index_handler(sender, **kwargs):
+    """Apply the change of a node or an edge to the adjacency index"""
+    if not settings.ADJACENCY_INDEX:
+        return
+
+    from gstudio.adjacency import ADJACENCY_INDEX
+
+    ADJACENCY_INDEX.update(kwargs['instance'],
+                           deleted=not 'created' in kwargs,
+                           created=kwargs.get('created', False))
+
+
+def update_search_index_handler(sender, **kwargs):
+    """Queue for indexing a saved or deleted node, the subjects
+    of an edge, or the nodetypes whose metatypes or authors changed"""
+    from gstudio.search_backends import get_search_backend
+
+    if not get_search_backend().indexed:
+        return
+
+    from gstudio.models import Relation
+    from gstudio.models import Attribute
+    from gstudio.indexing import enqueue
+    from gstudio.indexing import is_indexed
+
+    instance = kwargs['instance']
+    action = kwargs.get('action')
+    if action is not None:
+        if not action.startswith('post_'):
+            return
+        if kwargs.get('reverse'):
+            node_ids = kwargs.get('pk_set') or []
+        else:
+            node_ids = [instance.pk]
+    elif isinstance(instance, Attribute):
+        node_ids = [instance.subject_id]
+    elif isinstance(instance, Relation):
+        node_ids = [instance.left_subject_id, instance.right_subject_id]
+    elif is_indexed(instance):
+        node_ids = [instance.pk]
+    else:
+        return
+
+    enqueue(node_ids)
+
+
+def bump_content_version_handler(sender, **kwargs):
+    """Invalidate the cached widgets when a nodetype, its sites,
+    authors or metatypes, a comment or a comment flag changes"""
+    action = kwargs.get('action')
+    if action is not None and not action.startswith('post_'):
+        return
+
+    from gstudio.caching import bump_content_version
+
+    bump_content_version()
+
+
+def update_publications_handler(sender, **kwargs):
+    """Update the publication index when a nodetype
+    is saved, or when the sites of nodetypes change"""
+    from gstudio.models import Nodetype
+
+    instance = kwargs['instance']
+    action = kwargs.get('action')
+    if action is not None and not action.startswith('post_'):
+        return
+
+    from gstudio.publication import clear_site_publications
+    from gstudio.publication import update_publications
+
+    if not kwargs.get('reverse'):
+        update_publications([instance])
+    elif action == 'post_clear':
+        clear_site_publications(instance)
+    else:
+        update_publications(Nodetype.objects.filter(
+            pk__in=kwargs.get('pk_set') or []))
+
+
+def clear_current_site_handler(sender, **kwargs):
+    """Forget the current site when a site is saved or deleted"""
+    from gstudio.current_site import clear_site_cache
+
+    clear_site_cache()
+
+
+def update_tag_usage_handler(sender, **kwargs):
+    """Update the usage of the tag of a nodetype tagged or
+    untagged, or of the tags of a nodetype deleted"""
+    from tagging.models import TaggedItem
+    from gstudio.models import Nodetype
+    from gstudio.tag_usage import update_tag_usage
+    from gstudio.tag_usage import get_content_type_id
+    from gstudio.tag_usage import update_nodetype_tag_usage
+
+    instance = kwargs['instance']
+    if isinstance(instance, TaggedItem):
+        if instance.content_type_id == get_content_type_id():
+            update_tag_usage([instance.tag_id])
+    elif isinstance(instance, Nodetype):
+        update_nodetype_tag_usage(instance.pk)
+
+
+def update_archives_handler(sender, **kwargs):
+    """Update the archive day of a nodetype deleted"""
+    from gstudio.models import Nodetype
+
+    instance = kwargs['instance']
+    if isinstance(instance, Nodetype):
+        from gstudio.archives import update_archive_days
+
+        update_archive_days([instance.creation_date.date()])
 
 
 def disconnect_gstudio_signals():
-    """Disconnect all the signals provided by Gstudio"""
+    """Disconnect all the signals provided by Gstudio,
+    except the ones keeping the caches consistent"""
     from gstudio.models import Nodetype
 
     post_save.disconnect(
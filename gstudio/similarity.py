@@ -0,0 +1,256 @@
+"""Similarity engine for Gstudio
+
+The words of the published nodes of the models compared, the
+nodetypes and the gbobjects by default, are vectorized in a single
+sparse matrix of float32, so any node can be compared to the nodes
+of any model. The most similar nodes of each model are scored by
+blocks with NumPy, only among the nodes sharing words, as the others
+cannot be similar, then stored in the Similarity table shared by all
+the processes.
+
+Only the nodes whose words changed since the last update, and the
+nodes which were or became similar to them, are scored again.
+The words too rare or too frequent in the corpus are ignored, like
+in the comparison module."""
+import re
+from hashlib import md5
+
+from django.db import transaction
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import numpy
+    from scipy import sparse
+except ImportError:
+    raise ImproperlyConfigured('numpy and scipy modules are not available')
+
+from gstudio.models import Similarity
+from gstudio.models import SimilarityDocument
+from gstudio.managers import get_nodemodel
+from gstudio.settings import F_MIN
+from gstudio.settings import F_MAX
+from gstudio.settings import SIMILARITY_TOP_K
+from gstudio.settings import SIMILARITY_MODELS
+from gstudio.settings import SIMILARITY_METHOD
+from gstudio.settings import SIMILARITY_BLOCK_SIZE
+
+WORD = re.compile(r'\w+', re.UNICODE)
+FIELDS = ('title', 'excerpt', 'content')
+
+
+def get_words(*texts):
+    """Return the lowercased words of texts"""
+    return WORD.findall(u' '.join([text or u'' for text in texts]).lower())
+
+
+def get_digest(words):
+    """Return the digest of a list of words"""
+    return md5(u' '.join(words).encode('utf-8')).hexdigest()
+
+
+def build_matrix(documents):
+    """Build the sparse matrix of the frequencies of the words in
+    the documents, a list of lists of words, keeping the words whose
+    frequency in the corpus is between F_MIN and F_MAX"""
+    totals = {}
+    counts = []
+    for words in documents:
+        count = {}
+        for word in words:
+            count[word] = count.get(word, 0) + 1
+            totals[word] = totals.get(word, 0) + 1
+        counts.append(count)
+
+    size = float(len(documents) or 1)
+    columns = {}
+    for word, total in totals.items():
+        if F_MIN < total / size < F_MAX:
+            columns[word] = len(columns)
+
+    data = numpy.zeros(sum([len(count) for count in counts]),
+                       dtype=numpy.float32)
+    indices = numpy.zeros(len(data), dtype=numpy.int32)
+    indptr = numpy.zeros(len(counts) + 1, dtype=numpy.int32)
+    position = 0
+    for row, count in enumerate(counts):
+        for word, frequency in count.items():
+            if word in columns:
+                indices[position] = columns[word]
+                data[position] = frequency
+                position += 1
+        indptr[row + 1] = position
+    return sparse.csr_matrix(
+        (data[:position], indices[:position], indptr),
+        shape=(len(documents), max(len(columns), 1)))
+
+
+def best_scores(columns, scores, top_k):
+    """Return the (column, score) of the top_k best scores,
+    the best first and the first column on ties"""
+    if len(scores) > top_k:
+        best = numpy.argpartition(-scores, top_k - 1)[:top_k]
+        columns, scores = columns[best], scores[best]
+    order = numpy.lexsort((columns, -scores))
+    return zip(columns[order], scores[order])
+
+
+class VectorStore(object):
+    """Vectors of words of the documents of several models, held in
+    compact arrays, scoring their similarity with the cosine or the
+    Pearson correlation of their vectors"""
+
+    def __init__(self, ids, documents, labels=None,
+                 method=SIMILARITY_METHOD):
+        if not method in ('cosine', 'pearson'):
+            raise ImproperlyConfigured('Unknown similarity method %s' %
+                                       method)
+        if labels is None:
+            labels = [''] * len(ids)
+        self.method = method
+        self.ids = numpy.array(ids, dtype=numpy.int64)
+        self.rows = dict((pk, row) for row, pk in enumerate(ids))
+        self.labels = sorted(set(labels))
+        codes = dict((label, code) for code, label in enumerate(self.labels))
+        self.codes = numpy.array([codes[label] for label in labels],
+                                 dtype=numpy.int16)
+        self.matrix = build_matrix(documents)
+        self.columns = numpy.float32(self.matrix.shape[1])
+
+        squares = numpy.asarray(
+            self.matrix.multiply(self.matrix).sum(axis=1),
+            dtype=numpy.float32).ravel()
+        self.sums = numpy.asarray(self.matrix.sum(axis=1),
+                                  dtype=numpy.float32).ravel()
+        if method == 'pearson':
+            squares = squares - self.sums ** 2 / self.columns
+        self.norms = numpy.sqrt(numpy.maximum(squares, 0))
+
+    def scores(self, rows):
+        """Return the sparse matrix of the positive scores between
+        the documents of the rows and all the documents. Only the
+        documents sharing words have a positive score, with the
+        cosine as with the Pearson correlation."""
+        products = (self.matrix[rows] * self.matrix.T).tocoo()
+        block, columns = products.row, products.col
+        values = numpy.asarray(products.data, dtype=numpy.float32)
+        if self.method == 'pearson':
+            values -= self.sums[rows][block] * self.sums[columns] / \
+                      self.columns
+        denominators = self.norms[rows][block] * self.norms[columns]
+        scores = numpy.zeros(len(values), dtype=numpy.float32)
+        nonzero = denominators > 0
+        scores[nonzero] = values[nonzero] / denominators[nonzero]
+        positive = scores > 0
+        return sparse.csr_matrix(
+            (scores[positive], (block[positive], columns[positive])),
+            shape=products.shape)
+
+    def top_k(self, ids, top_k=SIMILARITY_TOP_K,
+              block_size=SIMILARITY_BLOCK_SIZE):
+        """Yield the ids of the documents with the list of the
+        (id, score, label) of their most similar documents,
+        top_k for each label"""
+        rows = [self.rows[pk] for pk in ids if pk in self.rows]
+        for start in range(0, len(rows), block_size):
+            block = rows[start:start + block_size]
+            scores = self.scores(block)
+            for i, row in enumerate(block):
+                begin, end = scores.indptr[i], scores.indptr[i + 1]
+                columns = scores.indices[begin:end]
+                values = scores.data[begin:end]
+                others = columns != row
+                columns, values = columns[others], values[others]
+                codes = self.codes[columns]
+                similar = []
+                for code, label in enumerate(self.labels):
+                    in_label = codes == code
+                    for column, score in best_scores(
+                        columns[in_label], values[in_label], top_k):
+                        similar.append((int(self.ids[column]),
+                                        float(score), label))
+                yield int(self.ids[row]), similar
+
+
+def get_documents(labels=SIMILARITY_MODELS):
+    """Return the ids, the words and the labels of the
+    published nodes of the models"""
+    ids = []
+    documents = []
+    node_labels = []
+    seen = set()
+    for label in labels:
+        model = get_nodemodel(label)
+        if model is None:
+            continue
+        manager = getattr(model, 'published', model._default_manager)
+        for values in manager.order_by('pk').values_list(
+            'pk', *FIELDS).iterator():
+            if values[0] in seen:
+                continue
+            seen.add(values[0])
+            ids.append(values[0])
+            documents.append(get_words(*values[1:]))
+            node_labels.append(label)
+    return ids, documents, node_labels
+
+
+def store_similarities(node_id, similarities):
+    """Replace the similar nodes of a node"""
+    Similarity.objects.filter(node=node_id).delete()
+    ranks = {}
+    for similar_id, score, label in similarities:
+        ranks[label] = ranks.get(label, -1) + 1
+        Similarity.objects.create(node_id=node_id, similar_id=similar_id,
+                                  nodemodel=label, score=score,
+                                  rank=ranks[label])
+
+
+@transaction.commit_on_success
+def update_similarities(labels=SIMILARITY_MODELS, full=False,
+                        method=SIMILARITY_METHOD, top_k=SIMILARITY_TOP_K,
+                        block_size=SIMILARITY_BLOCK_SIZE):
+    """Score again the nodes changed since the last update and
+    the nodes which may be similar to them, or all the nodes if full.
+    Return the number of nodes scored"""
+    ids, documents, node_labels = get_documents(labels)
+    digests = dict([(pk, get_digest(words))
+                    for pk, words in zip(ids, documents)])
+    stored = dict(SimilarityDocument.objects.values_list('node', 'digest'))
+
+    changed = set([pk for pk in ids if stored.get(pk) != digests[pk]])
+    removed = set(stored) - set(digests)
+    if full:
+        scored = set(ids)
+    else:
+        scored = set(changed)
+        if changed or removed:
+            scored.update(Similarity.objects.filter(
+                similar__in=list(changed | removed)).values_list(
+                'node', flat=True))
+
+    store = VectorStore(ids, documents, node_labels, method)
+    del documents
+    results = dict(store.top_k(sorted(scored), top_k, block_size))
+    if not full:
+        # A changed node may now be among the most similar
+        # nodes of the nodes the most similar to it.
+        neighbours = set([similar_id for pk in changed
+                          for similar_id, score, label
+                          in results.get(pk, [])])
+        results.update(store.top_k(sorted(neighbours - scored),
+                                   top_k, block_size))
+
+    for node_id, similarities in results.items():
+        store_similarities(node_id, similarities)
+
+    if removed:
+        Similarity.objects.filter(node__in=list(removed)).delete()
+        SimilarityDocument.objects.filter(node__in=list(removed)).delete()
+    for pk in changed:
+        if pk in stored:
+            SimilarityDocument.objects.filter(node=pk).update(
+                digest=digests[pk])
+        else:
+            SimilarityDocument.objects.create(node_id=pk,
+                                              digest=digests[pk])
+    return len(results)
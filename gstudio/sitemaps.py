@@ -1,16 +1,91 @@
 """Sitemaps for Gstudio"""
+from functools import partial
+
+from django.db.models import Max
+from django.db.models import Count
+from django.template import loader
 from django.contrib.sitemaps import Sitemap
 from django.core.urlresolvers import reverse
 
-from tagging.models import TaggedItem
-
 from gstudio.models import Nodetype
 from gstudio.models import Author
 from gstudio.models import Metatype
 from gstudio.managers import tags_published
+from gstudio.settings import SITEMAP_LIMIT
+
+
+def published_nodetype_ids():
+    """Return the queryset of the ids of the published nodetypes"""
+    return Nodetype.published.order_by().values('pk')
+
+
+def relation_statistics(field_name):
+    """Return the number of published nodetypes and their last
+    creation date, by related object of a many to many field of
+    the nodetypes, in one grouped query"""
+    field = Nodetype._meta.get_field(field_name)
+    through = getattr(Nodetype, field_name).through
+    related = field.m2m_reverse_field_name()
+    nodetype = field.m2m_field_name()
+    statistics = through.objects.filter(**{
+        '%s__in' % nodetype: published_nodetype_ids()}).values(
+        related).annotate(count=Count(nodetype),
+                          lastmod=Max('%s__creation_date' % nodetype))
+    return dict([(row[related], (row['count'], row['lastmod']))
+                 for row in statistics])
+
+
+def tag_statistics():
+    """Return the number of published nodetypes and their last
+    creation date, by tag id, read in the tag usage table"""
+    return dict([(tag.pk, (tag.count, tag.last_used))
+                 for tag in tags_published(counts=True)])
+
+
+class GstudioSitemap(Sitemap):
+    """Base sitemap for Gstudio, split in sections of
+    GSTUDIO_SITEMAP_LIMIT urls"""
+    limit = SITEMAP_LIMIT
+
+
+class StatisticsSitemap(GstudioSitemap):
+    """Sitemap whose priorities and last modifications are
+    computed for all the items at once, from the share of the
+    published nodetypes of each item"""
+
+    def __init__(self, get_statistics):
+        """get_statistics returns the number of published
+        nodetypes and their last creation date by item id"""
+        self.get_statistics = get_statistics
+        self._statistics = None
+        self._total = 0.0
+
+    @property
+    def statistics(self):
+        """Statistics of the items, computed once
+        with the total of the published nodetypes"""
+        if self._statistics is None:
+            self._statistics = self.get_statistics()
+            self._total = float(Nodetype.published.count())
+        return self._statistics
+
+    def lastmod(self, obj):
+        """Return the last creation date of the
+        published nodetypes of an item"""
+        return self.statistics.get(obj.pk, (0, None))[1]
+
+    def priority(self, obj):
+        """Compute priority with the share of the nodetypes"""
+        count = self.statistics.get(obj.pk, (0, None))[0]
+        priority = 0.5
+        if self._total:
+            priority += count / self._total
+        if priority > 1.0:
+            priority = 1.0
+        return '%.1f' % priority
 
 
-class NodetypeSitemap(Sitemap):
+class NodetypeSitemap(GstudioSitemap):
     """Sitemap for nodetypes"""
     priority = 0.5
     changefreq = 'weekly'
@@ -24,94 +99,74 @@ class NodetypeSitemap(Sitemap):
         return obj.last_update
 
 
-class MetatypeSitemap(Sitemap):
+class MetatypeSitemap(StatisticsSitemap):
     """Sitemap for metatypes"""
     changefreq = 'monthly'
 
-    def cache(self, metatypes):
-        """Cache categorie's nodetypes percent on total nodetypes"""
-        len_nodetypes = float(Nodetype.published.count())
-        self.cache_metatypes = {}
-        for cat in metatypes:
-            if len_nodetypes:
-                self.cache_metatypes[cat.pk] = cat.nodetypes_published(
-                    ).count() / len_nodetypes
-            else:
-                self.cache_metatypes[cat.pk] = 0.0
+    def __init__(self):
+        super(MetatypeSitemap, self).__init__(
+            partial(relation_statistics, 'metatypes'))
 
     def items(self):
-        """Return all metatypes with coeff"""
-        metatypes = Metatype.objects.all()
-        self.cache(metatypes)
-        return metatypes
-
-    def lastmod(self, obj):
-        """Return last modification of a metatype"""
-        nodetypes = obj.nodetypes_published()
-        if not nodetypes:
-            return None
-        return nodetypes[0].creation_date
-
-    def priority(self, obj):
-        """Compute priority with cached coeffs"""
-        priority = 0.5 + self.cache_metatypes[obj.pk]
-        if priority > 1.0:
-            priority = 1.0
-        return '%.1f' % priority
+        """Return all metatypes"""
+        return Metatype.objects.all()
 
 
-class AuthorSitemap(Sitemap):
+class AuthorSitemap(StatisticsSitemap):
     """Sitemap for authors"""
     priority = 0.5
     changefreq = 'monthly'
 
+    def __init__(self):
+        super(AuthorSitemap, self).__init__(
+            partial(relation_statistics, 'authors'))
+
     def items(self):
         """Return published authors"""
         return Author.published.all()
 
-    def lastmod(self, obj):
-        """Return last modification of an author"""
-        nodetypes = obj.nodetypes_published()
-        if not nodetypes:
-            return None
-        return nodetypes[0].creation_date
-
     def location(self, obj):
         """Return url of an author"""
         return reverse('gstudio_author_detail', args=[obj.username])
 
 
-class TagSitemap(Sitemap):
+class TagSitemap(StatisticsSitemap):
     """Sitemap for tags"""
     changefreq = 'monthly'
 
-    def cache(self, tags):
-        """Cache tag's nodetypes percent on total nodetypes"""
-        len_nodetypes = float(Nodetype.published.count())
-        self.cache_tags = {}
-        for tag in tags:
-            nodetypes = TaggedItem.objects.get_by_model(
-                Nodetype.published.all(), tag)
-            self.cache_tags[tag.pk] = (nodetypes, nodetypes.count() / len_nodetypes)
+    def __init__(self):
+        super(TagSitemap, self).__init__(tag_statistics)
 
     def items(self):
-        """Return all tags with coeff"""
-        tags = tags_published()
-        self.cache(tags)
-        return tags
-
-    def lastmod(self, obj):
-        """Return last modification of a tag"""
-        nodetypes = self.cache_tags[obj.pk][0]
-        return nodetypes[0].creation_date
-
-    def priority(self, obj):
-        """Compute priority with cached coeffs"""
-        priority = 0.5 + self.cache_tags[obj.pk][1]
-        if priority > 1.0:
-            priority = 1.0
-        return '%.1f' % priority
+        """Return all published tags"""
+        return tags_published()
 
     def location(self, obj):
         """Return url of a tag"""
         return reverse('gstudio_tag_detail', args=[obj.name])
+
+
+SITEMAPS = {'nodetypes': NodetypeSitemap,
+            'metatypes': MetatypeSitemap,
+            'authors': AuthorSitemap,
+            'tags': TagSitemap}
+
+
+def render_sitemap_index(sitemaps, location):
+    """Render the index of the pages of the sitemaps,
+    location returning the url of a page of a section"""
+    urls = []
+    for section, sitemap in sorted(sitemaps.items()):
+        if callable(sitemap):
+            sitemap = sitemap()
+        for page in range(1, sitemap.paginator.num_pages + 1):
+            urls.append(location(section, page))
+    return loader.render_to_string('sitemap_index.xml', {'sitemaps': urls})
+
+
+def render_sitemap_section(sitemap, page=1, site=None):
+    """Render a page of the urls of a sitemap"""
+    if callable(sitemap):
+        sitemap = sitemap()
+    return loader.render_to_string(
+        'sitemap.xml', {'urlset': sitemap.get_urls(page=page, site=site)})
@@ -0,0 +1 @@
+CREATE INDEX gstudio_publication_window ON gstudio_publication (site_id, start_publication, end_publication, nodetype_id);
@@ -0,0 +1,103 @@
+/*
+ * Tree picker of the Gstudio admin forms, loading the nodes of a tree
+ * by level or by title prefix, one page at a time.
+ */
+(function($) {
+    function selectedIds(picker) {
+        var value = picker.find('input[type=hidden]').val();
+        return value ? value.split(',') : [];
+    }
+
+    function setSelection(picker, ids) {
+        picker.find('input[type=hidden]').val(ids.join(','));
+    }
+
+    function selectNode(picker, id, title) {
+        var ids = selectedIds(picker);
+        var selection = picker.find('.tree-picker-selection');
+        if ($.inArray(id, ids) != -1) {
+            return;
+        }
+        if (picker.attr('data-multiple') == 'true') {
+            ids.push(id);
+        } else {
+            ids = [id];
+            selection.empty();
+        }
+        setSelection(picker, ids);
+        selection.append($('<li></li>').attr('data-id', id).text(title));
+    }
+
+    function unselectNode(picker, item) {
+        var id = item.attr('data-id');
+        setSelection(picker, $.grep(selectedIds(picker), function(value) {
+            return value != id;
+        }));
+        item.remove();
+    }
+
+    function loadNodes(picker, list, parameters) {
+        parameters.model = picker.attr('data-model');
+        $.getJSON(picker.attr('data-url'), parameters, function(data) {
+            list.find('> .tree-picker-more').remove();
+            $.each(data.nodes, function(index, node) {
+                var item = $('<li></li>').attr('data-id', String(node.id));
+                if (!node.leaf && !parameters.q) {
+                    item.append('<a href="#" class="tree-picker-toggle">+</a> ');
+                }
+                item.append($('<a href="#" class="tree-picker-node"></a>')
+                            .text(node.title));
+                list.append(item);
+            });
+            if (data.more) {
+                var more = $('<li class="tree-picker-more">' +
+                             '<a href="#">...</a></li>');
+                more.find('a').click(function() {
+                    parameters.page = (parameters.page || 1) + 1;
+                    loadNodes(picker, list, parameters);
+                    return false;
+                });
+                list.append(more);
+            }
+        });
+    }
+
+    $(document).ready(function() {
+        $('.tree-picker').each(function() {
+            var picker = $(this);
+            var nodes = picker.find('.tree-picker-nodes');
+            var timer = null;
+            loadNodes(picker, nodes, {});
+
+            picker.find('.tree-picker-search').keyup(function() {
+                var prefix = $(this).val();
+                clearTimeout(timer);
+                timer = setTimeout(function() {
+                    nodes.empty();
+                    loadNodes(picker, nodes, prefix ? {q: prefix} : {});
+                }, 300);
+            });
+            nodes.delegate('.tree-picker-toggle', 'click', function() {
+                var item = $(this).parent();
+                var children = item.find('> ul');
+                if (children.length) {
+                    children.toggle();
+                } else {
+                    children = $('<ul></ul>').appendTo(item);
+                    loadNodes(picker, children,
+                              {parent: item.attr('data-id')});
+                }
+                return false;
+            });
+            nodes.delegate('.tree-picker-node', 'click', function() {
+                selectNode(picker, $(this).parent().attr('data-id'),
+                           $(this).text());
+                return false;
+            });
+            picker.find('.tree-picker-selection').delegate(
+                'li', 'click', function() {
+                    unselectNode(picker, $(this));
+                });
+        });
+    });
+})(jQuery);
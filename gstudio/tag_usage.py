@@ -0,0 +1,176 @@
+"""Tag usage counters for Gstudio
+
+The number of published nodetypes of each tag on each site is stored
+in the TagUsage table, updated for the tags of a nodetype when its tags
+or its publication change, so listing the published tags is a single
+indexed read instead of an aggregate on all the tagged nodetypes.
+
+As a count changes when a publication window opens or closes, each
+usage also stores the date of its next change, and the expired usages
+are computed again before being read."""
+from datetime import datetime
+
+from django.db import connection
+from django.db import transaction
+from django.db.utils import IntegrityError
+from django.contrib.contenttypes.models import ContentType
+
+from tagging.models import Tag
+from tagging.models import TaggedItem
+
+from gstudio.models import NID
+from gstudio.models import Nodetype
+from gstudio.models import TagUsage
+from gstudio.models import Publication
+from gstudio.current_site import get_current_site_id
+
+
+def get_content_type_id():
+    """Return the id of the content type of the tagged nodetypes"""
+    return ContentType.objects.get_for_model(Nodetype).pk
+
+
+def get_nodetype_tag_ids(nodetype_id):
+    """Return the ids of the tags of a nodetype"""
+    return list(TaggedItem.objects.filter(
+        content_type=get_content_type_id(),
+        object_id=nodetype_id).values_list('tag', flat=True))
+
+
+def compute_tag_usage(tag_ids=None):
+    """Return the tag id, the site id, the number of published nodetypes,
+    their last creation date and the date of the next change of the
+    usages of the tags, or of all the tags, in one grouped query"""
+    now = datetime.now()
+    qn = connection.ops.quote_name
+    creation_date = NID._meta.get_field('creation_date')
+    start = qn(Publication._meta.get_field('start_publication').column)
+    end = qn(Publication._meta.get_field('end_publication').column)
+    published = 'publication.%s <= %%s AND publication.%s > %%s' % (
+        start, end)
+    sql = ('SELECT item.tag_id, publication.site_id, '
+           'SUM(CASE WHEN %(published)s THEN 1 ELSE 0 END), '
+           'MAX(CASE WHEN %(published)s THEN nid.%(creation_date)s END), '
+           'MIN(CASE WHEN publication.%(start)s > %%s '
+           'THEN publication.%(start)s WHEN publication.%(end)s > %%s '
+           'THEN publication.%(end)s END) '
+           'FROM %(items)s item '
+           'INNER JOIN %(publications)s publication '
+           'ON publication.nodetype_id = item.object_id '
+           'INNER JOIN %(nids)s nid ON nid.%(nid)s = item.object_id '
+           'WHERE item.content_type_id = %%s' % {
+               'published': published, 'start': start, 'end': end,
+               'creation_date': qn(creation_date.column),
+               'items': qn(TaggedItem._meta.db_table),
+               'publications': qn(Publication._meta.db_table),
+               'nids': qn(NID._meta.db_table),
+               'nid': qn(NID._meta.pk.column)})
+    params = [now] * 6 + [get_content_type_id()]
+    if tag_ids is not None:
+        sql += ' AND item.tag_id IN (%s)' % ', '.join(['%s'] * len(tag_ids))
+        params.extend(tag_ids)
+    sql += ' GROUP BY item.tag_id, publication.site_id'
+
+    cursor = connection.cursor()
+    cursor.execute(sql, params)
+    convert = lambda value: connection.ops.convert_values(value,
+                                                          creation_date)
+    return [(tag_id, site_id, int(count), convert(last_used),
+             convert(expiration)) for tag_id, site_id, count, last_used,
+            expiration in cursor.fetchall()]
+
+
+def save_tag_usage(tag_id, site_id, **values):
+    """Update the usage of a tag on a site, or create it,
+    updating it if created meanwhile by a concurrent update"""
+    usages = TagUsage.objects.filter(tag=tag_id, site=site_id)
+    if usages.update(**values):
+        return
+    sid = transaction.savepoint()
+    try:
+        TagUsage.objects.create(tag_id=tag_id, site_id=site_id, **values)
+    except IntegrityError:
+        transaction.savepoint_rollback(sid)
+        usages.update(**values)
+    else:
+        transaction.savepoint_commit(sid)
+
+
+def store_tag_usage(usages):
+    """Store the usages computed which are or will be published,
+    and return the tag ids and the site ids of the usages stored"""
+    stored = set()
+    for tag_id, site_id, count, last_used, expiration in usages:
+        if count or expiration:
+            save_tag_usage(tag_id, site_id, count=count,
+                           last_used=last_used, expiration=expiration)
+            stored.add((tag_id, site_id))
+    return stored
+
+
+def update_tag_usage(tag_ids):
+    """Compute again the usages of the tags, updating the usages
+    in place so concurrent updates do not create them twice"""
+    tag_ids = list(set(tag_ids))
+    if not tag_ids:
+        return
+    stored = store_tag_usage(compute_tag_usage(tag_ids))
+    outdated = []
+    for pk, tag_id, site_id in TagUsage.objects.filter(
+        tag__in=tag_ids).values_list('pk', 'tag', 'site'):
+        if not (tag_id, site_id) in stored:
+            outdated.append(pk)
+    if outdated:
+        TagUsage.objects.filter(pk__in=outdated).delete()
+
+
+def update_nodetype_tag_usage(nodetype_id):
+    """Compute again the usages of the tags of a nodetype"""
+    update_tag_usage(get_nodetype_tag_ids(nodetype_id))
+
+
+def refresh_tag_usage(site_id=None):
+    """Compute again the usages of a site, the current
+    site by default, whose count has changed since"""
+    if site_id is None:
+        site_id = get_current_site_id()
+    update_tag_usage(TagUsage.objects.filter(
+        site=site_id, expiration__lte=datetime.now()).values_list(
+        'tag', flat=True))
+
+
+@transaction.commit_on_success
+def rebuild_tag_usage():
+    """Compute again the usages of all the tags,
+    and return the number of usages stored"""
+    TagUsage.objects.all().delete()
+    return len(store_tag_usage(compute_tag_usage()))
+
+
+def get_tag_usage(site_id=None):
+    """Return the tags published on a site, the current site
+    by default, with the number of their published nodetypes
+    in the count attribute and their last creation date in the
+    last_used attribute, ordered by name"""
+    if site_id is None:
+        site_id = get_current_site_id()
+    refresh_tag_usage(site_id)
+    tags = []
+    for usage in TagUsage.objects.filter(
+        site=site_id, count__gt=0).select_related('tag').order_by(
+        'tag__name'):
+        tag = usage.tag
+        tag.count = usage.count
+        tag.last_used = usage.last_used
+        tags.append(tag)
+    return tags
+
+
+def get_published_tags(site_id=None):
+    """Return the queryset of the tags published on a
+    site, the current site by default"""
+    if site_id is None:
+        site_id = get_current_site_id()
+    refresh_tag_usage(site_id)
+    return Tag.objects.filter(pk__in=TagUsage.objects.filter(
+        site=site_id, count__gt=0).values('tag'))
@@ -14,27 +14,27 @@ from django.contrib.contenttypes.models import ContentType
 from django.utils.encoding import smart_unicode
 from django.contrib.comments import get_model as get_comment_model
 
-from tagging.models import Tag
 from tagging.utils import calculate_cloud
 
 from gstudio.models import Nodetype
 from gstudio.models import Author
 from gstudio.models import Metatype
+from gstudio.models import Similarity
 
 from gstudio.gnowql import get_node
 
+from gstudio.caching import cached_widget
+from gstudio.archives import get_archive_dates
+from gstudio.archives import get_adjacent_months
 from gstudio.managers import tags_published
-from gstudio.comparison import VectorBuilder
-from gstudio.comparison import pearson_score
 from gstudio.templatetags.zcalendar import GstudioCalendar
 from gstudio.templatetags.zbreadcrumbs import retrieve_breadcrumbs
 
 register = Library()
 
-VECTORS = None
-VECTORS_FACTORY = lambda: VectorBuilder(Nodetype.published.all(),
-                                        ['title', 'excerpt', 'content'])
-CACHE_NODETYPES_RELATED = {}
+# The widgets reading their published items by chunks
+# give up after this number of chunks.
+MAX_CHUNKS = 10
 
 
 @register.inclusion_tag('gstudio/tags/dummy.html')
@@ -60,92 +60,94 @@ def get_authors(template='gstudio/tags/authors.html'):
 @register.inclusion_tag('gstudio/tags/dummy.html')
 def get_recent_nodetypes(number=5, template='gstudio/tags/recent_nodetypes.html'):
     """Return the most recent nodetypes"""
-    return {'template': template,
-            'nodetypes': Nodetype.published.all()[:number]}
+    return cached_widget('recent_nodetypes', (number, template), lambda: {
+        'template': template,
+        'nodetypes': list(Nodetype.published.all()[:number])})
 
 
 @register.inclusion_tag('gstudio/tags/dummy.html')
 def get_featured_nodetypes(number=5,
                          template='gstudio/tags/featured_nodetypes.html'):
     """Return the featured nodetypes"""
-    return {'template': template,
-            'nodetypes': Nodetype.published.filter(featured=True)[:number]}
+    return cached_widget('featured_nodetypes', (number, template), lambda: {
+        'template': template,
+        'nodetypes': list(Nodetype.published.filter(featured=True)[:number])})
+
+
+def random_nodetypes(number):
+    """Return random published nodetypes, fetched
+    at random offsets instead of loading all of them"""
+    nodetypes = Nodetype.published.all()
+    count = nodetypes.count()
+    offsets = sample(xrange(count), min(number, count))
+    ids = []
+    for offset in offsets:
+        ids.extend(nodetypes.order_by('pk').values_list(
+            'pk', flat=True)[offset:offset + 1])
+    nodetype_dict = Nodetype.published.in_bulk(ids)
+    return [nodetype_dict[pk] for pk in ids if pk in nodetype_dict]
 
 
 @register.inclusion_tag('gstudio/tags/dummy.html')
 def get_random_nodetypes(number=5, template='gstudio/tags/random_nodetypes.html'):
     """Return random nodetypes"""
-    nodetypes = Nodetype.published.all()
-    if number > len(nodetypes):
-        number = len(nodetypes)
-    return {'template': template,
-            'nodetypes': sample(nodetypes, number)}
+    return cached_widget('random_nodetypes', (number, template), lambda: {
+        'template': template,
+        'nodetypes': random_nodetypes(number)})
 
 
-@register.inclusion_tag('gstudio/tags/dummy.html')
-def get_popular_nodetypes(number=5, template='gstudio/tags/popular_nodetypes.html'):
-    """Return popular  nodetypes"""
+def popular_nodetypes(number):
+    """Return the published nodetypes with the most comments,
+    reading the scores by chunks until enough are published,
+    within MAX_CHUNKS chunks"""
     ctype = ContentType.objects.get_for_model(Nodetype)
     query = """SELECT object_pk, COUNT(*) AS score
     FROM %s
     WHERE content_type_id = %%s
     AND is_public = '1'
     GROUP BY object_pk
-    ORDER BY score DESC""" % get_comment_model()._meta.db_table
+    ORDER BY score DESC, object_pk
+    LIMIT %%s OFFSET %%s""" % get_comment_model()._meta.db_table
 
+    nodetypes = []
+    chunk_size = max(number * 4, 20)
     cursor = connection.cursor()
-    cursor.execute(query, [ctype.id])
-    object_ids = [int(row[0]) for row in cursor.fetchall()]
+    for offset in range(0, chunk_size * MAX_CHUNKS, chunk_size):
+        if len(nodetypes) >= number:
+            break
+        cursor.execute(query, [ctype.id, chunk_size, offset])
+        object_ids = [int(row[0]) for row in cursor.fetchall()]
+        if not object_ids:
+            break
+        # Use ``in_bulk`` here instead of an ``id__in`` filter,
+        # because ``id__in`` would clobber the ordering.
+        object_dict = Nodetype.published.in_bulk(object_ids)
+        nodetypes.extend([object_dict[object_id]
+                          for object_id in object_ids
+                          if object_id in object_dict])
+    return nodetypes[:number]
 
-    # Use ``in_bulk`` here instead of an ``id__in`` filter, because ``id__in``
-    # would clobber the ordering.
-    object_dict = Nodetype.published.in_bulk(object_ids)
 
-    return {'template': template,
-            'nodetypes': [object_dict[object_id]
-                        for object_id in object_ids
-                        if object_id in object_dict][:number]}
+@register.inclusion_tag('gstudio/tags/dummy.html')
+def get_popular_nodetypes(number=5, template='gstudio/tags/popular_nodetypes.html'):
+    """Return popular  nodetypes"""
+    return cached_widget('popular_nodetypes', (number, template), lambda: {
+        'template': template,
+        'nodetypes': popular_nodetypes(number)})
 
 
 @register.inclusion_tag('gstudio/tags/dummy.html', takes_context=True)
 def get_similar_nodetypes(context, number=5,
                         template='gstudio/tags/similar_nodetypes.html',
                         flush=False):
-    """Return similar nodetypes"""
-    global VECTORS
-    global CACHE_NODETYPES_RELATED
-
-    if VECTORS is None or flush:
-        VECTORS = VECTORS_FACTORY()
-        CACHE_NODETYPES_RELATED = {}
-
-    def compute_related(object_id, dataset):
-        """Compute related nodetypes to a nodetype with a dataset"""
-        object_vector = None
-        for nodetype, e_vector in dataset.items():
-            if nodetype.pk == object_id:
-                object_vector = e_vector
-
-        if not object_vector:
-            return []
-
-        nodetype_related = {}
-        for nodetype, e_vector in dataset.items():
-            if nodetype.pk != object_id:
-                score = pearson_score(object_vector, e_vector)
-                if score:
-                    nodetype_related[nodetype] = score
-
-        related = sorted(nodetype_related.items(), key=lambda(k, v): (v, k))
-        return [rel[0] for rel in related]
-
-    object_id = context['object'].pk
-    columns, dataset = VECTORS()
-    key = '%s-%s' % (object_id, VECTORS.key)
-    if not key in CACHE_NODETYPES_RELATED.keys():
-        CACHE_NODETYPES_RELATED[key] = compute_related(object_id, dataset)
-
-    nodetypes = CACHE_NODETYPES_RELATED[key][:number]
+    """Return the nodetypes similar to the object
+    of the context, a nodetype or a gbobject"""
+    if flush:
+        from gstudio.similarity import update_similarities
+        update_similarities()
+
+    nodetypes = Similarity.objects.similar_to(context['object'].pk,
+                                              Nodetype, number)
     return {'template': template,
             'nodetypes': nodetypes}
 
@@ -154,8 +156,7 @@ def get_similar_nodetypes(context, number=5,
 def get_archives_nodetypes(template='gstudio/tags/archives_nodetypes.html'):
     """Return archives nodetypes"""
     return {'template': template,
-            'archives': Nodetype.published.dates('creation_date', 'month',
-                                              order='DESC')}
+            'archives': get_archive_dates('month', order='DESC')}
 
 
 @register.inclusion_tag('gstudio/tags/dummy.html')
@@ -163,8 +164,7 @@ def get_archives_nodetypes_tree(
     template='gstudio/tags/archives_nodetypes_tree.html'):
     """Return archives nodetypes as a Tree"""
     return {'template': template,
-            'archives': Nodetype.published.dates('creation_date', 'day',
-                                              order='ASC')}
+            'archives': get_archive_dates('day', order='ASC')}
 
 
 @register.inclusion_tag('gstudio/tags/dummy.html', takes_context=True)
@@ -178,17 +178,7 @@ def get_calendar_nodetypes(context, year=None, month=None,
         year, month = date_month.timetuple()[:2]
 
     calendar = GstudioCalendar()
-    current_month = datetime(year, month, 1)
-
-    dates = list(Nodetype.published.dates('creation_date', 'month'))
-
-    if not current_month in dates:
-        dates.append(current_month)
-        dates.sort()
-    index = dates.index(current_month)
-
-    previous_month = index > 0 and dates[index - 1] or None
-    next_month = index != len(dates) - 1 and dates[index + 1] or None
+    previous_month, next_month = get_adjacent_months(year, month)
 
     return {'template': template,
             'next_month': next_month,
@@ -196,40 +186,59 @@ def get_calendar_nodetypes(context, year=None, month=None,
             'calendar': calendar.formatmonth(year, month)}
 
 
+def published_comments(comments, number):
+    """Return the first comments of a queryset posted on published
+    nodetypes, checking the nodetypes of a chunk at a time,
+    within MAX_CHUNKS chunks"""
+    published_comments = []
+    seen = set()
+    chunk_size = max(number * 4, 20)
+    for offset in range(0, chunk_size * MAX_CHUNKS, chunk_size):
+        if len(published_comments) >= number:
+            break
+        chunk = list(comments[offset:offset + chunk_size])
+        if not chunk:
+            break
+        # Using map(smart_unicode... fix bug related to issue #8554
+        published = map(smart_unicode, Nodetype.published.filter(
+            pk__in=[comment.object_pk for comment in chunk]).values_list(
+            'pk', flat=True))
+        for comment in chunk:
+            if comment.object_pk in published and not comment.pk in seen:
+                seen.add(comment.pk)
+                published_comments.append(comment)
+    return published_comments[:number]
+
+
 @register.inclusion_tag('gstudio/tags/dummy.html')
 def get_recent_comments(number=5, template='gstudio/tags/recent_comments.html'):
     """Return the most recent comments"""
-    # Using map(smart_unicode... fix bug related to issue #8554
-    nodetype_published_pks = map(smart_unicode,
-                              Nodetype.published.values_list('id', flat=True))
-    content_type = ContentType.objects.get_for_model(Nodetype)
-
-    comments = get_comment_model().objects.filter(
-        Q(flags=None) | Q(flags__flag=CommentFlag.MODERATOR_APPROVAL),
-        content_type=content_type, object_pk__in=nodetype_published_pks,
-        is_public=True).order_by('-submit_date')[:number]
+    def compute():
+        content_type = ContentType.objects.get_for_model(Nodetype)
+        comments = get_comment_model().objects.filter(
+            Q(flags=None) | Q(flags__flag=CommentFlag.MODERATOR_APPROVAL),
+            content_type=content_type,
+            is_public=True).order_by('-submit_date', '-pk')
+        return {'template': template,
+                'comments': published_comments(comments, number)}
 
-    return {'template': template,
-            'comments': comments}
+    return cached_widget('recent_comments', (number, template), compute)
 
 
 @register.inclusion_tag('gstudio/tags/dummy.html')
 def get_recent_linkbacks(number=5,
                          template='gstudio/tags/recent_linkbacks.html'):
     """Return the most recent linkbacks"""
-    nodetype_published_pks = map(smart_unicode,
-                              Nodetype.published.values_list('id', flat=True))
-    content_type = ContentType.objects.get_for_model(Nodetype)
+    def compute():
+        content_type = ContentType.objects.get_for_model(Nodetype)
+        linkbacks = get_comment_model().objects.filter(
+            content_type=content_type,
+            flags__flag__in=['pingback', 'trackback'],
+            is_public=True).order_by('-submit_date', '-pk')
+        return {'template': template,
+                'linkbacks': published_comments(linkbacks, number)}
 
-    linkbacks = get_comment_model().objects.filter(
-        content_type=content_type,
-        object_pk__in=nodetype_published_pks,
-        flags__flag__in=['pingback', 'trackback'],
-        is_public=True).order_by(
-        '-submit_date')[:number]
-
-    return {'template': template,
-            'linkbacks': linkbacks}
+    return cached_widget('recent_linkbacks', (number, template), compute)
 
 
 @register.inclusion_tag('gstudio/tags/dummy.html', takes_context=True)
@@ -329,7 +338,6 @@ def get_tags(parser, token):
 @register.inclusion_tag('gstudio/tags/dummy.html')
 def get_tag_cloud(steps=6, template='gstudio/tags/tag_cloud.html'):
     """Return a cloud of published tags"""
-    tags = Tag.objects.usage_for_queryset(
-        Nodetype.published.all(), counts=True)
+    tags = tags_published(counts=True)
     return {'template': template,
             'tags': calculate_cloud(tags, steps)}
@@ -7,7 +7,7 @@ from django.utils.dates import WEEKDAYS_ABBR
 from django.utils.formats import get_format
 from django.core.urlresolvers import reverse
 
-from gstudio.models import Nodetype
+from gstudio.archives import get_month_days
 
 AMERICAN_TO_EUROPEAN_WEEK_DAYS = [6, 0, 1, 2, 3, 4, 5]
 
@@ -41,10 +41,7 @@ class GstudioCalendar(HTMLCalendar):
         new attributes computed for formatting a day"""
         self.current_year = theyear
         self.current_month = themonth
-        self.day_nodetypes = [nodetypes.creation_date.day for nodetypes in
-                            Nodetype.published.filter(
-                                creation_date__year=theyear,
-                                creation_date__month=themonth)]
+        self.day_nodetypes = get_month_days(theyear, themonth)
 
         return super(GstudioCalendar, self).formatmonth(
             theyear, themonth, withyear)
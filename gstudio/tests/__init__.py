@@ -6,10 +6,19 @@ from django.conf import settings
 from gstudio.tests.nodetype import NodetypeTestCase  # ~0.2s
 from gstudio.tests.nodetype import NodetypeHtmlContentTestCase  # ~0.5s
 from gstudio.tests.nodetype import NodetypeGetBaseModelTestCase
+from gstudio.tests.nid import NIDTestCase
+from gstudio.tests.neighbourhood import NeighbourhoodTestCase
+from gstudio.tests.inheritance import InheritanceTestCase
+from gstudio.tests.graphs import GraphsTestCase
+from gstudio.tests.adjacency import AdjacencyIndexTestCase
+from gstudio.tests.search_backends import SearchBackendTestCase
+from gstudio.tests.search_backends import SearchIndexingTestCase
 from gstudio.tests.signals import SignalsTestCase
 from gstudio.tests.metatype import MetatypeTestCase
 from gstudio.tests.admin import NodetypeAdminTestCase
 from gstudio.tests.admin import MetatypeAdminTestCase
+from gstudio.tests.admin import NodetypeChangeListTestCase
+from gstudio.tests.admin import TreePickerTestCase
 from gstudio.tests.managers import ManagersTestCase  # ~1.2s
 from gstudio.tests.feeds import GstudioFeedsTestCase  # ~0.4s
 from gstudio.tests.views import GstudioViewsTestCase  # ~1.5s ouch...
@@ -17,10 +26,16 @@ from gstudio.tests.views import GstudioCustomDetailViews  # ~0.3s
 from gstudio.tests.pingback import PingBackTestCase  # ~0.3s
 from gstudio.tests.metaweblog import MetaWeblogTestCase  # ~0.6s
 from gstudio.tests.comparison import ComparisonTestCase
+from gstudio.tests.similarity import SimilarityTestCase
+from gstudio.tests.publication import PublicationTestCase
+from gstudio.tests.current_site import CurrentSiteTestCase
+from gstudio.tests.tag_usage import TagUsageTestCase
+from gstudio.tests.archives import ArchiveIndexTestCase
 from gstudio.tests.quick_nodetype import QuickNodetypeTestCase  # ~0.4s
 from gstudio.tests.sitemaps import GstudioSitemapsTestCase  # ~0.3s
 from gstudio.tests.ping import DirectoryPingerTestCase
 from gstudio.tests.ping import ExternalUrlsPingerTestCase
+from gstudio.tests.ping import PingQueueTestCase
 from gstudio.tests.templatetags import TemplateTagsTestCase  # ~0.4s
 from gstudio.tests.moderator import NodetypeCommentModeratorTestCase  # ~0.1s
 from gstudio.tests.spam_checker import SpamCheckerTestCase
@@ -43,7 +58,14 @@ def suite():
                   TemplateTagsTestCase, QuickNodetypeTestCase,
                   URLShortenerTestCase, NodetypeCommentModeratorTestCase,
                   GstudioCustomDetailViews, SpamCheckerTestCase,
-                  NodetypeAdminTestCase, MetatypeAdminTestCase)
+                  NodetypeAdminTestCase, MetatypeAdminTestCase,
+                  NodetypeChangeListTestCase, TreePickerTestCase,
+                  NIDTestCase, NeighbourhoodTestCase, InheritanceTestCase,
+                  GraphsTestCase, AdjacencyIndexTestCase,
+                  SearchBackendTestCase, SearchIndexingTestCase,
+                  SimilarityTestCase, PublicationTestCase,
+                  CurrentSiteTestCase, TagUsageTestCase,
+                  ArchiveIndexTestCase, PingQueueTestCase)
 
     if 'django_xmlrpc' in settings.INSTALLED_APPS:
         test_cases += (PingBackTestCase, MetaWeblogTestCase)
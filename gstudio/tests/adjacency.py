@@ -0,0 +1,98 @@
+"""Test cases for Gstudio's adjacency index"""
+from __future__ import with_statement
+from django.test import TestCase
+
+from gstudio import models as models_settings
+from gstudio import settings as gstudio_settings
+from gstudio.models import Nodetype
+from gstudio.models import Relation
+from gstudio.models import Attribute
+from gstudio.models import Relationtype
+from gstudio.models import Attributetype
+from gstudio.adjacency import ADJACENCY_INDEX
+from gstudio.adjacency import AdjacencyIndex
+from gstudio.adjacency import get_adjacency_index
+
+
+class AdjacencyIndexTestCase(TestCase):
+    """Test cases for the adjacency index"""
+
+    def setUp(self):
+        self.original_index = (models_settings.ADJACENCY_INDEX,
+                               gstudio_settings.ADJACENCY_INDEX)
+        models_settings.ADJACENCY_INDEX = True
+        gstudio_settings.ADJACENCY_INDEX = True
+        ADJACENCY_INDEX.version = None
+
+        self.dog = Nodetype.objects.create(title='Dog', slug='dog')
+        self.cat = Nodetype.objects.create(title='Cat', slug='cat')
+        self.chases = Relationtype.objects.create(
+            title='chases', inverse='is chased by', slug='chases',
+            left_subjecttype=self.dog, right_subjecttype=self.cat)
+        self.relation = Relation.objects.create(
+            title='dog chases cat', left_subject=self.dog,
+            relationtype=self.chases, right_subject=self.cat)
+        self.weight = Attributetype.objects.create(
+            title='weight', slug='weight', subjecttype=self.dog)
+        Attribute.objects.create(title='dog weight', subject=self.dog,
+                                 attributetype=self.weight, svalue='30')
+
+    def tearDown(self):
+        models_settings.ADJACENCY_INDEX, \
+            gstudio_settings.ADJACENCY_INDEX = self.original_index
+        ADJACENCY_INDEX.version = None
+        ADJACENCY_INDEX.clear()
+
+    def test_get_relations(self):
+        get_adjacency_index()
+        with self.assertNumQueries(0):
+            relations = self.dog.get_relations()
+            self.assertEquals(relations['chases'].title, 'Cat')
+            self.assertEquals(relations['chases'].get_absolute_url(),
+                              self.cat.get_absolute_url())
+            relations = self.cat.get_relations()
+            self.assertEquals(relations['is chased by'].title, 'Dog')
+
+        index = get_adjacency_index()
+        self.assertEquals(index.get_relation_sets(self.dog.pk)['chases'][0].id,
+                          self.relation.pk)
+        self.assertEquals(
+            [n.title for n in index.get_relations_by_side(
+                self.cat.pk)['rrelations']['is chased by']], ['Dog'])
+        self.assertEquals(index.get_attributes(self.dog.pk), {'weight': '30'})
+
+    def test_update(self):
+        index = get_adjacency_index()
+        version = index.version
+        mouse = Nodetype.objects.create(title='Mouse', slug='mouse')
+        self.assertEquals(index.version, version)
+        Relation.objects.create(title='cat chases mouse',
+                                left_subject=self.cat,
+                                relationtype=self.chases, right_subject=mouse)
+        self.assertEquals(index.get_relations(self.cat.pk)['chases'].title,
+                          'Mouse')
+        mouse.title = 'Rat'
+        mouse.save()
+        self.assertEquals(index.get_relations(self.cat.pk)['chases'].title,
+                          'Rat')
+        self.relation.delete()
+        self.assertEquals(index.get_relations(self.dog.pk), {})
+        self.assertTrue(index.is_built())
+        with self.assertNumQueries(0):
+            self.assertEquals(get_adjacency_index(), index)
+
+    def test_replay_changes(self):
+        index = get_adjacency_index()
+        other_index = AdjacencyIndex()
+        other_index.ensure_built()
+        self.cat.title = 'Tiger'
+        self.cat.save()
+        Attribute.objects.create(title='dog height', subject=self.dog,
+                                 attributetype=self.weight, svalue='60')
+        self.assertNotEquals(other_index.version, index.version)
+        with self.assertNumQueries(0):
+            other_index.ensure_built()
+        self.assertEquals(other_index.version, index.version)
+        self.assertEquals(
+            other_index.get_relations(self.dog.pk)['chases'].title, 'Tiger')
+        self.assertEquals(len(other_index.attributes[self.dog.pk]), 2)
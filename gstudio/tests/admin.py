@@ -1,10 +1,21 @@
 """Test cases for Gstudio's admin"""
+import json
+
+from django import forms
 from django.test import TestCase
+from django.contrib import comments
+from django.contrib.admin.sites import AdminSite
 from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.contrib.contenttypes.models import ContentType
 
 from gstudio import settings
 from gstudio.models import Nodetype
 from gstudio.models import Metatype
+from gstudio.models import Objecttype
+from gstudio.admin.objecttype import ObjecttypeAdmin
+from gstudio.admin.widgets import TreeNodePicker
+from gstudio.views.tree import get_tree_nodes
 
 
 class NodetypeAdminTestCase(TestCase):
@@ -84,3 +95,139 @@ class MetatypeAdminTestCase(TestCase):
         self.assertEquals(response.redirect_chain,
                           [('http://testserver/admin/gstudio/metatype/', 302)])
         self.assertEquals(Metatype.objects.count(), 2)
+
+
+class NodetypeChangeListTestCase(TestCase):
+    """Test cases for the changelist of the nodetype admins"""
+    urls = 'gstudio.tests.urls'
+
+    def setUp(self):
+        self.original_wysiwyg = settings.WYSIWYG
+        settings.WYSIWYG = None
+        self.user = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password')
+        self.metatype = Metatype.objects.create(title='Metatype 1',
+                                                slug='cat-1')
+        site = Site.objects.get_current()
+        for i in range(4):
+            objecttype = Objecttype.objects.create(
+                title='Objecttype %i' % i, slug='objecttype-%i' % i,
+                content='My content', tags='gstudio, test')
+            objecttype.authors.add(self.user)
+            objecttype.metatypes.add(self.metatype)
+            objecttype.sites.add(site)
+            comments.get_model().objects.create(
+                comment='My Comment', user=self.user, site=site,
+                content_object=objecttype)
+        self.admin = ObjecttypeAdmin(Objecttype, AdminSite())
+        self.client.login(username='admin', password='password')
+
+    def tearDown(self):
+        settings.WYSIWYG = self.original_wysiwyg
+
+    def test_prefetch_rows(self):
+        ContentType.objects.get_for_model(Objecttype)
+        self.assertNumQueries(6, self.admin.prefetch_rows,
+                              Objecttype.objects.all())
+        objecttypes = self.admin.prefetch_rows(Objecttype.objects.all())
+        self.assertEquals(len(objecttypes), 4)
+
+        def display_rows():
+            for objecttype in objecttypes:
+                self.admin.get_title(objecttype)
+                self.admin.get_authors(objecttype)
+                self.admin.get_metatypes(objecttype)
+                self.admin.get_tags(objecttype)
+                self.admin.get_sites(objecttype)
+        self.assertNumQueries(0, display_rows)
+
+        objecttype = objecttypes[0]
+        self.assertEquals(unicode(self.admin.get_title(objecttype)),
+                          u'Objecttype 0 (2 words) (1 comments)')
+        self.assertEquals([tag.name for tag in objecttype.admin_tags],
+                          ['gstudio', 'test'])
+        self.assertEquals(objecttype.admin_authors, [self.user])
+        self.assertEquals(objecttype.admin_metatypes, [self.metatype])
+
+        objecttype = Objecttype.objects.get(pk=objecttype.pk)
+        self.assertEquals(self.admin.get_sites(objecttype),
+                          self.admin.get_sites(objecttypes[0]))
+        self.assertEquals(self.admin.get_tags(objecttype),
+                          self.admin.get_tags(objecttypes[0]))
+
+    def test_changelist(self):
+        response = self.client.get('/admin/gstudio/objecttype/')
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(len(response.context['cl'].result_list), 4)
+
+
+class TreePickerTestCase(TestCase):
+    """Test cases for the tree pickers of the admin forms"""
+    urls = 'gstudio.tests.urls'
+
+    def setUp(self):
+        self.original_wysiwyg = settings.WYSIWYG
+        settings.WYSIWYG = None
+        User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.root = Nodetype.objects.create(title='Animal', slug='animal')
+        self.children = [Nodetype.objects.create(
+            title=title, slug=title.lower(), parent=self.root)
+                         for title in ('Cat', 'Dog', 'Duck')]
+        self.client.login(username='admin', password='password')
+
+    def tearDown(self):
+        settings.WYSIWYG = self.original_wysiwyg
+
+    def test_get_tree_nodes(self):
+        nodes, more = get_tree_nodes(Nodetype)
+        self.assertEquals(nodes, [{'id': self.root.pk, 'title': 'Animal',
+                                   'level': 0, 'leaf': False}])
+        self.assertEquals(more, False)
+        nodes, more = get_tree_nodes(Nodetype, parent=self.root.pk,
+                                     page_size=2)
+        self.assertEquals([node['title'] for node in nodes], ['Cat', 'Dog'])
+        self.assertEquals(more, True)
+        nodes, more = get_tree_nodes(Nodetype, parent=self.root.pk,
+                                     page=2, page_size=2)
+        self.assertEquals([node['title'] for node in nodes], ['Duck'])
+        self.assertEquals(nodes[0]['leaf'], True)
+        self.assertEquals(more, False)
+        nodes, more = get_tree_nodes(Nodetype, prefix='d')
+        self.assertEquals([node['title'] for node in nodes], ['Dog', 'Duck'])
+
+    def test_tree_nodes_view(self):
+        response = self.client.get('/ajax/tree/', {'model': 'nodetype',
+                                                   'q': 'ca'})
+        self.assertEquals(response['Content-Type'], 'application/json')
+        self.assertEquals(json.loads(response.content), {
+            'nodes': [{'id': self.children[0].pk, 'title': 'Cat',
+                       'level': 1, 'leaf': True}], 'more': False})
+        response = self.client.get('/ajax/tree/', {'model': 'user'})
+        self.assertEquals(response.status_code, 400)
+        response = self.client.get('/ajax/tree/', {'model': 'nodetype',
+                                                   'page': 'last'})
+        self.assertEquals(response.status_code, 400)
+
+    def test_tree_node_picker(self):
+        field = forms.ModelMultipleChoiceField(
+            queryset=Nodetype.objects.all(),
+            widget=TreeNodePicker(multiple=True))
+        self.assertNumQueries(0, field.widget.render, 'nodes', [])
+        output = field.widget.render('nodes', [self.children[1].pk])
+        self.assertTrue('data-model="nodetype"' in output)
+        self.assertTrue('value="%i"' % self.children[1].pk in output)
+        self.assertTrue('Dog' in output)
+        self.assertFalse('Cat' in output)
+
+        ids = '%i,%i' % (self.root.pk, self.children[0].pk)
+        self.assertEquals(set(field.clean(field.widget.value_from_datadict(
+            {'nodes': ids}, {}, 'nodes'))), set([self.root, self.children[0]]))
+        self.assertRaises(forms.ValidationError, field.clean,
+                          field.widget.value_from_datadict(
+                              {'nodes': '%s,999' % ids}, {}, 'nodes'))
+
+    def test_admin_form(self):
+        response = self.client.get('/admin/gstudio/objecttype/add/')
+        self.assertEquals(response.status_code, 200)
+        self.assertTrue('class="tree-picker"' in response.content)
+        self.assertFalse('>Animal</option>' in response.content)
@@ -0,0 +1,99 @@
+"""Test cases for Gstudio's archive index"""
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+
+from django.test import TestCase
+from django.contrib.sites.models import Site
+
+from gstudio.models import Nodetype
+from gstudio.models import ArchiveDay
+from gstudio.models import Publication
+from gstudio.managers import DRAFT
+from gstudio.managers import PUBLISHED
+from gstudio.archives import get_month_days
+from gstudio.archives import get_archive_dates
+from gstudio.archives import get_adjacent_months
+from gstudio.archives import save_archive_day
+from gstudio.archives import update_archive_days
+from gstudio.archives import rebuild_archive_days
+
+
+class ArchiveIndexTestCase(TestCase):
+    """Test cases for the archive index"""
+
+    def setUp(self):
+        self.site = Site.objects.get_current()
+        self.nodetypes = [
+            self.create_nodetype('my-nodetype-1', datetime(2010, 1, 1, 10)),
+            self.create_nodetype('my-nodetype-2', datetime(2010, 1, 1, 12)),
+            self.create_nodetype('my-nodetype-3', datetime(2010, 3, 15))]
+
+    def create_nodetype(self, slug, creation_date, **kwargs):
+        nodetype = Nodetype.objects.create(
+            title=slug, content=slug, slug=slug, status=PUBLISHED,
+            creation_date=creation_date, **kwargs)
+        nodetype.sites.add(self.site)
+        return nodetype
+
+    def get_counts(self):
+        return list(ArchiveDay.objects.filter(count__gt=0).values_list(
+            'day', 'count'))
+
+    def test_archive_days(self):
+        self.assertEquals(self.get_counts(), [(date(2010, 1, 1), 2),
+                                              (date(2010, 3, 15), 1)])
+        self.assertEquals(get_archive_dates('month', order='DESC'),
+                          [datetime(2010, 3, 1), datetime(2010, 1, 1)])
+        self.assertNumQueries(2, get_month_days, 2010, 1)
+        self.assertEquals(get_month_days(2010, 1), [1])
+        self.assertNumQueries(3, get_adjacent_months, 2010, 2)
+        self.assertEquals(get_adjacent_months(2010, 2),
+                          [datetime(2010, 1, 1), datetime(2010, 3, 1)])
+        self.assertEquals(get_adjacent_months(2010, 12),
+                          [datetime(2010, 3, 1), None])
+
+    def test_nodetypes_changed(self):
+        nodetype_1, nodetype_2, nodetype_3 = self.nodetypes
+        nodetype_1.creation_date = datetime(2010, 3, 15, 8)
+        nodetype_1.save()
+        self.assertEquals(self.get_counts(), [(date(2010, 1, 1), 1),
+                                              (date(2010, 3, 15), 2)])
+        nodetype_2.status = DRAFT
+        nodetype_2.save()
+        self.assertEquals(self.get_counts(), [(date(2010, 3, 15), 2)])
+        nodetype_3.sites.clear()
+        self.assertEquals(self.get_counts(), [(date(2010, 3, 15), 1)])
+        nodetype_1.delete()
+        self.assertEquals(self.get_counts(), [])
+
+    def test_publication_window(self):
+        start = datetime.now() + timedelta(days=1)
+        self.create_nodetype('my-nodetype-4', datetime(2011, 1, 1),
+                             start_publication=start)
+        self.assertEquals(get_month_days(2011, 1), [])
+        self.assertEquals(ArchiveDay.objects.get(
+            day=date(2011, 1, 1)).expiration, start)
+
+        past = datetime.now() - timedelta(days=1)
+        Publication.objects.filter(start_publication=start).update(
+            start_publication=past)
+        ArchiveDay.objects.filter(day=date(2011, 1, 1)).update(
+            expiration=past)
+        self.assertEquals(get_month_days(2011, 1), [1])
+
+    def test_rebuild_archive_days(self):
+        ArchiveDay.objects.all().delete()
+        self.assertEquals(get_archive_dates('day'), [])
+        self.assertEquals(rebuild_archive_days(), 2)
+        self.assertEquals(get_archive_dates('day'),
+                          [datetime(2010, 1, 1), datetime(2010, 3, 15)])
+
+    def test_update_archive_days_in_place(self):
+        archive_day = ArchiveDay.objects.get(day=date(2010, 1, 1))
+        update_archive_days([archive_day.day])
+        self.assertEquals(ArchiveDay.objects.get(pk=archive_day.pk).count, 2)
+        save_archive_day(self.site.pk, archive_day.day, count=3)
+        self.assertEquals(ArchiveDay.objects.filter(
+            day=archive_day.day).values_list('pk', 'count')[0],
+                          (archive_day.pk, 3))
@@ -0,0 +1,44 @@
+"""Test cases for Gstudio's current site resolver"""
+from django.test import TestCase
+from django.http import HttpRequest
+from django.contrib.sites.models import Site
+
+from gstudio.models import Author
+from gstudio.models import Nodetype
+from gstudio.current_site import get_current_site
+from gstudio.current_site import clear_site_cache
+
+
+class CurrentSiteTestCase(TestCase):
+    """Test cases for the current site resolver"""
+
+    def setUp(self):
+        clear_site_cache()
+
+    def tearDown(self):
+        clear_site_cache()
+
+    def test_get_current_site(self):
+        self.assertNumQueries(1, get_current_site)
+        site = get_current_site()
+        self.assertEquals(site, Site.objects.get_current())
+        self.assertNumQueries(0, get_current_site)
+
+        request = HttpRequest()
+        self.assertEquals(get_current_site(request), site)
+        clear_site_cache()
+        self.assertNumQueries(0, get_current_site, request)
+
+    def test_site_saved(self):
+        site = get_current_site()
+        site.name = 'Renamed'
+        site.save()
+        self.assertNumQueries(1, get_current_site)
+        self.assertEquals(get_current_site().name, 'Renamed')
+        Site.objects.create(domain='http://domain.com', name='Domain.com')
+        self.assertNumQueries(1, get_current_site)
+
+    def test_published_querysets_without_query(self):
+        self.assertNumQueries(0, Nodetype.published.all)
+        self.assertNumQueries(0, Nodetype.published.on_site)
+        self.assertNumQueries(0, Author.published.all)
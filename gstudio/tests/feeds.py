@@ -1,8 +1,11 @@
 """Test cases for Gstudio's feeds"""
+from time import mktime
 from datetime import datetime
 
 from django.test import TestCase
+from django.test.client import RequestFactory
 from django.conf import settings
+from django.utils.http import http_date
 from django.contrib import comments
 from django.contrib.auth.models import User
 from django.contrib.sites.models import Site
@@ -115,6 +118,55 @@ class GstudioFeedsTestCase(TestCase):
         self.assertEquals(feed.item_enclosure_mime_type(nodetype), 'image/jpeg')
         feeds.FEEDS_FORMAT = original_feeds_format
 
+    def test_nodetype_feed_queries(self):
+        request = RequestFactory().get('/feeds/latest/')
+        feed = LatestNodetypes()
+        self.create_published_nodetype()
+        feed.get_feed(None, request)
+        self.assertNumQueries(3, feed.get_feed, None, request)
+        self.create_published_nodetype()
+        self.create_published_nodetype()
+        self.assertNumQueries(3, feed.get_feed, None, request)
+
+    def test_nodetype_feed_conditional_get(self):
+        nodetype = self.create_published_nodetype()
+        Nodetype.objects.filter(pk=nodetype.pk).update(
+            last_update=datetime(2010, 1, 1))
+        response = self.client.get('/feeds/latest/')
+        self.assertEquals(response.status_code, 200)
+        last_modified = http_date(mktime(datetime(2010, 1, 1).timetuple()))
+        self.assertEquals(response['Last-Modified'], last_modified)
+        response = self.client.get('/feeds/latest/',
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEquals(response.status_code, 304)
+        response = self.client.get('/feeds/latest/',
+                                   HTTP_IF_NONE_MATCH='"other"')
+        self.assertEquals(response.status_code, 200)
+        response = self.client.get(
+            '/feeds/latest/',
+            HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEquals(response.status_code, 304)
+        response = self.client.get(
+            '/feeds/latest/',
+            HTTP_IF_MODIFIED_SINCE='Thu, 31 Dec 2009 00:00:00 GMT')
+        self.assertEquals(response.status_code, 200)
+
+    def test_nodetype_feed_cached(self):
+        nodetype = self.create_published_nodetype()
+        content = self.client.get('/feeds/latest/').content
+        Nodetype.objects.filter(pk=nodetype.pk).update(title='New title')
+        self.assertEquals(self.client.get('/feeds/latest/').content, content)
+        Nodetype.objects.get(pk=nodetype.pk).save()
+        self.assertTrue('New title' in
+                        self.client.get('/feeds/latest/').content)
+
+    def test_nodetype_feed_non_ascii_url(self):
+        nodetype = self.create_published_nodetype()
+        nodetype.tags = u'caf\xe9'
+        nodetype.save()
+        response = self.client.get('/feeds/tags/caf%C3%A9/')
+        self.assertEquals(response.status_code, 200)
+
     def test_latest_nodetypes(self):
         self.create_published_nodetype()
         feed = LatestNodetypes()
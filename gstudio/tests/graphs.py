@@ -0,0 +1,155 @@
+"""Test cases for Gstudio's graph export"""
+from __future__ import with_statement
+import json
+
+from django.test import TestCase
+from django.core.cache import cache
+
+from gstudio.models import Metatype
+from gstudio.models import Nodetype
+from gstudio.models import Relation
+from gstudio.models import Objecttype
+from gstudio.models import Relationtype
+from gstudio.graphs import GRAPH_CACHE_KEY
+from gstudio.graphs import get_graph
+from gstudio.graphs import breadth_first
+from gstudio.graphs import get_ego_network
+
+
+class GraphsTestCase(TestCase):
+    """Test cases for the graph export"""
+    urls = 'gstudio.tests.urls'
+
+    def setUp(self):
+        self.parent = Objecttype.objects.create(title='Animal',
+                                                slug='animal')
+        self.nodetype = Objecttype.objects.create(title='Dog', slug='dog',
+                                                  parent=self.parent)
+        self.metatype = Metatype.objects.create(title='Concept',
+                                                slug='concept')
+        self.nodetype.metatypes.add(self.metatype)
+        cache.delete(GRAPH_CACHE_KEY % self.nodetype.pk)
+
+    def test_get_graph_json(self):
+        graph = json.loads(self.nodetype.get_graph_json())
+        ids = [node['_id'] for node in graph['node_metadata']]
+        self.assertTrue(str(self.nodetype.pk) in ids)
+        self.assertTrue(str(self.parent.pk) in ids)
+        self.assertTrue(str(self.metatype.pk) in ids)
+        self.assertEquals(len(ids), len(set(ids)))
+        self.assertEquals(graph['type_of'][0]['from'], self.nodetype.pk)
+        self.assertEquals(graph['type_of'][1]['to'], self.parent.pk)
+        self.assertEquals(graph['member_of_metatype'][1]['to'],
+                          self.metatype.pk)
+        self.assertEquals(json.loads(''.join(get_graph(self.nodetype.pk))),
+                          graph)
+
+    def test_get_graph_cache(self):
+        graph = get_graph(self.nodetype.pk)
+        content = ''.join(graph)
+        with self.assertNumQueries(0):
+            cached = get_graph(self.nodetype.pk)
+            self.assertEquals(cached.etag, graph.etag)
+            self.assertEquals(''.join(cached), content)
+        self.nodetype.title = 'Wolf'
+        self.nodetype.save()
+        self.assertEquals(cache.get(GRAPH_CACHE_KEY % self.nodetype.pk), None)
+        self.assertTrue('Wolf' in ''.join(get_graph(self.nodetype.pk)))
+        self.assertEquals(get_graph(0), None)
+
+    def cache_graphs(self, *nodes):
+        for node in nodes:
+            ''.join(get_graph(node.pk))
+            self.assertNotEquals(cache.get(GRAPH_CACHE_KEY % node.pk), None)
+
+    def assertGraphsFlushed(self, *nodes):
+        for node in nodes:
+            self.assertEquals(cache.get(GRAPH_CACHE_KEY % node.pk), None)
+
+    def test_get_graph_cache_tree(self):
+        plant = Objecttype.objects.create(title='Plant', slug='plant')
+        cat = Objecttype.objects.create(title='Cat', slug='cat',
+                                        parent=self.parent)
+        self.cache_graphs(self.parent, plant, cat)
+        self.nodetype.parent = plant
+        self.nodetype.save()
+        self.assertGraphsFlushed(self.parent, plant, cat)
+
+    def test_get_graph_cache_links(self):
+        cat = Objecttype.objects.create(title='Cat', slug='cat')
+        self.cache_graphs(self.nodetype, self.metatype, cat)
+        self.nodetype.prior_nodes.add(cat)
+        self.assertGraphsFlushed(self.nodetype, cat)
+        self.cache_graphs(self.nodetype, self.metatype)
+        self.nodetype.metatypes.clear()
+        self.assertGraphsFlushed(self.nodetype, self.metatype)
+
+    def test_graph_json_view(self):
+        url = '/graphs/graph_json/%s' % self.nodetype.pk
+        response = self.client.get(url)
+        self.assertEquals(response.status_code, 200)
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertEquals(
+            json.loads(response.content)['node_metadata'][0]['title'], 'Dog')
+        response = self.client.get(url,
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEquals(response.status_code, 304)
+        response = self.client.get('/graphs/graph_json/0')
+        self.assertEquals(response.status_code, 404)
+
+    def test_breadth_first(self):
+        adjacency = {1: [2, 3, 4], 2: [5], 3: [5, 6], 5: [7]}
+
+        def expand(ids):
+            return [(pk, other, (pk, other, 'edge')) for pk in ids
+                    for other in adjacency.get(pk, [])]
+
+        levels, edges = breadth_first(1, expand, 2)
+        self.assertEquals(levels, {1: 0, 2: 1, 3: 1, 4: 1, 5: 2, 6: 2})
+        self.assertEquals(len(edges), 6)
+        levels, edges = breadth_first(1, expand, 3, fan_out=1)
+        self.assertEquals(levels, {1: 0, 2: 1, 5: 2, 7: 3})
+        levels, edges = breadth_first(1, expand, 3, max_nodes=3)
+        self.assertEquals(len(levels), 3)
+
+    def test_get_ego_network(self):
+        cat = Objecttype.objects.create(title='Cat', slug='cat')
+        mouse = Objecttype.objects.create(title='Mouse', slug='mouse')
+        chases = Relationtype.objects.create(
+            title='chases', inverse='is chased by', slug='chases',
+            left_subjecttype=self.parent, right_subjecttype=self.parent)
+        Relation.objects.create(title='dog chases cat',
+                                left_subject=self.nodetype,
+                                relationtype=chases, right_subject=cat)
+        Relation.objects.create(title='cat chases mouse',
+                                left_subject=cat,
+                                relationtype=chases, right_subject=mouse)
+
+        network = get_ego_network(self.nodetype.pk, 1)
+        nodes = dict((node.pk, level) for node, level in network['nodes'])
+        self.assertEquals(nodes[cat.pk], 1)
+        self.assertFalse(mouse.pk in nodes)
+        network = get_ego_network(self.nodetype.pk, 2)
+        nodes = dict((node.pk, level) for node, level in network['nodes'])
+        self.assertEquals(nodes[mouse.pk], 2)
+        self.assertEquals(network['predicates']['chases'],
+                          [(self.nodetype.pk, cat.pk), (cat.pk, mouse.pk)])
+        network = get_ego_network(self.nodetype.pk, 2, kinds=['parent'])
+        self.assertEquals(network['predicates'].keys(), ['type_of'])
+        network = get_ego_network(self.nodetype.pk, 2, relationtypes=[0])
+        self.assertFalse('chases' in network['predicates'])
+        self.assertEquals(get_ego_network(0, 2), None)
+
+    def test_ego_network_json_view(self):
+        url = '/graphs/egonet_json/%s' % self.nodetype.pk
+        graph = json.loads(self.client.get(url + '?depth=2').content)
+        ids = [node['_id'] for node in graph['node_metadata']]
+        self.assertEquals(ids[0], str(self.nodetype.pk))
+        self.assertTrue(str(self.parent.pk) in ids)
+        self.assertEquals(graph['type_of'],
+                          [{'from': self.nodetype.pk, 'to': self.parent.pk,
+                            'value': 1}])
+        response = self.client.get(url + '?depth=two')
+        self.assertEquals(response.status_code, 400)
+        response = self.client.get('/graphs/egonet_json/0')
+        self.assertEquals(response.status_code, 404)
@@ -0,0 +1,97 @@
+"""Test cases for Gstudio's inheritance resolver"""
+from __future__ import with_statement
+from django.test import TestCase
+
+from gstudio.models import Nodetype
+from gstudio.models import Relation
+from gstudio.models import Attribute
+from gstudio.models import Relationtype
+from gstudio.models import Attributetype
+from gstudio import inheritance
+from gstudio.inheritance import INHERITANCE_CACHE
+from gstudio.inheritance import get_ancestor_ids
+from gstudio.inheritance import flush_inheritance_cache
+
+
+class InheritanceTestCase(TestCase):
+    """Test cases for the inheritance resolver"""
+
+    def setUp(self):
+        flush_inheritance_cache()
+        self.animal = Nodetype.objects.create(title='Animal', slug='animal')
+        self.mammal = Nodetype.objects.create(title='Mammal', slug='mammal',
+                                              parent=self.animal)
+        self.dog = Nodetype.objects.create(title='Dog', slug='dog',
+                                           parent=self.mammal)
+        self.plant = Nodetype.objects.create(title='Plant', slug='plant')
+        self.attributetype = Attributetype.objects.create(
+            title='weight', slug='weight', subjecttype=self.animal)
+        self.relationtype = Relationtype.objects.create(
+            title='eats', inverse='is eaten by', slug='eats',
+            left_subjecttype=self.animal, right_subjecttype=self.plant)
+
+    def get(self, nodetype):
+        return Nodetype.objects.get(pk=nodetype.pk)
+
+    def test_get_ancestor_ids(self):
+        self.assertEquals(get_ancestor_ids(self.get(self.dog)),
+                          set([self.animal.pk, self.mammal.pk]))
+        self.assertEquals(get_ancestor_ids(self.get(self.animal)), set())
+
+    def test_get_possible_attributetypes(self):
+        dog = self.get(self.dog)
+        self.assertEquals([at.pk for at in dog.get_possible_attributetypes],
+                          [self.attributetype.pk])
+        self.assertEquals(self.get(self.plant).get_possible_attributetypes,
+                          [])
+
+    def test_get_possible_reltypes(self):
+        reltypes = self.get(self.dog).get_possible_reltypes()
+        self.assertEquals([rt.pk for rt in reltypes['possible_rightroles']],
+                          [self.relationtype.pk])
+        self.assertEquals(reltypes['possible_leftroles'], [])
+
+    def test_get_possible_rels_and_attributes(self):
+        grass = Nodetype.objects.create(title='Grass', slug='grass')
+        relation = Relation.objects.create(
+            title='animal eats grass', left_subject=self.animal,
+            relationtype=self.relationtype, right_subject=grass)
+        attribute = Attribute.objects.create(
+            title='animal weight', subject=self.animal,
+            attributetype=self.attributetype, svalue='10')
+        dog = self.get(self.dog)
+        rels = dog.get_possible_rels
+        self.assertEquals([r.pk for r in rels['possible_rightroles']],
+                          [relation.pk])
+        self.assertEquals([a.pk for a in dog.get_possible_attributes],
+                          [attribute.pk])
+
+    def test_cache(self):
+        dog = self.get(self.dog)
+        dog.get_possible_attributetypes
+        dog = self.get(self.dog)
+        with self.assertNumQueries(0):
+            dog.get_possible_attributetypes
+        Attributetype.objects.create(title='height', slug='height',
+                                     subjecttype=self.mammal)
+        dog = self.get(self.dog)
+        self.assertEquals(len(dog.get_possible_attributetypes), 2)
+
+    def test_cache_copies(self):
+        dog = self.get(self.dog)
+        dog.get_possible_attributetypes.append(None)
+        self.assertEquals(len(dog.get_possible_attributetypes), 1)
+        reltypes = dog.get_possible_reltypes()
+        reltypes['possible_rightroles'].append(None)
+        self.assertEquals(
+            len(dog.get_possible_reltypes()['possible_rightroles']), 1)
+
+    def test_cache_size(self):
+        original_cache_size = inheritance.INHERITANCE_CACHE_SIZE
+        inheritance.INHERITANCE_CACHE_SIZE = 2
+        try:
+            for nodetype in (self.dog, self.mammal, self.animal):
+                self.get(nodetype).get_possible_attributetypes
+                self.assertTrue(len(INHERITANCE_CACHE['entries']) <= 2)
+        finally:
+            inheritance.INHERITANCE_CACHE_SIZE = original_cache_size
@@ -1,10 +1,14 @@
 """Test cases for Gstudio's Metatype"""
+from __future__ import with_statement
+from django.http import Http404
 from django.test import TestCase
+from django.core.exceptions import ValidationError
 from django.contrib.sites.models import Site
 
 from gstudio.models import Nodetype
 from gstudio.models import Metatype
 from gstudio.managers import PUBLISHED
+from gstudio.views.metatypes import get_metatype_or_404
 
 
 class MetatypeTestCase(TestCase):
@@ -50,3 +54,38 @@ class MetatypeTestCase(TestCase):
         self.metatypes[1].parent = self.metatypes[0]
         self.metatypes[1].save()
         self.assertEqual(self.metatypes[1].tree_path, 'metatype-1/metatype-2')
+
+    def test_nodetypes_tree_path_descendants(self):
+        child = Metatype.objects.create(title='Metatype 3', slug='metatype-3',
+                                        parent=self.metatypes[1])
+        self.assertEqual(child.tree_path, 'metatype-2/metatype-3')
+        self.metatypes[1].parent = self.metatypes[0]
+        self.metatypes[1].save()
+        child = Metatype.objects.get(pk=child.pk)
+        self.assertEqual(child.tree_path, 'metatype-1/metatype-2/metatype-3')
+        self.metatypes[0].slug = 'root'
+        self.metatypes[0].save()
+        child = Metatype.objects.get(pk=child.pk)
+        self.assertEqual(child.tree_path, 'root/metatype-2/metatype-3')
+        with self.assertNumQueries(0):
+            child.get_absolute_url()
+
+    def test_nodetypes_tree_path_length(self):
+        root = Metatype.objects.create(title='Root', slug='r' * 100)
+        child = Metatype.objects.create(title='Child', slug='c' * 150,
+                                        parent=root)
+        self.assertEqual(len(child.tree_path), 251)
+        self.assertRaises(ValidationError, Metatype.objects.create,
+                          title='Grandchild', slug='g' * 10, parent=child)
+        root.slug = 'r' * 110
+        self.assertRaises(ValidationError, root.clean)
+        self.assertRaises(ValidationError, root.save)
+        child = Metatype.objects.get(pk=child.pk)
+        self.assertEqual(len(child.tree_path), 251)
+
+    def test_get_metatype_or_404(self):
+        self.metatypes[1].parent = self.metatypes[0]
+        self.metatypes[1].save()
+        self.assertEqual(get_metatype_or_404('metatype-1/metatype-2/'),
+                         self.metatypes[1])
+        self.assertRaises(Http404, get_metatype_or_404, 'metatype-2')
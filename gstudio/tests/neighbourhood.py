@@ -0,0 +1,99 @@
+"""Test cases for Gstudio's neighbourhood loader"""
+from django.db import connection
+from django.test import TestCase
+from django.contrib.auth.models import User
+
+from gstudio.models import Metatype
+from gstudio.models import Nodetype
+from gstudio.models import Relation
+from gstudio.models import Relationtype
+from gstudio import neighbourhood
+from gstudio.neighbourhood import load_neighbourhoods
+
+
+class NeighbourhoodTestCase(TestCase):
+    """Test cases for the neighbourhood loader"""
+
+    def setUp(self):
+        self.parent = Nodetype.objects.create(title='Animal', slug='animal')
+        self.nodetype = Nodetype.objects.create(title='Dog', slug='dog',
+                                                parent=self.parent)
+        self.sibling = Nodetype.objects.create(title='Cat', slug='cat',
+                                               parent=self.parent)
+        self.metatype = Metatype.objects.create(title='Concept',
+                                                slug='concept')
+        self.nodetype.metatypes.add(self.metatype)
+        self.author = User.objects.create_user(username='webmaster',
+                                               email='webmaster@example.com')
+        self.nodetype.authors.add(self.author)
+        self.relationtype = Relationtype.objects.create(
+            title='chases', inverse='is chased by', slug='chases',
+            left_subjecttype=self.parent, right_subjecttype=self.parent)
+        Relation.objects.create(title='dog chases cat',
+                                left_subject=self.nodetype,
+                                relationtype=self.relationtype,
+                                right_subject=self.sibling)
+
+    def count_queries(self, nodetypes):
+        connection.use_debug_cursor = True
+        start = len(connection.queries)
+        try:
+            load_neighbourhoods(nodetypes)
+        finally:
+            connection.use_debug_cursor = None
+        return len(connection.queries) - start
+
+    def test_load_neighbourhoods(self):
+        neighbourhoods = load_neighbourhoods([self.nodetype, self.sibling])
+        nbh = neighbourhoods[self.nodetype.pk]
+        self.assertEquals([n.title for n in nbh['type_of']], ['Animal'])
+        self.assertEquals([n.title for n in nbh['siblings']], ['Cat'])
+        self.assertEquals([n.title for n in nbh['member_of_metatypes']],
+                          ['Concept'])
+        self.assertEquals([n.title for n in nbh['authors']], ['webmaster'])
+        self.assertEquals([n.title for n in nbh['relations']['chases']],
+                          ['Cat'])
+        self.assertEquals(nbh['type_of'][0].get_absolute_url(),
+                          self.parent.get_absolute_url())
+        nbh = neighbourhoods[self.sibling.pk]
+        self.assertEquals([n.title for n in nbh['relations']['is chased by']],
+                          ['Dog'])
+        nbh = load_neighbourhoods([self.parent])[self.parent.pk]
+        self.assertEquals(sorted([n.title for n in nbh['contains_subtypes']]),
+                          ['Cat', 'Dog'])
+        self.assertEquals([n.title for n in nbh['left_subjecttype_of']],
+                          ['chases'])
+        self.assertEquals(load_neighbourhoods([]), {})
+
+    def test_load_neighbourhoods_queries(self):
+        queries = self.count_queries([self.nodetype])
+        for i in range(5):
+            nodetype = Nodetype.objects.create(
+                title='Dog %i' % i, slug='dog-%i' % i, parent=self.parent)
+            nodetype.metatypes.add(self.metatype)
+            nodetype.authors.add(self.author)
+            nodetype.prior_nodes.add(self.nodetype)
+        nodetypes = list(Nodetype.objects.filter(parent=self.parent))
+        self.assertEquals(len(nodetypes), 7)
+        self.assertEquals(self.count_queries(nodetypes), queries)
+
+    def test_load_neighbourhoods_root_siblings(self):
+        for title in ('Plant', 'Mineral'):
+            Nodetype.objects.create(title=title, slug=title.lower())
+        nbh = load_neighbourhoods([self.parent])[self.parent.pk]
+        self.assertEquals(sorted([n.title for n in nbh['siblings']]),
+                          ['Mineral', 'Plant'])
+        original_root_siblings = neighbourhood.NEIGHBOURHOOD_ROOT_SIBLINGS
+        neighbourhood.NEIGHBOURHOOD_ROOT_SIBLINGS = 1
+        try:
+            nbh = load_neighbourhoods([self.parent])[self.parent.pk]
+            self.assertEquals(len(nbh['siblings']), 1)
+        finally:
+            neighbourhood.NEIGHBOURHOOD_ROOT_SIBLINGS = original_root_siblings
+
+    def test_get_rendered_nbh(self):
+        nbh = self.nodetype.get_rendered_nbh
+        self.assertEquals(nbh['type_of'],
+                          {'Animal': self.parent.get_absolute_url()})
+        self.assertEquals(nbh['relations'].keys(), ['chases'])
+        self.assertTrue(self.nodetype.get_rendered_nbh is nbh)
@@ -0,0 +1,42 @@
+"""Test cases for Gstudio's NID"""
+from __future__ import with_statement
+from django.test import TestCase
+
+from gstudio.models import NID
+from gstudio.models import Metatype
+from gstudio.models import Nodetype
+from gstudio.models import Objecttype
+
+
+class NIDTestCase(TestCase):
+    """Test cases for the resolution of the NIDs"""
+
+    def setUp(self):
+        self.objecttype = Objecttype.objects.create(
+            title='My objecttype', content='My content',
+            slug='my-objecttype')
+        self.metatype = Metatype.objects.create(
+            title='My metatype', slug='my-metatype')
+
+    def test_nodemodel(self):
+        self.assertEquals(self.objecttype.nodemodel, 'gstudio.objecttype')
+        self.assertEquals(self.metatype.nodemodel, 'gstudio.metatype')
+        nodetype = Nodetype.objects.get(pk=self.objecttype.pk)
+        nodetype.save()
+        self.assertEquals(NID.objects.get(
+            pk=self.objecttype.pk).nodemodel, 'gstudio.objecttype')
+
+    def test_ref(self):
+        nid = NID.objects.get(pk=self.objecttype.pk)
+        self.assertEquals(nid.ref.__class__, Objecttype)
+        self.assertEquals(nid.ref, self.objecttype)
+        self.assertEquals(self.metatype.ref, self.metatype)
+        NID.objects.filter(pk=self.metatype.pk).update(nodemodel='')
+        self.assertEquals(NID.objects.get(pk=self.metatype.pk).ref, None)
+
+    def test_refs(self):
+        with self.assertNumQueries(3):
+            refs = NID.objects.refs([self.objecttype.pk, self.metatype.pk])
+        self.assertEquals(refs[self.objecttype.pk].__class__, Objecttype)
+        self.assertEquals(refs[self.metatype.pk].__class__, Metatype)
+        self.assertEquals(NID.objects.refs([]), {})
@@ -16,6 +16,8 @@ from gstudio import models
 from gstudio.models import Nodetype
 from gstudio.managers import PUBLISHED
 from gstudio.models import get_base_model
+from gstudio.rendering import get_rendering_key
+from gstudio.rendering import render_stored_contents
 from gstudio.models import Nodetype
 from gstudio import models as models_settings
 from gstudio import url_shortener as shortener_settings
@@ -258,6 +260,36 @@ class NodetypeHtmlContentTestCase(TestCase):
         except AssertionError:
             self.assertEquals(html_content, self.nodetype.content)
 
+    def test_rendered_content(self):
+        models_settings.MARKUP_LANGUAGE = None
+        self.nodetype.content = '<p>My <a href="http://example.com/">' \
+                                'content</a> <img src="/image.png" /></p>'
+        self.nodetype.save()
+        nodetype = Nodetype.objects.get(pk=self.nodetype.pk)
+        self.assertEquals(nodetype.rendered_content, self.nodetype.content)
+        self.assertEquals(nodetype.rendered_word_count, 2)
+        self.assertEquals(nodetype.links, ['http://example.com/'])
+        self.assertEquals(nodetype.content_image, '/image.png')
+
+        nodetype.rendered_content = 'Stored'
+        self.assertEquals(nodetype.html_content, 'Stored')
+        nodetype.content = 'Changed content'
+        self.assertEquals(nodetype.html_content, '<p>Changed content</p>')
+        self.assertEquals(nodetype.word_count, 2)
+        self.assertEquals(nodetype.links, [])
+
+    def test_render_stored_contents(self):
+        models_settings.MARKUP_LANGUAGE = None
+        self.nodetype.save()
+        self.assertEquals(render_stored_contents(Nodetype, None), 0)
+        self.assertEquals(render_stored_contents(
+            Nodetype, None, processes=1, force=True), 1)
+        self.assertEquals(render_stored_contents(
+            Nodetype, 'markdown', processes=1), 1)
+        self.assertEquals(Nodetype.objects.get(
+            pk=self.nodetype.pk).rendered_key, get_rendering_key(
+            self.nodetype.content, 'markdown'))
+
 # this class can be removed since the base abstract class is no longer present.
 class NodetypeGetBaseModelTestCase(TestCase):
 
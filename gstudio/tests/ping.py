@@ -1,13 +1,23 @@
 """Test cases for Gstudio's ping"""
 import cStringIO
+import threading
+from datetime import datetime
 from urllib2 import URLError
 from urllib import addinfourl
+from SimpleXMLRPCServer import SimpleXMLRPCServer
 from django.test import TestCase
 
+from gstudio import ping_queue
 from gstudio.models import Nodetype
+from gstudio.models import QueuedPing
+from gstudio.models import PingbackDiscovery
+from gstudio.managers import PUBLISHED
+from gstudio.ping import read_head
 from gstudio.ping import URLRessources
 from gstudio.ping import DirectoryPinger
 from gstudio.ping import ExternalUrlsPinger
+from gstudio.ping_queue import enqueue_ping
+from gstudio.ping_queue import process_ping_queue
 
 
 class DirectoryPingerTestCase(TestCase):
@@ -86,7 +96,7 @@ class ExternalUrlsPingerTestCase(TestCase):
         """)
         self.assertEquals(result, None)
 
-    def fake_urlopen(self, url):
+    def fake_urlopen(self, url, timeout=None):
         """Fake urlopen using test client"""
         if 'example' in url:
             response = cStringIO.StringIO('')
@@ -114,10 +124,144 @@ class ExternalUrlsPingerTestCase(TestCase):
             self.pinger.find_pingback_urls(urls),
             {'http://localhost/': 'http://localhost/xmlrpc/',
              'http://example.com/': 'http://example.com/xmlrpc.php'})
+        self.assertEquals(PingbackDiscovery.objects.count(), 4)
+        self.assertEquals(PingbackDiscovery.objects.get(
+            url='http://error').error, '<urlopen error Invalid ressource>')
+
+        # The urls discovered are not fetched again
+        def failing_urlopen(url, timeout=None):
+            raise URLError('Fetched again')
+        gstudio.ping.urlopen = failing_urlopen
+        self.assertEquals(
+            self.pinger.find_pingback_urls(urls),
+            {'http://localhost/': 'http://localhost/xmlrpc/',
+             'http://example.com/': 'http://example.com/xmlrpc.php'})
+        PingbackDiscovery.objects.filter(url='http://localhost/').update(
+            expiration=datetime.now())
+        self.assertEquals(
+            self.pinger.find_pingback_urls(urls),
+            {'http://example.com/': 'http://example.com/xmlrpc.php'})
         # Remove stub
         gstudio.ping.urlopen = self.original_urlopen
 
+    def test_read_head(self):
+        page = cStringIO.StringIO('<html><head><link rel="pingback" />'
+                                  '</head><body>%s</body></html>' % (
+                                      'x' * 10000))
+        self.assertEquals(read_head(page, chunk_size=16),
+                          '<html><head><link rel="pingback" /></head><body>')
+        page = cStringIO.StringIO('x' * 10000)
+        self.assertEquals(len(read_head(page, max_bytes=100)), 100)
+
     def test_pingback_url(self):
         self.assertEquals(self.pinger.pingback_url('http://localhost',
                                                    'http://error.com'),
                           'http://error.com cannot be pinged.')
+
+
+class PingQueueTestCase(TestCase):
+    """Test cases for the queue of the pings, sent
+    to a local XML-RPC server"""
+
+    def setUp(self):
+        self.pings = []
+        self.reply = {'flerror': False, 'message': 'Thanks for the ping.'}
+        self.server = SimpleXMLRPCServer(('127.0.0.1', 0),
+                                         logRequests=False)
+        self.server.register_function(self.fake_extended_ping,
+                                      'weblogUpdates.extendedPing')
+        self.server.register_function(self.fake_pingback,
+                                      'pingback.ping')
+        self.server_url = 'http://127.0.0.1:%i/' % \
+                          self.server.server_address[1]
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        import gstudio.ping
+        self.original_urlopen = gstudio.ping.urlopen
+        gstudio.ping.urlopen = self.fake_urlopen
+
+        params = {'title': 'My nodetype',
+                  'content': '<p><a href="http://external.com/">link</a></p>',
+                  'status': PUBLISHED,
+                  'slug': 'my-nodetype'}
+        self.nodetype = Nodetype.objects.create(**params)
+        self.nodetype_url = '%s%s' % (URLRessources().site_url,
+                                      self.nodetype.get_absolute_url())
+
+    def tearDown(self):
+        import gstudio.ping
+        gstudio.ping.urlopen = self.original_urlopen
+        self.server.shutdown()
+        self.server.server_close()
+
+    def fake_extended_ping(self, name, blog_url, nodetype_url,
+                           feed_url, metatypes):
+        self.pings.append(('directory', nodetype_url))
+        return self.reply
+
+    def fake_pingback(self, source, target):
+        self.pings.append(('pingback', source, target))
+        return 'Pingback registered.'
+
+    def fake_urlopen(self, url, timeout=None):
+        response = cStringIO.StringIO('')
+        return addinfourl(response, {'X-Pingback': self.server_url,
+                                     'Content-Type': 'text/html'}, url)
+
+    def test_process_ping_queue(self):
+        enqueue_ping(self.nodetype, self.server_url)
+        enqueue_ping(self.nodetype)
+        self.assertEquals(process_ping_queue(), (0, 0))
+        self.assertEquals(process_ping_queue(force=True), (2, 0))
+        self.assertEquals(sorted(self.pings), [
+            ('directory', self.nodetype_url),
+            ('pingback', self.nodetype_url, 'http://external.com/')])
+        self.assertEquals(QueuedPing.objects.count(), 0)
+
+    def test_enqueue_ping_merged(self):
+        queued_ping = enqueue_ping(self.nodetype, self.server_url)
+        enqueue_ping(self.nodetype, self.server_url)
+        self.assertEquals(QueuedPing.objects.count(), 1)
+        self.assertEquals(QueuedPing.objects.get().next_attempt,
+                          queued_ping.next_attempt)
+        self.assertEquals(process_ping_queue(force=True), (1, 0))
+        self.assertEquals(len(self.pings), 1)
+
+    def test_ping_retried(self):
+        self.reply = {'flerror': True, 'message': 'Busy'}
+        enqueue_ping(self.nodetype, self.server_url)
+        self.assertEquals(process_ping_queue(force=True), (0, 1))
+        queued_ping = QueuedPing.objects.get()
+        self.assertEquals(queued_ping.attempts, 1)
+        self.assertEquals(queued_ping.last_error, 'Busy')
+        self.assertTrue(queued_ping.next_attempt > datetime.now())
+        self.assertEquals(process_ping_queue(), (0, 0))
+
+        QueuedPing.objects.update(attempts=ping_queue.PING_MAX_ATTEMPTS - 1)
+        self.assertEquals(process_ping_queue(force=True), (0, 1))
+        self.assertEquals(QueuedPing.objects.count(), 0)
+
+    def test_ping_failed(self):
+        def failing_ping_host(task, transports):
+            raise ValueError('Host unreachable')
+
+        original_ping_host = ping_queue.ping_host
+        ping_queue.ping_host = failing_ping_host
+        try:
+            enqueue_ping(self.nodetype, self.server_url)
+            self.assertEquals(process_ping_queue(force=True), (0, 1))
+        finally:
+            ping_queue.ping_host = original_ping_host
+        self.assertEquals(QueuedPing.objects.get().last_error,
+                          'Host unreachable')
+
+    def test_ping_claimed(self):
+        enqueue_ping(self.nodetype, self.server_url)
+        queued_ping = QueuedPing.objects.get()
+        now = datetime.now()
+        self.assertEquals(ping_queue.claim_pings([queued_ping], now),
+                          [queued_ping])
+        self.assertEquals(ping_queue.claim_pings([queued_ping], now), [])
+        self.assertEquals(process_ping_queue(), (0, 0))
@@ -6,6 +6,7 @@ from urllib2 import HTTPError
 from xmlrpclib import ServerProxy
 
 from django.test import TestCase
+from django.core.cache import cache
 from django.contrib import comments
 from django.contrib.auth.models import User
 from django.contrib.sites.models import Site
@@ -17,7 +18,12 @@ from gstudio.models import Nodetype
 from gstudio.models import Metatype
 from gstudio.managers import PUBLISHED
 from gstudio.tests.utils import TestTransport
+from gstudio.xmlrpc import pingback
+from gstudio.xmlrpc.pingback import read_source
+from gstudio.xmlrpc.pingback import parse_source
+from gstudio.xmlrpc.pingback import verify_pingback
 from gstudio.xmlrpc.pingback import generate_pingback_content
+from gstudio.current_site import clear_site_cache
 from gstudio import url_shortener as shortener_settings
 
 
@@ -25,7 +31,7 @@ class PingBackTestCase(TestCase):
     """Test cases for pingbacks"""
     urls = 'gstudio.tests.urls'
 
-    def fake_urlopen(self, url):
+    def fake_urlopen(self, url, timeout=None):
         """Fake urlopen using client if domain
         correspond to current_site else HTTPError"""
         scheme, netloc, path, query, fragment = urlsplit(url)
@@ -45,6 +51,8 @@ class PingBackTestCase(TestCase):
         import gstudio.xmlrpc.pingback
         self.original_urlopen = gstudio.xmlrpc.pingback.urlopen
         gstudio.xmlrpc.pingback.urlopen = self.fake_urlopen
+        # Forget the pingbacks and the rates cached by the other tests
+        cache.clear()
         # Preparing site
         self.site = Site.objects.get_current()
         self.site.domain = 'localhost:8000'
@@ -86,6 +94,8 @@ class PingBackTestCase(TestCase):
         import gstudio.xmlrpc.pingback
         gstudio.xmlrpc.pingback.urlopen = self.original_urlopen
         shortener_settings.URL_SHORTENER_BACKEND = self.original_shortener
+        # The domain of the site is restored by the rollback
+        clear_site_cache()
 
     def test_generate_pingback_content(self):
         soup = BeautifulSoup(self.second_nodetype.content)
@@ -204,3 +214,101 @@ class PingBackTestCase(TestCase):
         self.assertEquals(response, [
             'http://localhost:8000/2010/01/01/my-second-nodetype/',
             'http://example.com/blog/1/'])
+
+    def test_read_source(self):
+        document = '<html><head><title>Source</title></head><body>%s' \
+                   '<p>A <a href="http://target/">link</a></p>' \
+                   '</body></html>' % ('x' * 20000)
+        pingback.urlopen = lambda url, timeout: cStringIO.StringIO(document)
+
+        self.assertEquals(read_source('http://source/', 'http://target/',
+                                      max_bytes=1000), None)
+        self.assertEquals(read_source('http://source/', 'http://other/'),
+                          None)
+        document, position = read_source('http://source/', 'http://target/',
+                                         chunk_size=1000)
+        self.assertTrue(document[position:].startswith('http://target/'))
+        title, soup = parse_source(document, position)
+        self.assertEquals(title.string, 'Source')
+        self.assertEquals(generate_pingback_content(
+            soup, 'http://target/', 100), 'A link')
+
+    def test_pingback_ping_cached(self):
+        target = 'http://%s%s' % (
+            self.site.domain, self.first_nodetype.get_absolute_url())
+        source = 'http://%s%s' % (
+            self.site.domain, self.second_nodetype.get_absolute_url())
+
+        response = self.server.pingback.ping(source, target)
+        self.assertEquals(
+            response, 'Pingback from %s to %s registered.' % (source, target))
+        response = self.server.pingback.ping('http://example.com/', target)
+        self.assertEquals(response, 16)
+
+        def failing_urlopen(url, timeout=None):
+            raise HTTPError(url, 500, 'fetched again', {}, None)
+        pingback.urlopen = failing_urlopen
+        response = self.server.pingback.ping(source, target)
+        self.assertEquals(response, 48)
+        response = self.server.pingback.ping('http://example.com/', target)
+        self.assertEquals(response, 16)
+
+    def test_pingback_errors_cached_shortly(self):
+        target = 'http://%s%s' % (
+            self.site.domain, self.first_nodetype.get_absolute_url())
+        original_timeout = pingback.PINGBACK_ERROR_CACHE_TIMEOUT
+        pingback.PINGBACK_ERROR_CACHE_TIMEOUT = -1
+        try:
+            response = self.server.pingback.ping('http://example.com/',
+                                                 target)
+            self.assertEquals(response, 16)
+            self.assertEquals(cache.get(pingback.PINGBACK_CACHE_KEY % (
+                pingback.get_hash('http://example.com/', target))), None)
+        finally:
+            pingback.PINGBACK_ERROR_CACHE_TIMEOUT = original_timeout
+
+    def test_pingback_rate_limit(self):
+        target = 'http://%s%s' % (
+            self.site.domain, self.first_nodetype.get_absolute_url())
+        original_rate_limit = pingback.PINGBACK_RATE_LIMIT
+        pingback.PINGBACK_RATE_LIMIT = 2
+        try:
+            response = self.server.pingback.ping('http://example.com/1/',
+                                                 target)
+            self.assertEquals(response, 16)
+            response = self.server.pingback.ping('http://example.com/2/',
+                                                 target)
+            self.assertEquals(response, 16)
+            response = self.server.pingback.ping('http://example.com/3/',
+                                                 target)
+            self.assertEquals(response, 0)
+        finally:
+            pingback.PINGBACK_RATE_LIMIT = original_rate_limit
+
+    def test_pingback_deferred(self):
+        target = 'http://%s%s' % (
+            self.site.domain, self.first_nodetype.get_absolute_url())
+        source = 'http://%s%s' % (
+            self.site.domain, self.second_nodetype.get_absolute_url())
+        jobs = []
+        original_deferred = pingback.PINGBACK_DEFERRED
+        original_defer_pingback = pingback.defer_pingback
+        pingback.defer_pingback = lambda *job: jobs.append(job)
+        pingback.PINGBACK_DEFERRED = True
+        try:
+            response = self.server.pingback.ping(source, target)
+            self.assertEquals(
+                response, 'Pingback from %s to %s queued.' % (source, target))
+            response = self.server.pingback.ping(source,
+                                                 'http://example.com/')
+            self.assertEquals(response, 32)
+            self.assertEquals(jobs, [(source, target)])
+        finally:
+            pingback.defer_pingback = original_defer_pingback
+            pingback.PINGBACK_DEFERRED = original_deferred
+
+        self.assertEquals(self.first_nodetype.pingbacks.count(), 0)
+        self.assertEquals(
+            verify_pingback(source, target),
+            'Pingback from %s to %s registered.' % (source, target))
+        self.assertEquals(self.first_nodetype.pingbacks.count(), 1)
@@ -0,0 +1,95 @@
+"""Test cases for Gstudio's publication index"""
+from datetime import datetime
+from datetime import timedelta
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+
+from gstudio.models import Author
+from gstudio.models import Nodetype
+from gstudio.models import Publication
+from gstudio.managers import DRAFT
+from gstudio.managers import PUBLISHED
+from gstudio.publication import update_publications
+from gstudio.publication import rebuild_publications
+
+
+class PublicationTestCase(TestCase):
+    """Test cases for the publication index"""
+
+    def setUp(self):
+        self.sites = [
+            Site.objects.get_current(),
+            Site.objects.create(domain='http://domain.com',
+                                name='Domain.com')]
+        self.author = User.objects.create_user(
+            username='webmaster', email='webmaster@example.com')
+        self.nodetype = Nodetype.objects.create(
+            title='My nodetype', content='My content',
+            slug='my-nodetype', status=PUBLISHED)
+        self.nodetype.authors.add(self.author)
+
+    def get_sites(self, nodetype):
+        return sorted(Publication.objects.filter(
+            nodetype=nodetype).values_list('site', flat=True))
+
+    def test_sites_changed(self):
+        self.assertEquals(self.get_sites(self.nodetype), [])
+        self.nodetype.sites.add(*self.sites)
+        self.assertEquals(self.get_sites(self.nodetype),
+                          [site.pk for site in self.sites])
+        self.nodetype.sites.remove(self.sites[1])
+        self.assertEquals(self.get_sites(self.nodetype), [self.sites[0].pk])
+        self.nodetype.sites.clear()
+        self.assertEquals(self.get_sites(self.nodetype), [])
+
+    def test_reverse_sites_changed(self):
+        site = self.sites[1]
+        site.nodetypes.add(self.nodetype)
+        self.assertEquals(self.get_sites(self.nodetype), [site.pk])
+        site.nodetypes.remove(self.nodetype)
+        self.assertEquals(self.get_sites(self.nodetype), [])
+        site.nodetypes.add(self.nodetype)
+        site.nodetypes.clear()
+        self.assertEquals(self.get_sites(self.nodetype), [])
+
+    def test_nodetype_saved(self):
+        self.nodetype.sites.add(self.sites[0])
+        self.assertEquals(Nodetype.published.count(), 1)
+        self.assertEquals(Author.published.count(), 1)
+
+        self.nodetype.end_publication = datetime.now() - timedelta(days=1)
+        self.nodetype.save()
+        publication = Publication.objects.get(nodetype=self.nodetype)
+        self.assertEquals(publication.end_publication,
+                          self.nodetype.end_publication)
+        self.assertEquals(Nodetype.published.count(), 0)
+        self.assertEquals(Author.published.count(), 0)
+
+        self.nodetype.end_publication = datetime(2042, 3, 15)
+        self.nodetype.status = DRAFT
+        self.nodetype.save()
+        self.assertEquals(self.get_sites(self.nodetype), [])
+        self.assertEquals(Nodetype.published.count(), 0)
+
+        Nodetype.objects.filter(pk=self.nodetype.pk).update(status=PUBLISHED)
+        update_publications(Nodetype.objects.all())
+        self.assertEquals(self.get_sites(self.nodetype), [self.sites[0].pk])
+        self.assertEquals(Nodetype.published.count(), 1)
+
+    def test_published_on_current_site_only(self):
+        self.nodetype.sites.add(self.sites[1])
+        self.assertEquals(Nodetype.published.count(), 0)
+        self.nodetype.sites.add(self.sites[0])
+        self.assertEquals(Nodetype.published.count(), 1)
+        self.assertEquals(Author.published.count(), 1)
+
+    def test_rebuild_publications(self):
+        self.nodetype.sites.add(*self.sites)
+        Publication.objects.all().delete()
+        self.assertEquals(Nodetype.published.count(), 0)
+        self.assertEquals(rebuild_publications(), 2)
+        self.assertEquals(self.get_sites(self.nodetype),
+                          [site.pk for site in self.sites])
+        self.assertEquals(Nodetype.published.count(), 1)
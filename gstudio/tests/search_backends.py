@@ -0,0 +1,174 @@
+"""Test cases for Gstudio's search backends"""
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+
+from django.core.management import call_command
+
+from gstudio import search_backends
+from gstudio.models import Nodetype
+from gstudio.models import Metatype
+from gstudio.models import SearchPosting
+from gstudio.models import SearchQueue
+from gstudio.models import SearchDocument
+from gstudio.models import Attribute
+from gstudio.models import Attributetype
+from gstudio.managers import DRAFT
+from gstudio.managers import PUBLISHED
+from gstudio.search_backends import index
+from gstudio.search_backends.index import backend
+from gstudio.search_backends.index import get_document_terms
+from gstudio.indexing import iter_chunks
+from gstudio.indexing import process_queue
+
+
+class SearchBackendTestCase(TestCase):
+    """Test cases for the inverted index search backend"""
+
+    def setUp(self):
+        self.site = Site.objects.get_current()
+        self.author = User.objects.create_user(
+            username='webmaster', email='webmaster@example.com')
+        self.metatype = Metatype.objects.create(title='Animals',
+                                                slug='animals')
+        self.nodetypes = []
+        for title, content, tags in (
+            ('Python snake', 'The python is a snake.', 'reptile'),
+            ('Snake charmer', 'A charmer with a python snake, a python '
+             'charming snake.', 'music'),
+            ('Django reinhardt', 'Jazz guitar player.', 'music, jazz')):
+            nodetype = Nodetype.objects.create(
+                title=title, content=content, tags=tags,
+                slug=title.lower().replace(' ', '-'), status=PUBLISHED)
+            nodetype.sites.add(self.site)
+            self.nodetypes.append(nodetype)
+        self.nodetypes[0].authors.add(self.author)
+        self.nodetypes[0].metatypes.add(self.metatype)
+        backend.index(self.nodetypes)
+
+    def search(self, pattern):
+        return [nodetype.title for nodetype in
+                backend.search(Nodetype.published.all(), pattern)]
+
+    def test_get_document_terms(self):
+        frequencies, length = get_document_terms(self.nodetypes[0])
+        self.assertEquals(frequencies['python'], 3)
+        self.assertEquals(frequencies['snake'], 3)
+        self.assertEquals(frequencies['author:webmaster'], 1)
+        self.assertEquals(frequencies['metatype:animals'], 1)
+        self.assertEquals(frequencies['tag:reptile'], 1)
+        self.assertEquals(length, 7)
+
+    def test_index(self):
+        self.assertEquals(SearchDocument.objects.count(), 3)
+        postings = SearchPosting.objects.filter(
+            document=self.nodetypes[2].pk).count()
+        self.nodetypes[2].content = 'Jazz manouche guitar player.'
+        self.nodetypes[2].save()
+        backend.index([self.nodetypes[2]])
+        self.assertEquals(SearchPosting.objects.filter(
+            document=self.nodetypes[2].pk).count(), postings + 1)
+        backend.unindex([self.nodetypes[2].pk])
+        self.assertEquals(SearchDocument.objects.count(), 2)
+        self.assertEquals(SearchPosting.objects.filter(
+            document=self.nodetypes[2].pk).count(), 0)
+
+    def test_search_ranking(self):
+        self.assertEquals(self.search('python'),
+                          ['Python snake', 'Snake charmer'])
+        self.assertEquals(self.search('python or jazz'),
+                          ['Django reinhardt', 'Python snake',
+                           'Snake charmer'])
+        self.assertEquals(self.search('nothing'), [])
+
+    def test_search_max_results(self):
+        original_max_results = index.SEARCH_MAX_RESULTS
+        index.SEARCH_MAX_RESULTS = 1
+        try:
+            self.assertEquals(self.search('python'), ['Python snake'])
+            self.nodetypes[0].status = DRAFT
+            self.nodetypes[0].save()
+            self.assertEquals(self.search('python'), ['Snake charmer'])
+        finally:
+            index.SEARCH_MAX_RESULTS = original_max_results
+
+    def test_search_grammar(self):
+        self.assertEquals(self.search('charm*'), ['Snake charmer'])
+        self.assertEquals(self.search('snake -charmer'), ['Python snake'])
+        self.assertEquals(self.search('author:webmaster'), ['Python snake'])
+        self.assertEquals(self.search('metatype:animals'), ['Python snake'])
+        self.assertEquals(self.search('tag:music jazz'),
+                          ['Django reinhardt'])
+        self.assertEquals(self.search('"python snake"'),
+                          ['Python snake', 'Snake charmer'])
+        self.assertEquals(self.search('"snake python"'), [])
+        self.assertEquals(len(self.search('-python')), 1)
+
+
+class SearchIndexingTestCase(TestCase):
+    """Test cases for the incremental indexing"""
+
+    def setUp(self):
+        self.original_backend = search_backends.SEARCH_BACKEND
+        search_backends.SEARCH_BACKEND = 'gstudio.search_backends.index'
+        self.nodetype = Nodetype.objects.create(
+            title='Python snake', content='A reptile.', slug='python')
+
+    def tearDown(self):
+        search_backends.SEARCH_BACKEND = self.original_backend
+
+    def test_queue(self):
+        self.assertEquals(SearchQueue.objects.filter(
+            node_id=self.nodetype.pk).count(), 1)
+        self.nodetype.save()
+        self.assertEquals(process_queue(), 2)
+        self.assertEquals(SearchQueue.objects.count(), 0)
+        self.assertEquals(process_queue(), 0)
+        self.assertTrue(SearchPosting.objects.filter(
+            document=self.nodetype.pk, term='reptile').count())
+
+        length = Attributetype.objects.create(
+            title='length', slug='length', subjecttype=self.nodetype)
+        Attribute.objects.create(title='python length',
+                                 subject=self.nodetype,
+                                 attributetype=length, svalue='sixmeters')
+        process_queue()
+        self.assertTrue(SearchPosting.objects.filter(
+            document=self.nodetype.pk, term='sixmeters').count())
+
+        pk = self.nodetype.pk
+        self.nodetype.delete()
+        process_queue()
+        self.assertEquals(SearchDocument.objects.filter(pk=pk).count(), 0)
+        self.assertEquals(SearchQueue.objects.count(), 0)
+
+    def test_iter_chunks(self):
+        for i in range(4):
+            Nodetype.objects.create(title='Nodetype %i' % i,
+                                    slug='nodetype-%i' % i)
+        chunks = list(iter_chunks(Nodetype.objects.all(), 2))
+        self.assertEquals([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEquals([nodetype.pk for chunk in chunks
+                           for nodetype in chunk],
+                          list(Nodetype.objects.order_by(
+                              'pk').values_list('pk', flat=True)))
+
+    def test_rebuild_index(self):
+        call_command('rebuild_index', clear=True, verbosity=0)
+        self.assertEquals(SearchQueue.objects.count(), 0)
+        self.assertEquals(SearchDocument.objects.count(),
+                          Nodetype.objects.count())
+        self.assertEquals([nodetype.title for nodetype in backend.search(
+            Nodetype.objects.all(), 'reptile')], ['Python snake'])
+
+    def test_rebuild_index_queue(self):
+        process_queue()
+        pk = self.nodetype.pk
+        self.nodetype.delete()
+        Nodetype.objects.create(title='Boa', content='A reptile.',
+                                slug='boa')
+        call_command('rebuild_index', verbosity=0)
+        self.assertEquals(list(SearchQueue.objects.values_list(
+            'node_id', flat=True)), [pk])
+        process_queue()
+        self.assertEquals(SearchDocument.objects.filter(pk=pk).count(), 0)
@@ -1,9 +1,16 @@
 """Test cases for Gstudio's signals"""
 from django.test import TestCase
+from django.dispatch import Signal
+from django.contrib.sites.models import Site
 
 from gstudio.models import Nodetype
+from gstudio.models import Metatype
+from gstudio.models import Objecttype
+from gstudio.models import QueuedPing
 from gstudio.managers import DRAFT
 from gstudio.managers import PUBLISHED
+from gstudio.signals import connect_senders
+from gstudio.signals import is_indexed_sender
 from gstudio.signals import disable_for_loaddata
 from gstudio.signals import ping_directories_handler
 from gstudio.signals import ping_external_urls_handler
@@ -27,16 +34,9 @@ class SignalsTestCase(TestCase):
         # Okay the command is executed
 
     def test_ping_directories_handler(self):
-        # Set up a stub around DirectoryPinger
-        self.top = 0
-
-        def fake_pinger(*ka, **kw):
-            self.top += 1
-
-        import gstudio.ping
         from gstudio import settings
-        self.original_pinger = gstudio.ping.DirectoryPinger
-        gstudio.ping.DirectoryPinger = fake_pinger
+        original_directories = settings.PING_DIRECTORIES
+        original_save_ping = settings.SAVE_PING_DIRECTORIES
 
         params = {'title': 'My nodetype',
                   'content': 'My content',
@@ -44,31 +44,27 @@ class SignalsTestCase(TestCase):
                   'slug': 'my-nodetype'}
         nodetype = Nodetype.objects.create(**params)
         self.assertEquals(nodetype.is_visible, True)
-        settings.PING_DIRECTORIES = ()
-        ping_directories_handler('sender', **{'instance': nodetype})
-        self.assertEquals(self.top, 0)
-        settings.PING_DIRECTORIES = ('toto',)
-        settings.SAVE_PING_DIRECTORIES = True
-        ping_directories_handler('sender', **{'instance': nodetype})
-        self.assertEquals(self.top, 1)
-        nodetype.status = DRAFT
-        ping_directories_handler('sender', **{'instance': nodetype})
-        self.assertEquals(self.top, 1)
-
-        # Remove stub
-        gstudio.ping.DirectoryPinger = self.original_pinger
+        try:
+            settings.PING_DIRECTORIES = ()
+            ping_directories_handler('sender', **{'instance': nodetype})
+            self.assertEquals(QueuedPing.objects.count(), 0)
+            settings.PING_DIRECTORIES = ('toto',)
+            settings.SAVE_PING_DIRECTORIES = True
+            ping_directories_handler('sender', **{'instance': nodetype})
+            ping_directories_handler('sender', **{'instance': nodetype})
+            self.assertEquals(QueuedPing.objects.filter(
+                directory='toto').count(), 1)
+            nodetype.status = DRAFT
+            QueuedPing.objects.all().delete()
+            ping_directories_handler('sender', **{'instance': nodetype})
+            self.assertEquals(QueuedPing.objects.count(), 0)
+        finally:
+            settings.PING_DIRECTORIES = original_directories
+            settings.SAVE_PING_DIRECTORIES = original_save_ping
 
     def test_ping_external_urls_handler(self):
-        # Set up a stub around ExternalUrlsPinger
-        self.top = 0
-
-        def fake_pinger(*ka, **kw):
-            self.top += 1
-
-        import gstudio.ping
         from gstudio import settings
-        self.original_pinger = gstudio.ping.ExternalUrlsPinger
-        gstudio.ping.ExternalUrlsPinger = fake_pinger
+        original_save_ping = settings.SAVE_PING_EXTERNAL_URLS
 
         params = {'title': 'My nodetype',
                   'content': 'My content',
@@ -76,15 +72,35 @@ class SignalsTestCase(TestCase):
                   'slug': 'my-nodetype'}
         nodetype = Nodetype.objects.create(**params)
         self.assertEquals(nodetype.is_visible, True)
-        settings.SAVE_PING_EXTERNAL_URLS = False
-        ping_external_urls_handler('sender', **{'instance': nodetype})
-        self.assertEquals(self.top, 0)
-        settings.SAVE_PING_EXTERNAL_URLS = True
-        ping_external_urls_handler('sender', **{'instance': nodetype})
-        self.assertEquals(self.top, 1)
-        nodetype.status = 0
-        ping_external_urls_handler('sender', **{'instance': nodetype})
-        self.assertEquals(self.top, 1)
-
-        # Remove stub
-        gstudio.ping.ExternalUrlsPinger = self.original_pinger
+        try:
+            settings.SAVE_PING_EXTERNAL_URLS = False
+            ping_external_urls_handler('sender', **{'instance': nodetype})
+            self.assertEquals(QueuedPing.objects.count(), 0)
+            settings.SAVE_PING_EXTERNAL_URLS = True
+            ping_external_urls_handler('sender', **{'instance': nodetype})
+            self.assertEquals(QueuedPing.objects.filter(
+                directory='').count(), 1)
+            nodetype.status = 0
+            QueuedPing.objects.all().delete()
+            ping_external_urls_handler('sender', **{'instance': nodetype})
+            self.assertEquals(QueuedPing.objects.count(), 0)
+        finally:
+            settings.SAVE_PING_EXTERNAL_URLS = original_save_ping
+
+    def test_connect_senders(self):
+        senders = []
+
+        def handler(sender, **kwargs):
+            senders.append(sender)
+
+        signal = Signal()
+        connect_senders(signal, handler, Nodetype, 'gstudio.test')
+        for sender in (Nodetype, Objecttype, Site):
+            signal.send(sender=sender)
+        self.assertEquals(senders, [Nodetype, Objecttype])
+
+    def test_is_indexed_sender(self):
+        self.assertTrue(is_indexed_sender(Nodetype))
+        self.assertTrue(is_indexed_sender(Objecttype))
+        self.assertFalse(is_indexed_sender(Metatype))
+        self.assertFalse(is_indexed_sender(Site))
@@ -0,0 +1,95 @@
+"""Test cases for Gstudio's similarity engine"""
+from django.test import TestCase
+from django.contrib.sites.models import Site
+
+from gstudio.models import Nodetype
+from gstudio.models import Similarity
+from gstudio.models import SimilarityDocument
+from gstudio.managers import DRAFT
+from gstudio.managers import PUBLISHED
+from gstudio.comparison import pearson_score
+from gstudio.similarity import build_matrix
+from gstudio.similarity import VectorStore
+from gstudio.similarity import update_similarities
+
+
+class SimilarityTestCase(TestCase):
+    """Test cases for the similarity engine"""
+
+    def setUp(self):
+        self.site = Site.objects.get_current()
+        self.nodetypes = [self.create_nodetype(title, content) for
+                          title, content in (
+            ('Python', 'python snake reptile scales'),
+            ('Cobra', 'cobra snake reptile venom'),
+            ('Jazz', 'jazz guitar music swing'),
+            ('Blues', 'blues guitar music'))]
+
+    def create_nodetype(self, title, content):
+        nodetype = Nodetype.objects.create(
+            title=title, content=content, status=PUBLISHED,
+            slug=title.lower())
+        nodetype.sites.add(self.site)
+        return nodetype
+
+    def get_similar(self, nodetype):
+        return list(Similarity.objects.filter(
+            node=nodetype.pk).values_list('similar', flat=True))
+
+    def test_build_matrix(self):
+        matrix = build_matrix([['a', 'b', 'b'], ['b', 'c'],
+                               ['d'], ['d'], ['e']])
+        self.assertEquals(matrix.shape, (5, 5))
+        self.assertEquals(sorted(matrix.toarray().sum(axis=1)),
+                          [1, 1, 1, 2, 3])
+
+    def test_scores(self):
+        documents = [['a', 'b', 'b', 'c'], ['a', 'b', 'c', 'c'],
+                     ['d', 'e'], ['e', 'e']]
+        matrix = VectorStore(range(4), documents, method='pearson')
+        dense = matrix.matrix.toarray().tolist()
+        scores = matrix.scores([0, 1])
+        for i in range(2):
+            for j in range(4):
+                self.assertAlmostEquals(
+                    scores[i, j],
+                    max(1.0 - pearson_score(dense[i], dense[j]), 0.0),
+                    places=5)
+
+        matrix = VectorStore(range(4), documents, method='cosine')
+        self.assertAlmostEquals(matrix.scores([0])[0, 0], 1.0)
+        self.assertEquals(matrix.scores([0])[0, 2], 0.0)
+        similar = dict(matrix.top_k([2]))[2]
+        self.assertEquals([pk for pk, score, label in similar], [3])
+        self.assertAlmostEquals(similar[0][1], 1.0 / 2 ** 0.5, places=5)
+
+    def test_top_k_by_label(self):
+        documents = [['a', 'b'], ['a', 'b', 'c'], ['a', 'c'],
+                     ['b', 'd'], ['d', 'e']]
+        store = VectorStore(range(5), documents,
+                            ['x', 'x', 'y', 'y', 'y'])
+        self.assertEquals(store.matrix.dtype.name, 'float32')
+        similar = dict(store.top_k([1], top_k=1))[1]
+        self.assertEquals([(pk, label) for pk, score, label in similar],
+                          [(0, 'x'), (2, 'y')])
+
+    def test_update_similarities(self):
+        python, cobra, jazz, blues = self.nodetypes
+        self.assertEquals(update_similarities(), 4)
+        self.assertEquals(self.get_similar(python), [cobra.pk])
+        self.assertEquals(self.get_similar(jazz), [blues.pk])
+        self.assertEquals(SimilarityDocument.objects.count(), 4)
+        self.assertEquals(update_similarities(), 0)
+
+        viper = self.create_nodetype('Viper', 'viper snake venom fangs')
+        self.assertEquals(update_similarities(), 3)
+        self.assertEquals(self.get_similar(viper), [cobra.pk, python.pk])
+        self.assertEquals(self.get_similar(cobra), [python.pk, viper.pk])
+        self.assertEquals(self.get_similar(blues), [jazz.pk])
+
+        viper.status = DRAFT
+        viper.save()
+        update_similarities()
+        self.assertEquals(self.get_similar(cobra), [python.pk])
+        self.assertEquals(Similarity.objects.filter(node=viper.pk).count(), 0)
+        self.assertEquals(update_similarities(full=True), 4)
@@ -13,6 +13,8 @@ from gstudio.sitemaps import NodetypeSitemap
 from gstudio.sitemaps import MetatypeSitemap
 from gstudio.sitemaps import AuthorSitemap
 from gstudio.sitemaps import TagSitemap
+from gstudio.sitemaps import SITEMAPS
+from gstudio.views import sitemap as sitemap_views
 
 
 class GstudioSitemapsTestCase(TestCase):
@@ -79,3 +81,50 @@ class GstudioSitemapsTestCase(TestCase):
         metatype_sitemap = MetatypeSitemap()
         metatype_sitemap.items()
         self.assertEquals(metatype_sitemap.priority(self.metatype), '0.5')
+
+    def test_statistics_in_grouped_queries(self):
+        Metatype.objects.create(title='Other', slug='other')
+        for sitemap, queries in ((MetatypeSitemap(), 2), (AuthorSitemap(), 2),
+                                 (TagSitemap(), 3)):
+            items = list(sitemap.items())
+
+            def compute():
+                for item in items:
+                    sitemap.lastmod(item)
+                    sitemap.priority(item)
+            self.assertNumQueries(queries, compute)
+
+    def test_sitemap_views(self):
+        original_timeout = sitemap_views.SITEMAP_CACHE_TIMEOUT
+        original_limit = NodetypeSitemap.limit
+        sitemap_views.SITEMAP_CACHE_TIMEOUT = 0
+        NodetypeSitemap.limit = 1
+        try:
+            response = self.client.get('/sitemap/sitemap.xml')
+            self.assertEquals(response.status_code, 200)
+            for section in SITEMAPS:
+                self.assertContains(response, 'sitemap-%s.xml' % section)
+            self.assertContains(response, 'sitemap-nodetypes.xml?p=2')
+            self.assertNotContains(response, 'sitemap-nodetypes.xml?p=3')
+
+            response = self.client.get('/sitemap/sitemap-nodetypes.xml?p=2')
+            self.assertContains(response, '<loc>', 1)
+            self.assertContains(response, 'my-nodetype-1')
+            response = self.client.get('/sitemap/sitemap-nodetypes.xml?p=3')
+            self.assertEquals(response.status_code, 404)
+            response = self.client.get('/sitemap/sitemap-unknown.xml')
+            self.assertEquals(response.status_code, 404)
+
+            sitemap_views.SITEMAP_CACHE_TIMEOUT = 3600
+            response = self.client.get('/sitemap/sitemap-tags.xml')
+            self.assertNotContains(response, '/tags/cached/')
+            Tag.objects.add_tag(self.nodetype_1, 'cached')
+            response = self.client.get('/sitemap/sitemap-tags.xml')
+            self.assertNotContains(response, '/tags/cached/')
+            self.nodetype_1.tags = 'gstudio, test, cached'
+            self.nodetype_1.save()
+            response = self.client.get('/sitemap/sitemap-tags.xml')
+            self.assertContains(response, '/tags/cached/')
+        finally:
+            sitemap_views.SITEMAP_CACHE_TIMEOUT = original_timeout
+            NodetypeSitemap.limit = original_limit
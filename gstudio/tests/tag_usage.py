@@ -0,0 +1,101 @@
+"""Test cases for Gstudio's tag usages"""
+from datetime import datetime
+from datetime import timedelta
+
+from django.test import TestCase
+from django.contrib.sites.models import Site
+
+from tagging.models import Tag
+
+from gstudio.models import Nodetype
+from gstudio.models import TagUsage
+from gstudio.models import Publication
+from gstudio.managers import DRAFT
+from gstudio.managers import PUBLISHED
+from gstudio.managers import tags_published
+from gstudio.tag_usage import get_tag_usage
+from gstudio.tag_usage import save_tag_usage
+from gstudio.tag_usage import update_tag_usage
+from gstudio.tag_usage import rebuild_tag_usage
+
+
+class TagUsageTestCase(TestCase):
+    """Test cases for the tag usages"""
+
+    def setUp(self):
+        self.sites = [
+            Site.objects.get_current(),
+            Site.objects.create(domain='http://domain.com',
+                                name='Domain.com')]
+        self.nodetype_1 = self.create_nodetype('my-nodetype-1',
+                                               'gstudio, test')
+        self.nodetype_2 = self.create_nodetype('my-nodetype-2', 'gstudio')
+
+    def create_nodetype(self, slug, tags, **kwargs):
+        nodetype = Nodetype.objects.create(
+            title=slug, content=slug, slug=slug, tags=tags,
+            status=PUBLISHED, **kwargs)
+        nodetype.sites.add(self.sites[0])
+        return nodetype
+
+    def get_counts(self):
+        return [(tag.name, tag.count) for tag in get_tag_usage()]
+
+    def test_get_tag_usage(self):
+        self.assertEquals(self.get_counts(), [('gstudio', 2), ('test', 1)])
+        tags = get_tag_usage()
+        self.assertEquals(tags[0].last_used, self.nodetype_2.creation_date)
+        self.assertEquals(get_tag_usage(self.sites[1].pk), [])
+        self.assertNumQueries(2, get_tag_usage)
+        self.assertEquals(sorted(tags_published().values_list(
+            'name', flat=True)), ['gstudio', 'test'])
+
+    def test_tags_changed(self):
+        self.nodetype_1.tags = 'test, other'
+        self.nodetype_1.save()
+        self.assertEquals(self.get_counts(), [('gstudio', 1), ('other', 1),
+                                              ('test', 1)])
+        Tag.objects.add_tag(self.nodetype_2, 'other')
+        self.assertEquals(self.get_counts(), [('gstudio', 1), ('other', 2),
+                                              ('test', 1)])
+
+    def test_publication_changed(self):
+        self.nodetype_1.status = DRAFT
+        self.nodetype_1.save()
+        self.assertEquals(self.get_counts(), [('gstudio', 1)])
+        self.nodetype_2.sites.add(self.sites[1])
+        self.assertEquals([(tag.name, tag.count) for tag in get_tag_usage(
+            self.sites[1].pk)], [('gstudio', 1)])
+        self.nodetype_2.sites.remove(self.sites[0])
+        self.assertEquals(self.get_counts(), [])
+        self.nodetype_2.delete()
+        self.assertEquals(TagUsage.objects.count(), 0)
+
+    def test_publication_window(self):
+        start = datetime.now() + timedelta(days=1)
+        self.create_nodetype('my-nodetype-3', 'future',
+                             start_publication=start)
+        self.assertEquals(self.get_counts(), [('gstudio', 2), ('test', 1)])
+        self.assertEquals(TagUsage.objects.get(
+            tag__name='future').expiration, start)
+
+        past = datetime.now() - timedelta(days=1)
+        Publication.objects.filter(start_publication=start).update(
+            start_publication=past)
+        TagUsage.objects.filter(tag__name='future').update(expiration=past)
+        self.assertEquals(self.get_counts(), [('future', 1), ('gstudio', 2),
+                                              ('test', 1)])
+
+    def test_rebuild_tag_usage(self):
+        TagUsage.objects.all().delete()
+        self.assertEquals(self.get_counts(), [])
+        self.assertEquals(rebuild_tag_usage(), 2)
+        self.assertEquals(self.get_counts(), [('gstudio', 2), ('test', 1)])
+
+    def test_update_tag_usage_in_place(self):
+        usage = TagUsage.objects.get(tag__name='gstudio')
+        update_tag_usage([usage.tag_id])
+        self.assertEquals(TagUsage.objects.get(pk=usage.pk).count, 2)
+        save_tag_usage(usage.tag_id, usage.site_id, count=3)
+        self.assertEquals(TagUsage.objects.filter(
+            tag=usage.tag_id).values_list('pk', 'count')[0], (usage.pk, 3))
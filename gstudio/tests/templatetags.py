@@ -1,4 +1,5 @@
 """Test cases for Gstudio's templatetags"""
+from __future__ import with_statement
 from datetime import datetime
 
 from django.test import TestCase
@@ -14,11 +15,13 @@ from django.contrib.comments.models import CommentFlag
 
 from tagging.models import Tag
 
+from gstudio import caching
 from gstudio.models import Nodetype
 from gstudio.models import Author
 from gstudio.models import Metatype
 from gstudio.managers import DRAFT
 from gstudio.managers import PUBLISHED
+from gstudio.templatetags import gstudio_tags
 from gstudio.templatetags.gstudio_tags import get_authors
 from gstudio.templatetags.gstudio_tags import get_gravatar
 from gstudio.templatetags.gstudio_tags import get_tag_cloud
@@ -149,6 +152,32 @@ class TemplateTagsTestCase(TestCase):
         context = get_popular_nodetypes(3)
         self.assertEquals(context['nodetypes'], [second_nodetype])
 
+    def test_widgets_cache(self):
+        original_timeout = caching.WIDGET_CACHE_TIMEOUT
+        caching.WIDGET_CACHE_TIMEOUT = 300
+        try:
+            self.publish_nodetype()
+            widgets = (get_recent_nodetypes, get_featured_nodetypes,
+                       get_random_nodetypes, get_popular_nodetypes,
+                       get_recent_comments, get_recent_linkbacks)
+            for widget in widgets:
+                widget()
+            with self.assertNumQueries(0):
+                for widget in widgets:
+                    widget()
+                context = get_recent_nodetypes()
+            self.assertEquals(context['nodetypes'], [self.nodetype])
+
+            comments.get_model().objects.create(
+                comment='My Comment', site=Site.objects.get_current(),
+                content_object=self.nodetype)
+            self.assertEquals(len(get_recent_comments()['comments']), 1)
+            self.nodetype.status = DRAFT
+            self.nodetype.save()
+            self.assertEquals(get_recent_nodetypes()['nodetypes'], [])
+        finally:
+            caching.WIDGET_CACHE_TIMEOUT = original_timeout
+
     def test_get_similar_nodetypes(self):
         self.publish_nodetype()
         source_context = Context({'object': self.nodetype})
@@ -158,19 +187,25 @@ class TemplateTagsTestCase(TestCase):
                           'gstudio/tags/similar_nodetypes.html')
 
         params = {'title': 'My second nodetype',
-                  'content': 'This is the second nodetype of my tests.',
+                  'content': 'This is the second content of my tests.',
                   'tags': 'gstudio, test',
                   'status': PUBLISHED,
                   'slug': 'my-second-nodetype'}
         site = Site.objects.get_current()
         second_nodetype = Nodetype.objects.create(**params)
         second_nodetype.sites.add(site)
+        params = {'title': 'Another nodetype',
+                  'content': 'Something unrelated here.',
+                  'tags': 'gstudio, test',
+                  'status': PUBLISHED,
+                  'slug': 'another-nodetype'}
+        Nodetype.objects.create(**params).sites.add(site)
 
         source_context = Context({'object': second_nodetype})
         context = get_similar_nodetypes(source_context, 3,
                                       'custom_template.html',
                                       flush=True)
-        self.assertEquals(len(context['nodetypes']), 1)
+        self.assertEquals(context['nodetypes'], [self.nodetype])
         self.assertEquals(context['template'], 'custom_template.html')
 
     def test_get_archives_nodetypes(self):
@@ -293,6 +328,14 @@ class TemplateTagsTestCase(TestCase):
         context = get_recent_comments()
         self.assertEquals(list(context['comments']), [comment_2, comment_1])
 
+        original_max_chunks = gstudio_tags.MAX_CHUNKS
+        gstudio_tags.MAX_CHUNKS = 0
+        try:
+            context = get_recent_comments()
+            self.assertEquals(len(context['comments']), 0)
+        finally:
+            gstudio_tags.MAX_CHUNKS = original_max_chunks
+
     def test_get_recent_linkbacks(self):
         user = User.objects.create_user(username='webmaster',
                                         email='webmaster@example.com')
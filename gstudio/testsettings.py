@@ -31,9 +31,12 @@ INSTALLED_APPS = ['django.contrib.contenttypes',
                   'django.contrib.sites',
                   'django.contrib.admin',
                   'django.contrib.auth',
+                  'django.contrib.sitemaps',
                   'django_xmlrpc',
                   'mptt', 'tagging', 'gstudio']
 
 GSTUDIO_PAGINATION = 3
 
+GSTUDIO_PING_DISPATCHER = False
+
 XMLRPC_METHODS = GSTUDIO_XMLRPC_METHODS
@@ -0,0 +1,76 @@
+"""Tree path maintenance for Gstudio
+
+The tree path of a metatype or a nodetype is the slugs of its
+ancestors and its own slug, joined by '/'. It is stored on the node,
+so reversing an URL or resolving a path do not walk the ancestors.
+A tree path longer than its column is refused with a ValidationError,
+for the node and for the descendants it would move."""
+from django.core.exceptions import ValidationError
+from django.utils.translation import ugettext as _
+
+TREE_PATH_LENGTH = 255
+
+
+def check_tree_path(path):
+    """Return a tree path, or raise a ValidationError
+    if it is too long to be stored"""
+    if len(path) > TREE_PATH_LENGTH:
+        raise ValidationError(
+            _('The tree path "%(path)s" is longer than %(length)i '
+              'characters, use shorter slugs.') % {
+                'path': path, 'length': TREE_PATH_LENGTH})
+    return path
+
+
+def build_tree_path(node):
+    """Return the tree path of a node from the one of its parent"""
+    if node.parent_id:
+        return check_tree_path('%s/%s' % (node.parent.tree_path, node.slug))
+    return check_tree_path(node.slug)
+
+
+def walk_descendant_tree_paths(model, node, old_path, new_path):
+    """Yield the id, the stored tree path and the new tree path
+    of the descendants of a node which tree path changes
+    from old_path to new_path"""
+    if not old_path or old_path == new_path:
+        return
+
+    # The descendants of the node are among the nodes which path
+    # starts with the old one, but other nodes can share that prefix,
+    # so only the ones linked to the node by their parent are kept.
+    candidates = model._default_manager.filter(
+        tree_path__startswith='%s/' % old_path).values_list(
+        'pk', 'parent', 'slug', 'tree_path')
+    children = {}
+    for pk, parent, slug, tree_path in candidates:
+        children.setdefault(parent, []).append((pk, slug, tree_path))
+
+    queue = [(node.pk, new_path)]
+    while queue:
+        parent, parent_path = queue.pop()
+        for pk, slug, tree_path in children.get(parent, []):
+            path = '%s/%s' % (parent_path, slug)
+            yield pk, tree_path, path
+            queue.append((pk, path))
+
+
+def check_descendant_tree_paths(model, node, old_path, new_path):
+    """Raise a ValidationError if the tree path of a descendant
+    of a node becomes too long when the one of the node changes"""
+    if old_path and len(new_path) > len(old_path):
+        for pk, tree_path, path in walk_descendant_tree_paths(
+            model, node, old_path, new_path):
+            check_tree_path(path)
+
+
+def update_descendant_tree_paths(model, node, old_path):
+    """Rewrite the tree paths of the descendants of a node
+    which tree path has changed from old_path"""
+    count = 0
+    for pk, tree_path, path in walk_descendant_tree_paths(
+        model, node, old_path, node.tree_path):
+        if path != tree_path:
+            model._default_manager.filter(pk=pk).update(tree_path=path)
+            count += 1
+    return count
@@ -1,11 +1,11 @@
 """Default url shortener backend for Gstudio"""
-from django.contrib.sites.models import Site
 from django.core.urlresolvers import reverse
 
 from gstudio.settings import PROTOCOL
+from gstudio.current_site import get_current_site
 
 
 def backend(nodetype):
     """Default url shortener backend for Gstudio"""
-    return '%s://%s%s' % (PROTOCOL, Site.objects.get_current().domain,
+    return '%s://%s%s' % (PROTOCOL, get_current_site().domain,
                        reverse('gstudio_nodetype_shortlink', args=[nodetype.pk]))
@@ -7,3 +7,8 @@ urlpatterns = patterns('gstudio.views.ajaxviews',
 
                            name='ajax_views'),
                        )
+
+urlpatterns += patterns('gstudio.views.tree',
+                        url(r'^tree/$', 'tree_nodes',
+                            name='gstudio_tree_nodes'),
+                        )
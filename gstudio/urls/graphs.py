@@ -10,5 +10,7 @@ from gstudio.settings import ALLOW_FUTURE
 urlpatterns = patterns(
     'gstudio.views.graphs',
     url(r'^graph_json/(?P<node_id>\d+)$','graph_json', name='graph_json_d3'), 
+    url(r'^egonet_json/(?P<node_id>\d+)$', 'ego_network_json',
+        name='egonet_json_d3'),
     url(r'^graph/(?P<node_id>\d+)$','force_graph', name='force_graph_d3'), 
     )
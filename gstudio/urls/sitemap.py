@@ -2,8 +2,16 @@
 from django.conf.urls.defaults import url
 from django.conf.urls.defaults import patterns
 
+from gstudio.sitemaps import SITEMAPS
+
 urlpatterns = patterns('gstudio.views.sitemap',
                        url(r'^$', 'sitemap',
                            {'template': 'gstudio/sitemap.html'},
                            name='gstudio_sitemap'),
+                       url(r'^sitemap\.xml$', 'sitemap_index',
+                           {'sitemaps': SITEMAPS},
+                           name='gstudio_sitemap_index'),
+                       url(r'^sitemap-(?P<section>\w+)\.xml$',
+                           'sitemap_section', {'sitemaps': SITEMAPS},
+                           name='gstudio_sitemap_section'),
                        )
@@ -3,6 +3,9 @@ from django.shortcuts import redirect
 from django.shortcuts import render_to_response
 from django.shortcuts import get_object_or_404
 from django.http import HttpResponse
+from django.http import HttpResponseNotFound
+from django.http import HttpResponseBadRequest
+from django.views.decorators.http import condition
 from gstudio.gnowql import *
 #import networkx as nx
 #import d3 
@@ -11,7 +14,32 @@ import os
  
 from gstudio.views.decorators import protect_nodetype
 from gstudio.views.decorators import update_queryset
+from gstudio.graphs import get_graph
+from gstudio.graphs import chunked
+from gstudio.graphs import EDGE_KINDS
+from gstudio.graphs import get_ego_network
+from gstudio.graphs import iter_ego_network_json
+from gstudio.settings import GRAPH_FAN_OUT
+from gstudio.settings import GRAPH_MAX_DEPTH
 
+def get_request_graph(request, node_id):
+    """Return the Graph of a node, once per request"""
+    if not hasattr(request, '_graph'):
+        request._graph = get_graph(node_id)
+    return request._graph
+
+
+def graph_etag(request, node_id):
+    graph = get_request_graph(request, node_id)
+    return graph and graph.etag
+
+
+def graph_last_modified(request, node_id):
+    graph = get_request_graph(request, node_id)
+    return graph and graph.last_modified
+
+
+@condition(etag_func=graph_etag, last_modified_func=graph_last_modified)
 def graph_json(request, node_id): 
 
     if(node_id=='189087228'):
@@ -20,14 +48,34 @@ def graph_json(request, node_id):
 
         return HttpResponse(str(jsonFile.read()), "application/json")
 
-    try:
-        node = NID.objects.get(id=node_id)
-        node = node.ref        
-    except:
-        return HttpResponse("Node not found.", "text/html")
+    graph = get_request_graph(request, node_id)
+    if graph is None:
+        return HttpResponseNotFound("Node not found.", "text/html")
 
-    return HttpResponse(node.get_graph_json(), "application/json")
+    return HttpResponse(graph, "application/json")
     
+def ego_network_json(request, node_id):
+    """Return the ego network of a node, expanded on
+    ?depth= levels with at most ?fan_out= edges by node,
+    over the ?edge= kinds and the ?relationtype= ids given"""
+    try:
+        depth = min(int(request.GET.get('depth', 2)), GRAPH_MAX_DEPTH)
+        fan_out = min(int(request.GET.get('fan_out', GRAPH_FAN_OUT)),
+                      GRAPH_FAN_OUT)
+        relationtypes = [int(pk) for pk in request.GET.getlist('relationtype')]
+    except ValueError:
+        return HttpResponseBadRequest("Invalid parameters.", "text/html")
+    kinds = [kind for kind in request.GET.getlist('edge')
+             if kind in EDGE_KINDS] or EDGE_KINDS
+
+    network = get_ego_network(int(node_id), max(depth, 1), max(fan_out, 1),
+                              kinds, relationtypes)
+    if network is None:
+        return HttpResponseNotFound("Node not found.", "text/html")
+
+    return HttpResponse(chunked(iter_ego_network_json(network)),
+                        "application/json")
+
 def force_graph(request, node_id):
     return render_to_response('gstudio/graph1.html',{'node_id': node_id })
 
@@ -5,7 +5,6 @@ from django import forms
 from django.utils.html import linebreaks
 from django.shortcuts import redirect
 from django.core.urlresolvers import reverse
-from django.contrib.sites.models import Site
 from django.template.defaultfilters import slugify
 from django.utils.encoding import smart_str
 from django.contrib.auth.decorators import permission_required
@@ -13,6 +12,7 @@ from django.contrib.auth.decorators import permission_required
 from gstudio.models import Nodetype
 from gstudio.managers import DRAFT
 from gstudio.managers import PUBLISHED
+from gstudio.current_site import get_current_site
 
 
 class QuickNodetypeForm(forms.Form):
@@ -37,7 +37,7 @@ def view_quick_nodetype(request):
             nodetype_dict['slug'] = slugify(nodetype_dict['title'])
             nodetype_dict['status'] = status
             nodetype = Nodetype.objects.create(**nodetype_dict)
-            nodetype.sites.add(Site.objects.get_current())
+            nodetype.sites.add(get_current_site(request))
             nodetype.authors.add(request.user)
             return redirect(nodetype)
 
@@ -47,7 +47,7 @@ def view_quick_nodetype(request):
                 'tags': smart_str(request.POST.get('tags', '')),
                 'slug': slugify(request.POST.get('title', '')),
                 'authors': request.user.pk,
-                'sites': Site.objects.get_current().pk}
+                'sites': get_current_site(request).pk}
         return redirect('%s?%s' % (reverse('admin:gstudio_nodetype_add'),
                                    urlencode(data)))
 
@@ -1,8 +1,23 @@
 """Views for Gstudio sitemap"""
+from hashlib import md5
+
+from django.http import Http404
+from django.http import HttpResponse
+from django.core.cache import cache
+from django.core.paginator import EmptyPage
+from django.core.paginator import PageNotAnInteger
+from django.core.urlresolvers import reverse
 from django.views.generic.simple import direct_to_template
 
 from gstudio.models import Nodetype
 from gstudio.models import Metatype
+from gstudio.caching import get_content_version
+from gstudio.current_site import get_current_site
+from gstudio.settings import SITEMAP_CACHE_TIMEOUT
+from gstudio.sitemaps import render_sitemap_index
+from gstudio.sitemaps import render_sitemap_section
+
+SITEMAP_CACHE_KEY = 'gstudio:sitemap:%s:%s:%s'
 
 
 def sitemap(*ka, **kw):
@@ -11,3 +26,49 @@ def sitemap(*ka, **kw):
     kw['extra_context'] = {'nodetypes': Nodetype.tree.all(),
                            'metatypes': Metatype.tree.all()}
     return direct_to_template(*ka, **kw)
+
+
+def cached_xml(request, render):
+    """Return the XML rendered for a request, cached until the
+    content of the site changes or GSTUDIO_SITEMAP_CACHE_TIMEOUT"""
+    if not SITEMAP_CACHE_TIMEOUT:
+        return HttpResponse(render(), mimetype='application/xml')
+
+    key = SITEMAP_CACHE_KEY % (get_content_version(),
+                               get_current_site(request).pk,
+                               md5(request.get_full_path()).hexdigest())
+    content = cache.get(key)
+    if content is None:
+        content = render()
+        cache.set(key, content, SITEMAP_CACHE_TIMEOUT)
+    return HttpResponse(content, mimetype='application/xml')
+
+
+def sitemap_index(request, sitemaps):
+    """Index of the sections of the XML sitemaps"""
+
+    def location(section, page):
+        url = request.build_absolute_uri(
+            reverse('gstudio_sitemap_section', args=[section]))
+        if page > 1:
+            url += '?p=%i' % page
+        return url
+
+    return cached_xml(
+        request, lambda: render_sitemap_index(sitemaps, location))
+
+
+def sitemap_section(request, sitemaps, section):
+    """Page of a section of the XML sitemaps"""
+    if not section in sitemaps:
+        raise Http404('No sitemap available for section: %r' % section)
+    page = request.GET.get('p', 1)
+
+    def render():
+        try:
+            return render_sitemap_section(sitemaps[section], page,
+                                          get_current_site(request))
+        except (EmptyPage, PageNotAnInteger):
+            raise Http404('Page %s empty' % page)
+
+    return cached_xml(request, render)
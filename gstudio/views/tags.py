@@ -3,10 +3,10 @@ from django.template import RequestContext
 from django.shortcuts import render_to_response
 from django.template.defaultfilters import slugify
 
-from tagging.models import Tag
 from tagging.views import tagged_object_list
 
 from gstudio.models import Nodetype
+from gstudio.managers import tags_published
 from gstudio.settings import PAGINATION
 
 from gstudio.views.decorators import template_name_for_nodetype_queryset_filtered
@@ -15,8 +15,7 @@ from gstudio.views.decorators import template_name_for_nodetype_queryset_filtere
 def tag_list(request, template_name='gstudio/tag_list.html'):
     """Return the list of published tags with counts,
     try to simulate an object_list view"""
-    tag_list = Tag.objects.usage_for_queryset(
-        Nodetype.published.all(), counts=True)
+    tag_list = tags_published(counts=True)
     return render_to_response(template_name, {'object_list': tag_list},
                               context_instance=RequestContext(request))
 
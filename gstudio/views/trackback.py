@@ -1,13 +1,13 @@
 """Views for Gstudio trackback"""
 from django.shortcuts import redirect
 from django.shortcuts import get_object_or_404
-from django.contrib.sites.models import Site
 from django.contrib import comments
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.contenttypes.models import ContentType
 from django.views.generic.simple import direct_to_template
 
 from gstudio.models import Nodetype
+from gstudio.current_site import get_current_site
 
 
 @csrf_exempt
@@ -18,7 +18,7 @@ def nodetype_trackback(request, object_id):
     if request.POST.get('url'):
         error = ''
         url = request.POST['url']
-        site = Site.objects.get_current()
+        site = get_current_site(request)
 
         if not nodetype.pingback_enabled:
             error = u'Trackback is not enabled for %s' % nodetype.title
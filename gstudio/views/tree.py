@@ -0,0 +1,65 @@
+"""Views for browsing the trees of Gstudio in the admin
+
+The tree pickers of the admin forms do not list all the nodes of a
+tree, they load the nodes of a level, or the nodes whose title starts
+with a prefix, one page at a time from these views."""
+import json
+
+from django.http import HttpResponse
+from django.http import HttpResponseBadRequest
+from django.contrib.admin.views.decorators import staff_member_required
+
+from gstudio.models import Metatype
+from gstudio.models import Nodetype
+from gstudio.models import Processtype
+from gstudio.models import Relationtype
+from gstudio.models import Attributetype
+from gstudio.settings import TREE_PICKER_PAGE_SIZE
+
+TREE_MODELS = dict([(model._meta.module_name, model) for model in (
+    Metatype, Nodetype, Processtype, Relationtype, Attributetype)])
+
+
+def get_tree_nodes(model, parent=None, prefix='', page=1,
+                   page_size=TREE_PICKER_PAGE_SIZE):
+    """Return a page of the children of a node, of the root nodes if
+    no parent, or of the nodes whose title starts with a prefix,
+    in tree order, and if there are more nodes"""
+    mptt_meta = model._mptt_meta
+    nodes = model._default_manager.all()
+    if prefix:
+        nodes = nodes.filter(title__istartswith=prefix)
+    elif parent:
+        nodes = nodes.filter(**{mptt_meta.parent_attr: parent})
+    else:
+        nodes = nodes.filter(**{'%s__isnull' % mptt_meta.parent_attr: True})
+
+    start = (page - 1) * page_size
+    rows = list(nodes.order_by(
+        mptt_meta.tree_id_attr, mptt_meta.left_attr).values_list(
+        'pk', 'title', mptt_meta.level_attr, mptt_meta.left_attr,
+        mptt_meta.right_attr)[start:start + page_size + 1])
+    return ([{'id': pk, 'title': title, 'level': level,
+              'leaf': right - left == 1}
+             for pk, title, level, left, right in rows[:page_size]],
+            len(rows) > page_size)
+
+
+@staff_member_required
+def tree_nodes(request):
+    """Return as JSON a page of the nodes of a tree, browsed by
+    level with the parent parameter, or searched by title with
+    the q parameter"""
+    model = TREE_MODELS.get(request.GET.get('model'))
+    try:
+        parent = int(request.GET.get('parent') or 0)
+        page = max(int(request.GET.get('page') or 1), 1)
+    except ValueError:
+        model = None
+    if model is None:
+        return HttpResponseBadRequest()
+
+    nodes, more = get_tree_nodes(model, parent,
+                                 request.GET.get('q', '').strip(), page)
+    return HttpResponse(json.dumps({'nodes': nodes, 'more': more}),
+                        mimetype='application/json')
@@ -1,21 +1,34 @@
 """XML-RPC methods of Gstudio Pingback"""
+import re
+import httplib
+import threading
+from Queue import Queue
+from hashlib import md5
 from urllib2 import urlopen
-from urllib2 import URLError
-from urllib2 import HTTPError
 from urlparse import urlsplit
+from logging import getLogger
 
+from django.db import connection
 from django.contrib import comments
+from django.core.cache import cache
 from django.utils.html import strip_tags
-from django.contrib.sites.models import Site
 from django.core.urlresolvers import resolve
 from django.core.urlresolvers import Resolver404
 from django.utils.translation import ugettext as _
 from django.contrib.contenttypes.models import ContentType
 
 from gstudio.models import Nodetype
+from gstudio.settings import PING_WORKERS
+from gstudio.settings import PINGBACK_TIMEOUT
+from gstudio.settings import PINGBACK_DEFERRED
+from gstudio.settings import PINGBACK_MAX_BYTES
+from gstudio.settings import PINGBACK_RATE_LIMIT
+from gstudio.settings import PINGBACK_CACHE_TIMEOUT
+from gstudio.settings import PINGBACK_ERROR_CACHE_TIMEOUT
 from gstudio.settings import PINGBACK_CONTENT_LENGTH
 from BeautifulSoup import BeautifulSoup
 from django_xmlrpc.decorators import xmlrpc_func
+from gstudio.current_site import get_current_site
 
 UNDEFINED_ERROR = 0
 SOURCE_DOES_NOT_EXIST = 16
@@ -24,6 +37,14 @@ TARGET_DOES_NOT_EXIST = 32
 TARGET_IS_NOT_PINGABLE = 33
 PINGBACK_ALREADY_REGISTERED = 48
 
+FRAGMENT_LENGTH = 4096
+TITLE_END = re.compile('</title>', re.I)
+PINGBACK_CACHE_KEY = 'gstudio:pingback:%s'
+PINGBACK_RATE_KEY = 'gstudio:pingback_rate:%s'
+PINGBACK_JOBS = Queue()
+VERIFIERS_LOCK = threading.Lock()
+VERIFIERS = []
+
 
 def generate_pingback_content(soup, target, max_length, trunc_char='...'):
     """Generate a description text for the pingback"""
@@ -50,6 +71,160 @@ def generate_pingback_content(soup, target, max_length, trunc_char='...'):
     return content
 
 
+def get_hash(*values):
+    """Return a key for some urls"""
+    return md5(' '.join(values).encode('utf-8')).hexdigest()
+
+
+def read_source(source, target, max_bytes=PINGBACK_MAX_BYTES,
+                timeout=PINGBACK_TIMEOUT, chunk_size=8192):
+    """Stream the source until a link to the target is found,
+    reading at most max_bytes, and return the document read with
+    the position of the target, or None if not found"""
+    if isinstance(target, unicode):
+        target = target.encode('utf-8')
+    page = urlopen(source, timeout=timeout)
+    try:
+        document = ''
+        while len(document) < max_bytes:
+            chunk = page.read(min(chunk_size, max_bytes - len(document)))
+            if not chunk:
+                return None
+            searched = max(len(document) - len(target) + 1, 0)
+            document += chunk
+            position = document.find(target, searched)
+            if position > -1:
+                # Read the end of the element linking to the target
+                return document + page.read(FRAGMENT_LENGTH), position
+        return None
+    finally:
+        page.close()
+
+
+def parse_source(document, position):
+    """Return the title of a source and the soup of the
+    fragment of the source around the position of the link"""
+    title = None
+    title_end = TITLE_END.search(document, 0, position)
+    if title_end:
+        title = BeautifulSoup(document[:title_end.end()]).find('title')
+
+    start = document.find('<', max(position - FRAGMENT_LENGTH, 0))
+    fragment = document[start:position + FRAGMENT_LENGTH]
+    return title, BeautifulSoup(fragment)
+
+
+def get_pingback_target(target, site):
+    """Return the nodetype pingable at the target url,
+    or the code of the error"""
+    scheme, netloc, path, query, fragment = urlsplit(target)
+    if netloc != site.domain:
+        return TARGET_DOES_NOT_EXIST
+
+    try:
+        view, args, kwargs = resolve(path)
+    except Resolver404:
+        return TARGET_DOES_NOT_EXIST
+
+    try:
+        nodetype = Nodetype.published.get(
+            slug=kwargs['slug'],
+            creation_date__year=kwargs['year'],
+            creation_date__month=kwargs['month'],
+            creation_date__day=kwargs['day'])
+        if not nodetype.pingback_enabled:
+            return TARGET_IS_NOT_PINGABLE
+    except (KeyError, Nodetype.DoesNotExist):
+        return TARGET_IS_NOT_PINGABLE
+    return nodetype
+
+
+def cache_response(source, target, response,
+                   timeout=PINGBACK_CACHE_TIMEOUT):
+    """Keep the response to a pingback for the next pings
+    of the same source and target"""
+    cache.set(PINGBACK_CACHE_KEY % get_hash(source, target), response,
+              timeout)
+    return response
+
+
+def is_rate_limited(source):
+    """Count the pings from the host of the source, and tell if
+    more than GSTUDIO_PINGBACK_RATE_LIMIT have been received
+    in the last minute"""
+    if not PINGBACK_RATE_LIMIT:
+        return False
+    key = PINGBACK_RATE_KEY % get_hash(urlsplit(source)[1])
+    cache.add(key, 0, 60)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        count = 1
+        cache.set(key, count, 60)
+    return count > PINGBACK_RATE_LIMIT
+
+
+def verify_pingback(source, target):
+    """Verify that the source links to the target, register
+    the pingback, and return the response"""
+    site = get_current_site()
+    try:
+        link = read_source(source, target)
+    except (IOError, httplib.HTTPException):
+        return cache_response(source, target, SOURCE_DOES_NOT_EXIST,
+                              PINGBACK_ERROR_CACHE_TIMEOUT)
+    if link is None:
+        return cache_response(source, target, SOURCE_DOES_NOT_LINK,
+                              PINGBACK_ERROR_CACHE_TIMEOUT)
+
+    nodetype = get_pingback_target(target, site)
+    if not isinstance(nodetype, Nodetype):
+        return nodetype
+
+    title, soup = parse_source(*link)
+    title = title and strip_tags(title) or _('No title')
+    description = generate_pingback_content(soup, target,
+                                            PINGBACK_CONTENT_LENGTH)
+
+    comment, created = comments.get_model().objects.get_or_create(
+        content_type=ContentType.objects.get_for_model(Nodetype),
+        object_pk=nodetype.pk, user_url=source, site=site,
+        defaults={'comment': description, 'user_name': title})
+    cache_response(source, target, PINGBACK_ALREADY_REGISTERED)
+    if created:
+        user = nodetype.authors.all()[0]
+        comment.flags.create(user=user, flag='pingback')
+        return 'Pingback from %s to %s registered.' % (source, target)
+    return PINGBACK_ALREADY_REGISTERED
+
+
+def verify_pingbacks():
+    """Verify the pingbacks deferred, in a thread"""
+    logger = getLogger('gstudio.pingback')
+    while True:
+        source, target = PINGBACK_JOBS.get()
+        try:
+            logger.info('%s : %s' % (source, verify_pingback(source, target)))
+        except Exception, error:
+            logger.error('%s : %s' % (source, error))
+        connection.close()
+
+
+def defer_pingback(source, target):
+    """Queue the verification of a pingback, done by a pool of
+    GSTUDIO_PING_WORKERS threads started at the first call"""
+    VERIFIERS_LOCK.acquire()
+    try:
+        while len(VERIFIERS) < PING_WORKERS:
+            verifier = threading.Thread(target=verify_pingbacks)
+            verifier.daemon = True
+            verifier.start()
+            VERIFIERS.append(verifier)
+    finally:
+        VERIFIERS_LOCK.release()
+    PINGBACK_JOBS.put((source, target))
+
+
 @xmlrpc_func(returns='string', args=['string', 'string'])
 def pingback_ping(source, target):
     """pingback.ping(sourceURI, targetURI) => 'Pingback message'
@@ -62,51 +237,20 @@ def pingback_ping(source, target):
         if source == target:
             return UNDEFINED_ERROR
 
-        site = Site.objects.get_current()
-        try:
-            document = ''.join(urlopen(source).readlines())
-        except (HTTPError, URLError):
-            return SOURCE_DOES_NOT_EXIST
-
-        if not target in document:
-            return SOURCE_DOES_NOT_LINK
-
-        scheme, netloc, path, query, fragment = urlsplit(target)
-        if netloc != site.domain:
-            return TARGET_DOES_NOT_EXIST
-
-        try:
-            view, args, kwargs = resolve(path)
-        except Resolver404:
-            return TARGET_DOES_NOT_EXIST
-
-        try:
-            nodetype = Nodetype.published.get(
-                slug=kwargs['slug'],
-                creation_date__year=kwargs['year'],
-                creation_date__month=kwargs['month'],
-                creation_date__day=kwargs['day'])
-            if not nodetype.pingback_enabled:
-                return TARGET_IS_NOT_PINGABLE
-        except (KeyError, Nodetype.DoesNotExist):
-            return TARGET_IS_NOT_PINGABLE
+        response = cache.get(PINGBACK_CACHE_KEY % get_hash(source, target))
+        if response is not None:
+            return response
+        if is_rate_limited(source):
+            return UNDEFINED_ERROR
 
-        soup = BeautifulSoup(document)
-        title = soup.find('title')
-        title = title and strip_tags(title) or _('No title')
-        description = generate_pingback_content(soup, target,
-                                                PINGBACK_CONTENT_LENGTH)
-
-        comment, created = comments.get_model().objects.get_or_create(
-            content_type=ContentType.objects.get_for_model(Nodetype),
-            object_pk=nodetype.pk, user_url=source, site=site,
-            defaults={'comment': description, 'user_name': title})
-        if created:
-            user = nodetype.authors.all()[0]
-            comment.flags.create(user=user, flag='pingback')
-            return 'Pingback from %s to %s registered.' % (source, target)
-        return PINGBACK_ALREADY_REGISTERED
-    except:
+        if PINGBACK_DEFERRED:
+            nodetype = get_pingback_target(target, get_current_site())
+            if not isinstance(nodetype, Nodetype):
+                return nodetype
+            defer_pingback(source, target)
+            return 'Pingback from %s to %s queued.' % (source, target)
+        return verify_pingback(source, target)
+    except Exception:
         return UNDEFINED_ERROR
 
 
@@ -117,7 +261,7 @@ def pingback_extensions_get_pingbacks(target):
     Returns an array of URLs that link to the specified url.
 
     See: http://www.aquarionics.com/misc/archives/blogite/0198.html"""
-    site = Site.objects.get_current()
+    site = get_current_site()
 
     scheme, netloc, path, query, fragment = urlsplit(target)
     if netloc != site.domain:
@@ -2,7 +2,6 @@
 from django import forms
 from django.db.models import ManyToOneRel
 from django.db.models import ManyToManyRel
-from django.contrib.sites.models import Site
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.admin.widgets import RelatedFieldWidgetWrapper
 
@@ -23,6 +22,7 @@ from gstudio.models import Metatype
 from objectapp.admin.widgets import TreeNodeChoiceField
 from objectapp.admin.widgets import MPTTFilteredSelectMultiple
 from objectapp.admin.widgets import MPTTModelMultipleChoiceField
+from gstudio.current_site import get_current_site
 
 
 class ProcessAdminForm(forms.ModelForm):
@@ -82,7 +82,7 @@ class GbobjectAdminForm(forms.ModelForm):
             self.fields['objecttypes'].widget, rel, self.admin_site)
 
 
-        self.fields['sites'].initial = [Site.objects.get_current()]
+        self.fields['sites'].initial = [get_current_site()]
 
     class Meta:
         """GbobjectAdminForm's Meta"""
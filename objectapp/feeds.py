@@ -3,7 +3,6 @@ from urlparse import urljoin
 from BeautifulSoup import BeautifulSoup
 
 from django.contrib.auth.models import User
-from django.contrib.sites.models import Site
 from django.core.urlresolvers import reverse
 from django.shortcuts import get_object_or_404
 from django.utils.feedgenerator import Atom1Feed
@@ -23,6 +22,7 @@ from objectapp.settings import FEEDS_MAX_ITEMS
 from objectapp.managers import gbobjects_published
 from objectapp.views.objecttypes import get_Objecttype_or_404
 from objectapp.templatetags.objectapp_tags import get_gravatar
+from gstudio.current_site import get_current_site
 
 
 class ObjectappFeed(Feed):
@@ -30,12 +30,21 @@ class ObjectappFeed(Feed):
     feed_copyright = COPYRIGHT
 
     def __init__(self):
-        self.site = Site.objects.get_current()
-        self.site_url = '%s://%s' % (PROTOCOL, self.site.domain)
         if FEEDS_FORMAT == 'atom':
             self.feed_type = Atom1Feed
             self.subtitle = self.description
 
+    @property
+    def site(self):
+        """Current site, resolved when the feed is served
+        rather than when the urls are loaded"""
+        return get_current_site()
+
+    @property
+    def site_url(self):
+        """Url of the current site"""
+        return '%s://%s' % (PROTOCOL, self.site.domain)
+
 
 class GbobjectFeed(ObjectappFeed):
     """Base Gbobject Feed"""
@@ -2,7 +2,8 @@
 from datetime import datetime
 
 from django.db import models
-from django.contrib.sites.models import Site
+
+from gstudio.current_site import get_current_site_id
 
 DRAFT = 0
 HIDDEN = 1
@@ -29,7 +30,7 @@ class AuthorPublishedManager(models.Manager):
             gbobjects__status=PUBLISHED,
             gbobjects__start_publication__lte=now,
             gbobjects__end_publication__gt=now,
-            gbobjects__sites=Site.objects.get_current()
+            gbobjects__sites=get_current_site_id()
             ).distinct()
 
 
@@ -39,7 +40,7 @@ def gbobjects_published(queryset):
     return queryset.filter(status=PUBLISHED,
                            start_publication__lte=now,
                            end_publication__gt=now,
-                           sites=Site.objects.get_current())
+                           sites=get_current_site_id())
 
 
 class GbobjectPublishedManager(models.Manager):
@@ -53,7 +54,7 @@ class GbobjectPublishedManager(models.Manager):
     def on_site(self):
         """Return gbobjects published on current site"""
         return super(GbobjectPublishedManager, self).get_query_set(
-            ).filter(sites=Site.objects.get_current())
+            ).filter(sites=get_current_site_id())
 
     def search(self, pattern):
         """Top level search method on gbobjects"""
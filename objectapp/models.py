@@ -4,20 +4,16 @@ from datetime import datetime
 
 from django.db import models
 from django.db.models import Q
-from django.utils.html import strip_tags
-from django.utils.html import linebreaks
 from django.contrib.auth.models import User
 from django.contrib.sites.models import Site
 from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed
 from django.utils.importlib import import_module
 from django.contrib import comments
 from django.contrib.comments.models import CommentFlag
 from django.contrib.comments.moderation import moderator
 from django.utils.translation import ugettext_lazy as _
 import json
-from django.contrib.markup.templatetags.markup import markdown
-from django.contrib.markup.templatetags.markup import textile
-from django.contrib.markup.templatetags.markup import restructuredtext
 
 
 from djangoratings.fields import RatingField
@@ -33,6 +29,10 @@ from gstudio.models import Relation
 from gstudio.models import Node
 from gstudio.models import Edge
 from gstudio.models import Author
+from gstudio.settings import ADJACENCY_INDEX
+from gstudio.rendering import render_content
+from gstudio.rendering import RENDERED_FIELDS
+from gstudio.rendering import get_rendering_key
 
 import reversion
 from objectapp.settings import UPLOAD_TO
@@ -49,6 +49,8 @@ from objectapp.moderator import GbobjectCommentModerator
 from objectapp.url_shortener import get_url_shortener
 from objectapp.signals import ping_directories_handler
 from objectapp.signals import ping_external_urls_handler
+from gstudio.signals import flush_inheritance_handler
+from gstudio.signals import update_search_index_handler
 
 '''
 class Author(User):
@@ -90,6 +92,14 @@ class Gbobject(Node):
     content_org = models.TextField(_('content'), null=True, blank=True)
     image = models.ImageField(_('image'), upload_to=UPLOAD_TO,
                               blank=True, help_text=_('used for illustration'))
+    rendered_key = models.CharField(_('rendered key'), max_length=32,
+                                    blank=True, editable=False)
+    rendered_content = models.TextField(_('rendered content'), blank=True,
+                                        editable=False)
+    rendered_word_count = models.PositiveIntegerField(
+        _('rendered word count'), default=0, editable=False)
+    rendered_links = models.TextField(_('rendered links'), blank=True,
+                                      editable=False)
 
     excerpt = models.TextField(_('excerpt'), blank=True,
                                 help_text=_('optional element'))
@@ -148,6 +158,10 @@ class Gbobject(Node):
 
 
     def get_relations(self):
+        if ADJACENCY_INDEX:
+            from gstudio.adjacency import get_adjacency_index
+            return get_adjacency_index().get_relation_sets(self.pk)
+
         relation_set = {}
         # ALGO to find the relations and their left-subjecttypes and right_subjecttypes
         # 1. Get the relations containing a reference to the object. Retrieve where it occurs (left or right)
@@ -189,6 +203,10 @@ class Gbobject(Node):
         
 
     def get_attributes(self):
+        if ADJACENCY_INDEX:
+            from gstudio.adjacency import get_adjacency_index
+            return get_adjacency_index().get_attributes(self.pk)
+
         attributes =  {}
         for attribute in Attribute.objects.filter(subject=self.id):
             for key,value in attribute.edge_node_dict.iteritems():
@@ -200,59 +218,20 @@ class Gbobject(Node):
     
     def get_possible_rels(self):
         """
-        Gets the relations possible for this metatype
-        1. Recursively create a set of all the ancestors i.e. parent/subtypes of the MT. 
-        2. Get all the R's linked to each ancestor 
+        Gets the relations possible for this object from the
+        nodetypes it is member of and their ancestors.
         """
-        #Step 1. 
-        ancestor_list = []
-        this_parent = self.parent
-        
-        # append
-        while this_parent:
-            ancestor_list.append(this_parent)
-            this_parent = this_parent.parent
-            
-        #Step 2.
-        rels = {}
-        rt_set = Relation.objects.all()
-        right_subset = []
-        left_subset = []
-        
-        for each in ancestor_list:
-            # retrieve all the RT's from each ancestor 
-            right_subset.extend(rt_set.filter(subject1=each.id))
-            left_subset.extend(rt_set.filter(subject2=each.id))
-         
-        rels['possible_leftroles'] = left_subset
-        rels['possible_rightroles'] = right_subset
-        
-        return rels
+        from gstudio.inheritance import get_possible_rels
+        return get_possible_rels(self)
 
 
     def get_possible_attributes(self):
         """
-        Gets the relations possible for this metatype
-        1. Recursively create a set of all the ancestors i.e. parent/subtypes of the MT. 
-        2. Get all the RT's linked to each ancestor 
+        Gets the attributes possible for this object from the
+        nodetypes it is member of and their ancestors.
         """
-        #Step 1. 
-        ancestor_list = []
-        this_parent = self.parent
-        
-        # recursive thru parent field and append
-        while this_parent:
-            ancestor_list.append(this_parent)
-            this_parent = this_parent.parent
-            
-        #Step 2.
-        attrs = [] 
-                
-        for each in ancestor_list:
-            # retrieve all the AT's from each ancestor 
-            attrs.extend(Attribute.objects.filter(subject=each.id))
-                     
-        return attrs
+        from gstudio.inheritance import get_possible_attributes
+        return get_possible_attributes(self)
 
 
 
@@ -321,6 +300,10 @@ class Gbobject(Node):
         """
         Returns all the relations of the nodetype
         """
+        if ADJACENCY_INDEX:
+            from gstudio.adjacency import get_adjacency_index
+            return get_adjacency_index().get_relations_by_side(self.pk)
+
         relations={}
         reltype={}
         left_relations=Relation.objects.filter(left_subject=self.id)
@@ -428,18 +411,34 @@ class Gbobject(Node):
 
 
 
+    rendered_fields = RENDERED_FIELDS
+
+    def render_content(self):
+        """Render the content with its words and links,
+        unless the stored rendering is current"""
+        if self.rendered_key != get_rendering_key(
+            self.content, MARKUP_LANGUAGE, MARKDOWN_EXTENSIONS):
+            rendering = render_content(self.content, MARKUP_LANGUAGE,
+                                       MARKDOWN_EXTENSIONS)
+            for field in self.rendered_fields:
+                setattr(self, field, rendering[field])
+
+    def save(self, *args, **kwargs):
+        """Store the rendering of gbobject's content"""
+        self.render_content()
+        super(Gbobject, self).save(*args, **kwargs)
+
     @property
     def html_content(self):
         """Return the content correctly formatted"""
-        if MARKUP_LANGUAGE == 'markdown':
-            return markdown(self.content, MARKDOWN_EXTENSIONS)
-        elif MARKUP_LANGUAGE == 'textile':
-            return textile(self.content)
-        elif MARKUP_LANGUAGE == 'restructuredtext':
-            return restructuredtext(self.content)
-        elif not '</p>' in self.content:
-            return linebreaks(self.content)
-        return self.content
+        self.render_content()
+        return self.rendered_content
+
+    @property
+    def links(self):
+        """Return the urls linked by the content"""
+        self.render_content()
+        return [url for url in self.rendered_links.split('\n') if url]
 
 
     @property
@@ -461,7 +460,8 @@ class Gbobject(Node):
     @property
     def word_count(self):
         """Count the words of an gbobject"""
-        return len(strip_tags(self.html_content).split())
+        self.render_content()
+        return self.rendered_word_count
 
     @property
     def is_actual(self):
@@ -634,5 +634,11 @@ post_save.connect(ping_directories_handler, sender=Gbobject,
                   dispatch_uid='objectapp.gbobject.post_save.ping_directories')
 post_save.connect(ping_external_urls_handler, sender=Gbobject,
                   dispatch_uid='objectapp.gbobject.post_save.ping_external_urls')
+m2m_changed.connect(flush_inheritance_handler,
+                    sender=Gbobject.objecttypes.through,
+                    dispatch_uid='objectapp.gbobject.m2m_changed.flush_inheritance')
+m2m_changed.connect(update_search_index_handler,
+                    sender=Gbobject.authors.through,
+                    dispatch_uid='objectapp.gbobject.authors.update_search_index')
 
 
@@ -4,7 +4,6 @@ from django.template import Context
 from django.template import loader
 from django.core.mail import send_mail
 from django.core.mail import EmailMessage
-from django.contrib.sites.models import Site
 from django.utils.translation import activate
 from django.utils.translation import get_language
 from django.utils.translation import ugettext_lazy as _
@@ -18,6 +17,7 @@ from objectapp.settings import AUTO_CLOSE_COMMENTS_AFTER
 from objectapp.settings import MAIL_COMMENT_NOTIFICATION_RECIPIENTS
 from objectapp.settings import SPAM_CHECKER_BACKENDS
 from objectapp.spam_checker import check_is_spam
+from gstudio.current_site import get_current_site
 
 
 class GbobjectCommentModerator(CommentModerator):
@@ -50,7 +50,7 @@ class GbobjectCommentModerator(CommentModerator):
     def do_email_notification(self, comment, content_object, request):
         """Send email notification of a new comment to site staff when email
         notifications have been requested."""
-        site = Site.objects.get_current()
+        site = get_current_site(request)
         template = loader.get_template(
             'comments/comment_notification_email.txt')
         context = Context({'comment': comment, 'site': site,
@@ -73,7 +73,7 @@ class GbobjectCommentModerator(CommentModerator):
                               set(exclude_list)
 
         if recipient_list:
-            site = Site.objects.get_current()
+            site = get_current_site(request)
             template = loader.get_template(
                 'comments/comment_authors_email.txt')
             context = Context({'comment': comment, 'site': site,
@@ -99,7 +99,7 @@ class GbobjectCommentModerator(CommentModerator):
                               set(exclude_list)
 
         if recipient_list:
-            site = Site.objects.get_current()
+            site = get_current_site(request)
             template = loader.get_template('comments/comment_reply_email.txt')
             context = Context({'comment': comment, 'site': site,
                                'protocol': PROTOCOL,
@@ -8,17 +8,17 @@ from logging import getLogger
 
 from BeautifulSoup import BeautifulSoup
 
-from django.contrib.sites.models import Site
 from django.core.urlresolvers import reverse
 
 from objectapp.settings import PROTOCOL
+from gstudio.current_site import get_current_site
 
 
 class URLRessources(object):
     """Object defining the ressources of the website"""
 
     def __init__(self):
-        self.current_site = Site.objects.get_current()
+        self.current_site = get_current_site()
         self.site_url = '%s://%s' % (PROTOCOL, self.current_site.domain)
         self.blog_url = '%s%s' % (self.site_url,
                                   reverse('objectapp_gbobject_archive_index'))
@@ -114,11 +114,8 @@ class ExternalUrlsPinger(threading.Thread):
 
     def find_external_urls(self, gbobject):
         """Find external urls in an gbobject"""
-        soup = BeautifulSoup(gbobject.html_content)
-        external_urls = [a['href'] for a in soup.findAll('a')
-                         if self.is_external_url(
-                             a['href'], self.ressources.site_url)]
-        return external_urls
+        return [url for url in gbobject.links
+                if self.is_external_url(url, self.ressources.site_url)]
 
     def find_pingback_href(self, content):
         """Try to find Link markup to pingback url"""
@@ -53,9 +53,6 @@ FEEDS_MAX_ITEMS = getattr(settings, 'OBJECTAPP_FEEDS_MAX_ITEMS', 15)
 PINGBACK_CONTENT_LENGTH = getattr(settings,
                                   'OBJECTAPP_PINGBACK_CONTENT_LENGTH', 300)
 
-F_MIN = getattr(settings, 'OBJECTAPP_F_MIN', 0.1)
-F_MAX = getattr(settings, 'OBJECTAPP_F_MAX', 1.0)
-
 SPAM_CHECKER_BACKENDS = getattr(settings, 'OBJECTAPP_SPAM_CHECKER_BACKENDS',
                                 ())
 
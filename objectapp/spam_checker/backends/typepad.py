@@ -1,10 +1,10 @@
 """TypePad spam checker backend for Objectapp"""
 from django.conf import settings
 from django.utils.encoding import smart_str
-from django.contrib.sites.models import Site
 from django.core.exceptions import ImproperlyConfigured
 
 from objectapp.settings import PROTOCOL
+from gstudio.current_site import get_current_site
 
 try:
     from akismet import Akismet
@@ -25,7 +25,7 @@ class TypePad(Akismet):
 
 def backend(comment, content_object, request):
     """TypePad spam checker backend for Objectapp"""
-    blog_url = '%s://%s/' % (PROTOCOL, Site.objects.get_current().domain)
+    blog_url = '%s://%s/' % (PROTOCOL, get_current_site().domain)
 
     typepad = TypePad(key=TYPEPAD_API_KEY, blog_url=blog_url)
 
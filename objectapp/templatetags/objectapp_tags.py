@@ -18,23 +18,17 @@ from tagging.models import Tag
 from tagging.utils import calculate_cloud
 
 from gstudio.gnowql import get_node
+from gstudio.models import Similarity
 
 from objectapp.models import Gbobject
 from objectapp.models import Author
 from objectapp.models import Objecttype
 from objectapp.managers import tags_published
-from objectapp.comparison import VectorBuilder
-from objectapp.comparison import pearson_score
 from objectapp.templatetags.zcalendar import ObjectappCalendar
 from objectapp.templatetags.zbreadcrumbs import retrieve_breadcrumbs
 
 register = Library()
 
-VECTORS = None
-VECTORS_FACTORY = lambda: VectorBuilder(Gbobject.published.all(),
-                                        ['title', 'excerpt', 'content'])
-CACHE_GBOBJECTS_RELATED = {}
-
 
 @register.inclusion_tag('objectapp/tags/dummy.html')
 def get_objecttypes(template='objectapp/tags/objecttypes.html'):
@@ -109,41 +103,14 @@ def get_popular_gbobjects(number=5, template='objectapp/tags/popular_gbobjects.h
 def get_similar_gbobjects(context, number=5,
                         template='objectapp/tags/similar_gbobjects.html',
                         flush=False):
-    """Return similar gbobjects"""
-    global VECTORS
-    global CACHE_GBOBJECTS_RELATED
-
-    if VECTORS is None or flush:
-        VECTORS = VECTORS_FACTORY()
-        CACHE_GBOBJECTS_RELATED = {}
-
-    def compute_related(object_id, dataset):
-        """Compute related gbobjects to an gbobject with a dataset"""
-        object_vector = None
-        for gbobject, e_vector in dataset.items():
-            if gbobject.pk == object_id:
-                object_vector = e_vector
-
-        if not object_vector:
-            return []
-
-        gbobject_related = {}
-        for gbobject, e_vector in dataset.items():
-            if gbobject.pk != object_id:
-                score = pearson_score(object_vector, e_vector)
-                if score:
-                    gbobject_related[gbobject] = score
-
-        related = sorted(gbobject_related.items(), key=lambda(k, v): (v, k))
-        return [rel[0] for rel in related]
-
-    object_id = context['object'].pk
-    columns, dataset = VECTORS()
-    key = '%s-%s' % (object_id, VECTORS.key)
-    if not key in CACHE_GBOBJECTS_RELATED.keys():
-        CACHE_GBOBJECTS_RELATED[key] = compute_related(object_id, dataset)
-
-    gbobjects = CACHE_GBOBJECTS_RELATED[key][:number]
+    """Return the gbobjects similar to the object
+    of the context, a gbobject or a nodetype"""
+    if flush:
+        from gstudio.similarity import update_similarities
+        update_similarities()
+
+    gbobjects = Similarity.objects.similar_to(context['object'].pk,
+                                              Gbobject, number)
     return {'template': template,
             'gbobjects': gbobjects}
 
@@ -18,6 +18,7 @@ from objectapp.models import Objecttype
 from objectapp.managers import PUBLISHED
 from objectapp.tests.utils import TestTransport
 from objectapp.xmlrpc.pingback import generate_pingback_content
+from gstudio.current_site import clear_site_cache
 from objectapp import url_shortener as shortener_settings
 
 
@@ -86,6 +87,8 @@ class PingBackTestCase(TestCase):
         import objectapp.xmlrpc.pingback
         objectapp.xmlrpc.pingback.urlopen = self.original_urlopen
         shortener_settings.URL_SHORTENER_BACKEND = self.original_shortener
+        # The domain of the site is restored by the rollback
+        clear_site_cache()
 
     def test_generate_pingback_content(self):
         soup = BeautifulSoup(self.second_gbobject.content)
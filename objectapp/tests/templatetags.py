@@ -158,19 +158,25 @@ class TemplateTagsTestCase(TestCase):
                           'objectapp/tags/similar_gbobjects.html')
 
         params = {'title': 'My second gbobject',
-                  'content': 'This is the second gbobject of my tests.',
+                  'content': 'This is the second content of my tests.',
                   'tags': 'objectapp, test',
                   'status': PUBLISHED,
                   'slug': 'my-second-gbobject'}
         site = Site.objects.get_current()
         second_gbobject = Gbobject.objects.create(**params)
         second_gbobject.sites.add(site)
+        params = {'title': 'Another gbobject',
+                  'content': 'Something unrelated here.',
+                  'tags': 'objectapp, test',
+                  'status': PUBLISHED,
+                  'slug': 'another-gbobject'}
+        Gbobject.objects.create(**params).sites.add(site)
 
         source_context = Context({'object': second_gbobject})
         context = get_similar_gbobjects(source_context, 3,
                                       'custom_template.html',
                                       flush=True)
-        self.assertEquals(len(context['gbobjects']), 1)
+        self.assertEquals(context['gbobjects'], [self.gbobject])
         self.assertEquals(context['template'], 'custom_template.html')
 
     def test_get_archives_gbobjects(self):
@@ -1,11 +1,11 @@
 """Default url shortener backend for Objectapp"""
-from django.contrib.sites.models import Site
 from django.core.urlresolvers import reverse
 
 from objectapp.settings import PROTOCOL
+from gstudio.current_site import get_current_site
 
 
 def backend(gbobject):
     """Default url shortener backend for Objectapp"""
-    return '%s://%s%s' % (PROTOCOL, Site.objects.get_current().domain,
+    return '%s://%s%s' % (PROTOCOL, get_current_site().domain,
                        reverse('objectapp_gbobject_shortlink', args=[gbobject.pk]))
@@ -5,7 +5,6 @@ from django import forms
 from django.utils.html import linebreaks
 from django.shortcuts import redirect
 from django.core.urlresolvers import reverse
-from django.contrib.sites.models import Site
 from django.template.defaultfilters import slugify
 from django.utils.encoding import smart_str
 from django.contrib.auth.decorators import permission_required
@@ -13,6 +12,7 @@ from django.contrib.auth.decorators import permission_required
 from objectapp.models import Gbobject
 from objectapp.managers import DRAFT
 from objectapp.managers import PUBLISHED
+from gstudio.current_site import get_current_site
 
 
 class QuickGbobjectForm(forms.Form):
@@ -37,7 +37,7 @@ def view_quick_gbobject(request):
             gbobject_dict['slug'] = slugify(gbobject_dict['title'])
             gbobject_dict['status'] = status
             gbobject = Gbobject.objects.create(**gbobject_dict)
-            gbobject.sites.add(Site.objects.get_current())
+            gbobject.sites.add(get_current_site(request))
             gbobject.authors.add(request.user)
             return redirect(gbobject)
 
@@ -47,7 +47,7 @@ def view_quick_gbobject(request):
                 'tags': smart_str(request.POST.get('tags', '')),
                 'slug': slugify(request.POST.get('title', '')),
                 'authors': request.user.pk,
-                'sites': Site.objects.get_current().pk}
+                'sites': get_current_site(request).pk}
         return redirect('%s?%s' % (reverse('admin:objectapp_gbobject_add'),
                                    urlencode(data)))
 
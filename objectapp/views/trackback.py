@@ -1,13 +1,13 @@
 """Views for Objectapp trackback"""
 from django.shortcuts import redirect
 from django.shortcuts import get_object_or_404
-from django.contrib.sites.models import Site
 from django.contrib import comments
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.contenttypes.models import ContentType
 from django.views.generic.simple import direct_to_template
 
 from objectapp.models import Gbobject
+from gstudio.current_site import get_current_site
 
 
 @csrf_exempt
@@ -18,7 +18,7 @@ def gbobject_trackback(request, object_id):
     if request.POST.get('url'):
         error = ''
         url = request.POST['url']
-        site = Site.objects.get_current()
+        site = get_current_site(request)
 
         if not gbobject.pingback_enabled:
             error = u'Trackback is not enabled for %s' % gbobject.title
@@ -6,7 +6,6 @@ from xmlrpclib import DateTime
 
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.contrib.sites.models import Site
 from django.core.urlresolvers import reverse
 from django.utils.translation import gettext as _
 from django.utils.html import strip_tags
@@ -21,6 +20,7 @@ from objectapp.settings import PROTOCOL
 from objectapp.settings import UPLOAD_TO
 from objectapp.managers import DRAFT, PUBLISHED
 from django_xmlrpc.decorators import xmlrpc_func
+from gstudio.current_site import get_current_site
 
 # http://docs.nucleuscms.org/blog/12#errorcodes
 LOGIN_ERROR = 801
@@ -120,7 +120,7 @@ def get_users_blogs(apikey, username, password):
     """blogger.getUsersBlogs(api_key, username, password)
     => blog structure[]"""
     authenticate(username, password)
-    site = Site.objects.get_current()
+    site = get_current_site()
     return [blog_structure(site)]
 
 
@@ -129,7 +129,7 @@ def get_user_info(apikey, username, password):
     """blogger.getUserInfo(api_key, username, password)
     => user structure"""
     user = authenticate(username, password)
-    site = Site.objects.get_current()
+    site = get_current_site()
     return user_structure(user, site)
 
 
@@ -158,7 +158,7 @@ def get_post(post_id, username, password):
     """metaWeblog.getPost(post_id, username, password)
     => post structure"""
     user = authenticate(username, password)
-    site = Site.objects.get_current()
+    site = get_current_site()
     return post_structure(Gbobject.objects.get(id=post_id, authors=user), site)
 
 
@@ -168,7 +168,7 @@ def get_recent_posts(blog_id, username, password, number):
     """metaWeblog.getRecentPosts(blog_id, username, password, number)
     => post structure[]"""
     user = authenticate(username, password)
-    site = Site.objects.get_current()
+    site = get_current_site()
     return [post_structure(gbobject, site) \
             for gbobject in Gbobject.objects.filter(authors=user)[:number]]
 
@@ -178,7 +178,7 @@ def get_objecttypes(blog_id, username, password):
     """metaWeblog.getObjecttypes(blog_id, username, password)
     => Objecttype structure[]"""
     authenticate(username, password)
-    site = Site.objects.get_current()
+    site = get_current_site()
     return [Objecttype_structure(Objecttype, site) \
             for Objecttype in Objecttype.objects.all()]
 
@@ -234,7 +234,7 @@ def new_post(blog_id, username, password, post, publish):
             author = User.objects.get(pk=post['wp_author_id'])
     gbobject.authors.add(author)
 
-    gbobject.sites.add(Site.objects.get_current())
+    gbobject.sites.add(get_current_site())
     if 'objecttypes' in post:
         gbobject.objecttypes.add(*[Objecttype.objects.get_or_create(
             title=cat, slug=slugify(cat))[0]
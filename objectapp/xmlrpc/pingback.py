@@ -6,7 +6,6 @@ from urlparse import urlsplit
 
 from django.contrib import comments
 from django.utils.html import strip_tags
-from django.contrib.sites.models import Site
 from django.core.urlresolvers import resolve
 from django.core.urlresolvers import Resolver404
 from django.utils.translation import ugettext as _
@@ -16,6 +15,7 @@ from objectapp.models import Gbobject
 from objectapp.settings import PINGBACK_CONTENT_LENGTH
 from BeautifulSoup import BeautifulSoup
 from django_xmlrpc.decorators import xmlrpc_func
+from gstudio.current_site import get_current_site
 
 UNDEFINED_ERROR = 0
 SOURCE_DOES_NOT_EXIST = 16
@@ -62,7 +62,7 @@ def pingback_ping(source, target):
         if source == target:
             return UNDEFINED_ERROR
 
-        site = Site.objects.get_current()
+        site = get_current_site()
         try:
             document = ''.join(urlopen(source).readlines())
         except (HTTPError, URLError):
@@ -117,7 +117,7 @@ def pingback_extensions_get_pingbacks(target):
     Returns an array of URLs that link to the specified url.
 
     See: http://www.aquarionics.com/misc/archives/blogite/0198.html"""
-    site = Site.objects.get_current()
+    site = get_current_site()
 
     scheme, netloc, path, query, fragment = urlsplit(target)
     if netloc != site.domain:
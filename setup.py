@@ -40,4 +40,6 @@ setup(name='django-gstudio',
                         'django-grappelli>=2.3.4',
                         'django-ratings>=0.3.6',
                         'rdflib>=3.0.0',
+                        'numpy>=1.8.0',
+                        'scipy>=0.14.0',
                         ])